@@ -1,13 +1,20 @@
 from __future__ import annotations
 
+import multiprocessing
 import sys
 
 from PySide6.QtWidgets import QApplication
 
+from next_logger.cli import run_cli
 from next_logger.presentation import MainWindow
 
 
 def main() -> int:
+    # Export worker processes re-enter here in the frozen build.
+    multiprocessing.freeze_support()
+    if len(sys.argv) > 1:
+        return run_cli(sys.argv[1:])
+
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
@@ -15,4 +22,4 @@ def main() -> int:
 
 
 if __name__ == "__main__":
-    raise SystemExit(main())
+    raise SystemExit(main())
@@ -0,0 +1,246 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+import math
+import re
+import threading
+from typing import Any
+
+
+SILENCE_SEC = 30
+SPIKE_FACTOR = 10.0
+MIN_SPIKE_ERRORS_PER_SEC = 5.0
+BASELINE_WINDOW_SEC = 60.0
+WARMUP_SEC = 30
+WARMUP_LINES = 500
+SKETCH_WIDTH = 1 << 14
+SKETCH_DEPTH = 4
+# Past this share of occupied cells, unseen shapes start colliding with old ones in every row (~FILL**DEPTH);
+# the sketch is then retired to the previous generation and a fresh one takes its place.
+SKETCH_MAX_FILL = 0.4
+NEW_TEMPLATES_PER_MINUTE = 20
+MAX_RECORDED_ANOMALIES = 200
+RECENT_TEMPLATES = 4096
+TEMPLATE_MAX_CHARS = 200
+
+# Numbers, hex and long hex-ish ids vary between otherwise identical lines.
+_VARIABLE = re.compile(r"0[xX][0-9a-fA-F]+|\b[0-9a-fA-F]*\d[0-9a-fA-F]*\b|\d+")
+
+
+def line_template(line: str) -> str:
+    return _VARIABLE.sub("#", line[:TEMPLATE_MAX_CHARS])
+
+
+@dataclass(frozen=True)
+class Anomaly:
+    kind: str
+    at_ns: int
+    value: float = 0.0
+    baseline: float = 0.0
+    sample: str = ""
+
+    def as_dict(self, wall_ns: Callable[[int], int]) -> dict[str, Any]:
+        return {
+            "kind": self.kind,
+            "at_ns": wall_ns(self.at_ns),
+            "value": round(self.value, 3),
+            "baseline": round(self.baseline, 3),
+            "sample": self.sample,
+        }
+
+
+class CountMinSketch:
+    def __init__(self, width: int = SKETCH_WIDTH, depth: int = SKETCH_DEPTH) -> None:
+        self.width = 1 << max(1, (width - 1).bit_length())
+        self.depth = depth
+        self._mask = self.width - 1
+        self._rows = [array("I", bytes(4 * self.width)) for _ in range(depth)]
+        self._occupied = 0
+
+    def _slots(self, key: str) -> list[int]:
+        # Double hashing: one hash() call gives every row its own index.
+        digest = hash(key) & 0xFFFFFFFFFFFFFFFF
+        low = digest & 0xFFFFFFFF
+        step = (digest >> 32) | 1
+        return [(low + row * step) & self._mask for row in range(self.depth)]
+
+    def estimate(self, key: str) -> int:
+        return min(row[slot] for row, slot in zip(self._rows, self._slots(key)))
+
+    def add(self, key: str) -> int:
+        # Conservative update: only the rows at the current minimum grow, which keeps over-counting low.
+        slots = self._slots(key)
+        current = min(row[slot] for row, slot in zip(self._rows, slots))
+        if self._rows[0][slots[0]] == 0:
+            self._occupied += 1
+        if current < 0xFFFFFFFF:
+            for row, slot in zip(self._rows, slots):
+                if row[slot] == current:
+                    row[slot] = current + 1
+        return current
+
+    def fill_ratio(self) -> float:
+        return self._occupied / self.width
+
+
+class AnomalyDetector:
+    # Fixed memory however many distinct lines arrive: one EWMA, two sketch generations, a bounded
+    # recent-template set.
+    def __init__(
+        self,
+        silence_sec: float = SILENCE_SEC,
+        spike_factor: float = SPIKE_FACTOR,
+        min_spike_rate: float = MIN_SPIKE_ERRORS_PER_SEC,
+        warmup_sec: int = WARMUP_SEC,
+        warmup_lines: int = WARMUP_LINES,
+        sketch: CountMinSketch | None = None,
+        wall_ns: Callable[[int], int] = int,
+    ) -> None:
+        self._silence_ns = int(silence_sec * 1_000_000_000)
+        self._spike_factor = spike_factor
+        self._min_spike_rate = min_spike_rate
+        self._warmup_sec = warmup_sec
+        self._warmup_lines = warmup_lines
+        self._alpha = 1.0 - math.exp(-1.0 / BASELINE_WINDOW_SEC)
+        self._sketch = sketch or CountMinSketch()
+        self._previous_sketch: CountMinSketch | None = None
+        self._wall_ns = wall_ns
+        self._lock = threading.Lock()
+
+        self._second = -1
+        self._second_errors = 0
+        self._seconds_seen = 0
+        self._error_baseline = 0.0
+        self._spiking = False
+
+        self._lines = 0
+        self._last_line_ns: int | None = None
+        self._silent_since_ns: int | None = None
+
+        self._templates = 0
+        # Exact set of the latest templates in front of the sketch; most lines repeat one of a few shapes.
+        # Every entry is also in the current sketch generation, so skipping the sketch never ages it out.
+        self._recent: dict[str, None] = {}
+        self._new_minute = -1
+        self._new_in_minute = 0
+        self._suppressed_templates = 0
+        self._sketch_rotations = 0
+
+        self._counts: dict[str, int] = {}
+        self._recorded: list[dict[str, Any]] = []
+
+    def observe(self, batch: Sequence[tuple[int, str]], severities: Sequence[str]) -> list[Anomaly]:
+        found: list[Anomaly] = []
+        with self._lock:
+            for (arrived_ns, line), severity in zip(batch, severities):
+                if self._silent_since_ns is not None:
+                    found.append(Anomaly("silence_end", arrived_ns, (arrived_ns - self._silent_since_ns) / 1e9))
+                    self._silent_since_ns = None
+                self._last_line_ns = arrived_ns
+                self._lines += 1
+
+                second = arrived_ns // 1_000_000_000
+                if second > self._second:
+                    self._close_seconds(second)
+                if severity == "error":
+                    self._second_errors += 1
+                    if not self._spiking and self._seconds_seen >= self._warmup_sec:
+                        threshold = max(self._min_spike_rate, self._spike_factor * self._error_baseline)
+                        if self._second_errors >= threshold:
+                            self._spiking = True
+                            found.append(Anomaly("error_rate", arrived_ns, self._second_errors, self._error_baseline))
+
+                template = line_template(line)
+                if template in self._recent:
+                    continue
+                if len(self._recent) >= RECENT_TEMPLATES:
+                    self._recent.clear()
+                self._recent[template] = None
+                # The sketch never under-counts, so a zero estimate in both generations means this shape has
+                # not been seen for at least a full generation.
+                seen = self._sketch.add(template)
+                if not seen and self._previous_sketch is not None:
+                    seen = self._previous_sketch.estimate(template)
+                if self._sketch.fill_ratio() > SKETCH_MAX_FILL:
+                    self._rotate_sketch()
+                if seen == 0:
+                    self._templates += 1
+                    if self._lines > self._warmup_lines and self._seconds_seen >= self._warmup_sec:
+                        anomaly = self._new_template(arrived_ns, line)
+                        if anomaly is not None:
+                            found.append(anomaly)
+            self._record(found)
+        return found
+
+    def check_idle(self, now_ns: int) -> list[Anomaly]:
+        with self._lock:
+            if (
+                self._silence_ns <= 0
+                or self._last_line_ns is None
+                or self._silent_since_ns is not None
+                or now_ns - self._last_line_ns < self._silence_ns
+            ):
+                return []
+            self._silent_since_ns = self._last_line_ns
+            found = [Anomaly("silence", now_ns, (now_ns - self._last_line_ns) / 1e9)]
+            self._record(found)
+            return found
+
+    def reset_silence(self, now_ns: int) -> None:
+        # A pause is not silence: restart the timer from the moment reading resumes.
+        with self._lock:
+            if self._last_line_ns is not None and self._silent_since_ns is None:
+                self._last_line_ns = now_ns
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "counts": dict(self._counts),
+                "templates_seen": self._templates,
+                "new_templates_suppressed": self._suppressed_templates,
+                "sketch_rotations": self._sketch_rotations,
+                "error_baseline_per_sec": round(self._error_baseline, 3),
+                "silence_sec": self._silence_ns / 1e9,
+                "anomalies": list(self._recorded),
+            }
+
+    def _rotate_sketch(self) -> None:
+        # Shapes that keep arriving are carried into the new generation on their next line; shapes missing
+        # for a whole generation are forgotten. The recent set is emptied so it stays a subset of the sketch.
+        self._previous_sketch = self._sketch
+        self._sketch = CountMinSketch(self._sketch.width, self._sketch.depth)
+        self._recent.clear()
+        self._sketch_rotations += 1
+
+    def _close_seconds(self, second: int) -> None:
+        if self._second >= 0:
+            rate = self._second_errors
+            if self._spiking and rate < max(self._min_spike_rate, self._spike_factor * self._error_baseline) / 2:
+                self._spiking = False
+            self._error_baseline += self._alpha * (rate - self._error_baseline)
+            # Seconds without any line count as zero errors.
+            idle = min(second - self._second - 1, 3600)
+            if idle > 0:
+                self._error_baseline *= (1.0 - self._alpha) ** idle
+            self._seconds_seen += second - self._second
+        self._second = second
+        self._second_errors = 0
+
+    def _new_template(self, arrived_ns: int, line: str) -> Anomaly | None:
+        minute = arrived_ns // 60_000_000_000
+        if minute != self._new_minute:
+            self._new_minute = minute
+            self._new_in_minute = 0
+        if self._new_in_minute >= NEW_TEMPLATES_PER_MINUTE:
+            self._suppressed_templates += 1
+            return None
+        self._new_in_minute += 1
+        return Anomaly("new_template", arrived_ns, sample=line[:TEMPLATE_MAX_CHARS])
+
+    def _record(self, found: list[Anomaly]) -> None:
+        for anomaly in found:
+            self._counts[anomaly.kind] = self._counts.get(anomaly.kind, 0) + 1
+            if len(self._recorded) < MAX_RECORDED_ANOMALIES:
+                self._recorded.append(anomaly.as_dict(self._wall_ns))
@@ -0,0 +1,208 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from concurrent.futures import Future, ProcessPoolExecutor
+import multiprocessing
+import os
+import queue
+import threading
+import time
+from typing import Any
+
+from .log_markers import LogMarkerResult, classify_log_line
+from .rule_engine import RuleSet
+
+
+# Below this per-line cost, IPC (pickling lines and results) costs about as much as it saves.
+POOL_MIN_LINE_COST_NS = 20_000
+# Fraction of one core spent classifying before the reader is considered CPU bound.
+POOL_MIN_BUSY_FRACTION = 0.5
+POOL_MAX_WORKERS = 4
+MIN_CHUNK_LINES = 64
+_MAX_IN_FLIGHT = 8
+_CLOSE_TIMEOUT_SEC = 5.0
+
+Batch = list[tuple[int, str]]
+
+
+def classify_lines(lines: list[str], keywords: tuple[str, ...], rules: RuleSet | None = None) -> list[LogMarkerResult]:
+    if rules is None or not len(rules):
+        return [classify_log_line(line, keywords) for line in lines]
+    return [rules.apply(line, classify_log_line(line, keywords)) for line in lines]
+
+
+# Set once per worker process by the pool initializer, so tasks carry only their lines.
+_worker_config: tuple[tuple[str, ...], RuleSet | None] = ((), None)
+
+
+def _init_worker(keywords: tuple[str, ...], rules: RuleSet | None) -> None:
+    global _worker_config
+    _worker_config = (keywords, rules)
+
+
+def _classify_in_worker(lines: list[str]) -> list[LogMarkerResult]:
+    keywords, rules = _worker_config
+    return classify_lines(lines, keywords, rules)
+
+
+def default_pool_workers() -> int:
+    return max(0, min(POOL_MAX_WORKERS, (os.cpu_count() or 1) - 1))
+
+
+class ClassificationStage:
+    # Classifies inline until the measured load says the reader thread is CPU bound, then ships
+    # batches to worker processes. A single delivery thread hands results back in submit order.
+    def __init__(
+        self,
+        error_keywords: tuple[str, ...],
+        deliver: Callable[[Batch, list[LogMarkerResult]], None],
+        on_engage: Callable[[dict[str, Any]], None] | None = None,
+        on_deliver_error: Callable[[Batch, Exception], None] | None = None,
+        rules: RuleSet | None = None,
+        workers: int | None = None,
+        min_line_cost_ns: int = POOL_MIN_LINE_COST_NS,
+        min_busy_fraction: float = POOL_MIN_BUSY_FRACTION,
+        window_sec: float = 1.0,
+        clock: Callable[[], int] = time.perf_counter_ns,
+    ) -> None:
+        self._keywords = tuple(error_keywords)
+        self._rules = rules
+        self._deliver = deliver
+        self._on_engage = on_engage
+        self._on_deliver_error = on_deliver_error
+        self._workers = default_pool_workers() if workers is None else max(0, workers)
+        self._min_line_cost_ns = min_line_cost_ns
+        self._min_busy_fraction = min_busy_fraction
+        self._window_ns = int(window_sec * 1_000_000_000)
+        self._clock = clock
+
+        self._window_start = clock()
+        self._window_busy_ns = 0
+        self._window_lines = 0
+        self._line_cost_ns = 0
+
+        self._pool: ProcessPoolExecutor | None = None
+        # Guards swapping the pool in configure() against submit() on the reader thread.
+        self._pool_lock = threading.Lock()
+        self._pending: queue.Queue[
+            tuple[Batch, list[Future[list[LogMarkerResult]]], tuple[str, ...], RuleSet | None] | None
+        ] = queue.Queue(maxsize=_MAX_IN_FLIGHT)
+        self._delivery: threading.Thread | None = None
+        self._closed = False
+
+    @property
+    def mode(self) -> str:
+        return "pool" if self._pool is not None else "inline"
+
+    def configure(self, error_keywords: tuple[str, ...], rules: RuleSet | None) -> None:
+        with self._pool_lock:
+            self._keywords = tuple(error_keywords)
+            self._rules = rules
+            if self._pool is None or self._closed:
+                return
+            # Workers hold the old configuration; chunks already queued finish on the old pool.
+            old_pool = self._pool
+            self._pool = self._new_pool()
+        old_pool.shutdown(wait=False)
+
+    def submit(self, batch: Batch) -> None:
+        if self._closed or not batch:
+            return
+        if self._pool is None:
+            self._classify_inline(batch)
+            return
+
+        lines = [line for _, line in batch]
+        size = max(MIN_CHUNK_LINES, -(-len(lines) // self._workers))
+        with self._pool_lock:
+            pool = self._pool
+            keywords, rules = self._keywords, self._rules
+            futures = [
+                pool.submit(_classify_in_worker, lines[offset : offset + size]) for offset in range(0, len(lines), size)
+            ]
+        # Blocks when _MAX_IN_FLIGHT batches are outstanding, which throttles the reader like inline work would.
+        self._pending.put((batch, futures, keywords, rules))
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        if self._pool is None:
+            return
+        delivery = self._delivery
+        if delivery is not None and delivery.is_alive():
+            try:
+                self._pending.put(None, timeout=_CLOSE_TIMEOUT_SEC)
+            except queue.Full:
+                pass
+            delivery.join(_CLOSE_TIMEOUT_SEC)
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "mode": self.mode,
+            "workers": self._workers if self._pool is not None else 0,
+            "line_cost_us": round(self._line_cost_ns / 1000, 2),
+            "rules": self._rules.summary() if self._rules is not None else {},
+        }
+
+    def _classify_inline(self, batch: Batch) -> None:
+        started = self._clock()
+        results = classify_lines([line for _, line in batch], self._keywords, self._rules)
+        finished = self._clock()
+        self._window_busy_ns += finished - started
+        self._window_lines += len(batch)
+        self._safe_deliver(batch, results)
+
+        elapsed = finished - self._window_start
+        if elapsed < self._window_ns:
+            return
+        self._line_cost_ns = self._window_busy_ns // max(1, self._window_lines)
+        busy_fraction = self._window_busy_ns / max(1, elapsed)
+        self._window_start = finished
+        self._window_busy_ns = 0
+        self._window_lines = 0
+        if self._workers and self._line_cost_ns >= self._min_line_cost_ns and busy_fraction >= self._min_busy_fraction:
+            self._engage(busy_fraction)
+
+    def _new_pool(self) -> ProcessPoolExecutor:
+        # spawn: fork would copy the reader/writer threads' locks in whatever state they are in.
+        return ProcessPoolExecutor(
+            max_workers=self._workers,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(self._keywords, self._rules),
+        )
+
+    def _engage(self, busy_fraction: float) -> None:
+        with self._pool_lock:
+            self._pool = self._new_pool()
+        self._delivery = threading.Thread(target=self._deliver_loop, daemon=True, name="classify-delivery")
+        self._delivery.start()
+        if self._on_engage is not None:
+            self._on_engage({**self.summary(), "busy_fraction": round(busy_fraction, 2)})
+
+    def _deliver_loop(self) -> None:
+        while True:
+            item = self._pending.get()
+            if item is None:
+                return
+            batch, futures, keywords, rules = item
+            try:
+                results = [result for future in futures for result in future.result()]
+            except Exception:  # noqa: BLE001
+                # A dead worker must not lose lines; classify this batch here instead.
+                results = classify_lines([line for _, line in batch], keywords, rules)
+            self._safe_deliver(batch, results)
+
+    def _safe_deliver(self, batch: Batch, results: list[LogMarkerResult]) -> None:
+        # A failing consumer loses this batch only; the delivery thread has to keep draining the queue or the
+        # reader blocks in submit() and close() never returns.
+        try:
+            self._deliver(batch, results)
+        except Exception as exc:  # noqa: BLE001
+            if self._on_deliver_error is not None:
+                try:
+                    self._on_deliver_error(batch, exc)
+                except Exception:  # noqa: BLE001
+                    pass
@@ -4,7 +4,10 @@ from dataclasses import asdict, replace
 from datetime import datetime
 from pathlib import Path
 import queue
+import re
+import sqlite3
 import threading
+import time
 from typing import Any
 
 from serial.tools import list_ports
@@ -14,34 +17,92 @@ from next_logger.application.preflight import (
     normalize_error_keywords,
     run_preflight,
 )
-from next_logger.application.log_markers import classify_log_line
+from next_logger.application.anomaly_detector import Anomaly, AnomalyDetector
+from next_logger.application.classification_stage import ClassificationStage
+from next_logger.application.decimator import Decimator
+from next_logger.application.incident_recorder import IncidentRecorder
+from next_logger.application.live_plot import LivePlotStore, PlotSeries
+from next_logger.application.log_markers import LogMarkerResult
+from next_logger.application.prompt_builder import PromptBuildWorker, iter_prompt_records
+from next_logger.application.rule_engine import RuleError, RuleSet, load_rules
+from next_logger.application.template_miner import TemplateMiner, TemplateSummary
+from next_logger.application.stats_collector import StatsCollector
+from next_logger.application.throughput import ThroughputMeter
 from next_logger.domain import AppState, ConnectionConfig, SessionConfig, SessionStats, StateMachine
 from next_logger.infrastructure import (
     ProfileStore,
     RecoveryStore,
     SerialWorker,
+    SessionCatalog,
     SessionLogWriter,
-    apply_retention_policy,
 )
+from next_logger.infrastructure.clock import SessionClock, monotonic_ns
+from next_logger.infrastructure.incident_log import IncidentLog, read_incident
+from next_logger.infrastructure.log_writer import (
+    FullRateArchive,
+    connection_section,
+    settings_section,
+    stats_section,
+)
+from next_logger.infrastructure.retention_janitor import RetentionJanitor, RetentionJob
+from next_logger.infrastructure.session_archiver import SessionArchiver
+from next_logger.infrastructure.session_catalog import CatalogEntry
+from next_logger.infrastructure.session_export import SessionExporter, read_manifest
+from next_logger.infrastructure.session_journal import SessionJournal, recover_session
+from next_logger.infrastructure.triggered_capture import TriggeredCapture
 
 
 class LoggerController:
     def __init__(self) -> None:
         self._state_machine = StateMachine()
-        self._stats = SessionStats()
+        self._stats = StatsCollector()
+        self._throughput = ThroughputMeter()
         self._events: queue.Queue[dict[str, Any]] = queue.Queue(maxsize=5000)
         self._worker: SerialWorker | None = None
         self._writer: SessionLogWriter | None = None
+        self._journal: SessionJournal | None = None
+        self._clock = SessionClock()
+        self._classifier: ClassificationStage | None = None
+        self._anomalies: AnomalyDetector | None = None
+        self._incidents: IncidentRecorder | None = None
+        self._incident_log: IncidentLog | None = None
+        self._capture: TriggeredCapture | None = None
+        self._capture_pattern: re.Pattern[str] | None = None
+        self._capture_on_error = False
+        self._decimator: Decimator | None = None
+        self._full_rate: FullRateArchive | None = None
+        self._templates = TemplateMiner()
+        self._plot = LivePlotStore()
+        self._plot_enabled = True
+        self._prompt_worker: PromptBuildWorker | None = None
         self._connection: ConnectionConfig | None = None
         self._session: SessionConfig | None = None
         self._profile_store = ProfileStore()
         self._recovery_store = RecoveryStore()
+        self._catalog = SessionCatalog()
+        self._janitor = RetentionJanitor(
+            on_event=self._emit_event,
+            protected_dirs=self._active_session_dirs,
+            catalog=self._catalog,
+        )
+        self._archiver = SessionArchiver(
+            on_event=self._emit_event,
+            protected_dirs=self._active_session_dirs,
+            catalog=self._catalog,
+        )
+        self._exporter: SessionExporter | None = None
         self._lock = threading.Lock()
+        # Held across a write and its stats update, so a journal checkpoint never sees offsets past its counters.
+        self._checkpoint_lock = threading.Lock()
 
     @property
     def state(self) -> AppState:
         return self._state_machine.state
 
+    @property
+    def capture_active(self) -> bool:
+        return self._capture is not None
+
     def list_ports(self) -> list[str]:
         return [port.device for port in list_ports.comports()]
 
@@ -49,8 +110,13 @@ class LoggerController:
         return build_preview_path(self._normalize_session(session))
 
     def get_stats_snapshot(self) -> SessionStats:
-        with self._lock:
-            return replace(self._stats)
+        return self._stats.snapshot()
+
+    def get_throughput_rates(self) -> dict[int, dict[str, float]]:
+        return self._throughput.rates()
+
+    def get_recent_line_counts(self, seconds: int = 60) -> list[int]:
+        return self._throughput.recent_lines(seconds)
 
     def start(self, connection: ConnectionConfig, session: SessionConfig) -> tuple[str, ...]:
         normalized_session = self._normalize_session(session)
@@ -62,34 +128,98 @@ class LoggerController:
         if self.state not in {AppState.IDLE, AppState.READY, AppState.ERROR}:
             return (f"Cannot start from state: {self.state.value}",)
 
+        try:
+            rules = self._load_rules(normalized_session)
+        except RuleError as exc:
+            message = f"Failed to load rule file: {exc}"
+            self._emit_event({"type": "preflight_failed", "errors": [message]})
+            return (message,)
+
         with self._lock:
             self._connection = connection
             self._session = normalized_session
-            self._stats = SessionStats(start_time=datetime.now())
+            self._stats = StatsCollector(start_time=datetime.now())
+            self._throughput = ThroughputMeter()
+            self._clock = SessionClock()
+            self._classifier = ClassificationStage(
+                normalized_session.error_keywords,
+                deliver=self._write_classified,
+                on_engage=self._on_classifier_engaged,
+                on_deliver_error=self._on_deliver_error,
+                rules=rules,
+            )
+            self._anomalies = AnomalyDetector(
+                silence_sec=normalized_session.anomaly_silence_sec,
+                wall_ns=self._clock.wall_ns,
+            )
+            self._templates = TemplateMiner()
+            self._plot = LivePlotStore()
+            self._plot.enabled = self._plot_enabled
+            context_lines = normalized_session.incident_context_lines
+            self._incidents = (
+                IncidentRecorder(self._record_incident, before=context_lines, after=context_lines)
+                if context_lines > 0
+                else None
+            )
+            self._decimator = (
+                Decimator(
+                    normalized_session.decimation_mode,
+                    every_n=normalized_session.decimation_every_n,
+                    bucket_ms=normalized_session.decimation_bucket_ms,
+                )
+                if normalized_session.decimation_mode != "off"
+                else None
+            )
 
         self._move_state(AppState.READY)
 
         try:
-            self._writer = SessionLogWriter(normalized_session)
+            self._writer = SessionLogWriter(normalized_session, catalog=self._catalog)
+            self._journal = SessionJournal(self._writer.session_dir, snapshot=self._journal_snapshot)
+            self._incident_log = IncidentLog(self._writer.session_dir)
+            self._capture = None
+            if normalized_session.capture_mode == "triggered":
+                self._capture = TriggeredCapture(
+                    self._writer,
+                    pre_bytes=normalized_session.capture_pre_mb * 1024 * 1024,
+                    post_ns=normalized_session.capture_post_sec * 1_000_000_000,
+                    on_trigger=self._on_capture_triggered,
+                )
+            regex = normalized_session.capture_trigger_regex
+            self._capture_pattern = re.compile(regex) if regex else None
+            self._capture_on_error = normalized_session.capture_on_error
+            self._full_rate = None
+            if self._decimator is not None and normalized_session.decimation_keep_full_rate:
+                self._full_rate = FullRateArchive(self._writer.session_dir, normalized_session.timestamp_resolution)
         except OSError as exc:
+            self._abandon_session_files()
             self._move_state(AppState.ERROR)
-            with self._lock:
-                self._stats.last_error = str(exc)
+            self._stats.last_error = str(exc)
             message = f"Failed to create log files: {exc}"
             self._emit_event({"type": "error", "message": message})
             return (message,)
 
-        with self._lock:
-            self._stats.session_dir = self._writer.session_dir
+        self._stats.session_dir = self._writer.session_dir
 
         self._write_recovery_marker()
+        self._journal.write_start(
+            {
+                "session": {"started_at": datetime.now().isoformat(timespec="seconds")},
+                "settings": settings_section(normalized_session),
+                "connection": connection_section(connection),
+                "segments": self._writer.checkpoint_state()["segments"],
+                "clock": self._clock.section(),
+            }
+        )
+        self._journal.start()
 
         self._worker = SerialWorker(
             connection=connection,
             on_open=self._on_serial_open,
-            on_line=self._on_serial_line,
+            on_lines=self._on_serial_lines,
             on_error=self._on_serial_error,
             on_reconnect=self._on_serial_reconnect,
+            on_idle=self._on_serial_idle,
         )
         self._worker.start()
 
@@ -118,15 +248,28 @@ class LoggerController:
         if session is not None:
             normalized_session = self._normalize_session(session)
 
+        rules = None
+        if normalized_session is not None and self._classifier is not None:
+            try:
+                rules = self._load_rules(normalized_session)
+            except RuleError as exc:
+                self._emit_event({"type": "error", "message": f"Failed to load rule file: {exc}"})
+                return
+
         if normalized_session is not None and self._writer is not None:
             if normalized_session.resume_policy == "new_segment":
                 self._writer.rotate_segment()
-                with self._lock:
-                    self._stats.segment_count = self._writer.segment_index
+                self._stats.segment_count = self._writer.segment_index
+                if self._journal is not None:
+                    self._journal.checkpoint_now()
 
             with self._lock:
                 self._session = normalized_session
+            if self._classifier is not None:
+                self._classifier.configure(normalized_session.error_keywords, rules)
 
+        if self._anomalies is not None:
+            self._anomalies.reset_silence(monotonic_ns())
         self._worker.resume()
         self._move_state(AppState.RUNNING)
         self._emit_event({"type": "status", "message": "Resumed."})
@@ -147,32 +290,92 @@ class LoggerController:
             worker.stop()
             if threading.current_thread() is not worker:
                 worker.join(timeout=2.0)
-
-        with self._lock:
-            self._stats.end_time = datetime.now()
+        classifier = self._classifier
+        if classifier is not None:
+            # Lines still in the worker pool are written before the manifest is.
+            classifier.close()
+
+        decimator = self._decimator
+        if decimator is not None and self._writer is not None:
+            # The time bucket still being collected is written as it stands.
+            with self._checkpoint_lock:
+                tail, tail_markers = decimator.flush()
+                tail_ok = self._write_records(self._writer, tail) if tail else True
+            if tail:
+                self._publish_records(self._writer, tail, tail_markers, tail_ok)
+        capture = self._capture
+        if capture is not None and capture.trigger_pending and self._writer is not None:
+            # A manual trigger that no batch has picked up yet still saves its buffered lines.
+            with self._checkpoint_lock:
+                self._write_records(self._writer, [])
+
+        self._stats.end_time = datetime.now()
+        incidents = self._incidents
+        if incidents is not None:
+            # An incident still collecting its trailing context is written with what it has.
+            incidents.flush()
 
         writer = self._writer
         self._writer = None
         manifest_path = None
-        retention_result = {"removed_age": 0, "removed_count": 0}
+        retention_queued = False
         if writer is not None:
             manifest_path = writer.close(
                 status="stopped" if reason == "user_stop" else "error",
                 stats=self.get_stats_snapshot(),
                 reason=reason,
                 connection=self._connection,
+                extra_sections={
+                    "throughput": self._throughput.series(),
+                    "clock": self._clock.section(),
+                    "classification": classifier.summary() if classifier is not None else {},
+                    "anomalies": self._anomalies.summary() if self._anomalies is not None else {},
+                    "templates": self._templates.summary(wall_ns=self._clock.wall_ns),
+                    "incidents": incidents.summary() if incidents is not None else {},
+                    "capture": self._capture.summary() if self._capture is not None else {},
+                    "decimation": self._decimation_section(),
+                },
             )
+        self._capture = None
+        full_rate = self._full_rate
+        self._full_rate = None
+        if full_rate is not None:
+            full_rate.close()
+        incident_log = self._incident_log
+        self._incident_log = None
+        if incident_log is not None:
+            incident_log.close()
+        journal = self._journal
+        self._journal = None
+        if journal is not None:
+            # The manifest now holds everything the journal would have been used to rebuild.
+            journal.close(remove=manifest_path is not None)
 
         session = self._session
-        if session is not None:
-            keep_dirs = {self._stats.session_dir} if self._stats.session_dir else set()
-            retention_result = apply_retention_policy(
-                base_dir=session.save_dir,
-                max_sessions=session.retention_max_sessions,
-                max_age_days=session.retention_max_age_days,
-                keep_dirs=keep_dirs,
+        if session is not None and (
+            session.retention_max_sessions > 0
+            or session.retention_max_age_days > 0
+            or session.retention_max_total_mb > 0
+            or session.retention_max_product_mb > 0
+        ):
+            keep_dirs = frozenset({self._stats.session_dir}) if self._stats.session_dir else frozenset()
+            retention_queued = self._janitor.submit(
+                RetentionJob(
+                    base_dir=session.save_dir,
+                    max_sessions=session.retention_max_sessions,
+                    max_age_days=session.retention_max_age_days,
+                    keep_dirs=keep_dirs,
+                    max_total_bytes=session.retention_max_total_mb * 1024 * 1024,
+                    max_product_bytes=session.retention_max_product_mb * 1024 * 1024,
+                    priority=session.retention_priority,
+                    compress_before_delete=session.retention_compress_before_delete,
+                )
             )
 
+        archive_queued = 0
+        if session is not None and session.archive_closed_sessions:
+            archive_queued = self._archiver.submit_closed(session.save_dir)
+
         self._recovery_store.clear_marker()
 
         if self.state in {AppState.STOPPING, AppState.ERROR, AppState.READY}:
@@ -183,13 +386,19 @@ class LoggerController:
                 "type": "session_stopped",
                 "reason": reason,
                 "manifest": str(manifest_path) if manifest_path else "",
-                "retention": retention_result,
+                "retention_queued": retention_queued,
+                "archive_queued": archive_queued,
             }
         )
 
     def shutdown(self) -> None:
         if self.state in {AppState.RUNNING, AppState.PAUSED, AppState.ERROR, AppState.STOPPING}:
             self.stop(reason="shutdown")
+        self._janitor.stop()
+        self._archiver.stop()
+        self.cancel_export()
+        if self._prompt_worker is not None:
+            self._prompt_worker.cancel()
 
     def poll_events(self) -> list[dict[str, Any]]:
         events: list[dict[str, Any]] = []
@@ -200,6 +409,57 @@ class LoggerController:
                 break
         return events
 
+    def get_log_templates(self, limit: int | None = None, key: str = "count") -> list[TemplateSummary]:
+        clock = self._clock
+        return [
+            replace(item, first_ns=clock.wall_ns(item.first_ns), last_ns=clock.wall_ns(item.last_ns))
+            for item in self._templates.top(limit, key)
+        ]
+
+    def trigger_capture(self) -> bool:
+        capture = self._capture
+        if capture is None or self.state not in {AppState.RUNNING, AppState.PAUSED}:
+            return False
+        # Only flags the trigger; the ingest side writes the buffered lines with its next batch or idle tick.
+        capture.trigger("manual", self._clock.wall_ns(monotonic_ns()))
+        return True
+
+    @property
+    def plot_version(self) -> int:
+        return self._plot.version
+
+    def set_plot_enabled(self, enabled: bool) -> None:
+        # Field extraction runs on the delivery thread, so it is skipped entirely while the plot is off.
+        self._plot_enabled = enabled
+        self._plot.enabled = enabled
+
+    def get_plot_series(self, names: list[str] | None, window: int, width: int) -> list[PlotSeries]:
+        return self._plot.snapshot(names, window, width)
+
+    def get_incident(self, session_dir: Path, incident_id: int) -> dict[str, Any] | None:
+        return read_incident(Path(session_dir), incident_id)
+
+    def match_log_template(self, line: str) -> int | None:
+        return self._templates.match(line)
+
+    def build_prompt_logs(
+        self,
+        max_tokens: int,
+        session_dir: Path | None = None,
+        records: list[tuple[str, str, str]] | None = None,
+    ) -> PromptBuildWorker:
+        if self._prompt_worker is not None:
+            self._prompt_worker.cancel()
+        if session_dir is not None:
+            keywords, rules = self._session_classification(Path(session_dir))
+            worker = PromptBuildWorker(lambda: iter_prompt_records(Path(session_dir), keywords, rules), max_tokens)
+        else:
+            snapshot = list(records or [])
+            worker = PromptBuildWorker(lambda: snapshot, max_tokens)
+        self._prompt_worker = worker
+        worker.start()
+        return worker
+
     def list_profiles(self) -> list[str]:
         return self._profile_store.list_names()
 
@@ -235,6 +495,43 @@ class LoggerController:
     def delete_profile(self, name: str) -> None:
         self._profile_store.delete_profile(name)
 
+    def list_sessions(
+        self,
+        base_dir: Path,
+        product: str | None = None,
+        status: str | None = None,
+    ) -> list[CatalogEntry]:
+        return self._catalog.list_sessions(base_dir, product=product, status=status, newest_first=True)
+
+    def rebuild_catalog(self, base_dir: Path) -> int:
+        return self._catalog.rebuild(base_dir)
+
+    def recover_session(self, session_dir: Path) -> Path | None:
+        manifest_path = recover_session(session_dir)
+        if manifest_path is not None:
+            try:
+                self._catalog.record_manifest(manifest_path)
+            except sqlite3.Error:
+                pass
+        return manifest_path
+
+    def export_session(
+        self,
+        session_dir: Path,
+        output: Path,
+        log_format: str | None = None,
+        errors_only: bool = False,
+    ) -> bool:
+        if self._exporter is not None and self._exporter.is_alive():
+            return False
+        self._exporter = SessionExporter(session_dir, output, self._emit_event, log_format, errors_only)
+        self._exporter.start()
+        return True
+
+    def cancel_export(self) -> None:
+        if self._exporter is not None:
+            self._exporter.cancel()
+
     def load_recovery_marker(self) -> dict[str, Any] | None:
         return self._recovery_store.load_marker()
 
@@ -242,7 +539,33 @@ class LoggerController:
         self._recovery_store.clear_marker()
 
     def _normalize_session(self, session: SessionConfig) -> SessionConfig:
-        return replace(session, error_keywords=normalize_error_keywords(session.error_keywords))
+        return replace(
+            session,
+            error_keywords=normalize_error_keywords(session.error_keywords),
+            rules_file=session.rules_file.strip(),
+        )
+
+    def _load_rules(self, session: SessionConfig) -> RuleSet | None:
+        if not session.rules_file:
+            return None
+        return load_rules(Path(session.rules_file))
+
+    def _session_classification(self, session_dir: Path) -> tuple[tuple[str, ...], RuleSet | None]:
+        # The running session uses its live settings; closed sessions use the ones stored in their manifest.
+        session = self._session
+        if self._writer is None or self._writer.session_dir != session_dir or session is None:
+            settings = read_manifest(session_dir).get("settings", {})
+            keywords = normalize_error_keywords(settings.get("error_keywords", ()))
+            rules_file = str(settings.get("rules_file", "")).strip()
+        else:
+            keywords = session.error_keywords
+            rules_file = session.rules_file
+        if not rules_file:
+            return keywords, None
+        try:
+            return keywords, load_rules(Path(rules_file))
+        except RuleError:
+            return keywords, None
 
     def _write_recovery_marker(self) -> None:
         if self._connection is None or self._session is None:
@@ -260,45 +583,199 @@ class LoggerController:
         }
         self._recovery_store.write_marker(payload)
 
+    def _abandon_session_files(self) -> None:
+        # Whatever start() opened before the failure; the writer gets a manifest so the folder is not left
+        # looking like a crashed session.
+        self._capture = None
+        for closeable in (self._full_rate, self._incident_log):
+            if closeable is not None:
+                closeable.close()
+        self._full_rate = None
+        self._incident_log = None
+        writer = self._writer
+        self._writer = None
+        manifest_path = None
+        if writer is not None:
+            try:
+                manifest_path = writer.close(status="error", stats=self.get_stats_snapshot(), reason="start_failed")
+            except OSError:
+                pass
+        journal = self._journal
+        self._journal = None
+        if journal is not None:
+            journal.close(remove=manifest_path is not None)
+
+    def _journal_snapshot(self) -> dict[str, Any]:
+        writer = self._writer
+        with self._checkpoint_lock:
+            stats = stats_section(self._stats.snapshot())
+            state = writer.checkpoint_state() if writer is not None else {}
+        return {"stats": stats, **state}
+
+    def _active_session_dirs(self) -> set[Path]:
+        writer = self._writer
+        return {writer.session_dir} if writer is not None else set()
+
     def _on_serial_open(self) -> None:
         self._emit_event({"type": "status", "message": "Serial port connected."})
 
-    def _on_serial_line(self, line: str) -> None:
-        timestamp = datetime.now()
+    def _on_serial_lines(self, batch: list[tuple[int, str]]) -> None:
+        classifier = self._classifier
+        if self._writer is None or classifier is None:
+            self._stats.record_drop(len(batch))
+            self._throughput.record(drops=len(batch))
+            return
+        classifier.submit(batch)
+
+    def _on_classifier_engaged(self, summary: dict[str, Any]) -> None:
+        self._emit_event(
+            {
+                "type": "status",
+                "message": (
+                    f"Classification moved to {summary['workers']} worker processes "
+                    f"({summary['line_cost_us']:.0f} us/line)."
+                ),
+            }
+        )
+
+    def _on_deliver_error(self, batch: list[tuple[int, str]], exc: Exception) -> None:
+        # Only reached when the batch failed before it was written; later failures are reported by
+        # _write_classified without counting the lines twice.
+        self._stats.record_drop(len(batch))
+        self._throughput.record(drops=len(batch))
+        self._report_delivery_error(f"Failed to write {len(batch)} classified lines: {exc}")
+
+    def _report_delivery_error(self, message: str) -> None:
+        self._stats.last_error = message
+        self._emit_event({"type": "status", "message": message})
+
+    def _write_classified(self, batch: list[tuple[int, str]], markers: list[LogMarkerResult]) -> None:
         writer = self._writer
-        session = self._session
-        if writer is None or session is None:
-            with self._lock:
-                self._stats.dropped_lines += 1
+        if writer is None:
+            self._stats.record_drop(len(batch))
+            self._throughput.record(drops=len(batch))
             return
 
-        marker = classify_log_line(line, session.error_keywords)
-        is_error = marker.severity == "error"
-        write_ok = writer.write_line(timestamp, line, is_error)
+        clock = self._clock
+        records: list[tuple[int, str, bool]] = []
+        nbytes = 0
+        errors = 0
+        for (arrived_ns, line), marker in zip(batch, markers):
+            is_error = marker.severity == "error"
+            records.append((clock.wall_ns(arrived_ns), line, is_error))
+            nbytes += len(line.encode("utf-8")) + 1
+            errors += is_error
+
+        received = len(records)
+        written, written_markers = records, markers
+        decimator = self._decimator
+        if decimator is not None:
+            full_rate = self._full_rate
+            if full_rate is not None:
+                full_rate.write(records)
+
+        with self._checkpoint_lock:
+            if decimator is not None:
+                # Under the lock so a bucket closed from the idle path cannot land between these lines.
+                written, written_markers = decimator.apply(records, markers)
+            write_started = time.perf_counter_ns()
+            write_ok = self._write_records(writer, written)
+            write_latency_ns = time.perf_counter_ns() - write_started
+            self._stats.record_lines(received, errors, write_ok)
+
+        self._throughput.record(
+            lines=received,
+            nbytes=nbytes,
+            errors=errors,
+            latency_ns=write_latency_ns,
+            writes=1,
+        )
+
+        try:
+            self._publish_records(writer, written, written_markers, write_ok)
+            severities = [marker.severity for marker in markers]
+            self._templates.add_batch(batch, severities)
+            self._plot.observe(line for _, line in batch)
+            detector = self._anomalies
+            if detector is not None:
+                for anomaly in detector.observe(batch, severities):
+                    self._emit_anomaly(anomaly)
+        except Exception as exc:  # noqa: BLE001
+            # The lines are written and counted; only the live views missed them.
+            self._report_delivery_error(f"Failed to publish {len(batch)} written lines: {exc}")
+
+    def _write_records(self, writer: SessionLogWriter, records: list[tuple[int, str, bool]]) -> bool:
+        capture = self._capture
+        if capture is None:
+            return writer.write_lines_ns(records)
+        write_ok = capture.write(records, self._capture_triggers(records))
+        self._stats.segment_count = writer.segment_index
+        return write_ok
+
+    def _publish_records(
+        self,
+        writer: SessionLogWriter,
+        records: list[tuple[int, str, bool]],
+        markers: list[LogMarkerResult],
+        write_ok: bool,
+    ) -> None:
+        clock = self._clock
+        for (wall_ns, line, is_error), marker in zip(records, markers):
+            self._emit_event(
+                {
+                    "type": "line",
+                    "timestamp": clock.clock_text(wall_ns),
+                    "line": line,
+                    "is_error": is_error,
+                    "severity": marker.severity,
+                    "marker_terms": [*marker.matched_terms, *(f"#{tag}" for tag in marker.tags)],
+                    "write_ok": write_ok,
+                }
+            )
 
-        with self._lock:
-            self._stats.received_lines += 1
-            if is_error:
-                self._stats.error_lines += 1
-            if not write_ok:
-                self._stats.write_failures += 1
-                self._stats.last_error = "Log write failed."
+        incidents = self._incidents
+        if incidents is not None:
+            segment, first_line = (self._capture or writer).last_batch_start()
+            incidents.observe(records, [marker.severity for marker in markers], segment, first_line)
+
+    def _decimation_section(self) -> dict[str, Any]:
+        decimator = self._decimator
+        if decimator is None:
+            return {}
+        full_rate = self._full_rate
+        return {
+            **decimator.summary(),
+            "full_rate_file": full_rate.path.name if full_rate is not None and full_rate.lines else "",
+            "full_rate_lines": full_rate.lines if full_rate is not None else 0,
+        }
 
+    def _capture_triggers(self, records: list[tuple[int, str, bool]]) -> list[tuple[int, str]]:
+        pattern = self._capture_pattern
+        on_error = self._capture_on_error
+        if pattern is None and not on_error:
+            return []
+        triggers: list[tuple[int, str]] = []
+        for index, (_, line, is_error) in enumerate(records):
+            if is_error and on_error:
+                triggers.append((index, "error"))
+            elif pattern is not None and pattern.search(line):
+                triggers.append((index, "regex"))
+        return triggers
+
+    def _on_capture_triggered(self, capture: dict[str, Any]) -> None:
         self._emit_event(
             {
-                "type": "line",
-                "timestamp": timestamp.strftime("%H:%M:%S"),
-                "line": line,
-                "is_error": is_error,
-                "severity": marker.severity,
-                "marker_terms": list(marker.matched_terms),
-                "write_ok": write_ok,
+                "type": "status",
+                "message": (
+                    f"Capture #{capture['id']} triggered ({capture['reason']}): "
+                    f"{capture['pre_lines']} buffered lines saved to {capture['pre_segment'] or '-'}, "
+                    f"recording to {capture['post_segment']}."
+                ),
             }
         )
 
     def _on_serial_error(self, message: str) -> None:
-        with self._lock:
-            self._stats.last_error = message
+        self._stats.last_error = message
 
         self._emit_event({"type": "error", "message": message})
         self.stop(reason="serial_error")
@@ -311,9 +788,8 @@ class LoggerController:
             "delay_sec": f"{delay_sec:.2f}",
             "detail": detail,
         }
-        with self._lock:
-            self._stats.reconnect_attempts += 1
-            self._stats.reconnect_events.append(event)
+        self._stats.record_reconnect(event)
+        self._on_serial_idle()
 
         self._emit_event(
             {
@@ -324,6 +800,54 @@ class LoggerController:
             }
         )
 
+    def _on_serial_idle(self) -> None:
+        capture = self._capture
+        writer = self._writer
+        if capture is not None and capture.trigger_pending and writer is not None:
+            with self._checkpoint_lock:
+                self._write_records(writer, [])
+        decimator = self._decimator
+        if decimator is not None and writer is not None:
+            # A quiet device would otherwise keep its last bucket in memory until the next line.
+            with self._checkpoint_lock:
+                expired, expired_markers = decimator.expire(self._clock.wall_ns(monotonic_ns()))
+                expired_ok = self._write_records(writer, expired) if expired else True
+            if expired:
+                self._publish_records(writer, expired, expired_markers, expired_ok)
+        detector = self._anomalies
+        if detector is not None:
+            for anomaly in detector.check_idle(monotonic_ns()):
+                self._emit_anomaly(anomaly)
+
+    def _record_incident(self, incident: dict[str, Any]) -> None:
+        log = self._incident_log
+        if log is not None:
+            log.append(incident)
+        first_error = next((line for _, severity, line in incident["lines"] if severity == "error"), "")
+        self._emit_event(
+            {
+                "type": "incident",
+                "id": incident["id"],
+                "session_dir": str(log.path.parent) if log is not None else "",
+                "timestamp": time.strftime("%H:%M:%S", time.localtime(incident["first_error_ns"] // 1_000_000_000)),
+                "errors": incident["errors"],
+                "line_count": incident["line_count"],
+                "line": first_error,
+            }
+        )
+
+    def _emit_anomaly(self, anomaly: Anomaly) -> None:
+        self._emit_event(
+            {
+                "type": "anomaly",
+                "kind": anomaly.kind,
+                "timestamp": self._clock.clock_text(self._clock.wall_ns(anomaly.at_ns)),
+                "value": anomaly.value,
+                "baseline": anomaly.baseline,
+                "sample": anomaly.sample,
+            }
+        )
+
     def _move_state(self, to_state: AppState) -> None:
         if self.state == to_state:
             return
@@ -335,5 +859,5 @@ class LoggerController:
             self._events.put_nowait(event)
         except queue.Full:
             if event.get("type") == "line":
-                with self._lock:
-                    self._stats.dropped_lines += 1
+                self._stats.record_drop()
+                self._throughput.record(drops=1)
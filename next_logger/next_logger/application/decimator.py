@@ -0,0 +1,178 @@
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+import re
+import threading
+from typing import Any
+
+from next_logger.application.log_markers import LogMarkerResult
+
+
+MAX_BUCKET_SHAPES = 256
+SUMMARY_TAG = "decimated"
+
+# A number that is not glued to a preceding word, so "ch2" or "0x1F" stay part of the line's shape.
+_NUMBER = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?")
+_SUMMARY_MARKER = LogMarkerResult("info", (), (SUMMARY_TAG,))
+
+Record = tuple[int, str, bool]
+
+
+def _number_text(value: float) -> str:
+    return f"{value:.6g}"
+
+
+@dataclass
+class _ShapeStats:
+    parts: list[str]
+    first: Record
+    marker: LogMarkerResult
+    mins: list[float]
+    maxs: list[float]
+    sums: list[float]
+    count: int = 1
+    last_ns: int = 0
+
+    def add(self, values: list[float], wall_ns: int) -> None:
+        for index, value in enumerate(values):
+            if value < self.mins[index]:
+                self.mins[index] = value
+            if value > self.maxs[index]:
+                self.maxs[index] = value
+            self.sums[index] += value
+        self.count += 1
+        self.last_ns = wall_ns
+
+    def render(self) -> str:
+        pieces = [f"[{SUMMARY_TAG} n={self.count} min/mean/max] "]
+        for index, text in enumerate(self.parts):
+            pieces.append(text)
+            if index < len(self.mins):
+                pieces.append(
+                    f"{_number_text(self.mins[index])}/{_number_text(self.sums[index] / self.count)}"
+                    f"/{_number_text(self.maxs[index])}"
+                )
+        return "".join(pieces)
+
+
+class Decimator:
+    # Thins out info lines before they are written; error and warning lines always pass. "every_n" keeps
+    # one info line in N. "bucket" folds info lines of the same shape (the line with its numbers taken out)
+    # within a time bucket into one line holding min/mean/max of each number; lines without numbers pass.
+    # The open bucket is written ahead of any error or warning so those keep their place in time, and
+    # expire() closes it once its time has passed when no later line arrives to do so.
+    def __init__(
+        self,
+        mode: str,
+        every_n: int = 10,
+        bucket_ms: int = 1000,
+        max_shapes: int = MAX_BUCKET_SHAPES,
+    ) -> None:
+        self._mode = mode
+        self._every_n = max(1, every_n)
+        self._bucket_ns = max(1, bucket_ms) * 1_000_000
+        self._max_shapes = max_shapes
+        self._lock = threading.Lock()
+
+        self._bucket: int | None = None
+        self._shapes: dict[tuple[str, ...], _ShapeStats] = {}
+        self._lines_in = 0
+        self._lines_out = 0
+        self._info_in = 0
+        self._info_out = 0
+        self._summary_lines = 0
+
+    def apply(
+        self,
+        records: Sequence[Record],
+        markers: Sequence[LogMarkerResult],
+    ) -> tuple[list[Record], list[LogMarkerResult]]:
+        kept: list[Record] = []
+        kept_markers: list[LogMarkerResult] = []
+        with self._lock:
+            bucketed = self._mode == "bucket"
+            for record, marker in zip(records, markers):
+                if bucketed:
+                    bucket = record[0] // self._bucket_ns
+                    if bucket != self._bucket:
+                        self._close_bucket(kept, kept_markers)
+                        self._bucket = bucket
+                if marker.severity != "info":
+                    if bucketed:
+                        self._close_bucket(kept, kept_markers)
+                else:
+                    self._info_in += 1
+                    if bucketed:
+                        if self._fold(record, marker):
+                            continue
+                    elif (self._info_in - 1) % self._every_n:
+                        continue
+                    self._info_out += 1
+                kept.append(record)
+                kept_markers.append(marker)
+            self._lines_in += len(records)
+            self._lines_out += len(kept)
+        return kept, kept_markers
+
+    def flush(self) -> tuple[list[Record], list[LogMarkerResult]]:
+        return self._drain(None)
+
+    def expire(self, now_ns: int) -> tuple[list[Record], list[LogMarkerResult]]:
+        return self._drain(now_ns)
+
+    def _drain(self, now_ns: int | None) -> tuple[list[Record], list[LogMarkerResult]]:
+        kept: list[Record] = []
+        kept_markers: list[LogMarkerResult] = []
+        with self._lock:
+            if self._bucket is None or (now_ns is not None and now_ns // self._bucket_ns <= self._bucket):
+                return kept, kept_markers
+            self._close_bucket(kept, kept_markers)
+            self._bucket = None
+            self._lines_out += len(kept)
+        return kept, kept_markers
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": self._mode,
+                "every_n": self._every_n if self._mode == "every_n" else None,
+                "bucket_ms": self._bucket_ns // 1_000_000 if self._mode == "bucket" else None,
+                "lines_in": self._lines_in,
+                "lines_out": self._lines_out,
+                "info_lines_in": self._info_in,
+                "info_lines_out": self._info_out,
+                "summary_lines": self._summary_lines,
+                # Received lines per written line; 1.0 means nothing was dropped.
+                "ratio": round(self._lines_in / self._lines_out, 3) if self._lines_out else None,
+            }
+
+    def _fold(self, record: Record, marker: LogMarkerResult) -> bool:
+        wall_ns, line, _ = record
+        numbers = _NUMBER.findall(line)
+        if not numbers:
+            return False
+        parts = _NUMBER.split(line)
+        key = tuple(parts)
+        values = [float(number) for number in numbers]
+        shape = self._shapes.get(key)
+        if shape is None:
+            if len(self._shapes) >= self._max_shapes:
+                return False
+            self._shapes[key] = _ShapeStats(parts, record, marker, values, list(values), list(values), last_ns=wall_ns)
+        else:
+            shape.add(values, wall_ns)
+        return True
+
+    def _close_bucket(self, kept: list[Record], kept_markers: list[LogMarkerResult]) -> None:
+        for shape in sorted(self._shapes.values(), key=lambda shape: shape.last_ns):
+            if shape.count == 1:
+                # A single line is written as it came.
+                kept.append(shape.first)
+                kept_markers.append(shape.marker)
+                self._info_out += 1
+                continue
+            kept.append((shape.last_ns, shape.render(), False))
+            kept_markers.append(_SUMMARY_MARKER)
+            self._summary_lines += 1
+        self._shapes = {}
@@ -0,0 +1,154 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass, field
+import threading
+from typing import Any
+
+
+CONTEXT_LINES = 50
+MAX_INCIDENT_LINES = 2000
+MAX_INCIDENTS = 1000
+
+# (wall_ns, severity, line, raw file name, line number in that file)
+ContextLine = tuple[int, str, str, str, int]
+
+
+@dataclass
+class Incident:
+    incident_id: int
+    first_error_ns: int
+    last_error_ns: int
+    errors: int = 0
+    lines: list[ContextLine] = field(default_factory=list)
+    # Once `lines` is full, only the newest lines are kept here and the ones in between are counted.
+    tail: deque[ContextLine] = field(default_factory=deque)
+    omitted: int = 0
+
+    def as_dict(self) -> dict[str, Any]:
+        lines = [*self.lines, *self.tail]
+        first, last = lines[0], lines[-1]
+        return {
+            "id": self.incident_id,
+            "first_error_ns": self.first_error_ns,
+            "last_error_ns": self.last_error_ns,
+            "errors": self.errors,
+            # Lines held in memory by a triggered capture have no position in the raw files.
+            "start": {"segment": first[3], "line": first[4]} if first[3] else None,
+            "end": {"segment": last[3], "line": last[4]} if last[3] else None,
+            "line_count": len(lines) + self.omitted,
+            "omitted": self.omitted,
+            "omitted_after": len(self.lines) if self.omitted else None,
+            "lines": [[wall_ns, severity, line] for wall_ns, severity, line, _, _ in lines],
+        }
+
+
+class IncidentRecorder:
+    # Keeps the last `before` lines in a ring and, after an error, collects `after` more lines. An error
+    # that arrives before the window has closed (or within `before` lines after it) joins the same incident,
+    # so at most one incident is open at a time and its size is capped however long an error storm lasts.
+    def __init__(
+        self,
+        on_incident: Callable[[dict[str, Any]], None],
+        before: int = CONTEXT_LINES,
+        after: int = CONTEXT_LINES,
+        max_lines: int = MAX_INCIDENT_LINES,
+        max_incidents: int = MAX_INCIDENTS,
+    ) -> None:
+        self._on_incident = on_incident
+        self._before = max(0, before)
+        self._after = max(0, after)
+        self._max_lines = max(self._before + self._after + 1, max_lines)
+        self._max_incidents = max_incidents
+        self._lock = threading.Lock()
+
+        self._ring: deque[ContextLine] = deque(maxlen=self._before)
+        self._open: Incident | None = None
+        self._after_left = 0
+        # Lines seen since the open incident stopped collecting; it is written once this reaches `before`.
+        self._closing = -1
+        self._next_id = 1
+        self._written = 0
+        self._suppressed = 0
+        self._errors = 0
+
+    def observe(
+        self,
+        records: Sequence[tuple[int, str, bool]],
+        severities: Sequence[str],
+        segment: str,
+        first_line: int,
+    ) -> None:
+        with self._lock:
+            for offset, ((wall_ns, line, is_error), severity) in enumerate(zip(records, severities)):
+                item: ContextLine = (wall_ns, severity, line, segment, first_line + offset)
+                if is_error:
+                    self._error(item)
+                elif self._open is not None and self._closing < 0:
+                    self._append(item)
+                    self._after_left -= 1
+                    if self._after_left <= 0:
+                        self._closing = 0
+                elif self._open is not None:
+                    self._closing += 1
+                    if self._closing >= self._before:
+                        self._finish()
+                self._ring.append(item)
+
+    def flush(self) -> None:
+        with self._lock:
+            if self._open is not None:
+                self._finish()
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "incidents": self._written,
+                "errors": self._errors,
+                "suppressed": self._suppressed,
+                "before": self._before,
+                "after": self._after,
+            }
+
+    def _error(self, item: ContextLine) -> None:
+        self._errors += 1
+        incident = self._open
+        if incident is None:
+            incident = self._open = Incident(self._next_id, item[0], item[0])
+            self._next_id += 1
+            for context in self._ring:
+                self._append(context)
+        elif self._closing >= 0:
+            # Close enough to the previous window that the two overlap: the gap is still in the ring.
+            for context in list(self._ring)[len(self._ring) - self._closing :] if self._closing else ():
+                self._append(context)
+        self._append(item)
+        incident.errors += 1
+        incident.last_error_ns = item[0]
+        self._after_left = self._after
+        self._closing = -1 if self._after else 0
+
+    def _append(self, item: ContextLine) -> None:
+        incident = self._open
+        assert incident is not None
+        if len(incident.lines) < self._max_lines - self._before - self._after:
+            incident.lines.append(item)
+            return
+        if incident.tail.maxlen is None:
+            incident.tail = deque(maxlen=self._before + self._after + 1)
+        if len(incident.tail) == incident.tail.maxlen:
+            incident.omitted += 1
+        incident.tail.append(item)
+
+    def _finish(self) -> None:
+        incident = self._open
+        self._open = None
+        self._closing = -1
+        if incident is None:
+            return
+        if self._written >= self._max_incidents:
+            self._suppressed += 1
+            return
+        self._written += 1
+        self._on_incident(incident.as_dict())
@@ -0,0 +1,183 @@
+from __future__ import annotations
+
+from array import array
+from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
+import math
+import re
+import threading
+
+
+BRANCH = 4
+LEVELS = 10
+# 4**10 = 1,048,576 samples per series.
+SERIES_CAPACITY = BRANCH**LEVELS
+MAX_SERIES = 16
+
+# "name=value" or "name: value"; the value may carry a unit ("3.3V", "21.5degC").
+_FIELD = re.compile(r"(?<![\w.])([A-Za-z_][\w.]{0,31})\s*[=:]\s*(-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?)")
+
+
+def extract_fields(line: str) -> list[tuple[str, float]]:
+    if "=" not in line and ":" not in line:
+        return []
+    return [(name, float(value)) for name, value in _FIELD.findall(line)]
+
+
+def _store(values: array, slot: int, value: float) -> None:
+    # Arrays grow until the ring is full, so a short series costs next to nothing.
+    if slot == len(values):
+        values.append(value)
+    else:
+        values[slot] = value
+
+
+class MinMaxRing:
+    # The newest `capacity` samples, plus a pyramid of per-block min/max where level k holds one entry per
+    # BRANCH**k samples. A query picks the level whose blocks are just finer than a pixel, so drawing any
+    # window costs at most BRANCH entries per pixel however many samples it spans.
+    def __init__(self, levels: int = LEVELS) -> None:
+        self.levels = levels
+        self.capacity = BRANCH**levels
+        self.count = 0
+        self._values = array("d")
+        self._mins = [array("d") for _ in range(levels + 1)]
+        self._maxs = [array("d") for _ in range(levels + 1)]
+        # Min/max of the completed lower-level blocks inside the block each level is still filling.
+        self._acc_min = [math.inf] * (levels + 1)
+        self._acc_max = [-math.inf] * (levels + 1)
+        self.last = math.nan
+
+    def append(self, value: float) -> None:
+        index = self.count
+        if index < self.capacity:
+            self._values.append(value)
+        else:
+            self._values[index % self.capacity] = value
+        self.count = done = index + 1
+        self.last = value
+        if value < self._acc_min[1]:
+            self._acc_min[1] = value
+        if value > self._acc_max[1]:
+            self._acc_max[1] = value
+        if done % BRANCH == 0:
+            self._close_blocks(done)
+
+    def _close_blocks(self, done: int) -> None:
+        # Carries every block that `done` completes into the level above it.
+        acc_min, acc_max = self._acc_min, self._acc_max
+        size = BRANCH
+        for level in range(1, self.levels + 1):
+            low, high = acc_min[level], acc_max[level]
+            slot = (done // size - 1) % (self.capacity // size)
+            _store(self._mins[level], slot, low)
+            _store(self._maxs[level], slot, high)
+            acc_min[level] = math.inf
+            acc_max[level] = -math.inf
+            if level == self.levels:
+                return
+            if low < acc_min[level + 1]:
+                acc_min[level + 1] = low
+            if high > acc_max[level + 1]:
+                acc_max[level + 1] = high
+            size *= BRANCH
+            if done % size:
+                return
+
+    def columns(self, window: int, width: int) -> list[tuple[float, float]]:
+        # Min/max per column for the newest `window` samples, oldest first; at most `width` columns.
+        count = self.count
+        window = min(window, count, self.capacity)
+        if window <= 0 or width <= 0:
+            return []
+        per_column = window / width
+        level = 0
+        while level < self.levels and BRANCH ** (level + 1) <= per_column:
+            level += 1
+        size = BRANCH**level
+
+        first_block = (count - window) // size
+        full_blocks = count // size
+        entries: list[tuple[float, float]] = []
+        if level == 0:
+            values = self._values
+            capacity = self.capacity
+            for index in range(first_block, full_blocks):
+                value = values[index % capacity]
+                entries.append((value, value))
+        else:
+            mins, maxs = self._mins[level], self._maxs[level]
+            slots = self.capacity // size
+            for block in range(first_block, full_blocks):
+                slot = block % slots
+                entries.append((mins[slot], maxs[slot]))
+            if count % size:
+                # The block still being filled is spread over the accumulators of the levels below it.
+                low = min(self._acc_min[1 : level + 1])
+                high = max(self._acc_max[1 : level + 1])
+                entries.append((low, high))
+
+        total = len(entries)
+        column_count = min(width, total)
+        if column_count == total:
+            return entries
+        columns: list[tuple[float, float]] = [(math.inf, -math.inf)] * column_count
+        for index, (low, high) in enumerate(entries):
+            column = index * column_count // total
+            current_low, current_high = columns[column]
+            columns[column] = (min(current_low, low), max(current_high, high))
+        return columns
+
+
+@dataclass(frozen=True)
+class PlotSeries:
+    name: str
+    columns: list[tuple[float, float]]
+    last: float
+    count: int
+
+
+class LivePlotStore:
+    # Numeric fields pulled from received lines, one ring per field name. Written by the delivery thread and
+    # read by the UI timer; the lock is only held for one batch or one O(pixels) query.
+    def __init__(self, max_series: int = MAX_SERIES, levels: int = LEVELS) -> None:
+        self._max_series = max_series
+        self._levels = levels
+        self._lock = threading.Lock()
+        self._series: dict[str, MinMaxRing] = {}
+        self.ignored_fields = 0
+        # Bumped whenever a sample is added, so a reader can skip redrawing unchanged data.
+        self.version = 0
+        self.enabled = True
+
+    def observe(self, lines: Iterable[str]) -> None:
+        if not self.enabled:
+            return
+        with self._lock:
+            series = self._series
+            added = 0
+            for line in lines:
+                for name, value in extract_fields(line):
+                    ring = series.get(name)
+                    if ring is None:
+                        if len(series) >= self._max_series:
+                            self.ignored_fields += 1
+                            continue
+                        ring = series[name] = MinMaxRing(self._levels)
+                    ring.append(value)
+                    added += 1
+            if added:
+                self.version += 1
+
+    def names(self) -> list[str]:
+        with self._lock:
+            return list(self._series)
+
+    def snapshot(self, names: Sequence[str] | None, window: int, width: int) -> list[PlotSeries]:
+        with self._lock:
+            series = self._series
+            wanted = list(series) if names is None else [name for name in names if name in series]
+            return [
+                PlotSeries(name, series[name].columns(window, width), series[name].last, series[name].count)
+                for name in wanted
+            ]
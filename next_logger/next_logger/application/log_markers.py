@@ -5,6 +5,8 @@ from dataclasses import dataclass
 from functools import lru_cache
 import re
 
+from .regex_literals import prefilter_literals, prefilter_text, required_literals
+
 
 DEFAULT_CUSTOM_ERROR_KEYWORDS: tuple[str, ...] = (
     "ERROR",
@@ -93,45 +95,75 @@ _WARNING_REGEX_PATTERNS: tuple[tuple[str, str], ...] = (
 )
 
 
+# (term, pattern, literals): the pattern can only match when one of the literals is in prefilter_text(line);
+# an empty literal tuple means the pattern is always tried.
+_Marker = tuple[str, re.Pattern[str], tuple[str, ...]]
+
+
 @dataclass(frozen=True)
 class LogMarkerResult:
     severity: str
     matched_terms: tuple[str, ...]
+    tags: tuple[str, ...] = ()
 
 
-def _compile_word_patterns(tokens: Iterable[str]) -> tuple[tuple[str, re.Pattern[str]], ...]:
-    patterns: list[tuple[str, re.Pattern[str]]] = []
+def _compile_word_patterns(tokens: Iterable[str]) -> tuple[_Marker, ...]:
+    patterns: list[_Marker] = []
     for token in tokens:
         normalized = token.strip().lower()
         if not normalized:
             continue
         escaped = re.escape(normalized)
         pattern = re.compile(rf"(?<![a-z0-9]){escaped}(?![a-z0-9])", re.IGNORECASE)
-        patterns.append((token.strip(), pattern))
+        patterns.append((token.strip(), pattern, prefilter_literals([normalized])))
     return tuple(patterns)
 
 
+def _compile_regex_patterns(items: Iterable[tuple[str, str]]) -> tuple[_Marker, ...]:
+    return tuple(
+        (name, re.compile(pattern, re.IGNORECASE), prefilter_literals(required_literals(pattern)))
+        for name, pattern in items
+    )
+
+
 _STANDARD_ERROR_PATTERNS = _compile_word_patterns(STANDARD_ERROR_KEYWORDS)
 _STANDARD_WARNING_PATTERNS = _compile_word_patterns(STANDARD_WARNING_KEYWORDS)
-_ERROR_REGEX = tuple((name, re.compile(pattern, re.IGNORECASE)) for name, pattern in _ERROR_REGEX_PATTERNS)
-_WARNING_REGEX = tuple((name, re.compile(pattern, re.IGNORECASE)) for name, pattern in _WARNING_REGEX_PATTERNS)
+_ERROR_REGEX = _compile_regex_patterns(_ERROR_REGEX_PATTERNS)
+_WARNING_REGEX = _compile_regex_patterns(_WARNING_REGEX_PATTERNS)
+_NOISE = tuple((pattern, prefilter_literals(required_literals(pattern.pattern))) for pattern in _NOISE_PATTERNS)
 
 
 @lru_cache(maxsize=128)
-def _compile_custom_error_patterns(tokens: tuple[str, ...]) -> tuple[tuple[str, re.Pattern[str]], ...]:
+def _compile_custom_error_patterns(tokens: tuple[str, ...]) -> tuple[_Marker, ...]:
     return _compile_word_patterns(tokens)
 
 
-def _strip_noise(line: str) -> str:
+def _has_literal(lowered: str, literals: tuple[str, ...]) -> bool:
+    for literal in literals:
+        if literal in lowered:
+            return True
+    return not literals
+
+
+def _strip_noise(line: str, lowered: str) -> tuple[str, str]:
     cleaned = line
-    for pattern in _NOISE_PATTERNS:
-        cleaned = pattern.sub(" ", cleaned)
-    return cleaned
+    for pattern, literals in _NOISE:
+        if _has_literal(lowered, literals):
+            cleaned = pattern.sub(" ", cleaned)
+    if cleaned is line:
+        return line, lowered
+    return cleaned, prefilter_text(cleaned)
 
 
-def _match_terms(line: str, patterns: tuple[tuple[str, re.Pattern[str]], ...]) -> list[str]:
+def _match_terms(line: str, lowered: str, patterns: tuple[_Marker, ...]) -> list[str]:
     matched: list[str] = []
-    for term, pattern in patterns:
+    for term, pattern, literals in patterns:
+        for literal in literals:
+            if literal in lowered:
+                break
+        else:
+            if literals:
+                continue
         if pattern.search(line):
             matched.append(term)
     return matched
@@ -150,23 +182,31 @@ def _normalize_custom_keywords(keywords: Iterable[str]) -> tuple[str, ...]:
     return tuple(unique)
 
 
+# Callers pass the session's keyword tuple for every line; normalizing it once per tuple is enough.
+_normalize_keyword_tuple = lru_cache(maxsize=128)(_normalize_custom_keywords)
+
+
 def classify_log_line(line: str, custom_error_keywords: Iterable[str] = ()) -> LogMarkerResult:
-    prepared = _strip_noise(line)
-    custom_keywords = _normalize_custom_keywords(custom_error_keywords)
+    # One lower-cased copy of the line decides which patterns can possibly match; only those are searched.
+    prepared, lowered = _strip_noise(line, prefilter_text(line))
+    if type(custom_error_keywords) is tuple:
+        custom_keywords = _normalize_keyword_tuple(custom_error_keywords)
+    else:
+        custom_keywords = _normalize_custom_keywords(custom_error_keywords)
 
     error_matches = []
-    error_matches.extend(_match_terms(prepared, _STANDARD_ERROR_PATTERNS))
-    error_matches.extend(_match_terms(prepared, _ERROR_REGEX))
+    error_matches.extend(_match_terms(prepared, lowered, _STANDARD_ERROR_PATTERNS))
+    error_matches.extend(_match_terms(prepared, lowered, _ERROR_REGEX))
     if custom_keywords:
-        error_matches.extend(_match_terms(prepared, _compile_custom_error_patterns(custom_keywords)))
+        error_matches.extend(_match_terms(prepared, lowered, _compile_custom_error_patterns(custom_keywords)))
 
     if error_matches:
         unique = tuple(dict.fromkeys(error_matches))
         return LogMarkerResult(severity="error", matched_terms=unique)
 
     warning_matches = []
-    warning_matches.extend(_match_terms(prepared, _STANDARD_WARNING_PATTERNS))
-    warning_matches.extend(_match_terms(prepared, _WARNING_REGEX))
+    warning_matches.extend(_match_terms(prepared, lowered, _STANDARD_WARNING_PATTERNS))
+    warning_matches.extend(_match_terms(prepared, lowered, _WARNING_REGEX))
     if warning_matches:
         unique = tuple(dict.fromkeys(warning_matches))
         return LogMarkerResult(severity="warning", matched_terms=unique)
@@ -8,6 +8,7 @@ import re
 import tempfile
 
 from next_logger.application.log_markers import DEFAULT_CUSTOM_ERROR_KEYWORDS
+from next_logger.application.rule_engine import RuleError, load_rules
 from next_logger.domain.models import ConnectionConfig, SessionConfig
 
 
@@ -38,6 +39,12 @@ _RESERVED_NAMES = {
 }
 _SUPPORTED_FORMATS = {"txt", "csv", "jsonl"}
 _SUPPORTED_BACKOFF_MODES = {"fixed", "exponential"}
+_SUPPORTED_RETENTION_PRIORITIES = {"oldest", "keep_errors"}
+_SUPPORTED_DURABILITY = {"none", "periodic", "batch"}
+_SUPPORTED_STORAGE_LAYOUTS = {"split", "raw_only"}
+_SUPPORTED_TIMESTAMP_RESOLUTIONS = {"ms", "us", "ns"}
+_SUPPORTED_CAPTURE_MODES = {"continuous", "triggered"}
+_SUPPORTED_DECIMATION_MODES = {"off", "every_n", "bucket"}
 
 
 @dataclass(frozen=True)
@@ -142,6 +149,60 @@ def run_preflight(
     if session.retention_max_age_days < 0:
         errors.append("保持日数は0以上で指定してください。")
 
+    if session.retention_max_total_mb < 0 or session.retention_max_product_mb < 0:
+        errors.append("容量上限は0以上で指定してください。")
+
+    if session.retention_priority not in _SUPPORTED_RETENTION_PRIORITIES:
+        errors.append("削除優先度は oldest / keep_errors のいずれかを選択してください。")
+
+    if session.durability not in _SUPPORTED_DURABILITY:
+        errors.append("書き込み保証は none / periodic / batch のいずれかを選択してください。")
+
+    if session.durability == "periodic" and session.fsync_interval_sec <= 0:
+        errors.append("同期間隔は0より大きい値にしてください。")
+
+    if session.storage_layout not in _SUPPORTED_STORAGE_LAYOUTS:
+        errors.append("保存レイアウトは split / raw_only のいずれかを選択してください。")
+
+    if session.timestamp_resolution not in _SUPPORTED_TIMESTAMP_RESOLUTIONS:
+        errors.append("タイムスタンプ精度は ms / us / ns のいずれかを選択してください。")
+
+    if session.anomaly_silence_sec < 0:
+        errors.append("無通信検知の秒数は0以上で指定してください。")
+
+    if not 0 <= session.incident_context_lines <= 1000:
+        errors.append("エラー前後の記録行数は0〜1000で指定してください。")
+
+    if session.capture_mode not in _SUPPORTED_CAPTURE_MODES:
+        errors.append("記録モードは continuous / triggered のいずれかを選択してください。")
+
+    if not 1 <= session.capture_pre_mb <= 4096:
+        errors.append("トリガー前の保持量は1〜4096MBで指定してください。")
+
+    if not 0 <= session.capture_post_sec <= 86400:
+        errors.append("トリガー後の記録秒数は0〜86400で指定してください。")
+
+    if session.capture_trigger_regex:
+        try:
+            re.compile(session.capture_trigger_regex)
+        except re.error as exc:
+            errors.append(f"トリガーの正規表現が不正です: {exc}")
+
+    if session.decimation_mode not in _SUPPORTED_DECIMATION_MODES:
+        errors.append("間引きは off / every_n / bucket のいずれかを選択してください。")
+
+    if not 1 <= session.decimation_every_n <= 1_000_000:
+        errors.append("間引きの間隔は1〜1000000行で指定してください。")
+
+    if not 1 <= session.decimation_bucket_ms <= 3_600_000:
+        errors.append("集計の時間幅は1〜3600000ミリ秒で指定してください。")
+
+    if session.rules_file.strip():
+        try:
+            load_rules(Path(session.rules_file.strip()))
+        except RuleError as exc:
+            errors.append(f"ルールファイルを読み込めません: {exc}")
+
     try:
         save_dir = Path(session.save_dir)
         if not _is_writable_directory(save_dir):
@@ -153,4 +214,4 @@ def run_preflight(
     if len(str(preview_path)) > 240:
         warnings.append("保存パスが長すぎる可能性があります。項目を短くしてください。")
 
-    return PreflightResult(errors=tuple(errors), warnings=tuple(warnings), preview_path=preview_path)
+    return PreflightResult(errors=tuple(errors), warnings=tuple(warnings), preview_path=preview_path)
@@ -0,0 +1,299 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from pathlib import Path
+import random
+import threading
+
+from next_logger.infrastructure.session_export import iter_session_records
+
+from .anomaly_detector import line_template
+from .classification_stage import classify_lines
+from .rule_engine import RuleSet
+
+
+DEFAULT_MAX_TOKENS = 8000
+MIN_MAX_TOKENS = 500
+CONTEXT_LINES = 3
+LINE_MAX_CHARS = 300
+INFO_SAMPLE = 2000
+MAX_SHAPES = 500
+SUMMARY_SHAPES = 20
+_CLASSIFY_CHUNK = 4096
+_CANCEL_CHECK_LINES = 4096
+_COLLAPSE_MIN_RUN = 3
+# Section labels and the closing note are written after the budget is spent.
+_RESERVED_TOKENS = 40
+# Every excerpt line may bring an omission marker with it.
+_LINE_OVERHEAD_TOKENS = 8
+
+_LABELS = {"error": "ERROR", "warning": "WARN", "info": "INFO"}
+
+Entry = tuple[int, str, str, str]
+
+
+def estimate_tokens(text: str) -> int:
+    # Roughly 4 characters per token for ASCII; kana and kanji are closer to one token each.
+    wide = (len(text.encode("utf-8")) - len(text)) // 2
+    return (len(text) - wide + 3) // 4 + wide
+
+
+def _clip(line: str) -> str:
+    if len(line) <= LINE_MAX_CHARS:
+        return line
+    return line[:LINE_MAX_CHARS] + f"…(+{len(line) - LINE_MAX_CHARS}文字)"
+
+
+@dataclass
+class _Shape:
+    count: int
+    first: Entry
+    last: Entry
+    first_window: list[Entry] = field(default_factory=list)
+    last_window: list[Entry] = field(default_factory=list)
+
+
+class PromptLogBuilder:
+    # One pass over any number of lines with bounded memory: per error shape the first and the latest
+    # occurrence with their context, per warning shape one example and a count, and a uniform sample of
+    # the rest. render() then fills a token budget in that order of priority.
+    def __init__(
+        self,
+        context_lines: int = CONTEXT_LINES,
+        info_sample: int = INFO_SAMPLE,
+        max_shapes: int = MAX_SHAPES,
+        seed: int = 0,
+    ) -> None:
+        self._context_lines = context_lines
+        self._info_sample = info_sample
+        self._max_shapes = max_shapes
+        self._random = random.Random(seed)
+
+        self._before: deque[Entry] = deque(maxlen=context_lines)
+        self._open: list[tuple[list[Entry], list[int]]] = []
+        self._errors: dict[str, _Shape] = {}
+        self._warnings: dict[str, _Shape] = {}
+        self._sample: list[Entry] = []
+        self._info_seen = 0
+        self._untracked = {"error": 0, "warning": 0}
+
+        self.lines = 0
+        self.errors = 0
+        self.warnings = 0
+
+    def add(self, timestamp: str, line: str, severity: str) -> None:
+        entry: Entry = (self.lines, timestamp, severity, _clip(line))
+        self.lines += 1
+
+        if self._open:
+            for window, remaining in self._open:
+                window.append(entry)
+                remaining[0] -= 1
+            self._open = [item for item in self._open if item[1][0] > 0]
+
+        if severity == "error":
+            self.errors += 1
+            self._add_error(entry)
+        elif severity == "warning":
+            self.warnings += 1
+            self._add_shape(self._warnings, entry, "warning")
+        else:
+            self._info_seen += 1
+            if len(self._sample) < self._info_sample:
+                self._sample.append(entry)
+            else:
+                slot = self._random.randrange(self._info_seen)
+                if slot < self._info_sample:
+                    self._sample[slot] = entry
+        self._before.append(entry)
+
+    def add_records(self, records: Iterable[tuple[str, str, str]]) -> None:
+        for timestamp, line, severity in records:
+            self.add(timestamp, line, severity)
+
+    def render(self, max_tokens: int = DEFAULT_MAX_TOKENS) -> str:
+        header = f"全 {self.lines} 行（エラー {self.errors} 行 / 警告 {self.warnings} 行）から抜粋"
+        budget = max(0, max_tokens - estimate_tokens(header) - _RESERVED_TOKENS)
+        chosen: dict[int, Entry] = {}
+        omitted: dict[str, int] = {}
+
+        def take(entries: list[Entry], kind: str, core: Entry | None = None) -> None:
+            nonlocal budget
+            new = [entry for entry in entries if entry[0] not in chosen]
+            cost = sum(estimate_tokens(self._format(entry)) + _LINE_OVERHEAD_TOKENS for entry in new)
+            if cost > budget:
+                # Without room for the context, the line itself still goes in if it fits.
+                if core is not None and len(entries) > 1:
+                    take([core], kind)
+                else:
+                    omitted[kind] = omitted.get(kind, 0) + 1
+                return
+            budget -= cost
+            for entry in new:
+                chosen[entry[0]] = entry
+
+        error_shapes = sorted(self._errors.values(), key=lambda shape: shape.first[0])
+        for shape in error_shapes:
+            take(shape.first_window or [shape.first], "error", shape.first)
+
+        summary: list[str] = []
+        warning_shapes = sorted(self._warnings.values(), key=lambda shape: shape.count, reverse=True)
+        for label, shapes in (("エラー", self._errors.values()), ("警告", warning_shapes)):
+            repeated = sorted((shape for shape in shapes if shape.count > 1), key=lambda shape: shape.count, reverse=True)
+            summary += [
+                f"  {label} {shape.count} 回 ({shape.first[1]} 〜 {shape.last[1]}): {shape.first[3]}"
+                for shape in repeated[:SUMMARY_SHAPES]
+            ]
+        kept_summary: list[str] = []
+        for text in summary:
+            cost = estimate_tokens(text)
+            if cost > budget:
+                omitted["summary"] = omitted.get("summary", 0) + 1
+                continue
+            budget -= cost
+            kept_summary.append(text)
+
+        for shape in error_shapes:
+            if shape.count > 1:
+                take(shape.last_window or [shape.last], "error", shape.last)
+        for shape in warning_shapes:
+            take([shape.first], "warning")
+        sample = list(self._sample)
+        random.Random(self.lines).shuffle(sample)
+        for entry in sample:
+            take([entry], "info")
+
+        parts = [header]
+        if kept_summary:
+            parts += ["", "[繰り返し]", *kept_summary]
+        parts += ["", "[抜粋]", *self._render_lines(chosen)]
+        notes = [
+            f"{label} {omitted[kind]} 件"
+            for kind, label in (("error", "エラー"), ("summary", "繰り返しの集計"), ("warning", "警告"), ("info", "通常行"))
+            if omitted.get(kind)
+        ]
+        untracked = self._untracked["error"] + self._untracked["warning"]
+        if untracked:
+            notes.append(f"種類の上限を超えたエラー/警告 {untracked} 行")
+        if notes:
+            parts += ["", "上限のため省略: " + "、".join(notes)]
+        return "\n".join(parts)
+
+    def _add_error(self, entry: Entry) -> None:
+        shape = self._add_shape(self._errors, entry, "error")
+        if shape is None:
+            return
+        window = [*self._before, entry]
+        if shape.count == 1:
+            shape.first_window = window
+        else:
+            shape.last_window = window
+        self._open.append((window, [self._context_lines]))
+
+    def _add_shape(self, shapes: dict[str, _Shape], entry: Entry, severity: str) -> _Shape | None:
+        key = line_template(entry[3])
+        shape = shapes.get(key)
+        if shape is not None:
+            shape.count += 1
+            shape.last = entry
+            return shape
+        if len(shapes) >= self._max_shapes:
+            self._untracked[severity] += 1
+            return None
+        shape = shapes[key] = _Shape(1, entry, entry)
+        return shape
+
+    def _format(self, entry: Entry) -> str:
+        return f"{entry[1]} [{_LABELS.get(entry[2], 'INFO')}] {entry[3]}"
+
+    def _render_lines(self, chosen: dict[int, Entry]) -> list[str]:
+        # Long runs of adjacent lines with one shape keep their first line and a count; short runs such as
+        # the context around an error stay whole.
+        lines: list[str] = []
+        run: list[Entry] = []
+        previous = -1
+
+        def flush() -> None:
+            if len(run) - 1 >= _COLLAPSE_MIN_RUN:
+                lines.append(self._format(run[0]))
+                lines.append(f"  … 同じ形の行が {len(run) - 1} 行続く")
+            else:
+                lines.extend(self._format(entry) for entry in run)
+            run.clear()
+
+        for index in sorted(chosen):
+            entry = chosen[index]
+            if run and (index != previous + 1 or entry[2] != run[0][2] or line_template(entry[3]) != line_template(run[0][3])):
+                flush()
+            if index > previous + 1:
+                lines.append(f"  … {index - previous - 1} 行省略")
+            run.append(entry)
+            previous = index
+        flush()
+        if 0 <= previous < self.lines - 1:
+            lines.append(f"  … {self.lines - previous - 1} 行省略")
+        return lines
+
+
+def iter_prompt_records(
+    session_dir: Path,
+    error_keywords: tuple[str, ...],
+    rules: RuleSet | None = None,
+) -> Iterator[tuple[str, str, str]]:
+    # The error flag comes from the session files; warnings are not stored, so those lines are classified again.
+    chunk: list[tuple[str, str, bool]] = []
+
+    def flush() -> Iterator[tuple[str, str, str]]:
+        markers = classify_lines([line for _, line, is_error in chunk if not is_error], error_keywords, rules)
+        found = iter(markers)
+        for timestamp, line, is_error in chunk:
+            severity = "error" if is_error else ("warning" if next(found).severity == "warning" else "info")
+            yield timestamp, line, severity
+        chunk.clear()
+
+    for record in iter_session_records(session_dir):
+        chunk.append(record)
+        if len(chunk) >= _CLASSIFY_CHUNK:
+            yield from flush()
+    yield from flush()
+
+
+class PromptBuildWorker(threading.Thread):
+    def __init__(
+        self,
+        records: Callable[[], Iterable[tuple[str, str, str]]],
+        max_tokens: int = DEFAULT_MAX_TOKENS,
+        builder: PromptLogBuilder | None = None,
+    ) -> None:
+        super().__init__(daemon=True, name="prompt-builder")
+        self._records = records
+        self._max_tokens = max_tokens
+        self._builder = builder or PromptLogBuilder()
+        self._cancel_event = threading.Event()
+        self.lines_read = 0
+        self.text = ""
+        self.error = ""
+        self.finished = False
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def run(self) -> None:
+        try:
+            for timestamp, line, severity in self._records():
+                self._builder.add(timestamp, line, severity)
+                self.lines_read += 1
+                if self.lines_read % _CANCEL_CHECK_LINES == 0 and self._cancel_event.is_set():
+                    return
+            self.text = self._builder.render(self._max_tokens)
+        except Exception as exc:  # noqa: BLE001
+            # Any failure (an ArchiveError from an archived session included) must reach the UI poller.
+            self.error = str(exc) or type(exc).__name__
+        finally:
+            self.finished = True
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Iterator
+import sys
+from typing import Any
+
+
+SEVERITY_NAMES: tuple[str, ...] = ("info", "warning", "error")
+SEVERITY_CODES: dict[str, int] = {name: code for code, name in enumerate(SEVERITY_NAMES)}
+SEVERITY_INFO, SEVERITY_WARNING, SEVERITY_ERROR = range(len(SEVERITY_NAMES))
+
+FLAG_ERROR = 1
+FLAG_WRITE_FAILED = 2
+
+DEFAULT_MAX_LINES = 1_000_000
+DEFAULT_MEMORY_BUDGET_MB = 256
+
+# Instance with five slots + GC header, plus the deque slot that points at it.
+_RECORD_OVERHEAD_BYTES = sys.getsizeof(object()) + 5 * 8 + 16 + 8
+
+
+class LogRecord:
+    __slots__ = ("timestamp", "line", "severity", "flags", "term_ids")
+
+    def __init__(self, timestamp: str, line: str, severity: int, flags: int, term_ids: tuple[int, ...]) -> None:
+        self.timestamp = timestamp
+        self.line = line
+        self.severity = severity
+        self.flags = flags
+        self.term_ids = term_ids
+
+    @property
+    def severity_name(self) -> str:
+        return SEVERITY_NAMES[self.severity]
+
+    @property
+    def is_error(self) -> bool:
+        return bool(self.flags & FLAG_ERROR) or self.severity == SEVERITY_ERROR
+
+    @property
+    def write_ok(self) -> bool:
+        return not self.flags & FLAG_WRITE_FAILED
+
+
+class RecordBuffer:
+    def __init__(
+        self,
+        max_lines: int = DEFAULT_MAX_LINES,
+        memory_budget_bytes: int = DEFAULT_MEMORY_BUDGET_MB * 1024 * 1024,
+    ) -> None:
+        self._records: deque[LogRecord] = deque()
+        self._max_lines = max(1, max_lines)
+        self._memory_budget = max(1, memory_budget_bytes)
+        self._memory_used = 0
+        self._severity_counts = [0] * len(SEVERITY_NAMES)
+
+        self._term_ids: dict[str, int] = {}
+        self._term_names: list[str] = []
+        self._term_sets: dict[tuple[int, ...], tuple[int, ...]] = {(): ()}
+        self._timestamps: dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def __iter__(self) -> Iterator[LogRecord]:
+        return iter(self._records)
+
+    def __reversed__(self) -> Iterator[LogRecord]:
+        return reversed(self._records)
+
+    @property
+    def memory_used(self) -> int:
+        return self._memory_used
+
+    @property
+    def max_lines(self) -> int:
+        return self._max_lines
+
+    @property
+    def memory_budget(self) -> int:
+        return self._memory_budget
+
+    def severity_count(self, severity: int) -> int:
+        return self._severity_counts[severity]
+
+    def configure(self, max_lines: int, memory_budget_bytes: int) -> None:
+        self._max_lines = max(1, max_lines)
+        self._memory_budget = max(1, memory_budget_bytes)
+        self._evict()
+
+    def clear(self) -> None:
+        self._records.clear()
+        self._memory_used = 0
+        self._severity_counts = [0] * len(SEVERITY_NAMES)
+        self._timestamps.clear()
+
+    def _intern_timestamp(self, value: str) -> str:
+        cached = self._timestamps.get(value)
+        if cached is None:
+            if len(self._timestamps) > 4096:
+                self._timestamps.clear()
+            self._timestamps[value] = value
+            cached = value
+        return cached
+
+    def _intern_terms(self, terms: Any) -> tuple[int, ...]:
+        if not terms:
+            return ()
+        ids: list[int] = []
+        for term in terms:
+            term_id = self._term_ids.get(term)
+            if term_id is None:
+                term_id = len(self._term_names)
+                self._term_ids[term] = term_id
+                self._term_names.append(str(term))
+            ids.append(term_id)
+        key = tuple(ids)
+        return self._term_sets.setdefault(key, key)
+
+    def terms(self, record: LogRecord) -> tuple[str, ...]:
+        return tuple(self._term_names[term_id] for term_id in record.term_ids)
+
+    def append_event(self, event: dict[str, Any]) -> LogRecord:
+        is_error = bool(event.get("is_error", False))
+        severity = SEVERITY_CODES.get(event.get("severity", ""), SEVERITY_ERROR if is_error else SEVERITY_INFO)
+        flags = (FLAG_ERROR if is_error else 0) | (0 if event.get("write_ok", True) else FLAG_WRITE_FAILED)
+        record = LogRecord(
+            self._intern_timestamp(str(event.get("timestamp", ""))),
+            str(event.get("line", "")),
+            severity,
+            flags,
+            self._intern_terms(event.get("marker_terms")),
+        )
+        self._records.append(record)
+        self._memory_used += _RECORD_OVERHEAD_BYTES + sys.getsizeof(record.line)
+        self._severity_counts[severity] += 1
+        self._evict()
+        return record
+
+    def _evict(self) -> None:
+        records = self._records
+        while records and (len(records) > self._max_lines or self._memory_used > self._memory_budget):
+            record = records.popleft()
+            self._memory_used -= _RECORD_OVERHEAD_BYTES + sys.getsizeof(record.line)
+            self._severity_counts[record.severity] -= 1
+
+    def tail(self, count: int) -> list[LogRecord]:
+        if count <= 0:
+            return []
+        result: list[LogRecord] = []
+        for record in reversed(self._records):
+            result.append(record)
+            if len(result) >= count:
+                break
+        result.reverse()
+        return result
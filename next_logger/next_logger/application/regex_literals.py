@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+from collections.abc import Iterable
+import re
+
+
+_SIMPLE_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "f": "\f", "v": "\v", "a": "\a"}
+
+# The only non-ASCII characters re.IGNORECASE treats as equal to an ASCII letter (checked over all of Unicode)
+# that str.lower() does not already turn into that letter. Kelvin sign K lowers to "k" by itself.
+_PREFILTER_FOLD = str.maketrans({"İ": "i", "ı": "i", "ſ": "s"})
+
+
+def prefilter_text(line: str) -> str:
+    # Every ASCII literal an (optionally case-insensitive) match needs is a plain substring of this text.
+    if line.isascii():
+        return line.lower()
+    return line.translate(_PREFILTER_FOLD).lower()
+
+
+def prefilter_literals(options: Iterable[str]) -> tuple[str, ...]:
+    folded = tuple(dict.fromkeys(option.lower() for option in options))
+    # Non-ASCII literals would need Unicode case folding rules to compare safely, so they prefilter nothing.
+    if not folded or any(not option or not option.isascii() for option in folded):
+        return ()
+    return folded
+
+
+def _skip_class(pattern: str, index: int) -> int:
+    index += 1
+    if index < len(pattern) and pattern[index] == "^":
+        index += 1
+    if index < len(pattern) and pattern[index] == "]":
+        index += 1
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == "]":
+            return index + 1
+        index += 1
+    return index
+
+
+def _skip_group(pattern: str, index: int) -> int:
+    depth = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            index += 2
+            continue
+        if char == "[":
+            index = _skip_class(pattern, index)
+            continue
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return index + 1
+        index += 1
+    return index
+
+
+def _skip_escape_argument(pattern: str, index: int, escaped: str) -> int:
+    if escaped == "x":
+        return index + 2
+    if escaped == "u":
+        return index + 4
+    if escaped == "U":
+        return index + 8
+    if escaped == "N" and pattern[index : index + 1] == "{":
+        close = pattern.find("}", index)
+        return len(pattern) if close < 0 else close + 1
+    if escaped.isdigit():
+        while index < len(pattern) and pattern[index].isdigit():
+            index += 1
+    return index
+
+
+def _quantifier_end(pattern: str, index: int) -> int:
+    # Index just past the quantifier starting at `index`, or `index` itself when there is none.
+    if index >= len(pattern):
+        return index
+    char = pattern[index]
+    if char in "*+?":
+        end = index + 1
+    elif char == "{":
+        close = pattern.find("}", index)
+        body = pattern[index + 1 : close] if close > 0 else ""
+        if not body or not all(part.strip().isdigit() or part == "" for part in body.split(",")):
+            return index
+        end = close + 1
+    else:
+        return index
+    if end < len(pattern) and pattern[end] in "?+":
+        end += 1
+    return end
+
+
+def _keeps_atom(quantifier: str) -> bool:
+    # True when the quantified atom still has to occur at least once.
+    if quantifier.startswith("+"):
+        return True
+    if quantifier.startswith("{"):
+        low = quantifier[1:].split(",")[0].split("}")[0].strip()
+        return low.isdigit() and int(low) >= 1
+    return False
+
+
+def _split_alternatives(pattern: str) -> list[str]:
+    branches: list[str] = []
+    start = 0
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            index += 2
+        elif char == "[":
+            index = _skip_class(pattern, index)
+        elif char == "(":
+            index = _skip_group(pattern, index)
+        elif char == "|":
+            branches.append(pattern[start:index])
+            index += 1
+            start = index
+        else:
+            index += 1
+    branches.append(pattern[start:])
+    return branches
+
+
+def _group_body(group: str) -> str | None:
+    # Body of a capturing or non-capturing group; None for lookarounds, comments, flag groups and the like.
+    inner = group[1:-1] if group.endswith(")") else group[1:]
+    if not inner.startswith("?"):
+        return inner
+    if inner.startswith("?:"):
+        return inner[2:]
+    if inner.startswith("?P<"):
+        close = inner.find(">")
+        return inner[close + 1 :] if close > 0 else None
+    return None
+
+
+def _minimize(options: list[str]) -> tuple[str, ...]:
+    # If a shorter option is inside a longer one, finding the shorter one is already implied.
+    unique = sorted(dict.fromkeys(options), key=len)
+    kept: list[str] = []
+    for option in unique:
+        if not any(shorter in option for shorter in kept):
+            kept.append(option)
+    return tuple(kept)
+
+
+def _sequence_options(pattern: str) -> tuple[str, ...]:
+    factors: list[tuple[str, ...]] = []
+    current: list[str] = []
+    index = 0
+
+    def end_run() -> None:
+        if current:
+            factors.append(("".join(current),))
+            current.clear()
+
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "(":
+            end_run()
+            close = _skip_group(pattern, index)
+            group = pattern[index:close]
+            end = _quantifier_end(pattern, close)
+            body = _group_body(group)
+            if body is not None and (end == close or _keeps_atom(pattern[close:end])):
+                options = literal_options(body)
+                if options:
+                    factors.append(options)
+            index = end
+            continue
+        if char == "[":
+            end_run()
+            index = _quantifier_end(pattern, _skip_class(pattern, index))
+            continue
+        if char in ".^$":
+            end_run()
+            index += 1
+            continue
+
+        literal: str | None
+        if char == "\\":
+            escaped = pattern[index + 1 : index + 2]
+            index += 2
+            if escaped in _SIMPLE_ESCAPES:
+                literal = _SIMPLE_ESCAPES[escaped]
+            elif escaped and not escaped.isalnum():
+                literal = escaped
+            else:
+                literal = None
+                index = _skip_escape_argument(pattern, index, escaped)
+        else:
+            literal = char
+            index += 1
+
+        end = _quantifier_end(pattern, index)
+        if literal is None:
+            end_run()
+            index = end
+            continue
+        if end != index:
+            # The quantified character is optional or repeated; only what precedes it is fixed.
+            if _keeps_atom(pattern[index:end]):
+                current.append(literal)
+            end_run()
+            index = end
+            continue
+        current.append(literal)
+
+    end_run()
+    if not factors:
+        return ()
+    # Prefer the factor whose shortest option is longest (most selective), then the one with fewer options.
+    return max(factors, key=lambda options: (min(len(option) for option in options), -len(options)))
+
+
+def literal_options(pattern: str) -> tuple[str, ...]:
+    # Strings of which at least one occurs in every match of `pattern`; () when nothing can be proven.
+    # The scan is conservative: anything it does not understand just contributes no literal.
+    branches = _split_alternatives(pattern)
+    if len(branches) == 1:
+        return _sequence_options(pattern)
+    options: list[str] = []
+    for branch in branches:
+        branch_options = _sequence_options(branch)
+        if not branch_options:
+            return ()
+        options.extend(branch_options)
+    return _minimize(options)
+
+
+def required_literals(pattern: str) -> tuple[str, ...]:
+    try:
+        if re.compile(pattern).flags & re.VERBOSE:
+            return ()
+    except re.error:
+        return ()
+    return literal_options(pattern)
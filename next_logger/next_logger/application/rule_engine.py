@@ -0,0 +1,253 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterable, Sequence
+from dataclasses import dataclass, replace
+import json
+from pathlib import Path
+import re
+import time
+from typing import Any
+
+from .log_markers import LogMarkerResult
+from .regex_literals import prefilter_literals, prefilter_text, required_literals
+
+
+RULE_TYPES: tuple[str, ...] = ("keyword", "regex", "threshold")
+RULE_SEVERITIES: tuple[str, ...] = ("info", "warning", "error")
+THRESHOLD_OPS: tuple[str, ...] = (">", ">=", "<", "<=", "==", "!=")
+
+_SEVERITY_RANK = {name: rank for rank, name in enumerate(RULE_SEVERITIES)}
+_NUMBER = r"([-+]?\d+(?:\.\d+)?)"
+
+
+class RuleError(ValueError):
+    pass
+
+
+@dataclass(frozen=True)
+class Rule:
+    name: str
+    kind: str
+    severity: str
+    tags: tuple[str, ...]
+    pattern: re.Pattern[str]
+    # Lower-case ASCII strings of which at least one must occur in the line; empty means "always check".
+    literals: tuple[str, ...]
+    op: str = ""
+    value: float = 0.0
+
+    def confirm(self, line: str) -> bool:
+        found = self.pattern.search(line)
+        if found is None:
+            return False
+        if not self.op:
+            return True
+        number = float(found.group(1))
+        if self.op == ">":
+            return number > self.value
+        if self.op == ">=":
+            return number >= self.value
+        if self.op == "<":
+            return number < self.value
+        if self.op == "<=":
+            return number <= self.value
+        if self.op == "==":
+            return number == self.value
+        return number != self.value
+
+
+@dataclass(frozen=True)
+class RuleCost:
+    name: str
+    candidates: int
+    matches: int
+    total_ns: int
+
+    @property
+    def per_candidate_us(self) -> float:
+        return self.total_ns / 1000 / self.candidates if self.candidates else 0.0
+
+
+@dataclass(frozen=True)
+class RuleCostReport:
+    lines: int
+    prefilter_ns: int
+    rules: tuple[RuleCost, ...]
+
+
+class RuleSet:
+    def __init__(self, rules: Sequence[Rule]) -> None:
+        self.rules = tuple(rules)
+        self._always = tuple(index for index, rule in enumerate(self.rules) if not rule.literals)
+        index_by_literal: dict[str, list[int]] = {}
+        for index, rule in enumerate(self.rules):
+            for literal in rule.literals:
+                index_by_literal.setdefault(literal, []).append(index)
+        self._index = tuple((literal, tuple(ids)) for literal, ids in index_by_literal.items())
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def candidates(self, line: str) -> tuple[int, ...]:
+        lowered = prefilter_text(line)
+        found: set[int] = set(self._always)
+        for literal, ids in self._index:
+            if literal in lowered:
+                found.update(ids)
+        if not found:
+            return ()
+        return tuple(sorted(found))
+
+    def match(self, line: str) -> list[Rule]:
+        rules = self.rules
+        return [rules[index] for index in self.candidates(line) if rules[index].confirm(line)]
+
+    def apply(self, line: str, marker: LogMarkerResult) -> LogMarkerResult:
+        matched = self.match(line)
+        if not matched:
+            return marker
+        severity = marker.severity
+        terms = list(marker.matched_terms)
+        tags = list(marker.tags)
+        for rule in matched:
+            if _SEVERITY_RANK[rule.severity] > _SEVERITY_RANK.get(severity, 0):
+                severity = rule.severity
+            terms.append(rule.name)
+            tags.extend(rule.tags)
+        return replace(
+            marker,
+            severity=severity,
+            matched_terms=tuple(dict.fromkeys(terms)),
+            tags=tuple(dict.fromkeys(tags)),
+        )
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "rules": len(self.rules),
+            "prefiltered": len(self.rules) - len(self._always),
+            "literals": len(self._index),
+        }
+
+    def profile(self, lines: Iterable[str], clock: Callable[[], int] = time.perf_counter_ns) -> RuleCostReport:
+        rules = self.rules
+        candidates = [0] * len(rules)
+        matches = [0] * len(rules)
+        spent = [0] * len(rules)
+        prefilter_ns = 0
+        count = 0
+        for line in lines:
+            count += 1
+            started = clock()
+            ids = self.candidates(line)
+            prefilter_ns += clock() - started
+            for index in ids:
+                started = clock()
+                matched = rules[index].confirm(line)
+                spent[index] += clock() - started
+                candidates[index] += 1
+                matches[index] += matched
+        costs = (
+            RuleCost(rule.name, candidates[index], matches[index], spent[index]) for index, rule in enumerate(rules)
+        )
+        return RuleCostReport(
+            lines=count,
+            prefilter_ns=prefilter_ns,
+            rules=tuple(sorted(costs, key=lambda cost: cost.total_ns, reverse=True)),
+        )
+
+
+def _require_text(item: dict[str, Any], key: str, where: str) -> str:
+    value = item.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise RuleError(f"{where}: \"{key}\" must be a non-empty string")
+    return value.strip()
+
+
+def _compile(pattern: str, flags: int, where: str) -> re.Pattern[str]:
+    try:
+        return re.compile(pattern, flags)
+    except re.error as exc:
+        raise RuleError(f"{where}: invalid pattern: {exc}") from exc
+
+
+def _parse_rule(item: Any, position: int) -> Rule:
+    where = f"rule {position}"
+    if not isinstance(item, dict):
+        raise RuleError(f"{where}: must be an object")
+    name = _require_text(item, "name", where)
+    where = f"rule {position} ({name})"
+
+    kind = item.get("type", "keyword")
+    if kind not in RULE_TYPES:
+        raise RuleError(f"{where}: \"type\" must be one of {', '.join(RULE_TYPES)}")
+    severity = item.get("severity", "warning")
+    if severity not in RULE_SEVERITIES:
+        raise RuleError(f"{where}: \"severity\" must be one of {', '.join(RULE_SEVERITIES)}")
+    tags = item.get("tags", [])
+    if isinstance(tags, str):
+        tags = [tags]
+    if not isinstance(tags, list) or not all(isinstance(tag, str) and tag.strip() for tag in tags):
+        raise RuleError(f"{where}: \"tags\" must be a list of strings")
+    flags = re.IGNORECASE if item.get("ignore_case", True) else 0
+
+    op = ""
+    value = 0.0
+    if kind == "keyword":
+        keywords = item.get("keywords", item.get("keyword"))
+        if isinstance(keywords, str):
+            keywords = [keywords]
+        if not isinstance(keywords, list) or not keywords or not all(isinstance(k, str) and k.strip() for k in keywords):
+            raise RuleError(f"{where}: \"keywords\" must be a non-empty list of strings")
+        words = [keyword.strip() for keyword in keywords]
+        alternation = "|".join(re.escape(word) for word in words)
+        pattern = _compile(rf"(?<![A-Za-z0-9])(?:{alternation})(?![A-Za-z0-9])", flags, where)
+        literals = prefilter_literals(words)
+    elif kind == "regex":
+        source = _require_text(item, "pattern", where)
+        pattern = _compile(source, flags, where)
+        literals = prefilter_literals(required_literals(source))
+    else:
+        field = _require_text(item, "field", where)
+        op = item.get("op", ">")
+        if op not in THRESHOLD_OPS:
+            raise RuleError(f"{where}: \"op\" must be one of {' '.join(THRESHOLD_OPS)}")
+        raw_value = item.get("value")
+        if isinstance(raw_value, bool) or not isinstance(raw_value, (int, float)):
+            raise RuleError(f"{where}: \"value\" must be a number")
+        value = float(raw_value)
+        pattern = _compile(rf"(?<![A-Za-z0-9_]){re.escape(field)}\s*[:=]\s*{_NUMBER}", flags, where)
+        literals = prefilter_literals([field])
+
+    return Rule(
+        name=name,
+        kind=kind,
+        severity=severity,
+        tags=tuple(tag.strip() for tag in tags),
+        pattern=pattern,
+        literals=literals,
+        op=op,
+        value=value,
+    )
+
+
+def parse_rules(data: Any) -> RuleSet:
+    items = data.get("rules") if isinstance(data, dict) else data
+    if not isinstance(items, list):
+        raise RuleError("rule file must contain a \"rules\" list")
+    rules = [_parse_rule(item, position) for position, item in enumerate(items, 1)]
+    seen: set[str] = set()
+    for rule in rules:
+        if rule.name in seen:
+            raise RuleError(f"duplicate rule name: {rule.name}")
+        seen.add(rule.name)
+    return RuleSet(rules)
+
+
+def load_rules(path: Path) -> RuleSet:
+    try:
+        data = json.loads(Path(path).read_text(encoding="utf-8"))
+    except OSError as exc:
+        raise RuleError(f"cannot read rule file {path}: {exc}") from exc
+    except json.JSONDecodeError as exc:
+        raise RuleError(f"rule file {path} is not valid JSON: {exc}") from exc
+    return parse_rules(data)
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+import threading
+
+from next_logger.domain.models import SessionStats
+
+
+DEFAULT_MAX_RECONNECT_EVENTS = 200
+
+
+class _CounterShard:
+    # Mutated only by the thread that owns it, so increments need no lock.
+    __slots__ = ("received_lines", "dropped_lines", "write_failures", "error_lines", "reconnect_attempts")
+
+    def __init__(self) -> None:
+        self.received_lines = 0
+        self.dropped_lines = 0
+        self.write_failures = 0
+        self.error_lines = 0
+        self.reconnect_attempts = 0
+
+
+class StatsCollector:
+    def __init__(
+        self,
+        start_time: datetime | None = None,
+        max_reconnect_events: int = DEFAULT_MAX_RECONNECT_EVENTS,
+    ) -> None:
+        self._local = threading.local()
+        self._shards: list[_CounterShard] = []
+        self._registry_lock = threading.Lock()
+        self._events_lock = threading.Lock()
+        self._reconnect_events: deque[dict[str, str]] = deque(maxlen=max(1, max_reconnect_events))
+
+        self.start_time = start_time
+        self.end_time: datetime | None = None
+        self.last_error = ""
+        self.session_dir: Path | None = None
+        self.segment_count = 1
+
+    def shard(self) -> _CounterShard:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = _CounterShard()
+            self._local.shard = shard
+            with self._registry_lock:
+                self._shards.append(shard)
+        return shard
+
+    def record_line(self, is_error: bool, write_ok: bool) -> None:
+        shard = self.shard()
+        shard.received_lines += 1
+        if is_error:
+            shard.error_lines += 1
+        if not write_ok:
+            shard.write_failures += 1
+            self.last_error = "Log write failed."
+
+    def record_lines(self, count: int, errors: int, write_ok: bool) -> None:
+        shard = self.shard()
+        shard.received_lines += count
+        shard.error_lines += errors
+        if not write_ok:
+            shard.write_failures += count
+            self.last_error = "Log write failed."
+
+    def record_drop(self, count: int = 1) -> None:
+        self.shard().dropped_lines += count
+
+    def record_reconnect(self, event: dict[str, str]) -> None:
+        self.shard().reconnect_attempts += 1
+        with self._events_lock:
+            self._reconnect_events.append(event)
+
+    def snapshot(self) -> SessionStats:
+        with self._registry_lock:
+            shards = tuple(self._shards)
+        with self._events_lock:
+            reconnect_events = list(self._reconnect_events)
+
+        stats = SessionStats(
+            start_time=self.start_time,
+            end_time=self.end_time,
+            last_error=self.last_error,
+            session_dir=self.session_dir,
+            segment_count=self.segment_count,
+            reconnect_events=reconnect_events,
+        )
+        for shard in shards:
+            stats.received_lines += shard.received_lines
+            stats.dropped_lines += shard.dropped_lines
+            stats.write_failures += shard.write_failures
+            stats.error_lines += shard.error_lines
+            stats.reconnect_attempts += shard.reconnect_attempts
+        return stats
@@ -0,0 +1,270 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+import threading
+from typing import Any
+
+from .anomaly_detector import line_template
+
+
+WILDCARD = "<*>"
+TREE_DEPTH = 4
+SIMILARITY = 0.5
+MAX_CHILDREN = 100
+MAX_CLUSTERS = 1000
+MAX_TOKENS = 64
+MAX_EXAMPLES = 3
+EXAMPLE_MAX_CHARS = 200
+_RECENT_SHAPES = 4096
+
+
+@dataclass
+class LogTemplate:
+    template_id: int
+    tokens: list[str]
+    path: tuple[Any, ...]
+    count: int = 0
+    errors: int = 0
+    warnings: int = 0
+    first_ns: int = 0
+    last_ns: int = 0
+    examples: tuple[str, ...] = ()
+
+    @property
+    def text(self) -> str:
+        return " ".join(self.tokens)
+
+
+@dataclass(frozen=True)
+class TemplateSummary:
+    template_id: int
+    template: str
+    count: int
+    errors: int
+    warnings: int
+    first_ns: int
+    last_ns: int
+    examples: tuple[str, ...]
+
+
+def _is_variable(token: str) -> bool:
+    return "#" in token or token == WILDCARD
+
+
+class TemplateMiner:
+    # Drain: lines are routed by token count and their first tokens to a short list of templates, then
+    # joined to the most similar one, which turns differing positions into <*>. Template count, children per
+    # tree node and tokens per line are all capped; the least recently seen template is evicted first.
+    def __init__(
+        self,
+        depth: int = TREE_DEPTH,
+        similarity: float = SIMILARITY,
+        max_children: int = MAX_CHILDREN,
+        max_clusters: int = MAX_CLUSTERS,
+        max_examples: int = MAX_EXAMPLES,
+    ) -> None:
+        self._prefix_tokens = max(1, depth - 2)
+        self._similarity = similarity
+        self._max_children = max_children
+        self._max_clusters = max(1, max_clusters)
+        self._max_examples = max_examples
+        self._lock = threading.Lock()
+
+        self._root: dict[int, dict[str, Any]] = {}
+        self._templates: OrderedDict[int, LogTemplate] = OrderedDict()
+        # Masked line -> template id, so repeated shapes skip the tree walk and similarity scoring.
+        self._recent: dict[str, int] = {}
+        self._next_id = 1
+        self._lines = 0
+        self._evicted_templates = 0
+        self._evicted_lines = 0
+
+    def add(self, line: str, at_ns: int = 0, severity: str = "info") -> int:
+        with self._lock:
+            return self._add(line, at_ns, severity)
+
+    def add_batch(self, batch: Sequence[tuple[int, str]], severities: Sequence[str]) -> None:
+        with self._lock:
+            for (at_ns, line), severity in zip(batch, severities):
+                self._add(line, at_ns, severity)
+
+    def match(self, line: str) -> int | None:
+        with self._lock:
+            shape = line_template(line)
+            template_id = self._recent.get(shape)
+            if template_id in self._templates:
+                return template_id
+            tokens = shape.split()[:MAX_TOKENS]
+            if not tokens:
+                return None
+            leaf = self._leaf(tokens, create=False)
+            found = self._best(leaf, tokens) if leaf is not None else None
+            return found.template_id if found is not None else None
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+    @property
+    def lines(self) -> int:
+        return self._lines
+
+    def top(self, limit: int | None = None, key: str = "count") -> list[TemplateSummary]:
+        with self._lock:
+            templates = list(self._templates.values())
+        if key == "errors":
+            templates.sort(key=lambda item: (item.errors, item.warnings, item.count), reverse=True)
+        elif key == "rare":
+            templates.sort(key=lambda item: (item.count, -item.last_ns))
+        elif key == "recent":
+            templates.sort(key=lambda item: item.last_ns, reverse=True)
+        else:
+            templates.sort(key=lambda item: item.count, reverse=True)
+        return [
+            TemplateSummary(
+                template_id=item.template_id,
+                template=item.text,
+                count=item.count,
+                errors=item.errors,
+                warnings=item.warnings,
+                first_ns=item.first_ns,
+                last_ns=item.last_ns,
+                examples=item.examples,
+            )
+            for item in templates[:limit]
+        ]
+
+    def summary(self, limit: int = 100, wall_ns: Callable[[int], int] = int) -> dict[str, Any]:
+        return {
+            "lines": self._lines,
+            "templates": len(self._templates),
+            "evicted_templates": self._evicted_templates,
+            "evicted_lines": self._evicted_lines,
+            "top": [
+                {
+                    "template": item.template,
+                    "count": item.count,
+                    "errors": item.errors,
+                    "warnings": item.warnings,
+                    "first_ns": wall_ns(item.first_ns),
+                    "last_ns": wall_ns(item.last_ns),
+                    "examples": list(item.examples),
+                }
+                for item in self.top(limit)
+            ],
+        }
+
+    def _add(self, line: str, at_ns: int, severity: str) -> int:
+        shape = line_template(line)
+        template = self._templates.get(self._recent.get(shape, 0))
+        if template is None:
+            tokens = shape.split()[:MAX_TOKENS]
+            if not tokens:
+                return 0
+            leaf = self._leaf(tokens, create=True)
+            template = self._best(leaf, tokens)
+            if template is None:
+                template = self._create(leaf, tokens, at_ns)
+            else:
+                self._merge(template, tokens)
+            if len(self._recent) >= _RECENT_SHAPES:
+                self._recent.clear()
+            self._recent[shape] = template.template_id
+
+        self._lines += 1
+        template.count += 1
+        template.last_ns = at_ns
+        if severity == "error":
+            template.errors += 1
+        elif severity == "warning":
+            template.warnings += 1
+        if len(template.examples) < self._max_examples and (severity != "info" or not template.examples):
+            example = line[:EXAMPLE_MAX_CHARS]
+            if example not in template.examples:
+                template.examples = (*template.examples, example)
+        self._templates.move_to_end(template.template_id)
+        return template.template_id
+
+    def _leaf(self, tokens: list[str], create: bool) -> list[LogTemplate] | None:
+        node = self._root.get(len(tokens))
+        if node is None:
+            if not create:
+                return None
+            node = self._root[len(tokens)] = {}
+        for token in tokens[: self._prefix_tokens]:
+            key = WILDCARD if _is_variable(token) else token
+            child = node.get(key)
+            if child is None and key != WILDCARD:
+                child = node.get(WILDCARD) if len(node) >= self._max_children else None
+            if child is None:
+                if not create:
+                    return None
+                if len(node) >= self._max_children:
+                    key = WILDCARD
+                child = node.setdefault(key, {})
+            node = child
+        return node.setdefault("", []) if create else node.get("")
+
+    def _best(self, leaf: list[LogTemplate], tokens: list[str]) -> LogTemplate | None:
+        best: LogTemplate | None = None
+        best_score = (-1.0, -1)
+        for template in leaf:
+            same = 0
+            wildcards = 0
+            for known, token in zip(template.tokens, tokens):
+                if known == WILDCARD:
+                    wildcards += 1
+                elif known == token:
+                    same += 1
+            score = (same / len(tokens), wildcards)
+            if score > best_score:
+                best, best_score = template, score
+        if best is None or best_score[0] < self._similarity:
+            return None
+        return best
+
+    def _merge(self, template: LogTemplate, tokens: list[str]) -> None:
+        for index, (known, token) in enumerate(zip(template.tokens, tokens)):
+            if known != token and known != WILDCARD:
+                template.tokens[index] = WILDCARD
+
+    def _create(self, leaf: list[LogTemplate], tokens: list[str], at_ns: int) -> LogTemplate:
+        path = (len(tokens), *self._path_keys(tokens))
+        template = LogTemplate(self._next_id, list(tokens), path, first_ns=at_ns, last_ns=at_ns)
+        self._next_id += 1
+        leaf.append(template)
+        self._templates[template.template_id] = template
+        while len(self._templates) > self._max_clusters:
+            self._evict()
+        return template
+
+    def _path_keys(self, tokens: list[str]) -> list[str]:
+        keys: list[str] = []
+        node = self._root[len(tokens)]
+        for token in tokens[: self._prefix_tokens]:
+            key = WILDCARD if _is_variable(token) else token
+            if key not in node:
+                key = WILDCARD
+            keys.append(key)
+            node = node[key]
+        return keys
+
+    def _evict(self) -> None:
+        _, template = self._templates.popitem(last=False)
+        self._evicted_templates += 1
+        self._evicted_lines += template.count
+        length, *keys = template.path
+        nodes = [self._root[length]]
+        for key in keys:
+            nodes.append(nodes[-1][key])
+        nodes[-1][""].remove(template)
+        # Drop branches that no longer lead to any template so the tree stays as bounded as the list.
+        if not nodes[-1][""]:
+            del nodes[-1][""]
+        for parent, key, node in zip(reversed(nodes[:-1]), reversed(keys), reversed(nodes[1:])):
+            if node:
+                break
+            del parent[key]
+        if not self._root[length]:
+            del self._root[length]
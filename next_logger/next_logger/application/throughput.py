@@ -0,0 +1,143 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import threading
+import time
+from typing import Any
+
+
+RATE_WINDOWS_SEC: tuple[int, ...] = (1, 10, 60)
+SERIES_FIELDS: tuple[str, ...] = ("lines", "bytes", "errors", "drops", "latency_ns", "writes")
+
+_LINES, _BYTES, _ERRORS, _DROPS, _LATENCY_NS, _WRITES = range(len(SERIES_FIELDS))
+
+
+class ThroughputMeter:
+    def __init__(
+        self,
+        ring_seconds: int = 120,
+        history_buckets: int = 720,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self._clock = clock
+        # Recorded from the reader, the delivery thread and the UI; snapshots must not see a half-cleared slot.
+        self._lock = threading.Lock()
+        self._size = max(ring_seconds, max(RATE_WINDOWS_SEC) + 1)
+        self._slot_sec = [-1] * self._size
+        self._slots = [[0] * len(SERIES_FIELDS) for _ in range(self._size)]
+
+        self._start_sec = int(clock())
+        self._history_capacity = max(2, history_buckets - history_buckets % 2)
+        self._history_width = 1
+        self._history = [[0] * len(SERIES_FIELDS) for _ in range(self._history_capacity)]
+        self._history_len = 0
+
+    def _slot(self, sec: int) -> list[int]:
+        index = sec % self._size
+        slot = self._slots[index]
+        if self._slot_sec[index] != sec:
+            for field in range(len(slot)):
+                slot[field] = 0
+            self._slot_sec[index] = sec
+        return slot
+
+    def _history_bucket(self, sec: int) -> list[int]:
+        offset = max(0, sec - self._start_sec)
+        index = offset // self._history_width
+        while index >= self._history_capacity:
+            self._compact_history()
+            index = offset // self._history_width
+        if index >= self._history_len:
+            self._history_len = index + 1
+        return self._history[index]
+
+    def _compact_history(self) -> None:
+        half = self._history_capacity // 2
+        for index in range(half):
+            left = self._history[index * 2]
+            right = self._history[index * 2 + 1]
+            self._history[index] = [a + b for a, b in zip(left, right)]
+        for index in range(half, self._history_capacity):
+            self._history[index] = [0] * len(SERIES_FIELDS)
+        self._history_width *= 2
+        self._history_len = (self._history_len + 1) // 2
+
+    def record(
+        self,
+        lines: int = 0,
+        nbytes: int = 0,
+        errors: int = 0,
+        drops: int = 0,
+        latency_ns: int = 0,
+        writes: int = 0,
+    ) -> None:
+        sec = int(self._clock())
+        values = (lines, nbytes, errors, drops, latency_ns, writes)
+        with self._lock:
+            for bucket in (self._slot(sec), self._history_bucket(sec)):
+                for field, value in enumerate(values):
+                    if value:
+                        bucket[field] += value
+
+    def _window_totals(self, window_sec: int, now_sec: int) -> list[int]:
+        totals = [0] * len(SERIES_FIELDS)
+        for sec in range(now_sec - window_sec, now_sec):
+            index = sec % self._size
+            if self._slot_sec[index] != sec:
+                continue
+            for field, value in enumerate(self._slots[index]):
+                totals[field] += value
+        return totals
+
+    def rates(self) -> dict[int, dict[str, float]]:
+        now_sec = int(self._clock())
+        result: dict[int, dict[str, float]] = {}
+        for window in RATE_WINDOWS_SEC:
+            with self._lock:
+                totals = self._window_totals(window, now_sec)
+            # Only completed seconds are counted, but a session younger than the
+            # window must not be averaged over time it was not running.
+            span = max(1, min(window, now_sec - self._start_sec))
+            writes = totals[_WRITES]
+            result[window] = {
+                "lines": totals[_LINES] / span,
+                "bytes": totals[_BYTES] / span,
+                "errors": totals[_ERRORS] / span,
+                "drops": totals[_DROPS] / span,
+                "write_latency_ms": (totals[_LATENCY_NS] / writes / 1e6) if writes else 0.0,
+            }
+        return result
+
+    def recent_lines(self, seconds: int = 60) -> list[int]:
+        now_sec = int(self._clock())
+        seconds = min(seconds, self._size - 1)
+        values: list[int] = []
+        with self._lock:
+            for sec in range(now_sec - seconds, now_sec):
+                index = sec % self._size
+                values.append(self._slots[index][_LINES] if self._slot_sec[index] == sec else 0)
+        return values
+
+    def series(self) -> dict[str, Any]:
+        rows: list[list[float]] = []
+        with self._lock:
+            width = self._history_width
+            history = [list(self._history[index]) for index in range(self._history_len)]
+        for index, bucket in enumerate(history):
+            writes = bucket[_WRITES]
+            rows.append(
+                [
+                    index * width,
+                    bucket[_LINES],
+                    bucket[_BYTES],
+                    bucket[_ERRORS],
+                    bucket[_DROPS],
+                    round(bucket[_LATENCY_NS] / writes / 1e6, 3) if writes else 0.0,
+                ]
+            )
+        return {
+            "bucket_sec": width,
+            "columns": ["offset_sec", "lines", "bytes", "errors", "drops", "write_latency_ms"],
+            "rows": rows,
+        }
+
@@ -0,0 +1,147 @@
+from __future__ import annotations
+
+import argparse
+from collections.abc import Sequence
+from pathlib import Path
+import sys
+
+from next_logger.application.rule_engine import RuleError, load_rules
+from next_logger.infrastructure.session_catalog import SessionCatalog
+from next_logger.infrastructure.session_export import (
+    CHUNK_BYTES,
+    PARALLEL_EXPORT_FORMATS,
+    ExportProgress,
+    export_session,
+    export_session_parallel,
+    iter_session_records,
+    read_manifest,
+)
+
+
+def _cmd_catalog_rebuild(args: argparse.Namespace) -> int:
+    count = SessionCatalog().rebuild(Path(args.base_dir))
+    print(f"indexed {count} sessions in {args.base_dir}")
+    return 0
+
+
+def _cmd_catalog_list(args: argparse.Namespace) -> int:
+    entries = SessionCatalog().list_sessions(
+        Path(args.base_dir),
+        product=args.product,
+        status=args.status,
+        newest_first=True,
+        limit=args.limit,
+    )
+    for entry in entries:
+        print(
+            f"{entry.started_at}\t{entry.status}\t{entry.product}\t{entry.serial_number}\t"
+            f"{entry.size_bytes}\t{entry.received_lines}\t{entry.error_lines}\t{entry.session_dir}"
+        )
+    return 0
+
+
+def _cmd_export(args: argparse.Namespace) -> int:
+    session_dir = Path(args.session_dir)
+    if not session_dir.is_dir():
+        print(f"session directory not found: {session_dir}", file=sys.stderr)
+        return 1
+    if not args.output:
+        if args.format == "parquet":
+            print("parquet export needs --output", file=sys.stderr)
+            return 2
+        export_session(session_dir, sys.stdout.buffer, args.format, args.errors_only)
+        sys.stdout.buffer.flush()
+        return 0
+
+    def report(progress: ExportProgress) -> None:
+        percent = progress.bytes_done * 100 // max(1, progress.bytes_total)
+        print(f"\r{percent:3d}% {progress.units_done}/{progress.units_total} units", end="", file=sys.stderr)
+
+    try:
+        count = export_session_parallel(
+            session_dir,
+            Path(args.output),
+            args.format,
+            args.errors_only,
+            workers=args.workers,
+            chunk_bytes=args.chunk_mb * 1024 * 1024,
+            progress=report,
+        )
+    except (OSError, RuntimeError) as exc:
+        print(f"\nexport failed: {exc}", file=sys.stderr)
+        return 1
+    print(f"\nexported {count} lines to {args.output}", file=sys.stderr)
+    return 0
+
+
+def _cmd_rules_report(args: argparse.Namespace) -> int:
+    session_dir = Path(args.session_dir)
+    if not session_dir.is_dir():
+        print(f"session directory not found: {session_dir}", file=sys.stderr)
+        return 1
+    rules_file = args.rules or read_manifest(session_dir).get("settings", {}).get("rules_file", "")
+    if not rules_file:
+        print("no rule file given and the session did not use one; pass --rules", file=sys.stderr)
+        return 2
+    try:
+        rules = load_rules(Path(rules_file))
+    except RuleError as exc:
+        print(str(exc), file=sys.stderr)
+        return 1
+
+    report = rules.profile(line for _, line, _ in iter_session_records(session_dir))
+    total_ns = report.prefilter_ns + sum(cost.total_ns for cost in report.rules)
+    print(f"{report.lines} lines, {len(rules)} rules, {total_ns / 1e6:.1f} ms total")
+    print(f"prefilter\t{report.prefilter_ns / 1e6:.1f} ms\t{report.prefilter_ns / 1000 / max(1, report.lines):.2f} us/line")
+    print("rule\ttotal_ms\tshare\tcandidates\tmatches\tus/candidate")
+    for cost in report.rules[: args.top]:
+        share = cost.total_ns * 100 / max(1, total_ns)
+        print(
+            f"{cost.name}\t{cost.total_ns / 1e6:.1f}\t{share:.1f}%\t{cost.candidates}\t{cost.matches}\t"
+            f"{cost.per_candidate_us:.2f}"
+        )
+    return 0
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="next_logger")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    catalog = commands.add_parser("catalog", help="session catalog maintenance")
+    catalog_commands = catalog.add_subparsers(dest="catalog_command", required=True)
+
+    rebuild = catalog_commands.add_parser("rebuild", help="re-index all sessions under a save directory")
+    rebuild.add_argument("base_dir")
+    rebuild.set_defaults(handler=_cmd_catalog_rebuild)
+
+    listing = catalog_commands.add_parser("list", help="list indexed sessions, newest first")
+    listing.add_argument("base_dir")
+    listing.add_argument("--product")
+    listing.add_argument("--status")
+    listing.add_argument("--limit", type=int)
+    listing.set_defaults(handler=_cmd_catalog_list)
+
+    export = commands.add_parser("export", help="convert a session's log to raw / txt / csv / jsonl / parquet")
+    export.add_argument("session_dir")
+    export.add_argument("--format", choices=PARALLEL_EXPORT_FORMATS, help="defaults to the session's log_format")
+    export.add_argument("--errors-only", action="store_true")
+    export.add_argument("--output", "-o", help="write to a file (parquet: a directory) instead of stdout")
+    export.add_argument("--workers", type=int, help="worker processes for --output (default: CPU count)")
+    export.add_argument("--chunk-mb", type=int, default=CHUNK_BYTES // (1024 * 1024), help="raw bytes per work unit")
+    export.set_defaults(handler=_cmd_export)
+
+    rules = commands.add_parser("rules", help="user-defined classification rules")
+    rules_commands = rules.add_subparsers(dest="rules_command", required=True)
+
+    report = rules_commands.add_parser("report", help="replay a session and show which rules cost the most time")
+    report.add_argument("session_dir")
+    report.add_argument("--rules", help="rule file (default: the one the session was recorded with)")
+    report.add_argument("--top", type=int, default=20)
+    report.set_defaults(handler=_cmd_rules_report)
+
+    return parser
+
+
+def run_cli(argv: Sequence[str]) -> int:
+    args = build_parser().parse_args(list(argv))
+    return int(args.handler(args))
@@ -9,6 +9,12 @@ from typing import Literal
 LogFormat = Literal["txt", "csv", "jsonl"]
 ResumePolicy = Literal["append", "new_segment"]
 ReconnectBackoffMode = Literal["fixed", "exponential"]
+RetentionPriority = Literal["oldest", "keep_errors"]
+DurabilityPolicy = Literal["none", "periodic", "batch"]
+StorageLayout = Literal["split", "raw_only"]
+TimestampResolution = Literal["ms", "us", "ns"]
+CaptureMode = Literal["continuous", "triggered"]
+DecimationMode = Literal["off", "every_n", "bucket"]
 
 
 @dataclass(frozen=True)
@@ -38,6 +44,27 @@ class SessionConfig:
     resume_policy: ResumePolicy = "append"
     retention_max_sessions: int = 0
     retention_max_age_days: int = 0
+    retention_max_total_mb: int = 0
+    retention_max_product_mb: int = 0
+    retention_priority: RetentionPriority = "oldest"
+    retention_compress_before_delete: bool = False
+    archive_closed_sessions: bool = False
+    durability: DurabilityPolicy = "periodic"
+    fsync_interval_sec: float = 1.0
+    storage_layout: StorageLayout = "split"
+    timestamp_resolution: TimestampResolution = "ms"
+    rules_file: str = ""
+    anomaly_silence_sec: int = 30
+    incident_context_lines: int = 50
+    capture_mode: CaptureMode = "continuous"
+    capture_pre_mb: int = 16
+    capture_post_sec: int = 60
+    capture_on_error: bool = True
+    capture_trigger_regex: str = ""
+    decimation_mode: DecimationMode = "off"
+    decimation_every_n: int = 10
+    decimation_bucket_ms: int = 1000
+    decimation_keep_full_rate: bool = False
 
 
 @dataclass
@@ -3,6 +3,9 @@ from .log_writer import SessionLogWriter
 from .profile_store import ProfileStore
 from .recovery_store import RecoveryStore
 from .retention import apply_retention_policy
+from .scrollback import SessionScrollback
+from .session_archive import SessionArchive, archive_session
+from .session_catalog import SessionCatalog
 from .serial_worker import SerialWorker
 
 __all__ = [
@@ -10,6 +13,10 @@ __all__ = [
     "ProfileStore",
     "RecoveryStore",
     "SerialWorker",
+    "SessionArchive",
+    "SessionCatalog",
     "SessionLogWriter",
+    "SessionScrollback",
     "apply_retention_policy",
+    "archive_session",
 ]
@@ -32,3 +32,25 @@ class AppSettingsStore:
         data = self._load()
         data[key] = bool(value)
         self._save(data)
+
+    def get_int(self, key: str, default: int = 0) -> int:
+        data = self._load()
+        try:
+            return int(data.get(key, default))
+        except (TypeError, ValueError):
+            return default
+
+    def set_int(self, key: str, value: int) -> None:
+        data = self._load()
+        data[key] = int(value)
+        self._save(data)
+
+    def get_str(self, key: str, default: str = "") -> str:
+        data = self._load()
+        value = data.get(key, default)
+        return value if isinstance(value, str) else default
+
+    def set_str(self, key: str, value: str) -> None:
+        data = self._load()
+        data[key] = str(value)
+        self._save(data)
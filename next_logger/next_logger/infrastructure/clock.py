@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from datetime import datetime
+import sys
+import time
+from typing import Any
+
+
+if sys.platform == "win32" and sys.version_info < (3, 13):
+    # monotonic() ticks every 15.6 ms there; the performance counter is just as monotonic and sub-microsecond.
+    monotonic_ns = time.perf_counter_ns
+    MONOTONIC_SOURCE = "perf_counter"
+else:
+    monotonic_ns = time.monotonic_ns
+    MONOTONIC_SOURCE = "monotonic"
+
+
+class SessionClock:
+    # One wall-clock reading anchors the whole session; every line is placed relative to it on the
+    # monotonic clock, so NTP steps during a session cannot reorder the log.
+    def __init__(self, wall_ns: int | None = None, anchor_monotonic_ns: int | None = None) -> None:
+        self.anchor_monotonic_ns = monotonic_ns() if anchor_monotonic_ns is None else anchor_monotonic_ns
+        self.anchor_wall_ns = time.time_ns() if wall_ns is None else wall_ns
+        self._offset_ns = self.anchor_wall_ns - self.anchor_monotonic_ns
+        # One tuple swapped in a single assignment, so a reader on another thread never pairs one second
+        # with another second's text.
+        self._text_cache: tuple[int, str] = (-1, "")
+
+    def wall_ns(self, arrived_monotonic_ns: int) -> int:
+        return arrived_monotonic_ns + self._offset_ns
+
+    def clock_text(self, wall_ns: int) -> str:
+        second = wall_ns // 1_000_000_000
+        cached_second, text = self._text_cache
+        if second != cached_second:
+            text = time.strftime("%H:%M:%S", time.localtime(second))
+            self._text_cache = (second, text)
+        return text
+
+    def section(self) -> dict[str, Any]:
+        return {
+            "source": MONOTONIC_SOURCE,
+            "anchor_wall_ns": self.anchor_wall_ns,
+            "anchor_monotonic_ns": self.anchor_monotonic_ns,
+            "anchor_wall": datetime.fromtimestamp(self.anchor_wall_ns / 1_000_000_000).isoformat(
+                timespec="microseconds"
+            ),
+        }
@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import os
+from pathlib import Path
+import struct
+import threading
+from typing import BinaryIO
+import zlib
+
+
+CHECKSUM_SUFFIX = ".crc"
+CHECKSUM_BLOCK_BYTES = 64 * 1024
+# start offset, end offset, crc32 of the bytes in between.
+_ENTRY = struct.Struct("<QQI")
+
+
+def sync_fd(fd: int) -> None:
+    # fdatasync skips the metadata flush; Windows and macOS only offer fsync.
+    if hasattr(os, "fdatasync"):
+        os.fdatasync(fd)
+    else:
+        os.fsync(fd)
+
+
+def checksum_path(data_path: Path) -> Path:
+    return data_path.with_suffix(CHECKSUM_SUFFIX)
+
+
+class ChecksumSidecar:
+    def __init__(self, data_path: Path, start_offset: int) -> None:
+        self.path = checksum_path(data_path)
+        self._file: BinaryIO = self.path.open("ab")
+        self._block_start = start_offset
+        self._block_end = start_offset
+        self._crc = 0
+
+    def update(self, data: bytes) -> None:
+        self._crc = zlib.crc32(data, self._crc)
+        self._block_end += len(data)
+        if self._block_end - self._block_start >= CHECKSUM_BLOCK_BYTES:
+            self.seal()
+
+    def seal(self) -> None:
+        if self._block_end == self._block_start:
+            return
+        self._file.write(_ENTRY.pack(self._block_start, self._block_end, self._crc))
+        self._file.flush()
+        self._block_start = self._block_end
+        self._crc = 0
+
+    def fileno(self) -> int:
+        return self._file.fileno()
+
+    def close(self) -> None:
+        self.seal()
+        self._file.close()
+
+
+def read_checksums(data_path: Path) -> list[tuple[int, int, int]]:
+    try:
+        payload = checksum_path(data_path).read_bytes()
+    except OSError:
+        return []
+    usable = len(payload) - len(payload) % _ENTRY.size
+    return [_ENTRY.unpack_from(payload, offset) for offset in range(0, usable, _ENTRY.size)]
+
+
+def verify_checksums(data_path: Path) -> tuple[int, int]:
+    # Returns (end of the last verified block, number of mismatching blocks).
+    # Bytes past the verified end were never sealed and may be a torn tail.
+    verified_end = 0
+    mismatches = 0
+    try:
+        handle = data_path.open("rb")
+    except OSError:
+        return 0, 0
+    with handle:
+        for start, end, expected in read_checksums(data_path):
+            handle.seek(start)
+            data = handle.read(end - start)
+            if len(data) != end - start or zlib.crc32(data) != expected:
+                mismatches += 1
+                continue
+            verified_end = max(verified_end, end)
+    return verified_end, mismatches
+
+
+def trim_checksums(data_path: Path) -> None:
+    # Drop a half-written entry and entries that cover bytes truncated from the data file.
+    path = checksum_path(data_path)
+    if not path.exists():
+        return
+    try:
+        size = data_path.stat().st_size
+    except OSError:
+        size = 0
+    keep = 0
+    for start, end, _ in read_checksums(data_path):
+        if end > size:
+            break
+        keep += _ENTRY.size
+    with path.open("r+b") as handle:
+        handle.truncate(keep)
+
+
+class PeriodicSyncer(threading.Thread):
+    def __init__(self, collect_fds: Callable[[], list[int]], interval_sec: float) -> None:
+        super().__init__(daemon=True, name="log-fsync")
+        self._collect_fds = collect_fds
+        self._interval_sec = max(0.05, interval_sec)
+        self._stop_event = threading.Event()
+        self.sync_count = 0
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self._interval_sec):
+            self.sync_now()
+
+    def sync_now(self) -> None:
+        # collect_fds hands over duplicated descriptors, so a rotation cannot close them mid-sync.
+        for fd in self._collect_fds():
+            try:
+                sync_fd(fd)
+            except OSError:
+                pass
+            finally:
+                os.close(fd)
+        self.sync_count += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=2.0)
@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+import threading
+from typing import Any, TextIO
+
+
+INCIDENTS_NAME = "incidents.jsonl"
+
+
+def incidents_path(session_dir: Path) -> Path:
+    return Path(session_dir) / INCIDENTS_NAME
+
+
+class IncidentLog:
+    # One JSON record per incident, appended when its window closes. The file is only created once
+    # the first incident is written.
+    def __init__(self, session_dir: Path) -> None:
+        self.path = incidents_path(session_dir)
+        self._lock = threading.Lock()
+        self._file: TextIO | None = None
+        self._closed = False
+
+    def append(self, incident: dict[str, Any]) -> bool:
+        with self._lock:
+            if self._closed:
+                return False
+            try:
+                if self._file is None:
+                    self._file = self.path.open("a", encoding="utf-8", newline="")
+                self._file.write(json.dumps(incident, ensure_ascii=False) + "\n")
+                self._file.flush()
+                return True
+            except OSError:
+                return False
+
+    def close(self) -> None:
+        with self._lock:
+            self._closed = True
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def read_incidents(session_dir: Path) -> list[dict[str, Any]]:
+    try:
+        lines = incidents_path(session_dir).read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return []
+    incidents: list[dict[str, Any]] = []
+    for text in lines:
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError:
+            # A crash can leave the last record half written.
+            continue
+        if isinstance(record, dict):
+            incidents.append(record)
+    return incidents
+
+
+def read_incident(session_dir: Path, incident_id: int) -> dict[str, Any] | None:
+    # Records start with their id, so only the matching line is parsed.
+    prefix = f'{{"id": {incident_id},'
+    try:
+        with incidents_path(session_dir).open("r", encoding="utf-8", errors="replace") as handle:
+            for text in handle:
+                if not text.startswith(prefix):
+                    continue
+                try:
+                    record = json.loads(text)
+                except json.JSONDecodeError:
+                    return None
+                return record if isinstance(record, dict) else None
+    except OSError:
+        return None
+    return None
@@ -1,34 +1,219 @@
 from __future__ import annotations
 
-import csv
+from collections.abc import Callable, Sequence
 from datetime import datetime
+import gzip
 import json
+import os
+import sqlite3
 from pathlib import Path
 import threading
-from typing import TextIO
+import time
+from typing import IO, Any, BinaryIO
 
 from next_logger.application.preflight import build_preview_path
 from next_logger.domain.models import ConnectionConfig, SessionConfig, SessionStats
 
+from .durability import ChecksumSidecar, PeriodicSyncer, sync_fd
+from .session_catalog import SessionCatalog
+
+
+def settings_section(config: SessionConfig) -> dict[str, Any]:
+    return {
+        "product": config.product,
+        "serial_number": config.serial_number,
+        "comment": config.comment,
+        "date": config.date,
+        "save_dir": str(config.save_dir),
+        "log_format": config.log_format,
+        "error_keywords": list(config.error_keywords),
+        "resume_policy": config.resume_policy,
+        "retention_max_sessions": config.retention_max_sessions,
+        "retention_max_age_days": config.retention_max_age_days,
+        "retention_max_total_mb": config.retention_max_total_mb,
+        "retention_max_product_mb": config.retention_max_product_mb,
+        "retention_priority": config.retention_priority,
+        "retention_compress_before_delete": config.retention_compress_before_delete,
+        "archive_closed_sessions": config.archive_closed_sessions,
+        "durability": config.durability,
+        "fsync_interval_sec": config.fsync_interval_sec,
+        "storage_layout": config.storage_layout,
+        "timestamp_resolution": config.timestamp_resolution,
+        "rules_file": config.rules_file,
+        "anomaly_silence_sec": config.anomaly_silence_sec,
+        "incident_context_lines": config.incident_context_lines,
+        "capture_mode": config.capture_mode,
+        "capture_pre_mb": config.capture_pre_mb,
+        "capture_post_sec": config.capture_post_sec,
+        "capture_on_error": config.capture_on_error,
+        "capture_trigger_regex": config.capture_trigger_regex,
+        "decimation_mode": config.decimation_mode,
+        "decimation_every_n": config.decimation_every_n,
+        "decimation_bucket_ms": config.decimation_bucket_ms,
+        "decimation_keep_full_rate": config.decimation_keep_full_rate,
+    }
+
+
+def connection_section(connection: ConnectionConfig | None) -> dict[str, Any]:
+    if connection is None:
+        return {}
+    return {
+        "port": connection.port,
+        "baudrate": connection.baudrate,
+        "parity": connection.parity,
+        "bytesize": connection.bytesize,
+        "stopbits": connection.stopbits,
+        "timeout": connection.timeout,
+        "auto_reconnect": connection.auto_reconnect,
+        "reconnect_max_retries": connection.reconnect_max_retries,
+        "reconnect_backoff_mode": connection.reconnect_backoff_mode,
+        "reconnect_interval_sec": connection.reconnect_interval_sec,
+        "reconnect_max_interval_sec": connection.reconnect_max_interval_sec,
+    }
+
+
+def stats_section(stats: SessionStats) -> dict[str, Any]:
+    return {
+        "received_lines": stats.received_lines,
+        "dropped_lines": stats.dropped_lines,
+        "write_failures": stats.write_failures,
+        "error_lines": stats.error_lines,
+        "last_error": stats.last_error,
+        "reconnect_attempts": stats.reconnect_attempts,
+        "reconnect_events": stats.reconnect_events,
+    }
+
+
+def _count_lines(path: Path) -> int:
+    count = 0
+    with path.open("rb") as handle:
+        while block := handle.read(1024 * 1024):
+            count += block.count(b"\n")
+    return count
+
+
+# Fraction digits and nanoseconds per fraction unit.
+_RESOLUTIONS = {"ms": (3, 1_000_000), "us": (6, 1_000), "ns": (9, 1)}
+
+
+class _TimestampFormatter:
+    # strftime runs once per second; within a second only the fraction suffix changes.
+    __slots__ = (
+        "_second",
+        "_minute",
+        "_hour",
+        "_day",
+        "_month",
+        "_year",
+        "_epoch_second",
+        "_prefix",
+        "_fraction",
+        "_text",
+        "_digits",
+        "_divisor",
+    )
+
+    def __init__(self, resolution: str = "ms") -> None:
+        self._second = -1
+        self._minute = self._hour = self._day = self._month = self._year = -1
+        self._epoch_second = -1
+        self._prefix = ""
+        self._fraction = -1
+        self._text = ""
+        self._digits, self._divisor = _RESOLUTIONS.get(resolution, _RESOLUTIONS["ms"])
+
+    def format(self, ts: datetime) -> str:
+        if (
+            ts.second != self._second
+            or ts.minute != self._minute
+            or ts.hour != self._hour
+            or ts.day != self._day
+            or ts.month != self._month
+            or ts.year != self._year
+        ):
+            self._second, self._minute, self._hour = ts.second, ts.minute, ts.hour
+            self._day, self._month, self._year = ts.day, ts.month, ts.year
+            self._epoch_second = -1
+            self._prefix = ts.strftime("%Y-%m-%d %H:%M:%S.")
+            self._fraction = -1
+        fraction = ts.microsecond * 1000 // self._divisor
+        if fraction != self._fraction:
+            self._fraction = fraction
+            self._text = f"{self._prefix}{fraction:0{self._digits}d}"
+        return self._text
+
+    def format_ns(self, wall_ns: int) -> str:
+        second, nanosecond = divmod(wall_ns, 1_000_000_000)
+        if second != self._epoch_second:
+            self._epoch_second = second
+            self._second = -1
+            self._prefix = time.strftime("%Y-%m-%d %H:%M:%S.", time.localtime(second))
+            self._fraction = -1
+        fraction = nanosecond // self._divisor
+        if fraction != self._fraction:
+            self._fraction = fraction
+            self._text = f"{self._prefix}{fraction:0{self._digits}d}"
+        return self._text
+
+
+def _txt_record(ts: str, line: str, is_error: bool) -> str:
+    return line + "\n"
+
+
+def _csv_record(ts: str, line: str, is_error: bool) -> str:
+    # Same output as csv.writer with the default dialect (QUOTE_MINIMAL, CRLF terminator).
+    if '"' in line:
+        line = '"' + line.replace('"', '""') + '"'
+    elif "," in line or "\n" in line or "\r" in line:
+        line = f'"{line}"'
+    return f"{ts},{line},{is_error}\r\n"
+
+
+def _jsonl_record(ts: str, line: str, is_error: bool) -> str:
+    # Only the log text needs escaping; the rest matches json.dumps(payload) byte for byte.
+    return f'{{"timestamp": "{ts}", "log": {json.dumps(line, ensure_ascii=False)}, "is_error": {"true" if is_error else "false"}}}\n'
+
+
+DATA_FORMATTERS: dict[str, Callable[[str, str, bool], str]] = {
+    "txt": _txt_record,
+    "csv": _csv_record,
+    "jsonl": _jsonl_record,
+}
+
 
 class SessionLogWriter:
-    def __init__(self, config: SessionConfig) -> None:
+    def __init__(self, config: SessionConfig, catalog: SessionCatalog | None = None) -> None:
         self._lock = threading.Lock()
         self._config = config
+        self._catalog = catalog
         self._started_at = datetime.now()
         self.session_dir = build_preview_path(config, now=self._started_at)
         self.session_dir.mkdir(parents=True, exist_ok=True)
 
         self.segment_index = 1
-        self._raw_file: TextIO | None = None
-        self._data_file: TextIO | None = None
-        self._error_file: TextIO | None = None
-        self._csv_writer: csv.writer | None = None
+        self._raw_file: BinaryIO | None = None
+        self._data_file: BinaryIO | None = None
+        self._error_file: BinaryIO | None = None
+        self._checksums: ChecksumSidecar | None = None
+        self._timestamps = _TimestampFormatter(config.timestamp_resolution)
+        self._format_data = DATA_FORMATTERS.get(config.log_format, _txt_record)
+        self._raw_parts: list[str] = []
+        self._data_parts: list[str] = []
+        self._error_parts: list[str] = []
+        self._raw_lines = 0
+        self._batch_start = ("", 0)
+        self._first_ns: int | None = None
+        self._last_ns: int | None = None
         self._segment_files: list[dict[str, str]] = []
         self._closed = False
 
         self._open_segment_files()
 
+        self._syncer: PeriodicSyncer | None = None
+        if config.durability == "periodic":
+            self._syncer = PeriodicSyncer(self._duplicate_fds, config.fsync_interval_sec)
+            self._syncer.start()
+
     @property
     def log_format(self) -> str:
         return self._config.log_format
@@ -39,36 +224,67 @@ class SessionLogWriter:
     def _open_segment_files(self) -> None:
         tag = self._segment_tag()
         raw_path = self.session_dir / f"raw_{tag}.log"
-        error_path = self.session_dir / f"error_{tag}.log"
+        self._raw_file = raw_path.open("ab")
+        self._checksums = ChecksumSidecar(raw_path, self._raw_file.tell())
+        entry = {"segment": tag, "raw": str(raw_path)}
+        self._raw_lines = _count_lines(raw_path) if self._raw_file.tell() else 0
 
-        if self._config.log_format == "csv":
-            data_path = self.session_dir / f"data_{tag}.csv"
-        elif self._config.log_format == "jsonl":
-            data_path = self.session_dir / f"data_{tag}.jsonl"
+        if self._config.storage_layout == "raw_only":
+            # The data and error views are rebuilt from raw on export; only error line numbers are kept.
+            index_path = self.session_dir / f"error_{tag}.idx"
+            self._error_file = index_path.open("ab")
+            entry["error_index"] = str(index_path)
         else:
-            data_path = self.session_dir / f"data_{tag}.txt"
+            error_path = self.session_dir / f"error_{tag}.log"
+            if self._config.log_format == "csv":
+                data_path = self.session_dir / f"data_{tag}.csv"
+            elif self._config.log_format == "jsonl":
+                data_path = self.session_dir / f"data_{tag}.jsonl"
+            else:
+                data_path = self.session_dir / f"data_{tag}.txt"
 
-        self._raw_file = raw_path.open("a", encoding="utf-8", newline="")
-        self._error_file = error_path.open("a", encoding="utf-8", newline="")
-        self._data_file = data_path.open("a", encoding="utf-8", newline="")
-
-        self._csv_writer = None
-        if self._config.log_format == "csv":
-            self._csv_writer = csv.writer(self._data_file)
-            if data_path.stat().st_size == 0:
-                self._csv_writer.writerow(["timestamp", "log", "is_error"])
+            self._error_file = error_path.open("ab")
+            self._data_file = data_path.open("ab")
+            if self._config.log_format == "csv" and data_path.stat().st_size == 0:
+                self._data_file.write(b"timestamp,log,is_error\r\n")
                 self._data_file.flush()
+            entry["data"] = str(data_path)
+            entry["error"] = str(error_path)
 
-        self._segment_files.append(
-            {
-                "segment": tag,
-                "raw": str(raw_path),
-                "data": str(data_path),
-                "error": str(error_path),
-            }
-        )
+        entry["checksum"] = str(self._checksums.path)
+        self._segment_files.append(entry)
+
+    def _open_handles(self) -> list[BinaryIO]:
+        return [handle for handle in (self._raw_file, self._data_file, self._error_file) if handle is not None]
+
+    def _duplicate_fds(self) -> list[int]:
+        with self._lock:
+            if self._closed or self._checksums is None:
+                return []
+            self._checksums.seal()
+            return [os.dup(handle.fileno()) for handle in self._open_handles()] + [os.dup(self._checksums.fileno())]
+
+    def _sync_now(self) -> None:
+        for handle in self._open_handles():
+            sync_fd(handle.fileno())
+        if self._checksums is not None:
+            self._checksums.seal()
+            sync_fd(self._checksums.fileno())
 
     def _close_segment_files(self) -> None:
+        if self._first_ns is not None and self._segment_files:
+            # Per-segment time range, so a reader can pick segments by time without opening them.
+            self._segment_files[-1]["first_ns"] = self._first_ns
+            self._segment_files[-1]["last_ns"] = self._last_ns
+            self._first_ns = self._last_ns = None
+        if self._config.durability != "none":
+            try:
+                self._sync_now()
+            except OSError:
+                pass
+        if self._checksums is not None:
+            self._checksums.close()
+            self._checksums = None
         if self._raw_file:
             self._raw_file.close()
             self._raw_file = None
@@ -78,7 +294,6 @@ class SessionLogWriter:
         if self._error_file:
             self._error_file.close()
             self._error_file = None
-        self._csv_writer = None
 
     def rotate_segment(self) -> None:
         with self._lock:
@@ -89,35 +304,100 @@ class SessionLogWriter:
             self._open_segment_files()
 
     def write_line(self, timestamp: datetime, line: str, is_error: bool) -> bool:
+        return self.write_lines(((timestamp, line, is_error),))
+
+    def write_lines(self, records: Sequence[tuple[datetime, str, bool]]) -> bool:
+        return self._write_records(records, self._timestamps.format)
+
+    def write_lines_ns(self, records: Sequence[tuple[int, str, bool]]) -> bool:
+        # Timestamps are wall-clock nanoseconds since the epoch, as produced by SessionClock.
+        return self._write_records(records, self._timestamps.format_ns, track_range=True)
+
+    def _write_records(
+        self,
+        records: Sequence[tuple[Any, str, bool]],
+        format_timestamp: Callable[[Any], str],
+        track_range: bool = False,
+    ) -> bool:
+        if not records:
+            return True
         with self._lock:
             if self._closed:
                 return False
+            raw_parts = self._raw_parts
+            data_parts = self._data_parts
+            error_parts = self._error_parts
+            self._batch_start = (f"raw_{self._segment_tag()}.log", self._raw_lines)
             try:
-                ts = timestamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3]
                 assert self._raw_file is not None
-                assert self._data_file is not None
                 assert self._error_file is not None
+                assert self._checksums is not None
 
-                self._raw_file.write(f"{ts}\t{line}\n")
-
-                if self._config.log_format == "csv":
-                    assert self._csv_writer is not None
-                    self._csv_writer.writerow([ts, line, is_error])
-                elif self._config.log_format == "jsonl":
-                    payload = {"timestamp": ts, "log": line, "is_error": is_error}
-                    self._data_file.write(json.dumps(payload, ensure_ascii=False) + "\n")
+                if self._data_file is None:
+                    line_number = self._raw_lines
+                    for timestamp, line, is_error in records:
+                        raw_parts.append(f"{format_timestamp(timestamp)}\t{line}\n")
+                        if is_error:
+                            error_parts.append(f"{line_number}\n")
+                        line_number += 1
                 else:
-                    self._data_file.write(line + "\n")
+                    format_data = self._format_data
+                    for timestamp, line, is_error in records:
+                        ts = format_timestamp(timestamp)
+                        raw_line = f"{ts}\t{line}\n"
+                        raw_parts.append(raw_line)
+                        data_parts.append(format_data(ts, line, is_error))
+                        if is_error:
+                            error_parts.append(raw_line)
 
-                if is_error:
-                    self._error_file.write(f"{ts}\t{line}\n")
+                # One encode and one write per file for the whole batch.
+                raw = "".join(raw_parts).encode("utf-8")
+                self._raw_file.write(raw)
+                self._checksums.update(raw)
+                if self._data_file is not None:
+                    self._data_file.write("".join(data_parts).encode("utf-8"))
+                if error_parts:
+                    self._error_file.write("".join(error_parts).encode("utf-8"))
+                self._raw_lines += len(records)
+                if track_range:
+                    if self._first_ns is None:
+                        self._first_ns = records[0][0]
+                    self._last_ns = records[-1][0]
 
-                self._raw_file.flush()
-                self._data_file.flush()
-                self._error_file.flush()
+                for handle in self._open_handles():
+                    handle.flush()
+                if self._config.durability == "batch":
+                    self._sync_now()
                 return True
             except OSError:
                 return False
+            finally:
+                raw_parts.clear()
+                data_parts.clear()
+                error_parts.clear()
+
+    def segment_position(self) -> tuple[str, int]:
+        # Raw file name of the open segment and the number of lines already in it.
+        with self._lock:
+            return f"raw_{self._segment_tag()}.log", self._raw_lines
+
+    def last_batch_start(self) -> tuple[str, int]:
+        # Raw file name and line number of the first line of the latest write.
+        with self._lock:
+            return self._batch_start
+
+    def checkpoint_state(self) -> dict[str, Any]:
+        with self._lock:
+            offsets: dict[str, int] = {}
+            error_kind = "error_index" if self._data_file is None else "error"
+            for kind, handle in (("raw", self._raw_file), ("data", self._data_file), (error_kind, self._error_file)):
+                if handle is not None:
+                    offsets[kind] = handle.tell()
+            return {
+                "segment": self._segment_tag(),
+                "segments": [dict(item) for item in self._segment_files],
+                "offsets": offsets,
+            }
 
     def close(
         self,
@@ -125,11 +405,14 @@ class SessionLogWriter:
         stats: SessionStats,
         reason: str = "",
         connection: ConnectionConfig | None = None,
+        extra_sections: dict[str, Any] | None = None,
     ) -> Path:
         with self._lock:
             if self._closed:
                 return self.session_dir / "manifest.json"
 
+            syncer = self._syncer
+            self._syncer = None
             self._close_segment_files()
             finished_at = datetime.now()
             manifest = {
@@ -141,48 +424,69 @@ class SessionLogWriter:
                     "session_dir": str(self.session_dir),
                     "segment_count": self.segment_index,
                 },
-                "settings": {
-                    "product": self._config.product,
-                    "serial_number": self._config.serial_number,
-                    "comment": self._config.comment,
-                    "date": self._config.date,
-                    "save_dir": str(self._config.save_dir),
-                    "log_format": self._config.log_format,
-                    "error_keywords": list(self._config.error_keywords),
-                    "resume_policy": self._config.resume_policy,
-                    "retention_max_sessions": self._config.retention_max_sessions,
-                    "retention_max_age_days": self._config.retention_max_age_days,
-                },
-                "connection": (
-                    {
-                        "port": connection.port,
-                        "baudrate": connection.baudrate,
-                        "parity": connection.parity,
-                        "bytesize": connection.bytesize,
-                        "stopbits": connection.stopbits,
-                        "timeout": connection.timeout,
-                        "auto_reconnect": connection.auto_reconnect,
-                        "reconnect_max_retries": connection.reconnect_max_retries,
-                        "reconnect_backoff_mode": connection.reconnect_backoff_mode,
-                        "reconnect_interval_sec": connection.reconnect_interval_sec,
-                        "reconnect_max_interval_sec": connection.reconnect_max_interval_sec,
-                    }
-                    if connection is not None
-                    else {}
-                ),
-                "stats": {
-                    "received_lines": stats.received_lines,
-                    "dropped_lines": stats.dropped_lines,
-                    "write_failures": stats.write_failures,
-                    "error_lines": stats.error_lines,
-                    "last_error": stats.last_error,
-                    "reconnect_attempts": stats.reconnect_attempts,
-                    "reconnect_events": stats.reconnect_events,
-                },
+                "settings": settings_section(self._config),
+                "connection": connection_section(connection),
+                "stats": stats_section(stats),
                 "segments": self._segment_files,
             }
+            for key, value in (extra_sections or {}).items():
+                manifest.setdefault(key, value)
 
             manifest_path = self.session_dir / "manifest.json"
-            manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+            with manifest_path.open("w", encoding="utf-8") as handle:
+                handle.write(json.dumps(manifest, ensure_ascii=False, indent=2))
+                if self._config.durability != "none":
+                    handle.flush()
+                    sync_fd(handle.fileno())
+            self._closed = True
+
+        if syncer is not None:
+            syncer.stop()
+        if self._catalog is not None:
+            try:
+                self._catalog.record_session(self.session_dir, manifest)
+            except sqlite3.Error:
+                pass
+        return manifest_path
+
+
+FULL_RATE_NAME = "full_rate.log.gz"
+
+
+class FullRateArchive:
+    # Every received line, before decimation, in the raw "timestamp<TAB>line" form. Written through a fast
+    # gzip level and only flushed on close, so the last lines of a crashed session can be missing.
+    def __init__(self, session_dir: Path, timestamp_resolution: str = "ms") -> None:
+        self.path = Path(session_dir) / FULL_RATE_NAME
+        self._timestamps = _TimestampFormatter(timestamp_resolution)
+        self._lock = threading.Lock()
+        self._file: IO[bytes] | None = None
+        self._closed = False
+        self.lines = 0
+
+    def write(self, records: Sequence[tuple[int, str, bool]]) -> bool:
+        if not records:
+            return True
+        with self._lock:
+            if self._closed:
+                return False
+            format_ns = self._timestamps.format_ns
+            text = "".join(f"{format_ns(wall_ns)}\t{line}\n" for wall_ns, line, _ in records)
+            try:
+                if self._file is None:
+                    self._file = gzip.open(self.path, "ab", compresslevel=1)
+                self._file.write(text.encode("utf-8"))
+            except OSError:
+                return False
+            self.lines += len(records)
+            return True
+
+    def close(self) -> None:
+        with self._lock:
             self._closed = True
-            return manifest_path
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
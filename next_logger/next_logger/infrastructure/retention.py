@@ -1,9 +1,32 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+import json
+import os
 from pathlib import Path
 import shutil
 
+from next_logger.domain.models import RetentionPriority
+
+from .session_archive import ArchiveError, archive_session, is_archived
+from .session_catalog import SessionCatalog, measure_dir_size
+
+
+# Text logs typically shrink to a fifth or less; the estimate only decides how many sessions to compress.
+COMPRESSED_SIZE_RATIO = 0.25
+
+
+@dataclass
+class _Candidate:
+    path: Path
+    modified: float
+    size_bytes: int = 0
+    product: str = ""
+    has_errors: bool = False
+    archived: bool = False
+
 
 def _is_session_dir(path: Path) -> bool:
     if not path.is_dir():
@@ -15,43 +38,200 @@ def _remove_dir(path: Path) -> bool:
     try:
         shutil.rmtree(path)
         return True
+    except FileNotFoundError:
+        return True
     except OSError:
         return False
 
 
-def apply_retention_policy(
+def _read_manifest(path: Path) -> dict:
+    try:
+        manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return manifest if isinstance(manifest, dict) else {}
+
+
+def _scan_candidates(base_dir: Path, with_sizes: bool = False) -> list[_Candidate]:
+    candidates: list[_Candidate] = []
+    for path in base_dir.iterdir():
+        if not _is_session_dir(path):
+            continue
+        candidate = _Candidate(path=path, modified=path.stat().st_mtime)
+        if with_sizes:
+            manifest = _read_manifest(path)
+            candidate.size_bytes = measure_dir_size(path)
+            candidate.product = str(manifest.get("settings", {}).get("product", ""))
+            candidate.has_errors = int(manifest.get("stats", {}).get("error_lines", 0)) > 0
+            candidate.archived = is_archived(path)
+        candidates.append(candidate)
+    return candidates
+
+
+def _catalog_candidates(base_dir: Path, catalog: SessionCatalog) -> list[_Candidate]:
+    return [
+        _Candidate(
+            path=entry.session_dir,
+            modified=entry.ended_ts,
+            size_bytes=entry.size_bytes,
+            product=entry.product,
+            has_errors=entry.error_lines > 0,
+            archived=entry.archived,
+        )
+        for entry in catalog.list_sessions(base_dir)
+    ]
+
+
+def _same_dir(path: Path, keep_dirs: set[str]) -> bool:
+    return os.path.normcase(os.path.abspath(path)) in keep_dirs
+
+
+def _plan_quota(
+    candidates: list[_Candidate],
+    kept_bytes: int,
+    max_bytes: int,
+    priority: RetentionPriority,
+    compress_before_delete: bool,
+    actions: dict[str, tuple[Path, str]],
+) -> None:
+    alive = [c for c in candidates if actions.get(str(c.path), (None, ""))[1] != "quota"]
+    usage = kept_bytes + sum(c.size_bytes for c in alive)
+    if usage <= max_bytes:
+        return
+
+    if priority == "keep_errors":
+        alive.sort(key=lambda c: (c.has_errors, c.modified))
+    else:
+        alive.sort(key=lambda c: c.modified)
+
+    if compress_before_delete:
+        for candidate in alive:
+            if usage <= max_bytes:
+                return
+            if candidate.archived:
+                continue
+            estimated = int(candidate.size_bytes * COMPRESSED_SIZE_RATIO)
+            usage -= candidate.size_bytes - estimated
+            candidate.size_bytes = estimated
+            candidate.archived = True
+            actions[str(candidate.path)] = (candidate.path, "compress")
+
+    for candidate in alive:
+        if usage <= max_bytes:
+            return
+        usage -= candidate.size_bytes
+        actions[str(candidate.path)] = (candidate.path, "quota")
+
+
+def plan_retention(
     base_dir: Path,
     max_sessions: int,
     max_age_days: int,
     keep_dirs: set[Path] | None = None,
-) -> dict[str, int]:
-    keep_dirs = keep_dirs or set()
-    removed_age = 0
-    removed_count = 0
+    catalog: SessionCatalog | None = None,
+    max_total_bytes: int = 0,
+    max_product_bytes: int = 0,
+    priority: RetentionPriority = "oldest",
+    compress_before_delete: bool = False,
+) -> list[tuple[Path, str]]:
+    use_quota = max_total_bytes > 0 or max_product_bytes > 0
+    if max_sessions <= 0 and max_age_days <= 0 and not use_quota:
+        return []
 
+    normalized_keep = {os.path.normcase(os.path.abspath(path)) for path in keep_dirs or set()}
     try:
-        candidates = [p for p in base_dir.iterdir() if _is_session_dir(p) and p not in keep_dirs]
+        if catalog is not None:
+            scanned = _catalog_candidates(base_dir, catalog)
+        else:
+            scanned = _scan_candidates(base_dir, with_sizes=use_quota)
     except OSError:
-        return {"removed_age": 0, "removed_count": 0}
+        return []
+    kept = [c for c in scanned if _same_dir(c.path, normalized_keep)]
+    candidates = [c for c in scanned if not _same_dir(c.path, normalized_keep)]
 
-    now = datetime.now()
+    plan: list[tuple[Path, str]] = []
     if max_age_days > 0:
-        threshold = now - timedelta(days=max_age_days)
-        next_candidates: list[Path] = []
-        for path in candidates:
-            modified = datetime.fromtimestamp(path.stat().st_mtime)
-            if modified < threshold:
-                if _remove_dir(path):
-                    removed_age += 1
-            else:
-                next_candidates.append(path)
-        candidates = next_candidates
+        threshold = (datetime.now() - timedelta(days=max_age_days)).timestamp()
+        plan.extend((c.path, "age") for c in candidates if c.modified < threshold)
+        candidates = [c for c in candidates if c.modified >= threshold]
 
     if max_sessions > 0 and len(candidates) > max_sessions:
-        candidates.sort(key=lambda p: p.stat().st_mtime, reverse=True)
-        to_remove = candidates[max_sessions:]
-        for path in to_remove:
-            if _remove_dir(path):
-                removed_count += 1
+        candidates.sort(key=lambda c: c.modified, reverse=True)
+        plan.extend((c.path, "count") for c in candidates[max_sessions:])
+        candidates = candidates[:max_sessions]
+
+    if use_quota:
+        actions: dict[str, tuple[Path, str]] = {}
+        if max_product_bytes > 0:
+            products = {c.product for c in candidates} | {c.product for c in kept}
+            for product in sorted(products):
+                _plan_quota(
+                    [c for c in candidates if c.product == product],
+                    sum(c.size_bytes for c in kept if c.product == product),
+                    max_product_bytes,
+                    priority,
+                    compress_before_delete,
+                    actions,
+                )
+        if max_total_bytes > 0:
+            _plan_quota(
+                candidates,
+                sum(c.size_bytes for c in kept),
+                max_total_bytes,
+                priority,
+                compress_before_delete,
+                actions,
+            )
+        plan.extend(actions.values())
+
+    return plan
+
+
+def compress_session(
+    path: Path,
+    catalog: SessionCatalog | None = None,
+    pause: Callable[[], None] | None = None,
+) -> bool:
+    try:
+        archive_session(path, pause=pause)
+    except (OSError, ArchiveError):
+        return False
+    if catalog is not None:
+        catalog.update_size(path, measure_dir_size(path), archived=True)
+    return True
+
 
-    return {"removed_age": removed_age, "removed_count": removed_count}
+def apply_retention_policy(
+    base_dir: Path,
+    max_sessions: int,
+    max_age_days: int,
+    keep_dirs: set[Path] | None = None,
+    catalog: SessionCatalog | None = None,
+    max_total_bytes: int = 0,
+    max_product_bytes: int = 0,
+    priority: RetentionPriority = "oldest",
+    compress_before_delete: bool = False,
+) -> dict[str, int]:
+    result = {"removed_age": 0, "removed_count": 0, "removed_quota": 0, "compressed": 0}
+    plan = plan_retention(
+        base_dir,
+        max_sessions,
+        max_age_days,
+        keep_dirs,
+        catalog,
+        max_total_bytes=max_total_bytes,
+        max_product_bytes=max_product_bytes,
+        priority=priority,
+        compress_before_delete=compress_before_delete,
+    )
+    for path, reason in plan:
+        if reason == "compress":
+            if compress_session(path, catalog):
+                result["compressed"] += 1
+            continue
+        if not _remove_dir(path):
+            continue
+        if catalog is not None:
+            catalog.remove(path)
+        result[f"removed_{reason}"] += 1
+    return result
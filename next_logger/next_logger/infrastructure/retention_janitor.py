@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from dataclasses import dataclass, field
+import os
+from pathlib import Path
+import queue
+import threading
+import time
+from typing import Any
+
+from next_logger.domain.models import RetentionPriority
+
+from .retention import compress_session, plan_retention
+from .session_archive import FRAME_SIZE
+from .session_catalog import SessionCatalog, measure_dir_size
+
+
+@dataclass(frozen=True)
+class RetentionJob:
+    base_dir: Path
+    max_sessions: int
+    max_age_days: int
+    keep_dirs: frozenset[Path] = field(default_factory=frozenset)
+    max_total_bytes: int = 0
+    max_product_bytes: int = 0
+    priority: RetentionPriority = "oldest"
+    compress_before_delete: bool = False
+
+
+def _normalize(path: Path) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+class RetentionJanitor(threading.Thread):
+    def __init__(
+        self,
+        on_event: Callable[[dict[str, Any]], None],
+        protected_dirs: Callable[[], set[Path]],
+        catalog: SessionCatalog | None = None,
+        max_pending: int = 4,
+        max_bytes_per_sec: int = 64 * 1024 * 1024,
+        max_files_per_sec: int = 2000,
+    ) -> None:
+        super().__init__(daemon=True, name="retention-janitor")
+        self._on_event = on_event
+        self._protected_dirs = protected_dirs
+        self._catalog = catalog
+        self._reconciled: set[str] = set()
+        self._jobs: queue.Queue[RetentionJob] = queue.Queue(maxsize=max(1, max_pending))
+        self._stop_event = threading.Event()
+        self._max_bytes_per_sec = max(1, max_bytes_per_sec)
+        self._max_files_per_sec = max(1, max_files_per_sec)
+
+    def submit(self, job: RetentionJob) -> bool:
+        if self._stop_event.is_set():
+            return False
+        if self.ident is not None and not self.is_alive():
+            # Started once and gone: nothing would ever take the job off the queue.
+            return False
+        try:
+            self._jobs.put_nowait(job)
+        except queue.Full:
+            return False
+        if not self.is_alive():
+            try:
+                self.start()
+            except RuntimeError:
+                return self.is_alive()
+        return True
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            try:
+                job = self._jobs.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            self._run_job(job)
+
+    def _is_protected(self, path: Path, job: RetentionJob) -> bool:
+        # Re-evaluated per session: a new recording may have started since the job was queued.
+        protected = {_normalize(p) for p in self._protected_dirs()}
+        protected.update(_normalize(p) for p in job.keep_dirs)
+        return _normalize(path) in protected
+
+    def _run_job(self, job: RetentionJob) -> None:
+        result = {
+            "removed_age": 0,
+            "removed_count": 0,
+            "removed_quota": 0,
+            "compressed": 0,
+            "failed": 0,
+            "freed_bytes": 0,
+        }
+        event: dict[str, Any] = {"type": "retention_done", "base_dir": str(job.base_dir), "retention": result}
+        try:
+            self._apply_plan(job, result)
+        except Exception as exc:  # noqa: BLE001
+            # One unreadable catalog or directory must not take the janitor down for the rest of the run.
+            event["error"] = str(exc)
+        self._on_event(event)
+
+    def _apply_plan(self, job: RetentionJob, result: dict[str, int]) -> None:
+        key = _normalize(job.base_dir)
+        if self._catalog is not None and key not in self._reconciled:
+            # Once per folder and run: picks up sessions the catalog missed (older versions, another PC);
+            # after that retention trusts the catalog and never lists the folder.
+            self._catalog.reconcile(job.base_dir)
+            self._reconciled.add(key)
+        plan = plan_retention(
+            base_dir=job.base_dir,
+            max_sessions=job.max_sessions,
+            max_age_days=job.max_age_days,
+            keep_dirs=set(job.keep_dirs),
+            catalog=self._catalog,
+            max_total_bytes=job.max_total_bytes,
+            max_product_bytes=job.max_product_bytes,
+            priority=job.priority,
+            compress_before_delete=job.compress_before_delete,
+        )
+
+        for index, (path, reason) in enumerate(plan, start=1):
+            if self._stop_event.is_set():
+                break
+            if self._is_protected(path, job):
+                continue
+
+            if reason == "compress":
+                self._compress(path, result)
+            else:
+                self._remove(path, reason, result)
+            self._on_event(
+                {
+                    "type": "retention_progress",
+                    "done": index,
+                    "total": len(plan),
+                    "path": str(path),
+                }
+            )
+
+    def _compress(self, path: Path, result: dict[str, int]) -> None:
+        before = measure_dir_size(path)
+        if not compress_session(path, self._catalog, pause=self._pace_frame):
+            result["failed"] += 1
+            return
+        result["compressed"] += 1
+        result["freed_bytes"] += max(0, before - measure_dir_size(path))
+
+    def _remove(self, path: Path, reason: str, result: dict[str, int]) -> None:
+        ok, freed = self._remove_tree_paced(path)
+        result["freed_bytes"] += freed
+        if not ok:
+            result["failed"] += 1
+            return
+        result[f"removed_{reason}"] += 1
+        if self._catalog is not None:
+            self._catalog.remove(path)
+
+    def _pace_frame(self) -> None:
+        # Each archive frame reads and writes about FRAME_SIZE bytes; keep within the same disk budget as deletion.
+        self._stop_event.wait(FRAME_SIZE / self._max_bytes_per_sec)
+
+    def _remove_tree_paced(self, root: Path) -> tuple[bool, int]:
+        freed = 0
+        window_started = time.monotonic()
+        window_bytes = 0
+        window_files = 0
+        ok = True
+
+        root_text = str(root)
+        manifest_path = os.path.join(root_text, "manifest.json")
+        for dirpath, dirnames, filenames in os.walk(root_text, topdown=False):
+            for name in filenames:
+                if self._stop_event.is_set():
+                    return False, freed
+                file_path = os.path.join(dirpath, name)
+                # The manifest goes last so an interrupted purge is still recognised as a session.
+                if file_path == manifest_path:
+                    continue
+                try:
+                    size = os.lstat(file_path).st_size
+                    os.unlink(file_path)
+                except FileNotFoundError:
+                    continue
+                except OSError:
+                    ok = False
+                    continue
+                freed += size
+                window_bytes += size
+                window_files += 1
+
+                # Throttle so a large purge does not saturate the disk that live capture writes to.
+                elapsed = time.monotonic() - window_started
+                budget = max(window_bytes / self._max_bytes_per_sec, window_files / self._max_files_per_sec)
+                if budget > elapsed:
+                    self._stop_event.wait(budget - elapsed)
+                if elapsed >= 1.0:
+                    window_started = time.monotonic()
+                    window_bytes = 0
+                    window_files = 0
+
+            for name in dirnames:
+                try:
+                    os.rmdir(os.path.join(dirpath, name))
+                except FileNotFoundError:
+                    continue
+                except OSError:
+                    ok = False
+
+        if not ok:
+            return False, freed
+        try:
+            size = os.lstat(manifest_path).st_size
+            os.unlink(manifest_path)
+            freed += size
+        except FileNotFoundError:
+            pass
+        except OSError:
+            return False, freed
+        try:
+            os.rmdir(root_text)
+        except FileNotFoundError:
+            pass
+        except OSError:
+            ok = False
+        return ok, freed
@@ -0,0 +1,223 @@
+from __future__ import annotations
+
+from array import array
+from bisect import bisect_right
+from fnmatch import fnmatch
+import mmap
+from pathlib import Path
+import re
+
+from .session_archive import SessionArchive, is_archived, open_archive
+
+
+INDEX_STRIDE = 256
+_REFRESH_CHUNK_BYTES = 4 * 1024 * 1024
+
+
+def split_raw_line(data: bytes) -> tuple[str, str]:
+    text = data.decode("utf-8", errors="replace").rstrip("\r")
+    timestamp, sep, line = text.partition("\t")
+    if not sep:
+        return "", timestamp
+    return timestamp, line
+
+
+class _SegmentIndex:
+    # Sparse line index: byte offset of every INDEX_STRIDE-th line, so memory
+    # grows by 8 bytes per 256 lines instead of per line.
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.checkpoints = array("Q", [0])
+        self.line_count = 0
+        self.indexed_bytes = 0
+
+    def refresh(self) -> None:
+        try:
+            size = self.path.stat().st_size
+        except OSError:
+            return
+        if size <= self.indexed_bytes:
+            return
+
+        with self.path.open("rb") as handle, mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            pos = self.indexed_bytes
+            while pos < size:
+                chunk_end = min(size, pos + _REFRESH_CHUNK_BYTES)
+                chunk = view[pos:chunk_end]
+                lines_to_checkpoint = INDEX_STRIDE - self.line_count % INDEX_STRIDE
+                newline_count = chunk.count(b"\n")
+                if newline_count < lines_to_checkpoint:
+                    if newline_count == 0 and chunk_end == size:
+                        break
+                    last_newline = chunk.rfind(b"\n")
+                    if last_newline < 0:
+                        pos = chunk_end
+                        continue
+                    self.line_count += newline_count
+                    pos += last_newline + 1
+                    self.indexed_bytes = pos
+                    continue
+
+                cursor = 0
+                while True:
+                    found = chunk.find(b"\n", cursor)
+                    if found < 0:
+                        break
+                    cursor = found + 1
+                    self.line_count += 1
+                    if self.line_count % INDEX_STRIDE == 0:
+                        self.checkpoints.append(pos + cursor)
+                pos += cursor
+                self.indexed_bytes = pos
+
+    def read(self, start: int, count: int) -> list[bytes]:
+        if count <= 0 or start >= self.line_count or self.indexed_bytes == 0:
+            return []
+        count = min(count, self.line_count - start)
+        offset = self.checkpoints[start // INDEX_STRIDE]
+        skip = start % INDEX_STRIDE
+
+        lines: list[bytes] = []
+        with self.path.open("rb") as handle, mmap.mmap(handle.fileno(), self.indexed_bytes, access=mmap.ACCESS_READ) as view:
+            while skip:
+                offset = view.find(b"\n", offset) + 1
+                skip -= 1
+            while len(lines) < count:
+                end = view.find(b"\n", offset)
+                if end < 0:
+                    break
+                lines.append(view[offset:end])
+                offset = end + 1
+        return lines
+
+    def line_at_offset(self, view: mmap.mmap, offset: int) -> int:
+        checkpoint = bisect_right(self.checkpoints, offset) - 1
+        base = self.checkpoints[checkpoint]
+        return checkpoint * INDEX_STRIDE + view[base:offset].count(b"\n")
+
+    def find(self, pattern: re.Pattern[bytes], start: int) -> int | None:
+        if self.indexed_bytes == 0:
+            return None
+        with self.path.open("rb") as handle, mmap.mmap(handle.fileno(), self.indexed_bytes, access=mmap.ACCESS_READ) as view:
+            offset = self.checkpoints[start // INDEX_STRIDE]
+            for _ in range(start % INDEX_STRIDE):
+                offset = view.find(b"\n", offset) + 1
+            match = pattern.search(view, offset)
+            if match is None:
+                return None
+            return self.line_at_offset(view, match.start())
+
+
+class _ArchivedSegment:
+    # Same interface as _SegmentIndex, backed by the frame index of segments.nlz.
+    # Only the frames that cover the requested lines are inflated.
+    def __init__(self, archive: SessionArchive, name: str) -> None:
+        self.path = archive.path.parent / name
+        self._archive = archive
+        self._name = name
+        self.line_count = archive.line_count(name)
+        self._cached_frame = -1
+        self._cached_lines: list[bytes] = []
+
+    def refresh(self) -> None:
+        pass
+
+    def _frame_lines(self, frame_index: int) -> list[bytes]:
+        if frame_index != self._cached_frame:
+            data = self._archive.read_frame(self._name, frame_index)
+            lines = data.split(b"\n")
+            if data.endswith(b"\n") or frame_index < self._archive.frame_count(self._name) - 1:
+                # An overlong line cut at a frame boundary is shown from the frame its line number maps to.
+                lines.pop()
+            self._cached_lines = lines
+            self._cached_frame = frame_index
+        return self._cached_lines
+
+    def read(self, start: int, count: int) -> list[bytes]:
+        lines: list[bytes] = []
+        frame_count = self._archive.frame_count(self._name)
+        position = start
+        while len(lines) < count and position < self.line_count:
+            frame_index = self._archive.frame_for_line(self._name, position)
+            if frame_index >= frame_count:
+                break
+            first = self._archive.frame_first_line(self._name, frame_index)
+            chunk = self._frame_lines(frame_index)[position - first : position - first + count - len(lines)]
+            if not chunk:
+                break
+            lines.extend(chunk)
+            position += len(chunk)
+        return lines
+
+    def find(self, pattern: re.Pattern[bytes], start: int) -> int | None:
+        if start >= self.line_count:
+            return None
+        frame_index = self._archive.frame_for_line(self._name, start)
+        for index in range(frame_index, self._archive.frame_count(self._name)):
+            first = self._archive.frame_first_line(self._name, index)
+            for offset, line in enumerate(self._frame_lines(index)[max(0, start - first) :]):
+                if pattern.search(line):
+                    return max(start, first) + offset
+        return None
+
+
+class SessionScrollback:
+    def __init__(self, session_dir: Path) -> None:
+        self.session_dir = Path(session_dir)
+        self._segments: list[_SegmentIndex | _ArchivedSegment] = []
+        self._starts: list[int] = []
+        self._archived = False
+
+    def refresh(self) -> int:
+        if not self._archived and is_archived(self.session_dir):
+            # Archiving happens after the session closed, so the archived segment set is final.
+            archive = open_archive(self.session_dir)
+            if archive is not None:
+                names = sorted(name for name in archive.names() if fnmatch(name, "raw_part*.log"))
+                self._segments = [_ArchivedSegment(archive, name) for name in names]
+                self._archived = True
+
+        if not self._archived:
+            known = {segment.path for segment in self._segments}
+            for path in sorted(self.session_dir.glob("raw_part*.log")):
+                if path not in known:
+                    self._segments.append(_SegmentIndex(path))
+
+        total = 0
+        self._starts = []
+        for segment in self._segments:
+            segment.refresh()
+            self._starts.append(total)
+            total += segment.line_count
+        return total
+
+    def line_count(self) -> int:
+        return sum(segment.line_count for segment in self._segments)
+
+    def read_lines(self, start: int, count: int) -> list[tuple[str, str]]:
+        result: list[tuple[str, str]] = []
+        if start < 0 or not self._segments:
+            return result
+
+        index = bisect_right(self._starts, start) - 1
+        while index < len(self._segments) and len(result) < count:
+            segment = self._segments[index]
+            local_start = max(0, start - self._starts[index])
+            for data in segment.read(local_start, count - len(result)):
+                result.append(split_raw_line(data))
+            index += 1
+        return result
+
+    def find(self, query: str, start_line: int = 0, ignore_case: bool = True) -> int | None:
+        if not query:
+            return None
+        pattern = re.compile(re.escape(query.encode("utf-8")), re.IGNORECASE if ignore_case else 0)
+
+        for index, segment in enumerate(self._segments):
+            segment_start = self._starts[index]
+            if segment_start + segment.line_count <= start_line:
+                continue
+            found = segment.find(pattern, max(0, start_line - segment_start))
+            if found is not None:
+                return segment_start + found
+        return None
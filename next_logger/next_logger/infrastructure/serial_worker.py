@@ -8,6 +8,11 @@ import serial
 
 from next_logger.domain.models import ConnectionConfig
 
+from .clock import monotonic_ns
+
+
+MAX_PENDING_BYTES = 64 * 1024
+
 
 def compute_backoff_delay(
     base_interval_sec: float,
@@ -26,21 +31,59 @@ def compute_backoff_delay(
     return max(0.0, min(delay, max_interval_sec))
 
 
+class LineSplitter:
+    # Each line is stamped with the arrival time of its first byte, read once per chunk rather than per line.
+    def __init__(self, max_pending: int = MAX_PENDING_BYTES) -> None:
+        self._pending = b""
+        self._pending_ns = 0
+        self._max_pending = max(1, max_pending)
+
+    def feed(self, data: bytes, arrived_ns: int) -> list[tuple[int, str]]:
+        lines: list[tuple[int, str]] = []
+        if not self._pending:
+            self._pending_ns = arrived_ns
+        pieces = (self._pending + data).split(b"\n")
+        self._pending = pieces.pop()
+        for index, piece in enumerate(pieces):
+            self._append(lines, self._pending_ns if index == 0 else arrived_ns, piece)
+        if pieces:
+            self._pending_ns = arrived_ns
+        if len(self._pending) >= self._max_pending:
+            lines.extend(self.flush())
+        return lines
+
+    def flush(self) -> list[tuple[int, str]]:
+        # A read timeout ends a partial line, as readline() did.
+        lines: list[tuple[int, str]] = []
+        if self._pending:
+            self._append(lines, self._pending_ns, self._pending)
+            self._pending = b""
+        return lines
+
+    @staticmethod
+    def _append(lines: list[tuple[int, str]], arrived_ns: int, piece: bytes) -> None:
+        line = piece.decode("utf-8", errors="ignore").strip()
+        if line:
+            lines.append((arrived_ns, line))
+
+
 class SerialWorker(threading.Thread):
     def __init__(
         self,
         connection: ConnectionConfig,
         on_open: Callable[[], None],
-        on_line: Callable[[str], None],
+        on_lines: Callable[[list[tuple[int, str]]], None],
         on_error: Callable[[str], None],
         on_reconnect: Callable[[int, int, float, str], None],
+        on_idle: Callable[[], None] | None = None,
     ) -> None:
         super().__init__(daemon=True)
         self._connection = connection
         self._on_open = on_open
-        self._on_line = on_line
+        self._on_lines = on_lines
         self._on_error = on_error
         self._on_reconnect = on_reconnect
+        self._on_idle = on_idle
 
         self._stop_event = threading.Event()
         self._pause_event = threading.Event()
@@ -84,6 +127,12 @@ class SerialWorker(threading.Thread):
             return False, delay
         return True, delay
 
+    def _flush_partial(self, splitter: LineSplitter) -> None:
+        # Bytes received before a disconnect or Stop are kept as a final partial line.
+        lines = splitter.flush()
+        if lines:
+            self._on_lines(lines)
+
     def run(self) -> None:
         retries = 0
 
@@ -105,6 +154,7 @@ class SerialWorker(threading.Thread):
                 continue
 
             retries = 0
+            splitter = LineSplitter()
             with ser:
                 self._on_open()
                 while not self._stop_event.is_set():
@@ -113,17 +163,23 @@ class SerialWorker(threading.Thread):
                         continue
 
                     try:
-                        raw = ser.readline()
+                        # Blocks for the first byte, then takes whatever else is already buffered.
+                        raw = ser.read(ser.in_waiting or 1)
+                        arrived_ns = monotonic_ns()
+                        if raw and ser.in_waiting:
+                            raw += ser.read(ser.in_waiting)
                     except serial.SerialException as exc:
+                        self._flush_partial(splitter)
                         retries += 1
                         ok, _ = self._handle_retry_or_fail(retries, f"serial read error: {exc}")
                         if not ok:
                             return
                         break
 
-                    if not raw:
-                        continue
-
-                    line = raw.decode("utf-8", errors="ignore").strip()
-                    if line:
-                        self._on_line(line)
+                    lines = splitter.feed(raw, arrived_ns) if raw else splitter.flush()
+                    if lines:
+                        self._on_lines(lines)
+                    elif not raw and self._on_idle is not None:
+                        # A read timed out with nothing buffered: let the caller look at the silence.
+                        self._on_idle()
+                self._flush_partial(splitter)
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+from bisect import bisect_right
+from collections.abc import Callable, Iterator
+import json
+import os
+from pathlib import Path
+import struct
+import threading
+import zlib
+
+
+ARCHIVE_NAME = "segments.nlz"
+ARCHIVE_MAGIC = b"NLZ1"
+FRAME_SIZE = 1024 * 1024
+MAX_LINE_FRAMES = 16
+_TRAILER = struct.Struct("<Q4s")
+_SEGMENT_PATTERNS = ("raw_part*.log", "raw_part*.crc", "data_part*.*", "error_part*.log", "error_part*.idx")
+# Retention and the archiver may both target the same session; one archive is built at a time.
+_ARCHIVE_LOCK = threading.Lock()
+
+
+class ArchiveError(RuntimeError):
+    pass
+
+
+def archive_path(session_dir: Path) -> Path:
+    return session_dir / ARCHIVE_NAME
+
+
+def is_archived(session_dir: Path) -> bool:
+    return archive_path(session_dir).exists()
+
+
+def open_archive(session_dir: Path) -> SessionArchive | None:
+    path = archive_path(Path(session_dir))
+    try:
+        return SessionArchive(path)
+    except FileNotFoundError:
+        return None
+
+
+def _segment_files(session_dir: Path) -> list[Path]:
+    files: list[Path] = []
+    for pattern in _SEGMENT_PATTERNS:
+        files.extend(sorted(session_dir.glob(pattern)))
+    return files
+
+
+def has_loose_segments(session_dir: Path) -> bool:
+    return bool(_segment_files(Path(session_dir)))
+
+
+def _remove_archived_sources(session_dir: Path, archive: SessionArchive) -> int:
+    # Readers prefer a loose file over its archived copy, so a source that is still open (an mmap on Windows)
+    # can stay until a later pass; returns how many are left.
+    left = 0
+    for source in _segment_files(session_dir):
+        if source.name not in archive.names():
+            continue
+        try:
+            if source.stat().st_size != int(archive.file_info(source.name)["size"]):
+                left += 1
+                continue
+            source.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError:
+            left += 1
+    return left
+
+
+def _read_frames(handle, frame_size: int) -> Iterator[bytes]:
+    # Frames end on a newline so any frame can be decoded into whole lines on its own. A line longer than
+    # MAX_LINE_FRAMES frames is cut instead, so a file without newlines cannot be buffered whole; the cut
+    # adds no newline, so line numbers recorded per frame stay right.
+    pending = b""
+    limit = frame_size * MAX_LINE_FRAMES
+    while True:
+        chunk = handle.read(frame_size)
+        if not chunk:
+            break
+        data = pending + chunk
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            if len(data) >= limit:
+                yield data[:limit]
+                data = data[limit:]
+            pending = data
+            continue
+        yield data[: cut + 1]
+        pending = data[cut + 1 :]
+    if pending:
+        yield pending
+
+
+def archive_session(
+    session_dir: Path,
+    frame_size: int = FRAME_SIZE,
+    level: int = 6,
+    pause: Callable[[], None] | None = None,
+) -> int:
+    session_dir = Path(session_dir)
+    with _ARCHIVE_LOCK:
+        return _build_archive(session_dir, frame_size, level, pause)
+
+
+def _build_archive(
+    session_dir: Path,
+    frame_size: int,
+    level: int,
+    pause: Callable[[], None] | None,
+) -> int:
+    target = archive_path(session_dir)
+    if target.exists():
+        _remove_archived_sources(session_dir, SessionArchive(target))
+        return target.stat().st_size
+
+    # Age-based retention without a catalog orders sessions by directory mtime; keep it.
+    dir_stat = session_dir.stat()
+    sources = _segment_files(session_dir)
+    tmp_path = target.with_suffix(".tmp")
+    index: dict[str, object] = {"version": 1, "frame_size": frame_size, "files": []}
+
+    with tmp_path.open("wb") as out:
+        out.write(ARCHIVE_MAGIC)
+        for source in sources:
+            frames: list[list[int]] = []
+            uncompressed_offset = 0
+            line_number = 0
+            with source.open("rb") as handle:
+                for frame in _read_frames(handle, frame_size):
+                    payload = zlib.compress(frame, level)
+                    frames.append([out.tell(), len(payload), uncompressed_offset, len(frame), line_number])
+                    out.write(payload)
+                    uncompressed_offset += len(frame)
+                    line_number += frame.count(b"\n")
+                    if pause is not None:
+                        pause()
+            index["files"].append(
+                {"name": source.name, "size": uncompressed_offset, "lines": line_number, "frames": frames}
+            )
+
+        index_offset = out.tell()
+        out.write(json.dumps(index, ensure_ascii=False).encode("utf-8"))
+        out.write(_TRAILER.pack(index_offset, ARCHIVE_MAGIC))
+        out.flush()
+        os.fsync(out.fileno())
+
+    SessionArchive(tmp_path).verify()
+    os.replace(tmp_path, target)
+    _remove_archived_sources(session_dir, SessionArchive(target))
+    os.utime(session_dir, ns=(dir_stat.st_atime_ns, dir_stat.st_mtime_ns))
+    return target.stat().st_size
+
+
+def _inflate(payload: bytes, expected: int, label: str) -> bytes:
+    try:
+        data = zlib.decompress(payload)
+    except zlib.error as exc:
+        raise ArchiveError(f"Corrupt frame in {label}") from exc
+    if len(data) != expected:
+        raise ArchiveError(f"Corrupt frame in {label}")
+    return data
+
+
+class SessionArchive:
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            size = handle.tell()
+            if size < len(ARCHIVE_MAGIC) + _TRAILER.size:
+                raise ArchiveError(f"Archive too small: {self.path}")
+            handle.seek(size - _TRAILER.size)
+            index_offset, magic = _TRAILER.unpack(handle.read(_TRAILER.size))
+            if magic != ARCHIVE_MAGIC:
+                raise ArchiveError(f"Invalid archive trailer: {self.path}")
+            handle.seek(index_offset)
+            raw_index = handle.read(size - _TRAILER.size - index_offset)
+        try:
+            index = json.loads(raw_index.decode("utf-8"))
+        except (UnicodeDecodeError, json.JSONDecodeError) as exc:
+            raise ArchiveError(f"Invalid archive index: {self.path}") from exc
+        self._files: dict[str, dict[str, object]] = {item["name"]: item for item in index.get("files", [])}
+        self._first_lines = {
+            name: [int(frame[4]) for frame in item["frames"]] for name, item in self._files.items()
+        }
+
+    def names(self) -> list[str]:
+        return list(self._files)
+
+    def file_info(self, name: str) -> dict[str, object]:
+        return self._files[name]
+
+    def line_count(self, name: str) -> int:
+        return int(self._files[name]["lines"])
+
+    def frame_count(self, name: str) -> int:
+        return len(self._files[name]["frames"])
+
+    def frame_first_line(self, name: str, frame_index: int) -> int:
+        return int(self._files[name]["frames"][frame_index][4])
+
+    def frame_for_line(self, name: str, line: int) -> int:
+        return max(0, bisect_right(self._first_lines[name], line) - 1)
+
+    def read_frame(self, name: str, frame_index: int) -> bytes:
+        offset, length, _, expected, _ = self._files[name]["frames"][frame_index]
+        with self.path.open("rb") as handle:
+            handle.seek(offset)
+            return _inflate(handle.read(length), expected, f"{name} of {self.path}")
+
+    def iter_frames(self, name: str) -> Iterator[tuple[int, bytes]]:
+        frames = self._files[name]["frames"]
+        with self.path.open("rb") as handle:
+            for offset, length, _, expected, first_line in frames:
+                handle.seek(offset)
+                yield first_line, _inflate(handle.read(length), expected, f"{name} of {self.path}")
+
+    def read_file(self, name: str) -> bytes:
+        return b"".join(data for _, data in self.iter_frames(name))
+
+    def verify(self) -> None:
+        for name in self._files:
+            for _ in self.iter_frames(name):
+                pass
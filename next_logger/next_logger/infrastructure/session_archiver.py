@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+import os
+from pathlib import Path
+import queue
+import sys
+import threading
+import time
+from typing import Any
+
+from .retention import compress_session
+from .session_archive import archive_path, has_loose_segments, is_archived
+from .session_catalog import SessionCatalog
+from .session_search import list_session_dirs
+
+
+def _normalize(path: Path) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def _lower_thread_priority() -> None:
+    # Linux applies niceness per thread; elsewhere the duty cycle alone keeps the archiver polite.
+    if sys.platform.startswith("linux") and hasattr(os, "setpriority"):
+        try:
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except OSError:
+            pass
+
+
+class SessionArchiver(threading.Thread):
+    def __init__(
+        self,
+        on_event: Callable[[dict[str, Any]], None],
+        protected_dirs: Callable[[], set[Path]],
+        catalog: SessionCatalog | None = None,
+        duty_cycle: float = 0.25,
+        max_pending: int = 256,
+    ) -> None:
+        super().__init__(daemon=True, name="session-archiver")
+        self._on_event = on_event
+        self._protected_dirs = protected_dirs
+        self._catalog = catalog
+        self._duty_cycle = min(1.0, max(0.01, duty_cycle))
+        self._jobs: queue.Queue[Path] = queue.Queue(maxsize=max(1, max_pending))
+        self._queued: set[str] = set()
+        self._queued_lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._busy_since = time.monotonic()
+
+    def submit(self, session_dir: Path) -> bool:
+        if self._stop_event.is_set():
+            return False
+        if self.ident is not None and not self.is_alive():
+            return False
+        key = _normalize(session_dir)
+        with self._queued_lock:
+            if key in self._queued:
+                return True
+            try:
+                self._jobs.put_nowait(Path(session_dir))
+            except queue.Full:
+                return False
+            self._queued.add(key)
+        if not self.is_alive():
+            try:
+                self.start()
+            except RuntimeError:
+                return self.is_alive()
+        return True
+
+    def submit_closed(self, base_dir: Path) -> int:
+        queued = 0
+        for session_dir in list_session_dirs(Path(base_dir)):
+            if (is_archived(session_dir) and not has_loose_segments(session_dir)) or self._is_protected(session_dir):
+                continue
+            if self.submit(session_dir):
+                queued += 1
+        return queued
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+    def run(self) -> None:
+        _lower_thread_priority()
+        while not self._stop_event.is_set():
+            try:
+                session_dir = self._jobs.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            try:
+                self._archive(session_dir)
+            except Exception as exc:  # noqa: BLE001
+                # A corrupt source or a locked catalog fails this session only; the queue keeps moving.
+                self._on_event(
+                    {
+                        "type": "archive_done",
+                        "session_dir": str(session_dir),
+                        "ok": False,
+                        "size_bytes": 0,
+                        "error": str(exc),
+                    }
+                )
+            finally:
+                with self._queued_lock:
+                    self._queued.discard(_normalize(session_dir))
+
+    def _is_protected(self, session_dir: Path) -> bool:
+        return _normalize(session_dir) in {_normalize(p) for p in self._protected_dirs()}
+
+    def _archive(self, session_dir: Path) -> None:
+        # A session is only archived once it is closed: manifest written and no writer attached.
+        # An archived session with loose segments left is one whose sources were still open last time.
+        if not (session_dir / "manifest.json").exists():
+            return
+        if is_archived(session_dir) and not has_loose_segments(session_dir):
+            return
+        if self._is_protected(session_dir):
+            return
+
+        self._busy_since = time.monotonic()
+        ok = compress_session(session_dir, self._catalog, pause=self._yield)
+        size = 0
+        if ok:
+            try:
+                size = archive_path(session_dir).stat().st_size
+            except OSError:
+                pass
+        self._on_event(
+            {
+                "type": "archive_done",
+                "session_dir": str(session_dir),
+                "ok": ok,
+                "size_bytes": size,
+            }
+        )
+
+    def _yield(self) -> None:
+        # Sleep long enough that compression uses at most duty_cycle of one core over time.
+        busy = time.monotonic() - self._busy_since
+        self._stop_event.wait(busy * (1.0 - self._duty_cycle) / self._duty_cycle)
+        self._busy_since = time.monotonic()
@@ -0,0 +1,236 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass
+import json
+import os
+from pathlib import Path
+import sqlite3
+from typing import Any
+
+from .session_archive import ARCHIVE_NAME
+from .storage_paths import get_app_data_dir
+
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    session_dir TEXT PRIMARY KEY,
+    base_dir TEXT NOT NULL,
+    started_at TEXT NOT NULL DEFAULT '',
+    ended_at TEXT NOT NULL DEFAULT '',
+    ended_ts REAL NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT '',
+    product TEXT NOT NULL DEFAULT '',
+    serial_number TEXT NOT NULL DEFAULT '',
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    received_lines INTEGER NOT NULL DEFAULT 0,
+    error_lines INTEGER NOT NULL DEFAULT 0,
+    dropped_lines INTEGER NOT NULL DEFAULT 0,
+    archived INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_sessions_base_ended ON sessions (base_dir, ended_ts);
+"""
+
+_COLUMNS = (
+    "session_dir",
+    "base_dir",
+    "started_at",
+    "ended_at",
+    "ended_ts",
+    "status",
+    "product",
+    "serial_number",
+    "size_bytes",
+    "received_lines",
+    "error_lines",
+    "dropped_lines",
+    "archived",
+)
+
+
+@dataclass(frozen=True)
+class CatalogEntry:
+    session_dir: Path
+    base_dir: Path
+    started_at: str
+    ended_at: str
+    ended_ts: float
+    status: str
+    product: str
+    serial_number: str
+    size_bytes: int
+    received_lines: int
+    error_lines: int
+    dropped_lines: int
+    archived: bool = False
+
+
+def _normalize_dir(path: Path) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+
+def measure_dir_size(path: Path) -> int:
+    total = 0
+    try:
+        for entry in os.scandir(path):
+            if entry.is_file(follow_symlinks=False):
+                total += entry.stat(follow_symlinks=False).st_size
+            elif entry.is_dir(follow_symlinks=False):
+                total += measure_dir_size(Path(entry.path))
+    except OSError:
+        pass
+    return total
+
+
+class SessionCatalog:
+    def __init__(self, path: Path | None = None) -> None:
+        self.path = path or (get_app_data_dir() / "session_catalog.sqlite3")
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(self.path, timeout=5.0)
+        try:
+            conn.executescript(_SCHEMA)
+            existing = {row[1] for row in conn.execute("PRAGMA table_info(sessions)")}
+            if "archived" not in existing:
+                conn.execute("ALTER TABLE sessions ADD COLUMN archived INTEGER NOT NULL DEFAULT 0")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def record_session(self, session_dir: Path, manifest: dict[str, Any], size_bytes: int | None = None) -> None:
+        session_dir = Path(session_dir)
+        session_info = manifest.get("session", {})
+        settings = manifest.get("settings", {})
+        stats = manifest.get("stats", {})
+        try:
+            ended_ts = (session_dir / "manifest.json").stat().st_mtime
+        except OSError:
+            ended_ts = 0.0
+        if size_bytes is None:
+            size_bytes = measure_dir_size(session_dir)
+
+        row = (
+            _normalize_dir(session_dir),
+            _normalize_dir(session_dir.parent),
+            str(session_info.get("started_at", "")),
+            str(session_info.get("ended_at", "")),
+            ended_ts,
+            str(session_info.get("status", "")),
+            str(settings.get("product", "")),
+            str(settings.get("serial_number", "")),
+            int(size_bytes),
+            int(stats.get("received_lines", 0)),
+            int(stats.get("error_lines", 0)),
+            int(stats.get("dropped_lines", 0)),
+            1 if (session_dir / ARCHIVE_NAME).exists() else 0,
+        )
+        placeholders = ", ".join("?" for _ in _COLUMNS)
+        with self._connect() as conn:
+            conn.execute(f"INSERT OR REPLACE INTO sessions ({', '.join(_COLUMNS)}) VALUES ({placeholders})", row)
+
+    def record_manifest(self, manifest_path: Path) -> bool:
+        try:
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        except (OSError, json.JSONDecodeError):
+            return False
+        if not isinstance(manifest, dict):
+            manifest = {}
+        self.record_session(manifest_path.parent, manifest)
+        return True
+
+    def remove(self, session_dir: Path) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE session_dir = ?", (_normalize_dir(session_dir),))
+
+    def update_size(self, session_dir: Path, size_bytes: int, archived: bool | None = None) -> None:
+        with self._connect() as conn:
+            if archived is None:
+                conn.execute(
+                    "UPDATE sessions SET size_bytes = ? WHERE session_dir = ?",
+                    (int(size_bytes), _normalize_dir(session_dir)),
+                )
+            else:
+                conn.execute(
+                    "UPDATE sessions SET size_bytes = ?, archived = ? WHERE session_dir = ?",
+                    (int(size_bytes), 1 if archived else 0, _normalize_dir(session_dir)),
+                )
+
+    def list_sessions(
+        self,
+        base_dir: Path,
+        product: str | None = None,
+        status: str | None = None,
+        newest_first: bool = False,
+        limit: int | None = None,
+    ) -> list[CatalogEntry]:
+        query = f"SELECT {', '.join(_COLUMNS)} FROM sessions WHERE base_dir = ?"
+        params: list[Any] = [_normalize_dir(base_dir)]
+        if product is not None:
+            query += " AND product = ?"
+            params.append(product)
+        if status is not None:
+            query += " AND status = ?"
+            params.append(status)
+        query += " ORDER BY ended_ts DESC" if newest_first else " ORDER BY ended_ts ASC"
+        if limit is not None:
+            query += " LIMIT ?"
+            params.append(limit)
+
+        with self._connect() as conn:
+            rows = conn.execute(query, params).fetchall()
+        return [
+            CatalogEntry(
+                session_dir=Path(row[0]),
+                base_dir=Path(row[1]),
+                started_at=row[2],
+                ended_at=row[3],
+                ended_ts=row[4],
+                status=row[5],
+                product=row[6],
+                serial_number=row[7],
+                size_bytes=row[8],
+                received_lines=row[9],
+                error_lines=row[10],
+                dropped_lines=row[11],
+                archived=bool(row[12]),
+            )
+            for row in rows
+        ]
+
+    def reconcile(self, base_dir: Path) -> int:
+        # Adds sessions the catalog never saw (recorded before it existed, a failed insert, another PC sharing
+        # the folder) and drops rows whose directory is gone; returns how many rows changed.
+        try:
+            on_disk = {
+                _normalize_dir(p): p for p in Path(base_dir).iterdir() if (p / "manifest.json").exists()
+            }
+        except OSError:
+            return 0
+        known = {_normalize_dir(entry.session_dir) for entry in self.list_sessions(base_dir)}
+        changed = 0
+        for key in sorted(on_disk.keys() - known):
+            if self.record_manifest(on_disk[key] / "manifest.json"):
+                changed += 1
+        for key in sorted(known - on_disk.keys()):
+            self.remove(Path(key))
+            changed += 1
+        return changed
+
+    def rebuild(self, base_dir: Path) -> int:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM sessions WHERE base_dir = ?", (_normalize_dir(base_dir),))
+
+        count = 0
+        try:
+            children = sorted(p for p in Path(base_dir).iterdir() if p.is_dir())
+        except OSError:
+            return 0
+        for path in children:
+            manifest_path = path / "manifest.json"
+            if manifest_path.exists() and self.record_manifest(manifest_path):
+                count += 1
+        return count
@@ -0,0 +1,644 @@
+from __future__ import annotations
+
+from collections.abc import Callable, Iterator
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import dataclass
+from itertools import chain
+import json
+import multiprocessing
+import os
+from pathlib import Path
+import shutil
+import tempfile
+import threading
+import time
+from typing import Any, BinaryIO
+
+from .log_writer import DATA_FORMATTERS
+from .session_archive import ArchiveError, SessionArchive, open_archive
+from .session_search import list_segment_files
+
+
+EXPORT_FORMATS = ("raw", "txt", "csv", "jsonl")
+_READ_BLOCK = 1024 * 1024
+_WRITE_BATCH = 4096
+
+
+def _raw_record(ts: str, line: str, is_error: bool) -> str:
+    return f"{ts}\t{line}\n"
+
+
+_FORMATTERS: dict[str, Callable[[str, str, bool], str]] = {"raw": _raw_record, **DATA_FORMATTERS}
+
+
+def read_manifest(session_dir: Path) -> dict:
+    try:
+        return json.loads((Path(session_dir) / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def storage_layout(session_dir: Path) -> str:
+    layout = read_manifest(session_dir).get("settings", {}).get("storage_layout")
+    if layout:
+        return str(layout)
+    # Manifests written before the option existed, and sessions without a manifest yet.
+    return "raw_only" if any(Path(session_dir).glob("error_part*.idx")) else "split"
+
+
+def _iter_chunks(path: Path, archive: SessionArchive | None, offset: int = 0) -> Iterator[bytes]:
+    try:
+        handle = path.open("rb")
+    except FileNotFoundError:
+        if archive is None or path.name not in archive.names():
+            return
+        if not offset:
+            for _, frame in archive.iter_frames(path.name):
+                yield frame
+            return
+        for index, frame in enumerate(archive.file_info(path.name)["frames"]):
+            frame_start, frame_size = int(frame[2]), int(frame[3])
+            if frame_start + frame_size <= offset:
+                continue
+            yield archive.read_frame(path.name, index)[max(0, offset - frame_start) :]
+        return
+    with handle:
+        handle.seek(offset)
+        while block := handle.read(_READ_BLOCK):
+            yield block
+
+
+def _iter_lines(chunks: Iterator[bytes]) -> Iterator[bytes]:
+    pending = b""
+    for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        yield from lines
+    if pending:
+        yield pending
+
+
+def _error_numbers(path: Path, archive: SessionArchive | None) -> Iterator[int]:
+    for text in _iter_lines(_iter_chunks(path, archive)):
+        if text.strip():
+            yield int(text)
+
+
+def _segment_records(
+    raw_path: Path,
+    layout: str,
+    archive: SessionArchive | None,
+) -> Iterator[tuple[str, str, bool]]:
+    tag = raw_path.stem.removeprefix("raw_")
+    raw_lines = _iter_lines(_iter_chunks(raw_path, archive))
+    if layout == "raw_only":
+        errors = _error_numbers(raw_path.with_name(f"error_{tag}.idx"), archive)
+        next_error = next(errors, -1)
+        for number, data in enumerate(raw_lines):
+            is_error = number == next_error
+            if is_error:
+                next_error = next(errors, -1)
+            ts, _, line = data.decode("utf-8", errors="replace").partition("\t")
+            yield ts, line, is_error
+        return
+
+    # The split layout's error log holds the error lines in raw order, so one forward pass pairs them up.
+    errors = _iter_lines(_iter_chunks(raw_path.with_name(f"error_{tag}.log"), archive))
+    next_error = next(errors, None)
+    for data in raw_lines:
+        is_error = data == next_error
+        if is_error:
+            next_error = next(errors, None)
+        ts, _, line = data.decode("utf-8", errors="replace").partition("\t")
+        yield ts, line, is_error
+
+
+def iter_session_records(session_dir: Path) -> Iterator[tuple[str, str, bool]]:
+    session_dir = Path(session_dir)
+    layout = storage_layout(session_dir)
+    archive = open_archive(session_dir)
+    for _, raw_path in list_segment_files(session_dir):
+        yield from _segment_records(raw_path, layout, archive)
+
+
+def export_session(
+    session_dir: Path,
+    output: BinaryIO,
+    log_format: str | None = None,
+    errors_only: bool = False,
+) -> int:
+    if log_format is None:
+        log_format = str(read_manifest(session_dir).get("settings", {}).get("log_format", "txt"))
+    if log_format not in _FORMATTERS:
+        raise ValueError(f"Unsupported export format: {log_format}")
+    format_record = _FORMATTERS[log_format]
+
+    if log_format == "csv":
+        output.write(b"timestamp,log,is_error\r\n")
+    parts: list[str] = []
+    count = 0
+    for ts, line, is_error in iter_session_records(session_dir):
+        if errors_only and not is_error:
+            continue
+        parts.append(format_record(ts, line, is_error))
+        if len(parts) >= _WRITE_BATCH:
+            output.write("".join(parts).encode("utf-8"))
+            count += len(parts)
+            parts.clear()
+    if parts:
+        output.write("".join(parts).encode("utf-8"))
+        count += len(parts)
+    return count
+
+
+PARALLEL_EXPORT_FORMATS = (*EXPORT_FORMATS, "parquet")
+CHUNK_BYTES = 32 * 1024 * 1024
+_PARQUET_BATCH = 65536
+
+
+class ExportCancelled(RuntimeError):
+    pass
+
+
+@dataclass(frozen=True)
+class ExportUnit:
+    index: int
+    raw_name: str
+    # Byte range of the raw file, or a frame range when the segment only exists in the archive.
+    start: int
+    end: int
+    first_line: int
+    size: int
+    archived: bool = False
+
+
+@dataclass(frozen=True)
+class ExportProgress:
+    units_done: int
+    units_total: int
+    bytes_done: int
+    bytes_total: int
+    lines: int
+
+
+def _line_boundary(handle, offset: int, size: int) -> int:
+    # First offset after the newline at or past `offset`, so every unit starts on a whole line.
+    handle.seek(offset)
+    while offset < size:
+        block = handle.read(64 * 1024)
+        if not block:
+            break
+        newline = block.find(b"\n")
+        if newline >= 0:
+            return offset + newline + 1
+        offset += len(block)
+    return size
+
+
+def _count_newlines(handle, start: int, end: int) -> int:
+    handle.seek(start)
+    count = 0
+    remaining = end - start
+    while remaining > 0:
+        block = handle.read(min(_READ_BLOCK, remaining))
+        if not block:
+            break
+        count += block.count(b"\n")
+        remaining -= len(block)
+    return count
+
+
+def _plan_file(raw_path: Path, chunk_bytes: int, count_lines: bool, units: list[ExportUnit]) -> None:
+    size = raw_path.stat().st_size
+    first_line = 0
+    with raw_path.open("rb") as handle:
+        start = 0
+        while start < size:
+            end = _line_boundary(handle, min(size, start + chunk_bytes) - 1, size)
+            units.append(ExportUnit(len(units), raw_path.name, start, end, first_line, end - start))
+            if count_lines:
+                first_line += _count_newlines(handle, start, end)
+            start = end
+
+
+def _plan_archived(name: str, archive: SessionArchive, chunk_bytes: int, units: list[ExportUnit]) -> None:
+    frames = archive.file_info(name)["frames"]
+    start = 0
+    size = 0
+    for index, frame in enumerate(frames):
+        size += int(frame[3])
+        if size >= chunk_bytes or index == len(frames) - 1:
+            first_line = archive.frame_first_line(name, start)
+            units.append(ExportUnit(len(units), name, start, index + 1, first_line, size, archived=True))
+            start = index + 1
+            size = 0
+
+
+def plan_export(session_dir: Path, chunk_bytes: int = CHUNK_BYTES) -> list[ExportUnit]:
+    session_dir = Path(session_dir)
+    # Line numbers are only needed to look rows up in the raw_only error index.
+    count_lines = storage_layout(session_dir) == "raw_only"
+    archive = open_archive(session_dir)
+    units: list[ExportUnit] = []
+    for _, raw_path in list_segment_files(session_dir):
+        if raw_path.exists():
+            _plan_file(raw_path, max(1, chunk_bytes), count_lines, units)
+        elif archive is not None and raw_path.name in archive.names():
+            _plan_archived(raw_path.name, archive, max(1, chunk_bytes), units)
+    return units
+
+
+def _unit_chunks(session_dir: Path, unit: ExportUnit, archive: SessionArchive | None) -> Iterator[bytes]:
+    if unit.archived:
+        if archive is None:
+            raise ArchiveError(f"Archive missing for {unit.raw_name}")
+        for frame_index in range(unit.start, unit.end):
+            yield archive.read_frame(unit.raw_name, frame_index)
+        return
+    with (session_dir / unit.raw_name).open("rb") as handle:
+        handle.seek(unit.start)
+        remaining = unit.end - unit.start
+        while remaining > 0:
+            block = handle.read(min(_READ_BLOCK, remaining))
+            if not block:
+                break
+            remaining -= len(block)
+            yield block
+
+
+def _timestamp(line: bytes) -> bytes:
+    return line.partition(b"\t")[0]
+
+
+def _lines_before(session_dir: Path, unit: ExportUnit, archive: SessionArchive | None) -> Iterator[bytes]:
+    # Raw lines in front of the unit, nearest first.
+    if unit.archived:
+        assert archive is not None
+        for frame_index in range(unit.start - 1, -1, -1):
+            yield from reversed(archive.read_frame(unit.raw_name, frame_index).split(b"\n")[:-1])
+        return
+    with (session_dir / unit.raw_name).open("rb") as handle:
+        end = unit.start
+        carry = b""
+        while end > 0:
+            start = max(0, end - 64 * 1024)
+            handle.seek(start)
+            pieces = (handle.read(end - start) + carry).split(b"\n")
+            if end == unit.start:
+                # The unit starts right after a newline.
+                pieces.pop()
+            # The first piece may be the tail of a line that begins further back.
+            carry = pieces.pop(0) if start > 0 else b""
+            yield from reversed(pieces)
+            end = start
+
+
+def _first_at_or_after_in_file(handle, size: int, ts: bytes) -> int:
+    # Byte offset of the first line whose timestamp is not below `ts`; lo is always a line start.
+    lo, hi = 0, size
+    while lo < hi:
+        mid = (lo + hi) // 2
+        handle.seek(mid - 1)
+        handle.readline()
+        start = handle.tell()
+        if start >= hi:
+            start = lo
+            handle.seek(lo)
+        line = handle.readline()
+        if _timestamp(line) < ts:
+            lo = start + len(line)
+        else:
+            hi = start
+    return lo
+
+
+def _first_at_or_after_in_archive(archive: SessionArchive, name: str, ts: bytes) -> int:
+    # Frames start on whole lines, so a bisection over each frame's first timestamp finds the frame to scan.
+    frames = archive.file_info(name)["frames"]
+    lo, hi = 0, len(frames)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if _timestamp(archive.read_frame(name, mid)) < ts:
+            lo = mid + 1
+        else:
+            hi = mid
+    if lo == 0:
+        return 0
+    offset = int(frames[lo - 1][2])
+    for line in archive.read_frame(name, lo - 1).split(b"\n")[:-1]:
+        if _timestamp(line) >= ts:
+            break
+        offset += len(line) + 1
+    return offset
+
+
+def _error_log_start(
+    session_dir: Path,
+    unit: ExportUnit,
+    first_raw: bytes,
+    error_path: Path,
+    archive: SessionArchive | None,
+) -> int:
+    # Where this unit's share of the split error log begins. Timestamps never go backwards within a segment
+    # (SessionClock), so every error stamped before the unit's first line belongs to earlier units; lines
+    # stamped in the same tick just before the unit are paired off the way _segment_records would.
+    if unit.start == 0:
+        return 0
+    ts = _timestamp(first_raw)
+    same_tick: list[bytes] = []
+    for line in _lines_before(session_dir, unit, archive):
+        if _timestamp(line) != ts:
+            break
+        same_tick.append(line)
+    try:
+        with error_path.open("rb") as handle:
+            offset = _first_at_or_after_in_file(handle, os.fstat(handle.fileno()).st_size, ts)
+    except FileNotFoundError:
+        if archive is None or error_path.name not in archive.names():
+            return 0
+        offset = _first_at_or_after_in_archive(archive, error_path.name, ts)
+    if same_tick:
+        errors = _iter_lines(_iter_chunks(error_path, archive, offset))
+        next_error = next(errors, None)
+        for line in reversed(same_tick):
+            if next_error is None:
+                break
+            if line == next_error:
+                offset += len(line) + 1
+                next_error = next(errors, None)
+    return offset
+
+
+def _unit_records(session_dir: Path, unit: ExportUnit, layout: str) -> Iterator[tuple[str, str, bool]]:
+    archive = open_archive(session_dir) if unit.archived else None
+    tag = Path(unit.raw_name).stem.removeprefix("raw_")
+    raw_lines = _iter_lines(_unit_chunks(session_dir, unit, archive))
+    if layout == "raw_only":
+        index_archive = archive if archive is not None else open_archive(session_dir)
+        numbers = _error_numbers(session_dir / f"error_{tag}.idx", index_archive)
+        errors = (number for number in numbers if number >= unit.first_line)
+        next_error = next(errors, -1)
+        for number, data in enumerate(raw_lines, unit.first_line):
+            is_error = number == next_error
+            if is_error:
+                next_error = next(errors, -1)
+            ts, _, line = data.decode("utf-8", errors="replace").partition("\t")
+            yield ts, line, is_error
+        return
+
+    first_raw = next(raw_lines, None)
+    if first_raw is None:
+        return
+    error_archive = archive if archive is not None else open_archive(session_dir)
+    error_path = session_dir / f"error_{tag}.log"
+    offset = _error_log_start(session_dir, unit, first_raw, error_path, error_archive)
+    errors = _iter_lines(_iter_chunks(error_path, error_archive, offset))
+    next_error = next(errors, None)
+    for data in chain((first_raw,), raw_lines):
+        is_error = data == next_error
+        if is_error:
+            next_error = next(errors, None)
+        ts, _, line = data.decode("utf-8", errors="replace").partition("\t")
+        yield ts, line, is_error
+
+
+def _write_text_unit(records: Iterator[tuple[str, str, bool]], part_path: Path, log_format: str) -> int:
+    format_record = _FORMATTERS[log_format]
+    parts: list[str] = []
+    count = 0
+    with part_path.open("wb") as handle:
+        for ts, line, is_error in records:
+            parts.append(format_record(ts, line, is_error))
+            if len(parts) >= _WRITE_BATCH:
+                handle.write("".join(parts).encode("utf-8"))
+                count += len(parts)
+                parts.clear()
+        if parts:
+            handle.write("".join(parts).encode("utf-8"))
+            count += len(parts)
+    return count
+
+
+def _write_parquet_unit(records: Iterator[tuple[str, str, bool]], part_path: Path) -> int:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    schema = pa.schema([("timestamp", pa.string()), ("log", pa.string()), ("is_error", pa.bool_())])
+    columns: tuple[list[str], list[str], list[bool]] = ([], [], [])
+    count = 0
+
+    def flush() -> None:
+        arrays = [pa.array(column, type=field.type) for column, field in zip(columns, schema)]
+        writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+        for column in columns:
+            column.clear()
+
+    writer = pq.ParquetWriter(str(part_path), schema, compression="zstd")
+    try:
+        for ts, line, is_error in records:
+            columns[0].append(ts)
+            columns[1].append(line)
+            columns[2].append(is_error)
+            count += 1
+            if len(columns[0]) >= _PARQUET_BATCH:
+                flush()
+        if columns[0] or count == 0:
+            flush()
+    finally:
+        writer.close()
+    return count
+
+
+def _export_unit(
+    session_dir: str,
+    unit: ExportUnit,
+    layout: str,
+    log_format: str,
+    errors_only: bool,
+    part_path: str,
+) -> int:
+    records = _unit_records(Path(session_dir), unit, layout)
+    if errors_only:
+        records = (record for record in records if record[2])
+    if log_format == "parquet":
+        return _write_parquet_unit(records, Path(part_path))
+    return _write_text_unit(records, Path(part_path), log_format)
+
+
+def _check_parquet_available() -> None:
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as exc:
+        raise RuntimeError("Parquet export needs the optional pyarrow package (pip install pyarrow)") from exc
+
+
+def export_session_parallel(
+    session_dir: Path,
+    output: Path,
+    log_format: str | None = None,
+    errors_only: bool = False,
+    workers: int | None = None,
+    chunk_bytes: int = CHUNK_BYTES,
+    progress: Callable[[ExportProgress], None] | None = None,
+    cancel_event: threading.Event | None = None,
+) -> int:
+    session_dir = Path(session_dir)
+    output = Path(output)
+    if log_format is None:
+        log_format = str(read_manifest(session_dir).get("settings", {}).get("log_format", "txt"))
+    if log_format not in PARALLEL_EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {log_format}")
+    if log_format == "parquet":
+        _check_parquet_available()
+        # Parquet output is a dataset directory with one file per unit.
+        if output.exists():
+            raise FileExistsError(f"Export target already exists: {output}")
+
+    layout = storage_layout(session_dir)
+    units = plan_export(session_dir, chunk_bytes)
+    bytes_total = sum(unit.size for unit in units)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(units) or 1))
+    output.parent.mkdir(parents=True, exist_ok=True)
+    parts_dir = Path(tempfile.mkdtemp(prefix=f".{output.name}.", dir=output.parent))
+    suffix = ".parquet" if log_format == "parquet" else ".part"
+    part_paths = [parts_dir / f"part-{unit.index:05d}{suffix}" for unit in units]
+
+    try:
+        lines = _run_units(
+            session_dir, units, layout, log_format, errors_only, part_paths, workers, progress, cancel_event, bytes_total
+        )
+        if log_format == "parquet":
+            os.replace(parts_dir, output)
+        else:
+            _concatenate(part_paths, output, log_format)
+        return lines
+    finally:
+        shutil.rmtree(parts_dir, ignore_errors=True)
+
+
+def _run_units(
+    session_dir: Path,
+    units: list[ExportUnit],
+    layout: str,
+    log_format: str,
+    errors_only: bool,
+    part_paths: list[Path],
+    workers: int,
+    progress: Callable[[ExportProgress], None] | None,
+    cancel_event: threading.Event | None,
+    bytes_total: int,
+) -> int:
+    lines = 0
+    bytes_done = 0
+    units_done = 0
+
+    def finished(unit: ExportUnit, count: int) -> None:
+        nonlocal lines, bytes_done, units_done
+        lines += count
+        bytes_done += unit.size
+        units_done += 1
+        if progress is not None:
+            progress(ExportProgress(units_done, len(units), bytes_done, bytes_total, lines))
+        if cancel_event is not None and cancel_event.is_set():
+            raise ExportCancelled("Export cancelled")
+
+    if workers == 1:
+        for unit, part_path in zip(units, part_paths):
+            finished(unit, _export_unit(str(session_dir), unit, layout, log_format, errors_only, str(part_path)))
+        return lines
+
+    # spawn: the caller is usually a GUI process with live threads, which fork would copy half-initialised.
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        pending: dict[Future[int], ExportUnit] = {
+            pool.submit(_export_unit, str(session_dir), unit, layout, log_format, errors_only, str(part_path)): unit
+            for unit, part_path in zip(units, part_paths)
+        }
+        try:
+            while pending:
+                done, _ = wait(pending, timeout=0.5, return_when=FIRST_COMPLETED)
+                if cancel_event is not None and cancel_event.is_set():
+                    raise ExportCancelled("Export cancelled")
+                for future in done:
+                    finished(pending.pop(future), future.result())
+        except BaseException:
+            pool.shutdown(wait=True, cancel_futures=True)
+            raise
+    return lines
+
+
+def _concatenate(part_paths: list[Path], output: Path, log_format: str) -> None:
+    tmp_path = output.with_name(output.name + ".tmp")
+    with tmp_path.open("wb") as handle:
+        if log_format == "csv":
+            handle.write(b"timestamp,log,is_error\r\n")
+        for part_path in part_paths:
+            with part_path.open("rb") as part:
+                shutil.copyfileobj(part, handle, _READ_BLOCK)
+            part_path.unlink()
+    os.replace(tmp_path, output)
+
+
+class SessionExporter(threading.Thread):
+    def __init__(
+        self,
+        session_dir: Path,
+        output: Path,
+        on_event: Callable[[dict[str, Any]], None],
+        log_format: str | None = None,
+        errors_only: bool = False,
+        workers: int | None = None,
+    ) -> None:
+        super().__init__(daemon=True, name="session-exporter")
+        self.session_dir = Path(session_dir)
+        self.output = Path(output)
+        self._on_event = on_event
+        self._log_format = log_format
+        self._errors_only = errors_only
+        self._workers = workers
+        self._cancel_event = threading.Event()
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    def run(self) -> None:
+        started = time.monotonic()
+        event: dict[str, Any] = {
+            "type": "export_done",
+            "session_dir": str(self.session_dir),
+            "output": str(self.output),
+            "ok": False,
+            "cancelled": False,
+            "lines": 0,
+            "error": "",
+        }
+        try:
+            event["lines"] = export_session_parallel(
+                self.session_dir,
+                self.output,
+                self._log_format,
+                self._errors_only,
+                self._workers,
+                progress=self._report,
+                cancel_event=self._cancel_event,
+            )
+            event["ok"] = True
+        except ExportCancelled:
+            event["cancelled"] = True
+        except (OSError, ValueError, RuntimeError) as exc:
+            event["error"] = str(exc)
+        event["elapsed_sec"] = time.monotonic() - started
+        self._on_event(event)
+
+    def _report(self, progress: ExportProgress) -> None:
+        self._on_event(
+            {
+                "type": "export_progress",
+                "session_dir": str(self.session_dir),
+                "units_done": progress.units_done,
+                "units_total": progress.units_total,
+                "done": progress.bytes_done,
+                "total": progress.bytes_total,
+                "lines": progress.lines,
+            }
+        )
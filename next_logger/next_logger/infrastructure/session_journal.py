@@ -0,0 +1,255 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+import json
+import os
+from pathlib import Path
+import threading
+from typing import Any
+
+from .durability import trim_checksums
+
+
+JOURNAL_NAME = "journal.jsonl"
+_TAIL_BLOCK = 64 * 1024
+
+
+def journal_path(session_dir: Path) -> Path:
+    return session_dir / JOURNAL_NAME
+
+
+class SessionJournal(threading.Thread):
+    # Append-only: one JSON record per line. Only the first record and the
+    # checkpoints are written; the hot path never touches this file.
+    def __init__(
+        self,
+        session_dir: Path,
+        snapshot: Callable[[], dict[str, Any]],
+        interval_sec: float = 2.0,
+    ) -> None:
+        super().__init__(daemon=True, name="session-journal")
+        self.path = journal_path(Path(session_dir))
+        self._snapshot = snapshot
+        self._interval_sec = max(0.1, interval_sec)
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._file = self.path.open("a", encoding="utf-8", newline="")
+
+    def write_start(self, record: dict[str, Any]) -> None:
+        self._append({"type": "start", **record})
+
+    def checkpoint_now(self) -> None:
+        self._wake.set()
+
+    def run(self) -> None:
+        while not self._stop_event.is_set():
+            self._wake.wait(self._interval_sec)
+            self._wake.clear()
+            if self._stop_event.is_set():
+                break
+            self._checkpoint()
+
+    def close(self, remove: bool = False) -> None:
+        self._stop_event.set()
+        self._wake.set()
+        if self.is_alive() and threading.current_thread() is not self:
+            self.join(timeout=2.0)
+        if self._file.closed:
+            return
+        if not remove:
+            self._checkpoint()
+        self._file.close()
+        if remove:
+            try:
+                self.path.unlink()
+            except OSError:
+                pass
+
+    def _checkpoint(self) -> None:
+        try:
+            record = self._snapshot()
+        except Exception:  # noqa: BLE001
+            return
+        self._append({"type": "checkpoint", **record})
+
+    def _append(self, record: dict[str, Any]) -> None:
+        if self._file.closed:
+            return
+        record.setdefault("ts", datetime.now().isoformat(timespec="milliseconds"))
+        try:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        except OSError:
+            pass
+
+
+def read_journal(session_dir: Path) -> tuple[dict[str, Any] | None, dict[str, Any] | None]:
+    start: dict[str, Any] | None = None
+    checkpoint: dict[str, Any] | None = None
+    try:
+        lines = journal_path(session_dir).read_text(encoding="utf-8", errors="replace").splitlines()
+    except OSError:
+        return None, None
+    for text in lines:
+        try:
+            record = json.loads(text)
+        except json.JSONDecodeError:
+            # A crash can leave the last record half written.
+            continue
+        if not isinstance(record, dict):
+            continue
+        if record.get("type") == "start":
+            start = record
+        elif record.get("type") == "checkpoint":
+            checkpoint = record
+    return start, checkpoint
+
+
+def truncate_torn_tail(path: Path, floor: int = 0) -> int:
+    # Drop bytes after the last newline, scanning backwards from the end only as far as needed.
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return 0
+    floor = min(max(0, floor), size)
+    with path.open("r+b") as handle:
+        end = size
+        while end > floor:
+            start = max(floor, end - _TAIL_BLOCK)
+            handle.seek(start)
+            block = handle.read(end - start)
+            newline = block.rfind(b"\n")
+            if newline >= 0:
+                keep = start + newline + 1
+                break
+            end = start
+        else:
+            keep = floor
+        if keep < size:
+            handle.truncate(keep)
+    return keep
+
+
+def _count_lines(path: Path, start: int) -> int:
+    count = 0
+    try:
+        with path.open("rb") as handle:
+            handle.seek(start)
+            while True:
+                block = handle.read(1024 * 1024)
+                if not block:
+                    break
+                count += block.count(b"\n")
+    except OSError:
+        return 0
+    return count
+
+
+def _data_suffix(log_format: str) -> str:
+    return {"csv": ".csv", "jsonl": ".jsonl"}.get(log_format, ".txt")
+
+
+def recover_manifest(session_dir: Path) -> dict[str, Any] | None:
+    session_dir = Path(session_dir)
+    if (session_dir / "manifest.json").exists():
+        return None
+    start, checkpoint = read_journal(session_dir)
+    if start is None:
+        return None
+
+    settings = start.get("settings", {})
+    checkpoint = checkpoint or {}
+    stats = dict(checkpoint.get("stats", {}))
+    segments = [dict(item) for item in checkpoint.get("segments", start.get("segments", []))]
+    offsets = checkpoint.get("offsets", {})
+
+    # Segments opened after the last checkpoint are found by name; they are at most one interval old.
+    known = {Path(str(item.get("raw", ""))).name for item in segments}
+    checkpointed = {str(item.get("segment", "")) for item in segments} if checkpoint else set()
+    suffix = _data_suffix(str(settings.get("log_format", "txt")))
+    raw_only = settings.get("storage_layout") == "raw_only"
+    for raw_path in sorted(session_dir.glob("raw_part*.log")):
+        if raw_path.name in known:
+            continue
+        tag = raw_path.stem.removeprefix("raw_")
+        if raw_only:
+            segments.append(
+                {"segment": tag, "raw": str(raw_path), "error_index": str(session_dir / f"error_{tag}.idx")}
+            )
+        else:
+            segments.append(
+                {
+                    "segment": tag,
+                    "raw": str(raw_path),
+                    "data": str(session_dir / f"data_{tag}{suffix}"),
+                    "error": str(session_dir / f"error_{tag}.log"),
+                }
+            )
+
+    last_tag = str(checkpoint.get("segment", ""))
+    new_lines = 0
+    new_errors = 0
+    latest_mtime = 0.0
+    for item in segments:
+        # Only bytes written after the checkpoint are read; earlier lines are already counted in stats.
+        tag = str(item.get("segment", ""))
+        closed_before_checkpoint = tag in checkpointed and tag != last_tag
+        for kind in ("raw", "data", "error", "error_index"):
+            if not item.get(kind):
+                continue
+            path = session_dir / Path(str(item[kind])).name
+            if not path.exists():
+                continue
+            floor = int(offsets.get(kind, 0)) if tag == last_tag else 0
+            latest_mtime = max(latest_mtime, path.stat().st_mtime)
+            if closed_before_checkpoint:
+                continue
+            keep = truncate_torn_tail(path, floor)
+            if kind == "raw":
+                trim_checksums(path)
+                new_lines += _count_lines(path, min(floor, keep))
+            elif kind in ("error", "error_index"):
+                new_errors += _count_lines(path, min(floor, keep))
+        item["segment"] = tag
+
+    stats["received_lines"] = int(stats.get("received_lines", 0)) + new_lines
+    stats["error_lines"] = int(stats.get("error_lines", 0)) + new_errors
+    ended_at = datetime.fromtimestamp(latest_mtime) if latest_mtime else datetime.now()
+
+    session = dict(start.get("session", {}))
+    session.update(
+        {
+            "ended_at": ended_at.isoformat(timespec="seconds"),
+            "status": "recovered",
+            "reason": "crash_recovery",
+            "session_dir": str(session_dir),
+            "segment_count": len(segments),
+        }
+    )
+    return {
+        "session": session,
+        "settings": settings,
+        "connection": start.get("connection", {}),
+        "stats": stats,
+        "segments": segments,
+        "clock": start.get("clock", {}),
+        "recovery": {
+            "checkpoint_at": checkpoint.get("ts", ""),
+            "lines_after_checkpoint": new_lines,
+        },
+    }
+
+
+def recover_session(session_dir: Path) -> Path | None:
+    manifest = recover_manifest(session_dir)
+    if manifest is None:
+        return None
+    manifest_path = Path(session_dir) / "manifest.json"
+    manifest_path.write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    try:
+        journal_path(Path(session_dir)).unlink()
+    except OSError:
+        pass
+    return manifest_path
@@ -0,0 +1,218 @@
+from __future__ import annotations
+
+from collections.abc import Iterator
+from dataclasses import dataclass
+from fnmatch import fnmatch
+import json
+import mmap
+from pathlib import Path
+import queue
+import re
+import threading
+
+from .scrollback import split_raw_line
+from .session_archive import ArchiveError, open_archive
+
+
+@dataclass(frozen=True)
+class SearchHit:
+    session_dir: Path
+    segment: str
+    line_number: int
+    timestamp: str
+    line: str
+
+
+def _archived_names(session_dir: Path) -> set[str]:
+    try:
+        archive = open_archive(session_dir)
+    except (OSError, ArchiveError):
+        return set()
+    return set(archive.names()) if archive is not None else set()
+
+
+def list_segment_files(session_dir: Path) -> list[tuple[str, Path]]:
+    manifest_path = session_dir / "manifest.json"
+    archived = _archived_names(session_dir)
+    segments: list[tuple[str, Path]] = []
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        for item in manifest.get("segments", []):
+            # Manifests store absolute paths; resolve by name so moved sessions still work.
+            raw_path = session_dir / Path(str(item.get("raw", ""))).name
+            if raw_path.exists() or raw_path.name in archived:
+                segments.append((str(item.get("segment", raw_path.stem)), raw_path))
+    except (OSError, json.JSONDecodeError):
+        pass
+
+    if not segments:
+        names = {path.name for path in session_dir.glob("raw_part*.log")}
+        names.update(name for name in archived if fnmatch(name, "raw_part*.log"))
+        for name in sorted(names):
+            raw_path = session_dir / name
+            segments.append((raw_path.stem.removeprefix("raw_"), raw_path))
+    return segments
+
+
+def list_session_dirs(path: Path) -> list[Path]:
+    if (path / "manifest.json").exists() or any(path.glob("raw_part*.log")):
+        return [path]
+    try:
+        return sorted(p for p in path.iterdir() if p.is_dir() and (p / "manifest.json").exists())
+    except OSError:
+        return []
+
+
+def compile_search_pattern(query: str, regex: bool = False, ignore_case: bool = True) -> re.Pattern[bytes]:
+    source = query.encode("utf-8") if regex else re.escape(query.encode("utf-8"))
+    return re.compile(source, re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+
+
+# Newlines between hits are counted a slice at a time so a long gap in a mapped file is never copied whole.
+_COUNT_CHUNK = 1 << 20
+
+
+def _count_newlines(view: mmap.mmap | bytes, start: int, end: int) -> int:
+    count = 0
+    while start < end:
+        stop = min(start + _COUNT_CHUNK, end)
+        count += view[start:stop].count(b"\n")
+        start = stop
+    return count
+
+
+def _search_buffer(
+    view: mmap.mmap | bytes,
+    pattern: re.Pattern[bytes],
+    cancel_event: threading.Event | None,
+    literal: bytes | None,
+    first_line: int = 1,
+) -> Iterator[tuple[int, str, str]]:
+    line_number = first_line
+    counted_to = 0
+    pos = 0
+    size = len(view)
+    while pos < size:
+        if cancel_event is not None and cancel_event.is_set():
+            return
+        # A case-sensitive literal is cheaper with find(); the regex engine is only needed otherwise.
+        if literal is not None:
+            start = view.find(literal, pos)
+            if start < 0:
+                return
+        else:
+            match = pattern.search(view, pos)
+            if match is None:
+                return
+            start = match.start()
+
+        line_start = view.rfind(b"\n", 0, start) + 1
+        line_end = view.find(b"\n", start)
+        if line_end < 0:
+            line_end = size
+        line_number += _count_newlines(view, counted_to, line_start)
+        counted_to = line_start
+
+        timestamp, line = split_raw_line(view[line_start:line_end])
+        yield line_number, timestamp, line
+        pos = line_end + 1
+
+
+def _search_archived(
+    path: Path,
+    pattern: re.Pattern[bytes],
+    cancel_event: threading.Event | None,
+    literal: bytes | None,
+) -> Iterator[tuple[int, str, str]]:
+    try:
+        archive = open_archive(path.parent)
+        if archive is None or path.name not in archive.names():
+            return
+        # Frames end on line boundaries, so each one is searched on its own and never fully inflated together.
+        for first_line, frame in archive.iter_frames(path.name):
+            if cancel_event is not None and cancel_event.is_set():
+                return
+            yield from _search_buffer(frame, pattern, cancel_event, literal, first_line + 1)
+    except (OSError, ArchiveError):
+        return
+
+
+def search_segment(
+    path: Path,
+    pattern: re.Pattern[bytes],
+    cancel_event: threading.Event | None = None,
+    literal: bytes | None = None,
+) -> Iterator[tuple[int, str, str]]:
+    try:
+        handle = path.open("rb")
+    except FileNotFoundError:
+        yield from _search_archived(path, pattern, cancel_event, literal)
+        return
+    except OSError:
+        return
+    with handle:
+        try:
+            view = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            return
+        with view:
+            yield from _search_buffer(view, pattern, cancel_event, literal)
+
+
+class SessionSearchWorker(threading.Thread):
+    def __init__(
+        self,
+        session_dirs: list[Path],
+        query: str,
+        regex: bool = False,
+        ignore_case: bool = True,
+        max_hits: int = 10000,
+    ) -> None:
+        super().__init__(daemon=True)
+        self._session_dirs = list(session_dirs)
+        self._pattern = compile_search_pattern(query, regex=regex, ignore_case=ignore_case)
+        self._literal = query.encode("utf-8") if not regex and not ignore_case else None
+        self._max_hits = max_hits
+        self._cancel_event = threading.Event()
+        self._hits: queue.Queue[SearchHit] = queue.Queue()
+        self.hit_count = 0
+        self.scanned_segments = 0
+        self.total_segments = 0
+        self.truncated = False
+        self.finished = False
+
+    def cancel(self) -> None:
+        self._cancel_event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel_event.is_set()
+
+    def poll_hits(self, max_items: int = 500) -> list[SearchHit]:
+        hits: list[SearchHit] = []
+        while len(hits) < max_items:
+            try:
+                hits.append(self._hits.get_nowait())
+            except queue.Empty:
+                break
+        return hits
+
+    def run(self) -> None:
+        try:
+            plan = [(session_dir, list_segment_files(session_dir)) for session_dir in self._session_dirs]
+            self.total_segments = sum(len(segments) for _, segments in plan)
+            for session_dir, segments in plan:
+                for segment, path in segments:
+                    for line_number, timestamp, line in search_segment(
+                        path, self._pattern, self._cancel_event, self._literal
+                    ):
+                        self._hits.put(SearchHit(session_dir, segment, line_number, timestamp, line))
+                        self.hit_count += 1
+                        if self.hit_count >= self._max_hits:
+                            self.truncated = True
+                            return
+                    if self._cancel_event.is_set():
+                        return
+                    self.scanned_segments += 1
+        finally:
+            self.finished = True
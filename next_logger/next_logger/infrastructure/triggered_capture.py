@@ -0,0 +1,206 @@
+from __future__ import annotations
+
+from collections import deque
+from collections.abc import Callable, Sequence
+import threading
+from typing import Any
+
+from .log_writer import SessionLogWriter
+
+
+# Rough memory cost of a buffered record on top of its text: the tuple, the int and the str header.
+RECORD_OVERHEAD_BYTES = 120
+MAX_CAPTURES = 1000
+# The pre-trigger window goes to disk in slices of about this size, freeing the ring as it goes.
+PRE_WRITE_CHUNK_BYTES = 4 * 1024 * 1024
+TRIGGER_LINE_CHARS = 200
+
+Record = tuple[int, str, bool]
+
+
+class TriggeredCapture:
+    # Keeps the newest `pre_bytes` of lines in memory and writes nothing until a trigger fires. The buffered
+    # lines then go to a segment of their own (the pre-trigger window) and the lines of the next `post_ns`
+    # to the following one. A trigger inside an open post-trigger window extends it instead of starting a
+    # new capture. A manual trigger is only recorded by trigger(); the next write() fires it, so the
+    # pre-trigger window is always written from the thread that writes the lines.
+    def __init__(
+        self,
+        writer: SessionLogWriter,
+        pre_bytes: int,
+        post_ns: int,
+        on_trigger: Callable[[dict[str, Any]], None] | None = None,
+    ) -> None:
+        self._writer = writer
+        self._pre_bytes = max(0, pre_bytes)
+        self._post_ns = max(0, post_ns)
+        self._on_trigger = on_trigger
+        self._lock = threading.Lock()
+
+        self._ring: deque[Record] = deque()
+        self._ring_bytes = 0
+        self._post_until: int | None = None
+        self._current: dict[str, Any] | None = None
+        self._requested: tuple[str, int] | None = None
+        self._batch_start: tuple[str, int] | None = ("", 0)
+        self._captures: list[dict[str, Any]] = []
+        self._capture_count = 0
+        self._triggers = 0
+        self._written = 0
+        self._discarded = 0
+
+    def write(self, records: Sequence[Record], triggers: Sequence[tuple[int, str]] = ()) -> bool:
+        # `triggers` holds (index into records, reason) pairs in ascending order.
+        with self._lock:
+            fires = [(index, reason, records[index][0], records[index][1]) for index, reason in triggers]
+            requested = self._requested
+            if requested is not None:
+                self._requested = None
+                reason, wall_ns = requested
+                # Lines stamped before the request still belong to the pre-trigger window.
+                index = next((i for i, record in enumerate(records) if record[0] >= wall_ns), len(records))
+                fires.append((index, reason, wall_ns, ""))
+                fires.sort(key=lambda item: item[0])
+            self._batch_start = None
+            ok = True
+            start = 0
+            for index, reason, wall_ns, line in fires:
+                ok = self._pass(records[start:index]) and ok
+                ok = self._fire(reason, wall_ns, line) and ok
+                start = index
+            ok = self._pass(records[start:]) and ok
+            if self._batch_start is None:
+                self._batch_start = ("", 0)
+            return ok
+
+    def trigger(self, reason: str, wall_ns: int) -> None:
+        with self._lock:
+            if self._requested is None:
+                self._requested = (reason, wall_ns)
+
+    @property
+    def trigger_pending(self) -> bool:
+        return self._requested is not None
+
+    def last_batch_start(self) -> tuple[str, int]:
+        # Only a batch that went to disk in one piece has a position; a buffered or split batch reports "".
+        with self._lock:
+            return self._batch_start or ("", 0)
+
+    def summary(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": "triggered",
+                "pre_bytes": self._pre_bytes,
+                "post_sec": self._post_ns / 1_000_000_000,
+                "triggers": self._triggers,
+                "capture_count": self._capture_count,
+                "captures": [dict(item) for item in self._captures],
+                "written_lines": self._written,
+                "discarded_lines": self._discarded,
+                "buffered_lines": len(self._ring),
+            }
+
+    def _pass(self, records: Sequence[Record]) -> bool:
+        if not records:
+            return True
+        ok = True
+        until = self._post_until
+        if until is not None:
+            cut = len(records)
+            for index, (wall_ns, _, _) in enumerate(records):
+                if wall_ns > until:
+                    cut = index
+                    break
+            if cut:
+                ok = self._write(records[:cut], whole=cut == len(records))
+            if cut == len(records):
+                return ok
+            self._post_until = None
+            self._current = None
+            records = records[cut:]
+        self._buffer(records)
+        return ok
+
+    def _buffer(self, records: Sequence[Record]) -> None:
+        ring = self._ring
+        for record in records:
+            ring.append(record)
+            self._ring_bytes += len(record[1]) + RECORD_OVERHEAD_BYTES
+        while ring and self._ring_bytes > self._pre_bytes:
+            _, line, _ = ring.popleft()
+            self._ring_bytes -= len(line) + RECORD_OVERHEAD_BYTES
+            self._discarded += 1
+        self._batch_start = ("", 0)
+
+    def _fire(self, reason: str, wall_ns: int, line: str) -> bool:
+        self._triggers += 1
+        current = self._current
+        if current is not None and self._post_until is not None:
+            self._post_until = max(self._post_until, wall_ns + self._post_ns)
+            current["triggers"] += 1
+            return True
+
+        writer = self._writer
+        ok = True
+        if writer.segment_position()[1]:
+            # Every capture starts on a fresh segment, so the previous post-trigger window stays apart.
+            writer.rotate_segment()
+        pre_segment = ""
+        pre_lines = len(self._ring)
+        if self._ring:
+            pre_segment = writer.segment_position()[0]
+            ok = self._write_ring()
+            writer.rotate_segment()
+
+        self._capture_count += 1
+        self._post_until = wall_ns + self._post_ns
+        current = {
+            "id": self._capture_count,
+            "reason": reason,
+            "at_ns": wall_ns,
+            "line": line[:TRIGGER_LINE_CHARS],
+            "pre_segment": pre_segment,
+            "pre_lines": pre_lines,
+            "post_segment": writer.segment_position()[0],
+            "post_lines": 0,
+            "triggers": 1,
+        }
+        self._current = current
+        if len(self._captures) < MAX_CAPTURES:
+            self._captures.append(current)
+        if self._on_trigger is not None:
+            self._on_trigger(dict(current))
+        return ok
+
+    def _write_ring(self) -> bool:
+        ring = self._ring
+        writer = self._writer
+        ok = True
+        while ring:
+            chunk: list[Record] = []
+            chunk_bytes = 0
+            while ring and chunk_bytes < PRE_WRITE_CHUNK_BYTES:
+                record = ring.popleft()
+                chunk.append(record)
+                chunk_bytes += len(record[1]) + RECORD_OVERHEAD_BYTES
+            self._ring_bytes -= chunk_bytes
+            if writer.write_lines_ns(chunk):
+                self._written += len(chunk)
+            else:
+                ok = False
+        self._ring_bytes = 0
+        return ok
+
+    def _write(self, records: Sequence[Record], whole: bool) -> bool:
+        writer = self._writer
+        ok = writer.write_lines_ns(records)
+        if ok:
+            self._written += len(records)
+            if self._current is not None:
+                self._current["post_lines"] += len(records)
+        if whole and self._batch_start is None:
+            self._batch_start = writer.last_batch_start()
+        else:
+            self._batch_start = ("", 0)
+        return ok
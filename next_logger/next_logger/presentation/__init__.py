@@ -1,4 +1,6 @@
 from .main_window import MainWindow
+from .scrollback_dialog import ScrollbackDialog
+from .search_dialog import SessionSearchDialog
 from .setup_wizard import SetupWizardDialog
 
-__all__ = ["MainWindow", "SetupWizardDialog"]
+__all__ = ["MainWindow", "ScrollbackDialog", "SessionSearchDialog", "SetupWizardDialog"]
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+from datetime import datetime
+from typing import Any
+
+from PySide6.QtWidgets import QDialog, QLabel, QPlainTextEdit, QVBoxLayout, QWidget
+
+
+_LABELS = {"error": "ERROR", "warning": "WARN", "info": "INFO"}
+
+
+def _clock_text(wall_ns: int) -> str:
+    return datetime.fromtimestamp(wall_ns / 1_000_000_000).strftime("%H:%M:%S.%f")[:-3]
+
+
+def format_incident_lines(incident: dict[str, Any]) -> list[str]:
+    lines: list[str] = []
+    omitted = int(incident.get("omitted") or 0)
+    omitted_after = incident.get("omitted_after")
+    for index, (wall_ns, severity, line) in enumerate(incident.get("lines", [])):
+        if omitted and index == omitted_after:
+            lines.append(f"  … {omitted} 行省略")
+        lines.append(f"{_clock_text(int(wall_ns))} [{_LABELS.get(severity, 'INFO')}] {line}")
+    return lines
+
+
+class IncidentDialog(QDialog):
+    def __init__(self, incident: dict[str, Any], parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle(f"インシデント #{incident.get('id', '')}")
+        self.resize(1000, 600)
+
+        start = incident.get("start") or {}
+        end = incident.get("end") or {}
+        summary = f"エラー {incident.get('errors', 0)} 件 / {incident.get('line_count', 0)} 行"
+        if start and end:
+            summary += (
+                f"  {start.get('segment', '')} {start.get('line', 0) + 1}行目 〜 "
+                f"{end.get('segment', '')} {end.get('line', 0) + 1}行目"
+            )
+        root = QVBoxLayout(self)
+        root.addWidget(QLabel(summary))
+
+        self.text_view = QPlainTextEdit()
+        self.text_view.setReadOnly(True)
+        self.text_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.text_view.setPlainText("\n".join(format_incident_lines(incident)))
+        root.addWidget(self.text_view)
@@ -1,12 +1,10 @@
 from __future__ import annotations
 
-from collections import deque
-from datetime import datetime
 from html import escape
 import os
 from pathlib import Path
 
-from PySide6.QtCore import QDate, QTimer
+from PySide6.QtCore import QDate, Qt, QTimer
 from PySide6.QtGui import QCloseEvent
 from PySide6.QtWidgets import (
     QApplication,
@@ -18,8 +16,11 @@ from PySide6.QtWidgets import (
     QFormLayout,
     QGroupBox,
     QHBoxLayout,
+    QInputDialog,
     QLabel,
     QLineEdit,
+    QListWidget,
+    QListWidgetItem,
     QMainWindow,
     QMessageBox,
     QPlainTextEdit,
@@ -33,10 +34,30 @@ from PySide6.QtWidgets import (
 )
 
 from next_logger.application import LoggerController
+from next_logger.application.live_plot import SERIES_CAPACITY
 from next_logger.application.log_markers import DEFAULT_CUSTOM_ERROR_KEYWORDS
+from next_logger.application.prompt_builder import (
+    DEFAULT_MAX_TOKENS,
+    MIN_MAX_TOKENS,
+    PromptBuildWorker,
+    estimate_tokens,
+)
+from next_logger.application.record_buffer import (
+    DEFAULT_MAX_LINES,
+    DEFAULT_MEMORY_BUDGET_MB,
+    SEVERITY_ERROR,
+    SEVERITY_WARNING,
+    LogRecord,
+    RecordBuffer,
+)
 from next_logger.domain import AppState, ConnectionConfig, SessionConfig
 from next_logger.infrastructure import AppSettingsStore
+from .incident_dialog import IncidentDialog
+from .plot_widget import PlotWidget
+from .scrollback_dialog import ScrollbackDialog
+from .search_dialog import SessionSearchDialog
 from .setup_wizard import SetupWizardDialog
+from .template_dialog import TemplateDialog
 
 BAUDRATE_OPTIONS = [
     "1200",
@@ -58,6 +79,13 @@ LOG_MARKER_COLORS = {
     "info": "#1F2937",
 }
 
+LOG_VIEW_MAX_BLOCKS = 5000
+ANOMALY_LIST_MAX_ITEMS = 500
+INCIDENT_LIST_MAX_ITEMS = 500
+PLOT_WINDOWS = (1_000, 10_000, 100_000, SERIES_CAPACITY)
+
+SPARKLINE_BLOCKS = "▁▂▃▄▅▆▇█"
+
 PROMPT_TEMPLATE_CHOICES = [
     ("auto", "自動選択（推奨）"),
     ("analyze_error", "異常解析"),
@@ -94,6 +122,15 @@ PROMPT_TEMPLATE_LABELS = {
     "improvement": "改善提案",
 }
 
+
+def _render_sparkline(values: list[int]) -> str:
+    peak = max(values, default=0)
+    if peak <= 0:
+        return SPARKLINE_BLOCKS[0] * len(values)
+    scale = (len(SPARKLINE_BLOCKS) - 1) / peak
+    return "".join(SPARKLINE_BLOCKS[int(value * scale + 0.5)] for value in values)
+
+
 class MainWindow(QMainWindow):
     def __init__(self) -> None:
         super().__init__()
@@ -102,7 +139,21 @@ class MainWindow(QMainWindow):
 
         self.controller = LoggerController()
         self.settings_store = AppSettingsStore()
-        self._records: deque[dict[str, object]] = deque(maxlen=20000)
+        self._records = RecordBuffer(
+            max_lines=self.settings_store.get_int("log_buffer_max_lines", DEFAULT_MAX_LINES),
+            memory_budget_bytes=self.settings_store.get_int("log_buffer_memory_mb", DEFAULT_MEMORY_BUDGET_MB)
+            * 1024
+            * 1024,
+        )
+
+        self._session_dir: Path | None = None
+        self._scrollback_dialog: ScrollbackDialog | None = None
+        self._search_dialog: SessionSearchDialog | None = None
+        self._template_dialog: TemplateDialog | None = None
+        self._prompt_worker: PromptBuildWorker | None = None
+        self._prompt_head = ""
+        self._prompt_tail = ""
+        self._plot_key: tuple[int, int] | None = None
 
         self._build_ui()
         self._connect_signals()
@@ -143,6 +194,8 @@ class MainWindow(QMainWindow):
         self.fail_label = QLabel("保存失敗: 0")
         self.err_label = QLabel("エラー行: 0")
         self.rate_label = QLabel("受信レート: 0.0 lines/s")
+        self.sparkline_label = QLabel(SPARKLINE_BLOCKS[0] * 60)
+        self.sparkline_label.setToolTip("直近60秒の受信行数/秒")
 
         status.addPermanentWidget(self.state_label)
         status.addPermanentWidget(self.recv_label)
@@ -150,6 +203,7 @@ class MainWindow(QMainWindow):
         status.addPermanentWidget(self.fail_label)
         status.addPermanentWidget(self.err_label)
         status.addPermanentWidget(self.rate_label)
+        status.addPermanentWidget(self.sparkline_label)
 
     def _build_toolbar(self) -> QHBoxLayout:
         layout = QHBoxLayout()
@@ -159,12 +213,20 @@ class MainWindow(QMainWindow):
         self.resume_btn = QPushButton("再開")
         self.stop_btn = QPushButton("停止")
         self.refresh_ports_btn = QPushButton("ポート再取得")
+        self.search_sessions_btn = QPushButton("過去ログ検索")
+        self.export_session_btn = QPushButton("エクスポート")
+        self.capture_trigger_btn = QPushButton("手動トリガー")
+        self.capture_trigger_btn.setShortcut("F9")
+        self.capture_trigger_btn.setToolTip("トリガー記録モードで、保持中のログとこの後のログを保存します (F9)")
 
         layout.addWidget(self.start_btn)
         layout.addWidget(self.pause_btn)
         layout.addWidget(self.resume_btn)
         layout.addWidget(self.stop_btn)
+        layout.addWidget(self.capture_trigger_btn)
         layout.addWidget(self.refresh_ports_btn)
+        layout.addWidget(self.search_sessions_btn)
+        layout.addWidget(self.export_session_btn)
         layout.addStretch(1)
         return layout
 
@@ -231,13 +293,54 @@ class MainWindow(QMainWindow):
         self.filter_combo.addItems(["すべて", "エラーのみ", "通常のみ"])
         filter_bar.addWidget(self.search_edit)
         filter_bar.addWidget(self.filter_combo)
+        self.scrollback_btn = QPushButton("全履歴")
+        filter_bar.addWidget(self.scrollback_btn)
+        self.templates_btn = QPushButton("テンプレート")
+        filter_bar.addWidget(self.templates_btn)
         outer.addLayout(filter_bar)
 
         self.log_view = QTextEdit()
         self.log_view.setReadOnly(True)
-        self.log_view.document().setMaximumBlockCount(5000)
+        self.log_view.document().setMaximumBlockCount(LOG_VIEW_MAX_BLOCKS)
         outer.addWidget(self.log_view)
 
+        self.plot_box = QGroupBox("グラフ")
+        self.plot_box.setCheckable(True)
+        self.plot_box.setChecked(self.settings_store.get_bool("plot_enabled", True))
+        self.controller.set_plot_enabled(self.plot_box.isChecked())
+        plot_layout = QVBoxLayout(self.plot_box)
+        plot_controls = QHBoxLayout()
+        self.plot_fields_edit = QLineEdit(self.settings_store.get_str("plot_fields", ""))
+        self.plot_fields_edit.setPlaceholderText("表示する項目（カンマ区切り、空欄で検出したすべて）")
+        self.plot_window_combo = QComboBox()
+        for points in PLOT_WINDOWS:
+            self.plot_window_combo.addItem(f"直近 {points:,} 点", userData=points)
+        window_index = self.plot_window_combo.findData(self.settings_store.get_int("plot_window", SERIES_CAPACITY))
+        self.plot_window_combo.setCurrentIndex(window_index if window_index >= 0 else len(PLOT_WINDOWS) - 1)
+        plot_controls.addWidget(self.plot_fields_edit)
+        plot_controls.addWidget(self.plot_window_combo)
+        plot_layout.addLayout(plot_controls)
+        self.plot_widget = PlotWidget()
+        plot_layout.addWidget(self.plot_widget)
+        outer.addWidget(self.plot_box)
+
+        anomaly_box = QGroupBox("異常検知")
+        anomaly_layout = QVBoxLayout(anomaly_box)
+        self.anomaly_list = QListWidget()
+        self.anomaly_list.setMaximumHeight(110)
+        anomaly_layout.addWidget(self.anomaly_list)
+
+        incident_box = QGroupBox("インシデント（エラー前後の記録）")
+        incident_layout = QVBoxLayout(incident_box)
+        self.incident_list = QListWidget()
+        self.incident_list.setMaximumHeight(110)
+        incident_layout.addWidget(self.incident_list)
+
+        detection_row = QHBoxLayout()
+        detection_row.addWidget(anomaly_box)
+        detection_row.addWidget(incident_box)
+        outer.addLayout(detection_row)
+
         ai_box = QGroupBox("AIプロンプト")
         ai_layout = QVBoxLayout(ai_box)
 
@@ -248,16 +351,22 @@ class MainWindow(QMainWindow):
         self.ai_template_combo = QComboBox()
         for key, label in PROMPT_TEMPLATE_CHOICES:
             self.ai_template_combo.addItem(label, userData=key)
+        self.ai_max_tokens_spin = QSpinBox()
+        self.ai_max_tokens_spin.setRange(MIN_MAX_TOKENS, 200000)
+        self.ai_max_tokens_spin.setSingleStep(1000)
+        self.ai_max_tokens_spin.setPrefix("上限 ")
+        self.ai_max_tokens_spin.setSuffix(" トークン")
+        self.ai_max_tokens_spin.setValue(self.settings_store.get_int("ai_prompt_max_tokens", DEFAULT_MAX_TOKENS))
         self.ai_generate_btn = QPushButton("生成")
         self.ai_copy_btn = QPushButton("コピー")
         ai_selector_row.addWidget(self.ai_template_combo)
+        ai_selector_row.addWidget(self.ai_max_tokens_spin)
         ai_selector_row.addWidget(self.ai_generate_btn)
         ai_selector_row.addWidget(self.ai_copy_btn)
         ai_layout.addLayout(ai_selector_row)
 
         self.ai_prompt_view = QPlainTextEdit()
         self.ai_prompt_view.setPlaceholderText("AIへ渡すプロンプトがここに生成されます。")
-        self.ai_prompt_view.setMaximumBlockCount(2000)
         ai_layout.addWidget(self.ai_prompt_view)
 
         outer.addWidget(ai_box)
@@ -292,10 +401,73 @@ class MainWindow(QMainWindow):
         self.format_combo.addItems(["txt", "csv", "jsonl"])
 
         self.error_keywords_edit = QLineEdit(",".join(DEFAULT_CUSTOM_ERROR_KEYWORDS))
+        self.rules_file_edit = QLineEdit()
+        self.rules_file_edit.setPlaceholderText("未指定（標準の判定のみ）")
+        self.rules_file_btn = QPushButton("選択")
+        rules_file_row = QWidget()
+        rules_file_layout = QHBoxLayout(rules_file_row)
+        rules_file_layout.setContentsMargins(0, 0, 0, 0)
+        rules_file_layout.addWidget(self.rules_file_edit)
+        rules_file_layout.addWidget(self.rules_file_btn)
 
         self.resume_policy_combo = QComboBox()
         self.resume_policy_combo.addItem("同じファイルに追記", userData="append")
         self.resume_policy_combo.addItem("新しいセグメントを作成", userData="new_segment")
+        self.durability_combo = QComboBox()
+        self.durability_combo.addItem("同期しない（最速）", userData="none")
+        self.durability_combo.addItem("一定間隔で同期", userData="periodic")
+        self.durability_combo.addItem("書き込みごとに同期（最も安全）", userData="batch")
+        self.durability_combo.setCurrentIndex(1)
+        self.fsync_interval_spin = QDoubleSpinBox()
+        self.fsync_interval_spin.setRange(0.1, 60.0)
+        self.fsync_interval_spin.setSingleStep(0.5)
+        self.fsync_interval_spin.setValue(1.0)
+        self.fsync_interval_spin.setSuffix(" 秒")
+        self.anomaly_silence_spin = QSpinBox()
+        self.anomaly_silence_spin.setRange(0, 86400)
+        self.anomaly_silence_spin.setValue(30)
+        self.anomaly_silence_spin.setSuffix(" 秒")
+        self.anomaly_silence_spin.setSpecialValueText("無効")
+        self.incident_context_spin = QSpinBox()
+        self.incident_context_spin.setRange(0, 1000)
+        self.incident_context_spin.setValue(50)
+        self.incident_context_spin.setSuffix(" 行")
+        self.incident_context_spin.setSpecialValueText("無効")
+        self.capture_mode_combo = QComboBox()
+        self.capture_mode_combo.addItem("常に保存", userData="continuous")
+        self.capture_mode_combo.addItem("トリガー時のみ保存", userData="triggered")
+        self.capture_pre_mb_spin = QSpinBox()
+        self.capture_pre_mb_spin.setRange(1, 4096)
+        self.capture_pre_mb_spin.setValue(16)
+        self.capture_pre_mb_spin.setSuffix(" MB")
+        self.capture_post_sec_spin = QSpinBox()
+        self.capture_post_sec_spin.setRange(0, 86400)
+        self.capture_post_sec_spin.setValue(60)
+        self.capture_post_sec_spin.setSuffix(" 秒")
+        self.capture_on_error_check = QCheckBox("エラー行でトリガーする")
+        self.capture_on_error_check.setChecked(True)
+        self.capture_trigger_regex_edit = QLineEdit()
+        self.capture_trigger_regex_edit.setPlaceholderText("未指定（正規表現ではトリガーしない）")
+        self.decimation_mode_combo = QComboBox()
+        self.decimation_mode_combo.addItem("間引かない", userData="off")
+        self.decimation_mode_combo.addItem("通常行をN行ごとに1行保存", userData="every_n")
+        self.decimation_mode_combo.addItem("数値を時間幅ごとに集計（最小/平均/最大）", userData="bucket")
+        self.decimation_every_n_spin = QSpinBox()
+        self.decimation_every_n_spin.setRange(1, 1_000_000)
+        self.decimation_every_n_spin.setValue(10)
+        self.decimation_every_n_spin.setSuffix(" 行ごと")
+        self.decimation_bucket_spin = QSpinBox()
+        self.decimation_bucket_spin.setRange(1, 3_600_000)
+        self.decimation_bucket_spin.setValue(1000)
+        self.decimation_bucket_spin.setSuffix(" ms")
+        self.decimation_keep_full_check = QCheckBox("間引き前の全行を圧縮して保存する")
+        self.timestamp_resolution_combo = QComboBox()
+        self.timestamp_resolution_combo.addItem("ミリ秒", userData="ms")
+        self.timestamp_resolution_combo.addItem("マイクロ秒", userData="us")
+        self.timestamp_resolution_combo.addItem("ナノ秒", userData="ns")
+        self.storage_layout_combo = QComboBox()
+        self.storage_layout_combo.addItem("raw と保存形式の両方を保存", userData="split")
+        self.storage_layout_combo.addItem("raw のみ保存（保存形式はエクスポートで生成）", userData="raw_only")
         self.retention_max_sessions_spin = QSpinBox()
         self.retention_max_sessions_spin.setRange(0, 100000)
         self.retention_max_sessions_spin.setValue(0)
@@ -304,6 +476,19 @@ class MainWindow(QMainWindow):
         self.retention_max_age_days_spin.setRange(0, 3650)
         self.retention_max_age_days_spin.setValue(0)
         self.retention_max_age_days_spin.setSpecialValueText("無制限")
+        self.retention_max_total_mb_spin = QSpinBox()
+        self.retention_max_total_mb_spin.setRange(0, 10_000_000)
+        self.retention_max_total_mb_spin.setSuffix(" MB")
+        self.retention_max_total_mb_spin.setSpecialValueText("無制限")
+        self.retention_max_product_mb_spin = QSpinBox()
+        self.retention_max_product_mb_spin.setRange(0, 10_000_000)
+        self.retention_max_product_mb_spin.setSuffix(" MB")
+        self.retention_max_product_mb_spin.setSpecialValueText("無制限")
+        self.retention_priority_combo = QComboBox()
+        self.retention_priority_combo.addItem("古い順に削除", userData="oldest")
+        self.retention_priority_combo.addItem("エラーを含むセッションを残す", userData="keep_errors")
+        self.retention_compress_check = QCheckBox("削除前に圧縮する")
+        self.archive_closed_check = QCheckBox("停止後に過去セッションを圧縮アーカイブする")
 
         top_layout.addRow("製品名", self.product_edit)
         top_layout.addRow("シリアル番号", self.serial_edit)
@@ -312,9 +497,30 @@ class MainWindow(QMainWindow):
         top_layout.addRow("保存先", save_dir_row)
         top_layout.addRow("保存形式", self.format_combo)
         top_layout.addRow("エラーキーワード", self.error_keywords_edit)
+        top_layout.addRow("ルールファイル", rules_file_row)
+        top_layout.addRow("無通信検知", self.anomaly_silence_spin)
+        top_layout.addRow("エラー前後の記録", self.incident_context_spin)
+        top_layout.addRow("記録モード", self.capture_mode_combo)
+        top_layout.addRow("トリガー前の保持量", self.capture_pre_mb_spin)
+        top_layout.addRow("トリガー後の記録", self.capture_post_sec_spin)
+        top_layout.addRow("", self.capture_on_error_check)
+        top_layout.addRow("トリガー正規表現", self.capture_trigger_regex_edit)
+        top_layout.addRow("間引き", self.decimation_mode_combo)
+        top_layout.addRow("間引き間隔", self.decimation_every_n_spin)
+        top_layout.addRow("集計の時間幅", self.decimation_bucket_spin)
+        top_layout.addRow("", self.decimation_keep_full_check)
         top_layout.addRow("再開時の保存", self.resume_policy_combo)
+        top_layout.addRow("書き込み保証", self.durability_combo)
+        top_layout.addRow("同期間隔", self.fsync_interval_spin)
+        top_layout.addRow("タイムスタンプ精度", self.timestamp_resolution_combo)
+        top_layout.addRow("保存レイアウト", self.storage_layout_combo)
         top_layout.addRow("保持セッション数", self.retention_max_sessions_spin)
         top_layout.addRow("保持日数", self.retention_max_age_days_spin)
+        top_layout.addRow("容量上限（全体）", self.retention_max_total_mb_spin)
+        top_layout.addRow("容量上限（製品ごと）", self.retention_max_product_mb_spin)
+        top_layout.addRow("削除優先度", self.retention_priority_combo)
+        top_layout.addRow("", self.retention_compress_check)
+        top_layout.addRow("", self.archive_closed_check)
 
         preview_box = QGroupBox("保存先プレビュー")
         preview_layout = QVBoxLayout(preview_box)
@@ -342,11 +548,25 @@ class MainWindow(QMainWindow):
         profile_layout.addRow("一覧", self.profile_combo)
         profile_layout.addRow(profile_btn_row)
 
+        buffer_box = QGroupBox("表示バッファ")
+        buffer_layout = QFormLayout(buffer_box)
+        self.buffer_max_lines_spin = QSpinBox()
+        self.buffer_max_lines_spin.setRange(1000, 10_000_000)
+        self.buffer_max_lines_spin.setSingleStep(100_000)
+        self.buffer_max_lines_spin.setValue(self._records.max_lines)
+        self.buffer_memory_mb_spin = QSpinBox()
+        self.buffer_memory_mb_spin.setRange(16, 8192)
+        self.buffer_memory_mb_spin.setSingleStep(64)
+        self.buffer_memory_mb_spin.setValue(self._records.memory_budget // (1024 * 1024))
+        buffer_layout.addRow("最大行数", self.buffer_max_lines_spin)
+        buffer_layout.addRow("メモリ上限(MB)", self.buffer_memory_mb_spin)
+
         wrapper = QWidget()
         wrapper_layout = QVBoxLayout(wrapper)
         wrapper_layout.addWidget(top_box)
         wrapper_layout.addWidget(preview_box)
         wrapper_layout.addWidget(profile_box)
+        wrapper_layout.addWidget(buffer_box)
         wrapper_layout.addStretch(1)
 
         self._config_widgets = [
@@ -369,9 +589,31 @@ class MainWindow(QMainWindow):
             self.save_dir_btn,
             self.format_combo,
             self.error_keywords_edit,
+            self.rules_file_edit,
+            self.rules_file_btn,
+            self.anomaly_silence_spin,
+            self.incident_context_spin,
+            self.capture_mode_combo,
+            self.capture_pre_mb_spin,
+            self.capture_post_sec_spin,
+            self.capture_on_error_check,
+            self.capture_trigger_regex_edit,
+            self.decimation_mode_combo,
+            self.decimation_every_n_spin,
+            self.decimation_bucket_spin,
+            self.decimation_keep_full_check,
             self.resume_policy_combo,
+            self.durability_combo,
+            self.fsync_interval_spin,
+            self.timestamp_resolution_combo,
+            self.storage_layout_combo,
             self.retention_max_sessions_spin,
             self.retention_max_age_days_spin,
+            self.retention_max_total_mb_spin,
+            self.retention_max_product_mb_spin,
+            self.retention_priority_combo,
+            self.retention_compress_check,
+            self.archive_closed_check,
         ]
 
         return wrapper
@@ -382,10 +624,20 @@ class MainWindow(QMainWindow):
         self.resume_btn.clicked.connect(self._on_resume)
         self.stop_btn.clicked.connect(self._on_stop)
         self.refresh_ports_btn.clicked.connect(self._refresh_ports)
+        self.search_sessions_btn.clicked.connect(self._open_session_search)
+        self.export_session_btn.clicked.connect(self._export_session)
+        self.capture_trigger_btn.clicked.connect(self._trigger_capture)
         self.save_dir_btn.clicked.connect(self._browse_save_dir)
+        self.rules_file_btn.clicked.connect(self._browse_rules_file)
 
         self.search_edit.textChanged.connect(self._reload_log_view)
         self.filter_combo.currentIndexChanged.connect(self._reload_log_view)
+        self.scrollback_btn.clicked.connect(self._open_scrollback)
+        self.templates_btn.clicked.connect(self._open_templates)
+        self.incident_list.itemDoubleClicked.connect(self._open_incident)
+        self.plot_box.toggled.connect(self._apply_plot_settings)
+        self.plot_fields_edit.editingFinished.connect(self._apply_plot_settings)
+        self.plot_window_combo.currentIndexChanged.connect(self._apply_plot_settings)
 
         self.profile_save_btn.clicked.connect(self._save_profile)
         self.profile_load_btn.clicked.connect(self._load_profile)
@@ -394,6 +646,8 @@ class MainWindow(QMainWindow):
         self.ai_generate_btn.clicked.connect(self._generate_ai_prompt)
         self.ai_copy_btn.clicked.connect(self._copy_ai_prompt)
         self.ai_template_combo.currentIndexChanged.connect(self._update_ai_recommendation)
+        self.buffer_max_lines_spin.editingFinished.connect(self._apply_buffer_settings)
+        self.buffer_memory_mb_spin.editingFinished.connect(self._apply_buffer_settings)
 
         for widget in [
             self.product_edit,
@@ -458,6 +712,10 @@ class MainWindow(QMainWindow):
             event_type = event.get("type")
             if event_type == "line":
                 self._handle_line_event(event)
+            elif event_type == "anomaly":
+                self._handle_anomaly_event(event)
+            elif event_type == "incident":
+                self._handle_incident_event(event)
             elif event_type == "status":
                 self.statusBar().showMessage(str(event.get("message", "")), 5000)
             elif event_type == "error":
@@ -467,85 +725,161 @@ class MainWindow(QMainWindow):
                 self._handle_session_started(event)
             elif event_type == "session_stopped":
                 self._handle_session_stopped(event)
+            elif event_type == "retention_progress":
+                self.statusBar().showMessage(
+                    f"保持整理中: {event.get('done', 0)}/{event.get('total', 0)} {event.get('path', '')}", 3000
+                )
+            elif event_type == "retention_done":
+                self._handle_retention_done(event)
+            elif event_type == "archive_done":
+                self._handle_archive_done(event)
+            elif event_type == "export_progress":
+                total = max(1, int(event.get("total", 0)))
+                self.statusBar().showMessage(
+                    f"エクスポート中: {int(event.get('done', 0)) * 100 // total}% "
+                    f"({event.get('units_done', 0)}/{event.get('units_total', 0)}, {event.get('lines', 0)}行)",
+                    3000,
+                )
+            elif event_type == "export_done":
+                self._handle_export_done(event)
             elif event_type == "preflight_failed":
                 self.statusBar().showMessage("プリフライト失敗", 5000)
 
+        self._poll_prompt_worker()
+        self._refresh_plot()
         self._update_stats_view()
         self._update_button_states()
         self._update_ai_recommendation()
 
     def _handle_line_event(self, event: dict[str, object]) -> None:
-        severity = str(event.get("severity", "error" if bool(event.get("is_error", False)) else "info"))
-        if severity not in LOG_MARKER_COLORS:
-            severity = "info"
-        marker_terms = tuple(str(item) for item in event.get("marker_terms", []))
-        record = {
-            "timestamp": str(event.get("timestamp", "")),
-            "line": str(event.get("line", "")),
-            "is_error": bool(event.get("is_error", False)),
-            "severity": severity,
-            "marker_terms": marker_terms,
-            "write_ok": bool(event.get("write_ok", True)),
-        }
-        self._records.append(record)
-
-        if self._record_matches(record):
+        record = self._records.append_event(event)
+        if self._record_matches(record, self.filter_combo.currentIndex(), self._search_query()):
             self.log_view.append(self._format_record_html(record))
 
-    def _record_label(self, record: dict[str, object]) -> str:
-        severity = str(record.get("severity", "info"))
-        if bool(record.get("is_error", False)) or severity == "error":
+    def _apply_plot_settings(self) -> None:
+        self.settings_store.set_bool("plot_enabled", self.plot_box.isChecked())
+        self.controller.set_plot_enabled(self.plot_box.isChecked())
+        self.settings_store.set_str("plot_fields", self.plot_fields_edit.text().strip())
+        self.settings_store.set_int("plot_window", self.plot_window_combo.currentData())
+        self._plot_key = None
+        self._refresh_plot()
+
+    def _refresh_plot(self) -> None:
+        # Only the columns that fit the widget are fetched, and nothing at all while no new sample arrived.
+        width = self.plot_widget.plot_width()
+        key = (self.controller.plot_version, width)
+        if key == self._plot_key:
+            return
+        self._plot_key = key
+        names = [part.strip() for part in self.plot_fields_edit.text().split(",") if part.strip()]
+        window = self.plot_window_combo.currentData()
+        self.plot_widget.set_series(self.controller.get_plot_series(names or None, window, width))
+
+    def _handle_anomaly_event(self, event: dict[str, object]) -> None:
+        text = f"{event.get('timestamp', '')} {self._format_anomaly(event)}"
+        self.anomaly_list.addItem(text)
+        while self.anomaly_list.count() > ANOMALY_LIST_MAX_ITEMS:
+            self.anomaly_list.takeItem(0)
+        self.anomaly_list.scrollToBottom()
+        if event.get("kind") != "new_template":
+            self.statusBar().showMessage(text, 10000)
+
+    def _handle_incident_event(self, event: dict[str, object]) -> None:
+        item = QListWidgetItem(
+            f"{event.get('timestamp', '')} #{event.get('id', '')} エラー {event.get('errors', 0)} 件 / "
+            f"{event.get('line_count', 0)} 行: {event.get('line', '')}"
+        )
+        item.setData(Qt.ItemDataRole.UserRole, (str(event.get("session_dir", "")), int(event.get("id", 0))))
+        self.incident_list.addItem(item)
+        while self.incident_list.count() > INCIDENT_LIST_MAX_ITEMS:
+            self.incident_list.takeItem(0)
+        self.incident_list.scrollToBottom()
+
+    def _open_incident(self, item: QListWidgetItem) -> None:
+        session_dir, incident_id = item.data(Qt.ItemDataRole.UserRole)
+        incident = self.controller.get_incident(Path(session_dir), incident_id)
+        if incident is None:
+            QMessageBox.information(self, "インシデント", "インシデントの記録を読み込めませんでした。")
+            return
+        IncidentDialog(incident, parent=self).show()
+
+    def _format_anomaly(self, event: dict[str, object]) -> str:
+        kind = event.get("kind")
+        value = float(event.get("value", 0.0) or 0.0)
+        if kind == "silence":
+            return f"[無通信] {value:.0f} 秒間受信がありません"
+        if kind == "silence_end":
+            return f"[受信再開] 無通信 {value:.0f} 秒"
+        if kind == "error_rate":
+            baseline = float(event.get("baseline", 0.0) or 0.0)
+            return f"[エラー急増] {value:.0f} 件/秒（平常 {baseline:.2f} 件/秒）"
+        if kind == "new_template":
+            return f"[未知の行] {event.get('sample', '')}"
+        return f"[{kind}]"
+
+    def _record_label(self, record: LogRecord) -> str:
+        if record.is_error:
             return "ERROR"
-        if severity == "warning":
+        if record.severity == SEVERITY_WARNING:
             return "WARN"
         return "INFO"
 
-    def _format_record(self, record: dict[str, object]) -> str:
+    def _format_record(self, record: LogRecord) -> str:
         label = f"[{self._record_label(record)}]"
-        suffix = " [WRITE-FAILED]" if not bool(record["write_ok"]) else ""
-        return f"{record['timestamp']} {label} {record['line']}{suffix}"
+        suffix = " [WRITE-FAILED]" if not record.write_ok else ""
+        return f"{record.timestamp} {label} {record.line}{suffix}"
 
-    def _format_record_html(self, record: dict[str, object]) -> str:
+    def _format_record_html(self, record: LogRecord) -> str:
         text = escape(self._format_record(record))
-        severity = str(record.get("severity", "info"))
-        color = LOG_MARKER_COLORS.get(severity, LOG_MARKER_COLORS["info"])
-        marker_terms = tuple(str(item) for item in record.get("marker_terms", ()))
+        color = LOG_MARKER_COLORS.get(record.severity_name, LOG_MARKER_COLORS["info"])
+        marker_terms = self._records.terms(record)
         marker_hint = ""
         if marker_terms:
             marker_hint = f" <span style='color:#6B7280;'>({escape(','.join(marker_terms[:3]))})</span>"
         return f"<span style='color:{color};'>{text}</span>{marker_hint}"
 
-    def _record_matches(self, record: dict[str, object]) -> bool:
-        mode = self.filter_combo.currentIndex()
-        severity = str(record.get("severity", "error" if bool(record.get("is_error", False)) else "info"))
+    def _search_query(self) -> str:
+        return self.search_edit.text().strip().lower()
 
-        if mode == 1 and severity != "error":
+    def _record_matches(self, record: LogRecord, mode: int, query: str) -> bool:
+        if mode == 1 and record.severity != SEVERITY_ERROR:
             return False
-        if mode == 2 and severity == "error":
+        if mode == 2 and record.severity == SEVERITY_ERROR:
             return False
 
-        query = self.search_edit.text().strip().lower()
-        if query and query not in str(record["line"]).lower():
+        if query and query not in record.line.lower():
             return False
         return True
 
     def _reload_log_view(self) -> None:
+        mode = self.filter_combo.currentIndex()
+        query = self._search_query()
+        # Walk newest-first and stop once the view is full instead of scanning the whole buffer.
+        matched = []
+        for record in reversed(self._records):
+            if self._record_matches(record, mode, query):
+                matched.append(record)
+                if len(matched) >= LOG_VIEW_MAX_BLOCKS:
+                    break
+
         self.log_view.clear()
-        for record in self._records:
-            if self._record_matches(record):
-                self.log_view.append(self._format_record_html(record))
+        for record in reversed(matched):
+            self.log_view.append(self._format_record_html(record))
         self._update_ai_recommendation()
 
+    def _apply_buffer_settings(self) -> None:
+        max_lines = self.buffer_max_lines_spin.value()
+        memory_mb = self.buffer_memory_mb_spin.value()
+        self.settings_store.set_int("log_buffer_max_lines", max_lines)
+        self.settings_store.set_int("log_buffer_memory_mb", memory_mb)
+        self._records.configure(max_lines, memory_mb * 1024 * 1024)
+        self.statusBar().showMessage(
+            f"表示バッファ: {len(self._records)}行 / {self._records.memory_used / (1024 * 1024):.1f}MB 使用中",
+            4000,
+        )
+
     def _count_marker_levels(self) -> tuple[int, int]:
-        error_count = 0
-        warning_count = 0
-        for record in self._records:
-            severity = str(record.get("severity", "error" if bool(record.get("is_error", False)) else "info"))
-            if severity == "error":
-                error_count += 1
-            elif severity == "warning":
-                warning_count += 1
-        return error_count, warning_count
+        return self._records.severity_count(SEVERITY_ERROR), self._records.severity_count(SEVERITY_WARNING)
 
     def _recommended_prompt_key(self) -> str:
         error_count, warning_count = self._count_marker_levels()
@@ -572,11 +906,16 @@ class MainWindow(QMainWindow):
             return self._recommended_prompt_key()
         return selected_key
 
-    def _collect_prompt_logs(self, max_lines: int = 300) -> str:
-        records = list(self._records)[-max_lines:]
-        if not records:
-            return "(ログがありません)"
-        return "\n".join(self._format_record(record) for record in records)
+    def _collect_prompt_templates(self, limit: int = 15) -> str:
+        lines = [f"{item.count:>7} 行  {item.template}" for item in self.controller.get_log_templates(limit)]
+        error_lines = [
+            f"{item.errors:>7} 件  {item.template}"
+            for item in self.controller.get_log_templates(limit, key="errors")
+            if item.errors
+        ]
+        if error_lines:
+            lines += ["", "エラーを含む型:", *error_lines]
+        return "\n".join(lines)
 
     def _generate_ai_prompt(self) -> None:
         resolved_key = self._resolve_prompt_key()
@@ -585,9 +924,44 @@ class MainWindow(QMainWindow):
             QMessageBox.warning(self, "設定エラー", "プロンプトテンプレートが見つかりません。")
             return
 
-        prompt = f"{template}\n\n[ログ本文]\n{self._collect_prompt_logs()}"
+        max_tokens = self.ai_max_tokens_spin.value()
+        self.settings_store.set_int("ai_prompt_max_tokens", max_tokens)
+        self._prompt_head = f"{template}\n\n[ログ本文]\n"
+        self._prompt_tail = ""
+        anomalies = [self.anomaly_list.item(index).text() for index in range(self.anomaly_list.count())]
+        if anomalies:
+            self._prompt_tail += "\n\n[検知した異常]\n" + "\n".join(anomalies[-30:])
+        templates = self._collect_prompt_templates()
+        if templates:
+            self._prompt_tail += "\n\n[ログの型の概要]\n" + templates
+
+        # The log body gets whatever the template and the appendices leave of the budget.
+        budget = max(MIN_MAX_TOKENS, max_tokens - estimate_tokens(self._prompt_head + self._prompt_tail))
+        session_dir = self._session_dir if self._session_dir is not None and self._session_dir.exists() else None
+        records = None
+        if session_dir is None:
+            records = [(record.timestamp, record.line, record.severity_name) for record in self._records]
+        self._prompt_worker = self.controller.build_prompt_logs(budget, session_dir, records)
+        self.statusBar().showMessage("AIプロンプトを作成中...", 4000)
+
+    def _poll_prompt_worker(self) -> None:
+        worker = self._prompt_worker
+        if worker is None:
+            return
+        if not worker.finished:
+            self.statusBar().showMessage(f"AIプロンプトを作成中: {worker.lines_read}行を確認", 2000)
+            return
+        self._prompt_worker = None
+        if worker.cancelled:
+            return
+        if worker.error:
+            self.statusBar().showMessage(f"AIプロンプトを作成できませんでした: {worker.error}", 10000)
+            return
+        prompt = self._prompt_head + worker.text + self._prompt_tail
         self.ai_prompt_view.setPlainText(prompt)
-        self.statusBar().showMessage("AIプロンプトを生成しました。", 4000)
+        self.statusBar().showMessage(
+            f"AIプロンプトを生成しました（{worker.lines_read}行から抜粋、約{estimate_tokens(prompt)}トークン）。", 6000
+        )
 
     def _copy_ai_prompt(self) -> None:
         text = self.ai_prompt_view.toPlainText().strip()
@@ -658,6 +1032,27 @@ class MainWindow(QMainWindow):
             resume_policy=resume_policy,
             retention_max_sessions=self.retention_max_sessions_spin.value(),
             retention_max_age_days=self.retention_max_age_days_spin.value(),
+            retention_max_total_mb=self.retention_max_total_mb_spin.value(),
+            retention_max_product_mb=self.retention_max_product_mb_spin.value(),
+            retention_priority=self.retention_priority_combo.currentData(),
+            retention_compress_before_delete=self.retention_compress_check.isChecked(),
+            archive_closed_sessions=self.archive_closed_check.isChecked(),
+            durability=self.durability_combo.currentData(),
+            fsync_interval_sec=self.fsync_interval_spin.value(),
+            storage_layout=self.storage_layout_combo.currentData(),
+            timestamp_resolution=self.timestamp_resolution_combo.currentData(),
+            rules_file=self.rules_file_edit.text().strip(),
+            anomaly_silence_sec=self.anomaly_silence_spin.value(),
+            incident_context_lines=self.incident_context_spin.value(),
+            capture_mode=self.capture_mode_combo.currentData(),
+            capture_pre_mb=self.capture_pre_mb_spin.value(),
+            capture_post_sec=self.capture_post_sec_spin.value(),
+            capture_on_error=self.capture_on_error_check.isChecked(),
+            capture_trigger_regex=self.capture_trigger_regex_edit.text().strip(),
+            decimation_mode=self.decimation_mode_combo.currentData(),
+            decimation_every_n=self.decimation_every_n_spin.value(),
+            decimation_bucket_ms=self.decimation_bucket_spin.value(),
+            decimation_keep_full_rate=self.decimation_keep_full_check.isChecked(),
         )
 
     def _refresh_ports(self) -> None:
@@ -680,6 +1075,13 @@ class MainWindow(QMainWindow):
             self.save_dir_edit.setText(selected)
             self._update_preview_path()
 
+    def _browse_rules_file(self) -> None:
+        selected, _ = QFileDialog.getOpenFileName(
+            self, "ルールファイルを選択", self.rules_file_edit.text(), "ルールファイル (*.json)"
+        )
+        if selected:
+            self.rules_file_edit.setText(selected)
+
     def _update_preview_path(self) -> None:
         session = self._collect_session_config()
         preview = self.controller.build_preview_path(session)
@@ -692,6 +1094,9 @@ class MainWindow(QMainWindow):
         self.pause_btn.setEnabled(state == AppState.RUNNING)
         self.resume_btn.setEnabled(state == AppState.PAUSED)
         self.stop_btn.setEnabled(state in {AppState.RUNNING, AppState.PAUSED, AppState.ERROR, AppState.STOPPING})
+        self.capture_trigger_btn.setEnabled(
+            state in {AppState.RUNNING, AppState.PAUSED} and self.controller.capture_active
+        )
 
         editable = state in {AppState.IDLE, AppState.READY, AppState.ERROR, AppState.PAUSED}
         for widget in self._config_widgets:
@@ -707,39 +1112,137 @@ class MainWindow(QMainWindow):
 
     def _update_stats_view(self) -> None:
         stats = self.controller.get_stats_snapshot()
-        elapsed = 0.0
-        if stats.start_time is not None:
-            end = stats.end_time or datetime.now()
-            elapsed = max((end - stats.start_time).total_seconds(), 1e-6)
-
-        rate = stats.received_lines / elapsed if elapsed > 0 else 0.0
+        rates = self.controller.get_throughput_rates()
+        rate_text = " / ".join(f"{window}s {values['lines']:.1f}" for window, values in rates.items())
 
         self.state_label.setText(f"状態: {self.controller.state.value}")
         self.recv_label.setText(f"受信: {stats.received_lines}")
         self.drop_label.setText(f"欠損: {stats.dropped_lines}")
         self.fail_label.setText(f"保存失敗: {stats.write_failures}")
         self.err_label.setText(f"エラー行: {stats.error_lines}")
-        self.rate_label.setText(f"受信レート: {rate:.1f} lines/s")
+        self.rate_label.setText(f"受信レート: {rate_text} lines/s")
+        self.rate_label.setToolTip(
+            "\n".join(
+                f"{window}s: {values['bytes']:.0f} B/s, error {values['errors']:.1f}/s, "
+                f"drop {values['drops']:.1f}/s, write {values['write_latency_ms']:.3f} ms"
+                for window, values in rates.items()
+            )
+        )
+        self.sparkline_label.setText(_render_sparkline(self.controller.get_recent_line_counts(60)))
 
     def _handle_session_started(self, event: dict[str, object]) -> None:
         warnings = event.get("warnings", [])
         if warnings:
             QMessageBox.information(self, "注意", "\n".join(str(w) for w in warnings))
-        self.statusBar().showMessage(f"記録開始: {event.get('session_dir', '')}", 7000)
+        session_dir = str(event.get("session_dir", ""))
+        if session_dir:
+            self._session_dir = Path(session_dir)
+        self.anomaly_list.clear()
+        self.incident_list.clear()
+        self._plot_key = None
+        self.statusBar().showMessage(f"記録開始: {session_dir}", 7000)
+
+    def _open_scrollback(self) -> None:
+        session_dir = self._session_dir
+        if session_dir is None or not session_dir.exists():
+            selected = QFileDialog.getExistingDirectory(self, "セッションフォルダを選択", self.save_dir_edit.text())
+            if not selected:
+                return
+            session_dir = Path(selected)
+
+        if self._scrollback_dialog is not None:
+            self._scrollback_dialog.close()
+        self._scrollback_dialog = ScrollbackDialog(session_dir, parent=self)
+        self._scrollback_dialog.show()
+
+    def _open_templates(self) -> None:
+        if self._template_dialog is not None:
+            self._template_dialog.close()
+        self._template_dialog = TemplateDialog(
+            lambda limit, key: self.controller.get_log_templates(limit, key=key), parent=self
+        )
+        self._template_dialog.show()
+
+    def _open_session_search(self) -> None:
+        if self._search_dialog is None:
+            self._search_dialog = SessionSearchDialog(self.save_dir_edit.text(), parent=self)
+        self._search_dialog.show()
+        self._search_dialog.raise_()
+
+    def _trigger_capture(self) -> None:
+        if self.controller.trigger_capture():
+            self.statusBar().showMessage("手動トリガーを受け付けました。保持中のログを次の受信時に保存します。", 5000)
+
+    def _export_session(self) -> None:
+        start_dir = str(self._session_dir) if self._session_dir is not None else self.save_dir_edit.text()
+        selected = QFileDialog.getExistingDirectory(self, "エクスポートするセッションフォルダを選択", start_dir)
+        if not selected:
+            return
+        formats = ["csv", "jsonl", "txt", "raw", "parquet"]
+        log_format, ok = QInputDialog.getItem(self, "エクスポート", "出力形式", formats, 0, False)
+        if not ok:
+            return
+        session_dir = Path(selected)
+        suggested = str(session_dir.parent / f"{session_dir.name}.{'log' if log_format == 'raw' else log_format}")
+        output, _ = QFileDialog.getSaveFileName(self, "出力先を選択", suggested)
+        if not output:
+            return
+        if not self.controller.export_session(session_dir, Path(output), log_format):
+            QMessageBox.information(self, "エクスポート", "別のエクスポートを実行中です。")
+            return
+        self.statusBar().showMessage(f"エクスポートを開始しました: {session_dir.name}", 5000)
+
+    def _handle_export_done(self, event: dict[str, object]) -> None:
+        if bool(event.get("ok", False)):
+            self.statusBar().showMessage(
+                f"エクスポート完了: {event.get('output', '')} ({event.get('lines', 0)}行, "
+                f"{float(event.get('elapsed_sec', 0.0)):.1f}秒)",
+                10000,
+            )
+        elif bool(event.get("cancelled", False)):
+            self.statusBar().showMessage("エクスポートを中止しました。", 5000)
+        else:
+            self.statusBar().showMessage(f"エクスポートに失敗しました: {event.get('error', '')}", 10000)
 
     def _handle_session_stopped(self, event: dict[str, object]) -> None:
         manifest = str(event.get("manifest", ""))
-        retention = event.get("retention", {})
-        removed_age = int(retention.get("removed_age", 0)) if isinstance(retention, dict) else 0
-        removed_count = int(retention.get("removed_count", 0)) if isinstance(retention, dict) else 0
-        retention_suffix = ""
-        if removed_age or removed_count:
-            retention_suffix = f" / 保持整理: age={removed_age}, count={removed_count}"
+        retention_suffix = " / 保持整理をバックグラウンドで実行中" if bool(event.get("retention_queued", False)) else ""
         if manifest:
             self.statusBar().showMessage(f"停止しました。manifest: {manifest}{retention_suffix}", 10000)
         else:
             self.statusBar().showMessage(f"停止しました。{retention_suffix}", 8000)
 
+    def _handle_retention_done(self, event: dict[str, object]) -> None:
+        retention = event.get("retention", {})
+        if not isinstance(retention, dict):
+            return
+        removed_age = int(retention.get("removed_age", 0))
+        removed_count = int(retention.get("removed_count", 0))
+        removed_quota = int(retention.get("removed_quota", 0))
+        compressed = int(retention.get("compressed", 0))
+        failed = int(retention.get("failed", 0))
+        freed_mb = int(retention.get("freed_bytes", 0)) / (1024 * 1024)
+        error = event.get("error")
+        if error:
+            self.statusBar().showMessage(f"保持整理に失敗しました: {error}", 8000)
+            return
+        if removed_age or removed_count or removed_quota or compressed or failed:
+            self.statusBar().showMessage(
+                f"保持整理: age={removed_age}, count={removed_count}, quota={removed_quota}, "
+                f"圧縮={compressed}, 失敗={failed}, 解放={freed_mb:.1f}MB",
+                8000,
+            )
+
+    def _handle_archive_done(self, event: dict[str, object]) -> None:
+        name = Path(str(event.get("session_dir", ""))).name
+        if bool(event.get("ok", False)):
+            size_mb = int(event.get("size_bytes", 0)) / (1024 * 1024)
+            self.statusBar().showMessage(f"アーカイブしました: {name} ({size_mb:.1f}MB)", 5000)
+        else:
+            error = event.get("error")
+            detail = f" ({error})" if error else ""
+            self.statusBar().showMessage(f"アーカイブに失敗しました: {name}{detail}", 8000)
+
     def _show_retry_dialog(self, message: str) -> None:
         dialog = QMessageBox(self)
         dialog.setIcon(QMessageBox.Icon.Warning)
@@ -833,12 +1336,45 @@ class MainWindow(QMainWindow):
         self.save_dir_edit.setText(str(session.save_dir))
         self.format_combo.setCurrentText(session.log_format)
         self.error_keywords_edit.setText(",".join(session.error_keywords))
+        self.rules_file_edit.setText(session.rules_file)
+        self.anomaly_silence_spin.setValue(session.anomaly_silence_sec)
+        self.incident_context_spin.setValue(session.incident_context_lines)
+        capture_index = self.capture_mode_combo.findData(session.capture_mode)
+        if capture_index >= 0:
+            self.capture_mode_combo.setCurrentIndex(capture_index)
+        self.capture_pre_mb_spin.setValue(session.capture_pre_mb)
+        self.capture_post_sec_spin.setValue(session.capture_post_sec)
+        self.capture_on_error_check.setChecked(session.capture_on_error)
+        self.capture_trigger_regex_edit.setText(session.capture_trigger_regex)
+        decimation_index = self.decimation_mode_combo.findData(session.decimation_mode)
+        if decimation_index >= 0:
+            self.decimation_mode_combo.setCurrentIndex(decimation_index)
+        self.decimation_every_n_spin.setValue(session.decimation_every_n)
+        self.decimation_bucket_spin.setValue(session.decimation_bucket_ms)
+        self.decimation_keep_full_check.setChecked(session.decimation_keep_full_rate)
         self.retention_max_sessions_spin.setValue(session.retention_max_sessions)
         self.retention_max_age_days_spin.setValue(session.retention_max_age_days)
+        self.retention_max_total_mb_spin.setValue(session.retention_max_total_mb)
+        self.retention_max_product_mb_spin.setValue(session.retention_max_product_mb)
+        priority_index = self.retention_priority_combo.findData(session.retention_priority)
+        if priority_index >= 0:
+            self.retention_priority_combo.setCurrentIndex(priority_index)
+        self.retention_compress_check.setChecked(session.retention_compress_before_delete)
+        self.archive_closed_check.setChecked(session.archive_closed_sessions)
 
         index = self.resume_policy_combo.findData(session.resume_policy)
         if index >= 0:
             self.resume_policy_combo.setCurrentIndex(index)
+        durability_index = self.durability_combo.findData(session.durability)
+        if durability_index >= 0:
+            self.durability_combo.setCurrentIndex(durability_index)
+        self.fsync_interval_spin.setValue(session.fsync_interval_sec)
+        resolution_index = self.timestamp_resolution_combo.findData(session.timestamp_resolution)
+        if resolution_index >= 0:
+            self.timestamp_resolution_combo.setCurrentIndex(resolution_index)
+        layout_index = self.storage_layout_combo.findData(session.storage_layout)
+        if layout_index >= 0:
+            self.storage_layout_combo.setCurrentIndex(layout_index)
 
         self._update_preview_path()
 
@@ -849,12 +1385,14 @@ class MainWindow(QMainWindow):
 
         session_dir = marker.get("session_dir", "")
         started_at = marker.get("started_at", "")
+        recovered = self.controller.recover_session(Path(session_dir)) if session_dir else None
+        recovery_text = f"\nジャーナルから manifest を復元しました: {recovered}" if recovered else ""
 
         msg = QMessageBox(self)
         msg.setWindowTitle("復旧案内")
         msg.setIcon(QMessageBox.Icon.Information)
         msg.setText("前回セッションが正常終了していない可能性があります。")
-        msg.setInformativeText(f"開始時刻: {started_at}\n保存先: {session_dir}")
+        msg.setInformativeText(f"開始時刻: {started_at}\n保存先: {session_dir}{recovery_text}")
         open_btn = msg.addButton("保存先を開く", QMessageBox.ButtonRole.ActionRole)
         clear_btn = msg.addButton("マーカーをクリア", QMessageBox.ButtonRole.AcceptRole)
         keep_btn = msg.addButton("そのまま", QMessageBox.ButtonRole.RejectRole)
@@ -889,4 +1427,4 @@ class MainWindow(QMainWindow):
 
         self.controller.shutdown()
         self.timer.stop()
-        event.accept()
+        event.accept()
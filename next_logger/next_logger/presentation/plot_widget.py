@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import math
+
+from PySide6.QtCore import QPointF, QRectF, Qt
+from PySide6.QtGui import QColor, QPainter, QPaintEvent, QPen
+from PySide6.QtWidgets import QWidget
+
+from next_logger.application.live_plot import PlotSeries
+
+
+SERIES_COLORS = (
+    "#1f77b4",
+    "#d62728",
+    "#2ca02c",
+    "#ff7f0e",
+    "#9467bd",
+    "#8c564b",
+    "#e377c2",
+    "#17becf",
+)
+_LEFT_MARGIN = 56
+_MARGIN = 6
+
+
+def _value_text(value: float) -> str:
+    return f"{value:.6g}"
+
+
+class PlotWidget(QWidget):
+    # Draws each series as a min/max envelope, one vertical stroke per column, so a repaint costs O(columns)
+    # no matter how many samples the columns summarise.
+    def __init__(self, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setMinimumHeight(150)
+        self._series: list[PlotSeries] = []
+
+    def plot_width(self) -> int:
+        return max(1, self.width() - _LEFT_MARGIN - _MARGIN)
+
+    def set_series(self, series: list[PlotSeries]) -> None:
+        self._series = series
+        self.update()
+
+    def paintEvent(self, event: QPaintEvent) -> None:  # noqa: N802
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), QColor("white"))
+        area = QRectF(_LEFT_MARGIN, _MARGIN, self.plot_width(), max(1, self.height() - 2 * _MARGIN))
+        painter.setPen(QColor("#cccccc"))
+        painter.drawRect(area)
+
+        lows = [low for item in self._series for low, _ in item.columns if math.isfinite(low)]
+        highs = [high for item in self._series for _, high in item.columns if math.isfinite(high)]
+        if not lows or not highs:
+            painter.setPen(QColor("#888888"))
+            painter.drawText(area, Qt.AlignmentFlag.AlignCenter, "数値項目（name=値）を受信すると表示します")
+            return
+        bottom, top = min(lows), max(highs)
+        if top == bottom:
+            bottom, top = bottom - 1, top + 1
+
+        def y_of(value: float) -> float:
+            return area.bottom() - (value - bottom) / (top - bottom) * area.height()
+
+        painter.setPen(QColor("#555555"))
+        for fraction in (0.0, 0.5, 1.0):
+            value = bottom + (top - bottom) * fraction
+            y = y_of(value)
+            painter.drawText(QRectF(0, y - 8, _LEFT_MARGIN - 4, 16), Qt.AlignmentFlag.AlignRight, _value_text(value))
+
+        for index, item in enumerate(self._series):
+            painter.setPen(QPen(QColor(SERIES_COLORS[index % len(SERIES_COLORS)]), 1))
+            columns = item.columns
+            step = area.width() / max(1, len(columns) - 1)
+            points: list[QPointF] = []
+            for column, (low, high) in enumerate(columns):
+                if not (math.isfinite(low) and math.isfinite(high)):
+                    continue
+                x = area.left() + column * step
+                points.append(QPointF(x, y_of(low)))
+                points.append(QPointF(x, y_of(high)))
+            if points:
+                painter.drawPolyline(points)
+
+        metrics = painter.fontMetrics()
+        legend_y = area.top() + 4
+        for index, item in enumerate(self._series):
+            text = f"{item.name} = {_value_text(item.last)}"
+            box = QRectF(area.left() + 4, legend_y, metrics.horizontalAdvance(text) + 8, metrics.height())
+            painter.fillRect(box, QColor(255, 255, 255, 220))
+            painter.setPen(QColor(SERIES_COLORS[index % len(SERIES_COLORS)]))
+            painter.drawText(box, Qt.AlignmentFlag.AlignCenter, text)
+            legend_y += metrics.height()
@@ -0,0 +1,114 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from PySide6.QtCore import Qt, QTimer
+from PySide6.QtWidgets import (
+    QDialog,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QPlainTextEdit,
+    QPushButton,
+    QScrollBar,
+    QVBoxLayout,
+    QWidget,
+)
+
+from next_logger.infrastructure.scrollback import SessionScrollback
+
+
+PAGE_LINES = 200
+
+
+class ScrollbackDialog(QDialog):
+    def __init__(self, session_dir: Path, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle(f"全履歴: {session_dir.name}")
+        self.resize(1000, 700)
+
+        self._scrollback = SessionScrollback(session_dir)
+        self._follow_tail = True
+
+        root = QVBoxLayout(self)
+
+        search_row = QHBoxLayout()
+        self.search_edit = QLineEdit()
+        self.search_edit.setPlaceholderText("セッション全体を検索")
+        self.search_btn = QPushButton("次を検索")
+        self.position_label = QLabel("")
+        search_row.addWidget(self.search_edit)
+        search_row.addWidget(self.search_btn)
+        search_row.addWidget(self.position_label)
+        root.addLayout(search_row)
+
+        view_row = QHBoxLayout()
+        self.page_view = QPlainTextEdit()
+        self.page_view.setReadOnly(True)
+        self.page_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self.page_view.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOff)
+        self.scroll_bar = QScrollBar(Qt.Orientation.Vertical)
+        self.scroll_bar.setRange(0, 0)
+        self.scroll_bar.setPageStep(PAGE_LINES)
+        self.scroll_bar.setSingleStep(10)
+        view_row.addWidget(self.page_view)
+        view_row.addWidget(self.scroll_bar)
+        root.addLayout(view_row)
+
+        self.scroll_bar.valueChanged.connect(self._on_scroll)
+        self.search_btn.clicked.connect(self._find_next)
+        self.search_edit.returnPressed.connect(self._find_next)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(1000)
+        self.timer.timeout.connect(self._refresh)
+        self.timer.start()
+
+        self._match_line = -1
+        self._refresh()
+
+    def _refresh(self) -> None:
+        total = self._scrollback.refresh()
+        at_tail = self.scroll_bar.value() >= self.scroll_bar.maximum()
+        self.scroll_bar.blockSignals(True)
+        self.scroll_bar.setMaximum(max(0, total - PAGE_LINES))
+        if self._follow_tail and at_tail:
+            self.scroll_bar.setValue(self.scroll_bar.maximum())
+        self.scroll_bar.blockSignals(False)
+        self._load_page(self.scroll_bar.value())
+
+    def _on_scroll(self, value: int) -> None:
+        self._follow_tail = value >= self.scroll_bar.maximum()
+        self._load_page(value)
+
+    def _load_page(self, start: int) -> None:
+        rows = self._scrollback.read_lines(start, PAGE_LINES)
+        self.page_view.setPlainText("\n".join(f"{timestamp} {line}" for timestamp, line in rows))
+        total = self._scrollback.line_count()
+        self.position_label.setText(f"{start + 1 if rows else 0}-{start + len(rows)} / {total}行")
+
+        if start <= self._match_line < start + len(rows):
+            block = self.page_view.document().findBlockByNumber(self._match_line - start)
+            cursor = self.page_view.textCursor()
+            cursor.setPosition(block.position())
+            self.page_view.setTextCursor(cursor)
+            self.page_view.centerCursor()
+
+    def _find_next(self) -> None:
+        query = self.search_edit.text().strip()
+        if not query:
+            return
+        found = self._scrollback.find(query, start_line=self._match_line + 1)
+        if found is None:
+            self._match_line = -1
+            self.position_label.setText("見つかりません")
+            return
+
+        self._match_line = found
+        self._follow_tail = False
+        self.scroll_bar.setValue(min(self.scroll_bar.maximum(), max(0, found - PAGE_LINES // 2)))
+        self._load_page(self.scroll_bar.value())
+
+    def done(self, result: int) -> None:
+        self.timer.stop()
+        super().done(result)
@@ -0,0 +1,144 @@
+from __future__ import annotations
+
+from pathlib import Path
+import re
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import (
+    QCheckBox,
+    QDialog,
+    QFileDialog,
+    QHBoxLayout,
+    QLabel,
+    QLineEdit,
+    QMessageBox,
+    QPlainTextEdit,
+    QPushButton,
+    QVBoxLayout,
+    QWidget,
+)
+
+from next_logger.infrastructure.session_search import SessionSearchWorker, list_session_dirs
+
+
+class SessionSearchDialog(QDialog):
+    def __init__(self, default_dir: str, parent: QWidget | None = None) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("過去ログ検索")
+        self.resize(1000, 650)
+
+        self._worker: SessionSearchWorker | None = None
+
+        root = QVBoxLayout(self)
+
+        dir_row = QHBoxLayout()
+        self.dir_edit = QLineEdit(default_dir)
+        self.dir_edit.setPlaceholderText("セッションフォルダ、またはセッションをまとめた保存先")
+        self.dir_btn = QPushButton("選択")
+        dir_row.addWidget(self.dir_edit)
+        dir_row.addWidget(self.dir_btn)
+        root.addLayout(dir_row)
+
+        query_row = QHBoxLayout()
+        self.query_edit = QLineEdit()
+        self.query_edit.setPlaceholderText("検索文字列")
+        self.regex_check = QCheckBox("正規表現")
+        self.ignore_case_check = QCheckBox("大文字小文字を区別しない")
+        self.ignore_case_check.setChecked(True)
+        self.search_btn = QPushButton("検索")
+        self.cancel_btn = QPushButton("中止")
+        self.cancel_btn.setEnabled(False)
+        query_row.addWidget(self.query_edit)
+        query_row.addWidget(self.regex_check)
+        query_row.addWidget(self.ignore_case_check)
+        query_row.addWidget(self.search_btn)
+        query_row.addWidget(self.cancel_btn)
+        root.addLayout(query_row)
+
+        self.progress_label = QLabel("")
+        root.addWidget(self.progress_label)
+
+        self.result_view = QPlainTextEdit()
+        self.result_view.setReadOnly(True)
+        self.result_view.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        root.addWidget(self.result_view)
+
+        self.dir_btn.clicked.connect(self._choose_dir)
+        self.search_btn.clicked.connect(self._start_search)
+        self.query_edit.returnPressed.connect(self._start_search)
+        self.cancel_btn.clicked.connect(self._cancel_search)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(100)
+        self.timer.timeout.connect(self._drain_hits)
+
+    def _choose_dir(self) -> None:
+        selected = QFileDialog.getExistingDirectory(self, "検索対象フォルダを選択", self.dir_edit.text())
+        if selected:
+            self.dir_edit.setText(selected)
+
+    def _start_search(self) -> None:
+        query = self.query_edit.text()
+        if not query:
+            return
+        session_dirs = list_session_dirs(Path(self.dir_edit.text().strip() or "."))
+        if not session_dirs:
+            QMessageBox.information(self, "情報", "検索対象のセッションが見つかりません。")
+            return
+
+        self._cancel_search()
+        try:
+            worker = SessionSearchWorker(
+                session_dirs,
+                query,
+                regex=self.regex_check.isChecked(),
+                ignore_case=self.ignore_case_check.isChecked(),
+            )
+        except re.error as exc:
+            QMessageBox.warning(self, "入力エラー", f"正規表現が不正です: {exc}")
+            return
+
+        self.result_view.clear()
+        self._worker = worker
+        worker.start()
+        self.search_btn.setEnabled(False)
+        self.cancel_btn.setEnabled(True)
+        self.timer.start()
+
+    def _cancel_search(self) -> None:
+        if self._worker is not None:
+            self._worker.cancel()
+
+    def _drain_hits(self) -> None:
+        worker = self._worker
+        if worker is None:
+            self.timer.stop()
+            return
+
+        hits = worker.poll_hits()
+        if hits:
+            self.result_view.appendPlainText(
+                "\n".join(
+                    f"{hit.session_dir.name} {hit.segment}:{hit.line_number} {hit.timestamp} {hit.line}"
+                    for hit in hits
+                )
+            )
+
+        status = f"{worker.scanned_segments}/{worker.total_segments} セグメント / {worker.hit_count}件"
+        if worker.finished and not hits:
+            if worker.truncated:
+                status += "（上限に達したため打ち切り）"
+            elif worker.cancelled:
+                status += "（中止）"
+            else:
+                status += "（完了）"
+            self._worker = None
+            self.timer.stop()
+            self.search_btn.setEnabled(True)
+            self.cancel_btn.setEnabled(False)
+        self.progress_label.setText(status)
+
+    def done(self, result: int) -> None:
+        self._cancel_search()
+        self.timer.stop()
+        super().done(result)
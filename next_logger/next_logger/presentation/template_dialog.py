@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+from collections.abc import Callable
+from datetime import datetime
+
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import (
+    QAbstractItemView,
+    QComboBox,
+    QDialog,
+    QHBoxLayout,
+    QHeaderView,
+    QLabel,
+    QTableWidget,
+    QTableWidgetItem,
+    QVBoxLayout,
+    QWidget,
+)
+
+from next_logger.application.template_miner import TemplateSummary
+
+
+TEMPLATE_VIEW_LIMIT = 500
+
+SORT_CHOICES = [
+    ("count", "件数の多い順"),
+    ("errors", "エラーの多い順"),
+    ("rare", "件数の少ない順"),
+    ("recent", "最近現れた順"),
+]
+
+COLUMNS = ["件数", "エラー", "警告", "初回", "最終", "テンプレート", "例"]
+
+
+def _clock_text(wall_ns: int) -> str:
+    return datetime.fromtimestamp(wall_ns / 1_000_000_000).strftime("%H:%M:%S")
+
+
+class TemplateDialog(QDialog):
+    def __init__(
+        self,
+        load_templates: Callable[[int | None, str], list[TemplateSummary]],
+        parent: QWidget | None = None,
+    ) -> None:
+        super().__init__(parent)
+        self.setWindowTitle("ログテンプレート")
+        self.resize(1100, 600)
+        self._load_templates = load_templates
+
+        root = QVBoxLayout(self)
+
+        top_row = QHBoxLayout()
+        self.sort_combo = QComboBox()
+        for key, label in SORT_CHOICES:
+            self.sort_combo.addItem(label, userData=key)
+        self.summary_label = QLabel("")
+        top_row.addWidget(self.sort_combo)
+        top_row.addWidget(self.summary_label, 1)
+        root.addLayout(top_row)
+
+        self.table = QTableWidget(0, len(COLUMNS))
+        self.table.setHorizontalHeaderLabels(COLUMNS)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        for column in range(5):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(5, QHeaderView.ResizeMode.Stretch)
+        header.setSectionResizeMode(6, QHeaderView.ResizeMode.Interactive)
+        root.addWidget(self.table)
+
+        self.sort_combo.currentIndexChanged.connect(self._refresh)
+
+        self.timer = QTimer(self)
+        self.timer.setInterval(2000)
+        self.timer.timeout.connect(self._refresh)
+        self.timer.start()
+
+        self._refresh()
+
+    def _refresh(self) -> None:
+        templates = self._load_templates(TEMPLATE_VIEW_LIMIT, str(self.sort_combo.currentData()))
+        total = sum(item.count for item in templates)
+        self.summary_label.setText(f"テンプレート {len(templates)} 種類 / {total} 行")
+
+        self.table.setRowCount(len(templates))
+        for row, item in enumerate(templates):
+            values = [
+                str(item.count),
+                str(item.errors),
+                str(item.warnings),
+                _clock_text(item.first_ns),
+                _clock_text(item.last_ns),
+                item.template,
+                item.examples[0] if item.examples else "",
+            ]
+            for column, value in enumerate(values):
+                cell = QTableWidgetItem(value)
+                if column == 6 and item.examples:
+                    cell.setToolTip("\n".join(item.examples))
+                self.table.setItem(row, column, cell)
+
+    def closeEvent(self, event) -> None:  # noqa: N802
+        self.timer.stop()
+        super().closeEvent(event)
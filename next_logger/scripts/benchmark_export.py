@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime, timedelta
+import os
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from next_logger.domain import SessionConfig, SessionStats  # noqa: E402
+from next_logger.infrastructure.log_writer import SessionLogWriter  # noqa: E402
+from next_logger.infrastructure.session_export import export_session_parallel  # noqa: E402
+
+
+def build_session(base_dir: Path, lines: int, line_bytes: int, storage_layout: str) -> Path:
+    config = SessionConfig(save_dir=base_dir, durability="none", storage_layout=storage_layout)
+    writer = SessionLogWriter(config)
+    payload = "x" * max(1, line_bytes - 30)
+    started = datetime.now()
+    batch: list[tuple[datetime, str, bool]] = []
+    for index in range(lines):
+        batch.append((started + timedelta(microseconds=index * 100), f"{index:08d} {payload}", index % 100 == 0))
+        if len(batch) >= 4096:
+            writer.write_lines(batch)
+            batch.clear()
+    writer.write_lines(batch)
+    writer.close(status="stopped", stats=SessionStats(received_lines=lines))
+    return writer.session_dir
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure session export throughput per format and worker count.")
+    parser.add_argument("--lines", type=int, default=500000)
+    parser.add_argument("--line-bytes", type=int, default=80)
+    parser.add_argument("--storage-layout", choices=("split", "raw_only"), default="raw_only")
+    parser.add_argument("--formats", default="csv,jsonl")
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="comma separated worker counts")
+    parser.add_argument("--chunk-mb", type=int, default=8)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        session_dir = build_session(Path(tmp) / "sessions", args.lines, args.line_bytes, args.storage_layout)
+        raw_bytes = sum(path.stat().st_size for path in session_dir.glob("raw_part*.log"))
+        for log_format in args.formats.split(","):
+            for workers in sorted({int(value) for value in args.workers.split(",")}):
+                output = Path(tmp) / f"export_{log_format}_{workers}"
+                started = time.perf_counter()
+                count = export_session_parallel(
+                    session_dir, output, log_format, workers=workers, chunk_bytes=args.chunk_mb * 1024 * 1024
+                )
+                elapsed = time.perf_counter() - started
+                print(
+                    f"{log_format:8s} workers={workers:2d}  {count:9d} lines  {count / elapsed:10.0f} lines/s  "
+                    f"{raw_bytes / elapsed / (1024 * 1024):7.1f} MB/s raw in"
+                )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
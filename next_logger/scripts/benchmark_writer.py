@@ -0,0 +1,108 @@
+from __future__ import annotations
+
+import argparse
+from datetime import datetime
+from pathlib import Path
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from next_logger.domain import SessionConfig, SessionStats  # noqa: E402
+from next_logger.infrastructure.clock import SessionClock, monotonic_ns  # noqa: E402
+from next_logger.infrastructure.durability import verify_checksums  # noqa: E402
+from next_logger.infrastructure.log_writer import SessionLogWriter  # noqa: E402
+
+
+POLICIES = ("none", "periodic", "batch")
+
+
+def run_policy(
+    policy: str,
+    lines: int,
+    line_bytes: int,
+    base_dir: Path,
+    log_format: str = "txt",
+    batch_size: int = 1,
+    storage_layout: str = "split",
+    clock: str = "datetime",
+) -> dict[str, float]:
+    config = SessionConfig(
+        save_dir=base_dir / f"{policy}_{log_format}_{batch_size}_{storage_layout}",
+        log_format=log_format,
+        durability=policy,
+        fsync_interval_sec=1.0,
+        storage_layout=storage_layout,
+    )
+    writer = SessionLogWriter(config)
+    payload = "x" * max(1, line_bytes - 30)
+    records = [
+        (datetime.now(), f"{index:08d} {payload}", index % 100 == 0)
+        for index in range(lines)
+    ]
+
+    started = time.perf_counter()
+    cpu_started = time.process_time()
+    if clock == "ns":
+        # Matches the serial path: one monotonic reading per read chunk, anchored to wall time once.
+        session_clock = SessionClock()
+        for offset in range(0, lines, batch_size):
+            arrived_ns = session_clock.wall_ns(monotonic_ns())
+            writer.write_lines_ns(
+                [(arrived_ns, line, is_error) for _, line, is_error in records[offset : offset + batch_size]]
+            )
+    elif batch_size > 1:
+        for offset in range(0, lines, batch_size):
+            writer.write_lines(
+                [(datetime.now(), line, is_error) for _, line, is_error in records[offset : offset + batch_size]]
+            )
+    else:
+        for _, line, is_error in records:
+            writer.write_line(datetime.now(), line, is_error)
+    writer.close(status="stopped", stats=SessionStats(received_lines=lines))
+    cpu = time.process_time() - cpu_started
+    elapsed = time.perf_counter() - started
+
+    raw_path = writer.session_dir / "raw_part01.log"
+    verified, mismatches = verify_checksums(raw_path)
+    return {
+        "lines_per_sec": lines / elapsed,
+        "mb_per_sec": raw_path.stat().st_size / elapsed / (1024 * 1024),
+        "elapsed_sec": elapsed,
+        "cpu_us_per_line": cpu / lines * 1_000_000,
+        "disk_mb": sum(path.stat().st_size for path in writer.session_dir.iterdir()) / (1024 * 1024),
+        "verified": float(verified == raw_path.stat().st_size and mismatches == 0),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure SessionLogWriter throughput per durability policy.")
+    parser.add_argument("--lines", type=int, default=50000)
+    parser.add_argument("--line-bytes", type=int, default=80)
+    parser.add_argument("--batch-lines", type=int, default=2000, help="line count for the fsync-per-write policy")
+    parser.add_argument("--log-format", choices=("txt", "csv", "jsonl"), default="txt")
+    parser.add_argument("--batch-size", type=int, default=1, help="lines per write_lines() call")
+    parser.add_argument("--storage-layout", choices=("split", "raw_only"), default="split")
+    parser.add_argument(
+        "--clock", choices=("datetime", "ns"), default="datetime", help="datetime.now() per line, or the serial path"
+    )
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for policy in POLICIES:
+            lines = args.batch_lines if policy == "batch" else args.lines
+            result = run_policy(
+                policy, lines, args.line_bytes, Path(tmp), args.log_format, args.batch_size, args.storage_layout, args.clock
+            )
+            print(
+                f"{policy:9s} {lines:8d} lines  {result['lines_per_sec']:10.0f} lines/s  "
+                f"{result['mb_per_sec']:7.2f} MB/s  {result['cpu_us_per_line']:6.1f} us CPU/line  "
+                f"{result['disk_mb']:6.2f} MB on disk  "
+                f"checksums={'ok' if result['verified'] else 'NG'}"
+            )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,127 @@
+import unittest
+from unittest import mock
+
+from next_logger.application import anomaly_detector
+from next_logger.application.anomaly_detector import AnomalyDetector, CountMinSketch, line_template
+
+
+SEC = 1_000_000_000
+
+
+def _second(detector, second, lines, errors=0, text="sensor {i} value={v} ok"):
+    batch = [(second * SEC + i * (SEC // (lines + 1)), text.format(i=i % 4, v=i * 7)) for i in range(lines)]
+    severities = ["error"] * errors + ["info"] * (lines - errors)
+    return detector.observe(batch, severities)
+
+
+class TestLineTemplate(unittest.TestCase):
+    def test_variable_parts_are_masked(self) -> None:
+        self.assertEqual(line_template("t=12.5 id=deadbeef01 addr=0x1F seq 42"), "t=#.# id=# addr=# seq #")
+        self.assertEqual(line_template("boot ok"), "boot ok")
+
+
+class TestCountMinSketch(unittest.TestCase):
+    def test_never_under_counts(self) -> None:
+        sketch = CountMinSketch(width=64, depth=3)
+        for index in range(500):
+            sketch.add(f"key{index % 50}")
+        for index in range(50):
+            self.assertGreaterEqual(sketch.estimate(f"key{index}"), 10)
+        self.assertEqual(sketch.width, 64)
+
+class TestAnomalyDetector(unittest.TestCase):
+    def test_error_rate_spike_after_warmup(self) -> None:
+        detector = AnomalyDetector(warmup_sec=5, warmup_lines=0)
+        found = []
+        for second in range(10):
+            found += _second(detector, second, 20, errors=1 if second % 2 else 0)
+        self.assertEqual([anomaly.kind for anomaly in found], [])
+
+        found = _second(detector, 10, 40, errors=30)
+        self.assertEqual([anomaly.kind for anomaly in found], ["error_rate"])
+        self.assertGreaterEqual(found[0].value, 5)
+        self.assertLess(found[0].baseline, 1)
+        # Still spiking in the next second: reported once per episode.
+        self.assertEqual(_second(detector, 11, 40, errors=30), [])
+
+    def test_spikes_are_ignored_during_warmup(self) -> None:
+        detector = AnomalyDetector(warmup_sec=30)
+        self.assertEqual(_second(detector, 0, 50, errors=50), [])
+
+    def test_silence_and_recovery(self) -> None:
+        detector = AnomalyDetector(silence_sec=10)
+        self.assertEqual(detector.check_idle(5 * SEC), [])
+        _second(detector, 0, 5)
+        self.assertEqual(detector.check_idle(5 * SEC), [])
+
+        found = detector.check_idle(12 * SEC)
+        self.assertEqual([anomaly.kind for anomaly in found], ["silence"])
+        self.assertEqual(detector.check_idle(20 * SEC), [])
+
+        found = _second(detector, 30, 1)
+        self.assertEqual(found[0].kind, "silence_end")
+        self.assertGreater(found[0].value, 29)
+
+    def test_pause_restarts_the_silence_timer(self) -> None:
+        detector = AnomalyDetector(silence_sec=10)
+        _second(detector, 0, 5)
+        detector.reset_silence(60 * SEC)
+        self.assertEqual(detector.check_idle(65 * SEC), [])
+        self.assertEqual(len(detector.check_idle(71 * SEC)), 1)
+
+    def test_zero_silence_disables_the_timer(self) -> None:
+        detector = AnomalyDetector(silence_sec=0)
+        _second(detector, 0, 5)
+        self.assertEqual(detector.check_idle(3600 * SEC), [])
+
+    def test_new_templates_after_learning(self) -> None:
+        detector = AnomalyDetector(warmup_sec=2, warmup_lines=10)
+        for second in range(3):
+            _second(detector, second, 10)
+        self.assertEqual(_second(detector, 3, 10), [])
+
+        found = _second(detector, 4, 3, text="PSU brownout on rail {i} ({v} mV)")
+        self.assertEqual([anomaly.kind for anomaly in found], ["new_template"])
+        self.assertIn("brownout", found[0].sample)
+        self.assertEqual(_second(detector, 5, 3, text="PSU brownout on rail {i} ({v} mV)"), [])
+
+        summary = detector.summary()
+        self.assertEqual(summary["counts"], {"new_template": 1})
+        self.assertEqual(summary["templates_seen"], 2)
+        self.assertEqual(summary["anomalies"][0]["kind"], "new_template")
+
+    def test_new_template_reports_are_rate_limited(self) -> None:
+        detector = AnomalyDetector(warmup_sec=0, warmup_lines=0)
+        batch = [(SEC + index, f"unique line {chr(65 + index % 26)}{chr(97 + index // 26)}") for index in range(100)]
+        found = detector.observe(batch, ["info"] * len(batch))
+        self.assertEqual(len(found), 20)
+        self.assertEqual(detector.summary()["new_templates_suppressed"], 80)
+
+    def test_saturated_sketch_is_rotated_so_new_shapes_still_count(self) -> None:
+        detector = AnomalyDetector(warmup_sec=0, warmup_lines=0, sketch=CountMinSketch(width=64, depth=4))
+        words = [f"{chr(97 + a)}{chr(97 + b)}{chr(97 + c)}" for a in range(26) for b in range(26) for c in range(2)]
+        batch = [(SEC + index, f"shape {word}") for index, word in enumerate(words)]
+        detector.observe(batch, ["info"] * len(batch))
+
+        summary = detector.summary()
+        self.assertGreater(summary["sketch_rotations"], 0)
+        # A saturated 64-cell sketch would report almost every one of these as already seen.
+        self.assertGreater(summary["templates_seen"], len(words) * 0.9)
+
+    def test_frequent_template_is_not_reported_again_after_rotations(self) -> None:
+        detector = AnomalyDetector(
+            silence_sec=0, warmup_sec=0, warmup_lines=0, sketch=CountMinSketch(width=64, depth=4)
+        )
+        batch = []
+        for index in range(600):
+            # A minute apart so the per-minute report limit does not hide repeats.
+            batch.append(((2 * index + 1) * 60 * SEC, "heartbeat ok"))
+            batch.append(((2 * index + 2) * 60 * SEC, f"shape {chr(97 + index % 26)}{chr(97 + index // 26)}"))
+        with mock.patch.object(anomaly_detector, "RECENT_TEMPLATES", 64):
+            found = detector.observe(batch, ["info"] * len(batch))
+
+        self.assertGreater(detector.summary()["sketch_rotations"], 2)
+        self.assertEqual(sum(anomaly.sample == "heartbeat ok" for anomaly in found), 1)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,6 +13,22 @@ class TestAppSettingsStore(unittest.TestCase):
             store.set_bool("onboarding_completed", True)
             self.assertTrue(store.get_bool("onboarding_completed", default=False))
 
+    def test_int_roundtrip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = AppSettingsStore(path=Path(tmp) / "settings.json")
+            self.assertEqual(store.get_int("log_buffer_max_lines", default=1000), 1000)
+            store.set_int("log_buffer_max_lines", 250000)
+            self.assertEqual(store.get_int("log_buffer_max_lines", default=1000), 250000)
+
+    def test_str_roundtrip(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = AppSettingsStore(path=Path(tmp) / "settings.json")
+            self.assertEqual(store.get_str("plot_fields"), "")
+            store.set_str("plot_fields", "temp,volt")
+            self.assertEqual(store.get_str("plot_fields"), "temp,volt")
+            store.set_int("plot_fields", 3)
+            self.assertEqual(store.get_str("plot_fields", default="x"), "x")
+
 
 if __name__ == "__main__":
-    unittest.main()
+    unittest.main()
@@ -0,0 +1,141 @@
+import unittest
+
+from next_logger.application.classification_stage import ClassificationStage
+from next_logger.application.log_markers import classify_log_line
+from next_logger.application.rule_engine import parse_rules
+
+
+KEYWORDS = ("ERROR", "FAIL")
+
+
+class _StepClock:
+    def __init__(self, step_ns: int) -> None:
+        self.now = 0
+        self.step_ns = step_ns
+
+    def __call__(self) -> int:
+        self.now += self.step_ns
+        return self.now
+
+
+def _batch(start: int, count: int) -> list[tuple[int, str]]:
+    return [(index, f"line {index} {'ERROR' if index % 7 == 0 else 'ok'}") for index in range(start, start + count)]
+
+
+class TestClassificationStage(unittest.TestCase):
+    def test_light_load_stays_inline(self) -> None:
+        delivered = []
+        stage = ClassificationStage(KEYWORDS, lambda batch, markers: delivered.append((batch, markers)), workers=2)
+        for offset in range(0, 300, 100):
+            stage.submit(_batch(offset, 100))
+        stage.close()
+
+        self.assertEqual(stage.mode, "inline")
+        self.assertEqual([batch[0][0] for batch, _ in delivered], [0, 100, 200])
+        self.assertEqual(delivered[0][1][7].severity, "error")
+        self.assertEqual(stage.summary()["workers"], 0)
+
+    def test_no_workers_never_engages(self) -> None:
+        stage = ClassificationStage(
+            KEYWORDS, lambda batch, markers: None, workers=0, window_sec=0.0, clock=_StepClock(1_000_000_000)
+        )
+        stage.submit(_batch(0, 10))
+        stage.close()
+        self.assertEqual(stage.mode, "inline")
+
+    def test_heavy_load_moves_to_pool_and_keeps_order(self) -> None:
+        delivered = []
+        engaged = []
+        # Every clock reading advances 10 ms, so each batch "costs" far more than the threshold.
+        stage = ClassificationStage(
+            KEYWORDS,
+            lambda batch, markers: delivered.append((batch, markers)),
+            on_engage=engaged.append,
+            workers=1,
+            window_sec=0.0,
+            clock=_StepClock(10_000_000),
+        )
+        batches = [_batch(offset, 150) for offset in range(0, 1500, 150)]
+        for batch in batches:
+            stage.submit(batch)
+        self.assertEqual(stage.mode, "pool")
+        stage.close()
+
+        self.assertEqual(len(engaged), 1)
+        self.assertEqual(engaged[0]["mode"], "pool")
+        self.assertEqual([batch for batch, _ in delivered], batches)
+        for batch, markers in delivered:
+            self.assertEqual(markers, [classify_log_line(line, KEYWORDS) for _, line in batch])
+        self.assertEqual(stage.summary()["workers"], 1)
+
+    def test_rules_are_applied_and_can_be_swapped(self) -> None:
+        delivered = []
+        rules = parse_rules([{"name": "overheat", "type": "threshold", "field": "temp", "value": 80, "tags": ["thermal"]}])
+        stage = ClassificationStage(KEYWORDS, lambda batch, markers: delivered.extend(markers), rules=rules)
+        stage.submit([(0, "temp=95")])
+        stage.configure(KEYWORDS, None)
+        stage.submit([(1, "temp=95")])
+        stage.close()
+
+        self.assertEqual((delivered[0].severity, delivered[0].tags), ("warning", ("thermal",)))
+        self.assertEqual(delivered[1].severity, "info")
+
+    def test_failing_deliver_does_not_stall_the_pool(self) -> None:
+        delivered = []
+        failed = []
+
+        def deliver(batch, markers) -> None:
+            if batch[0][0] % 300 == 0:
+                raise OSError("disk full")
+            delivered.append(batch[0][0])
+
+        stage = ClassificationStage(
+            KEYWORDS,
+            deliver,
+            on_deliver_error=lambda batch, exc: failed.append((batch[0][0], str(exc))),
+            workers=1,
+            window_sec=0.0,
+            clock=_StepClock(10_000_000),
+        )
+        # More batches than the in-flight limit: a dead delivery thread would block submit() here.
+        for offset in range(0, 3000, 150):
+            stage.submit(_batch(offset, 150))
+        self.assertEqual(stage.mode, "pool")
+        stage.close()
+
+        self.assertEqual([offset for offset, _ in failed], list(range(0, 3000, 300)))
+        self.assertEqual(failed[0][1], "disk full")
+        self.assertEqual(delivered, list(range(150, 3000, 300)))
+
+    def test_pool_workers_pick_up_new_rules(self) -> None:
+        delivered = []
+        rules = parse_rules([{"name": "hot", "type": "threshold", "field": "temp", "value": 80, "tags": ["thermal"]}])
+        stage = ClassificationStage(
+            KEYWORDS,
+            lambda batch, markers: delivered.extend(markers),
+            rules=rules,
+            workers=1,
+            window_sec=0.0,
+            clock=_StepClock(10_000_000),
+        )
+        line_batch = [(index, "temp=95") for index in range(100)]
+        stage.submit(line_batch)
+        self.assertEqual(stage.mode, "pool")
+        stage.submit(line_batch)
+        stage.configure(KEYWORDS, None)
+        stage.submit(line_batch)
+        stage.close()
+
+        self.assertEqual([marker.severity for marker in delivered[100:200]], ["warning"] * 100)
+        self.assertEqual([marker.severity for marker in delivered[200:]], ["info"] * 100)
+
+    def test_submit_after_close_is_ignored(self) -> None:
+        delivered = []
+        stage = ClassificationStage(KEYWORDS, lambda batch, markers: delivered.append(batch))
+        stage.close()
+        stage.submit(_batch(0, 5))
+        self.assertEqual(delivered, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+from datetime import datetime
+import threading
+import time
+import unittest
+
+from next_logger.infrastructure.clock import SessionClock, monotonic_ns
+
+
+class TestSessionClock(unittest.TestCase):
+    def test_wall_time_is_anchored_once(self) -> None:
+        clock = SessionClock(wall_ns=1_700_000_000_000_000_000, anchor_monotonic_ns=5_000)
+
+        self.assertEqual(clock.wall_ns(5_000), 1_700_000_000_000_000_000)
+        self.assertEqual(clock.wall_ns(1_005_000), 1_700_000_000_001_000_000)
+        self.assertEqual(clock.section()["anchor_monotonic_ns"], 5_000)
+
+    def test_clock_text_matches_local_time(self) -> None:
+        clock = SessionClock()
+        wall_ns = clock.wall_ns(monotonic_ns())
+
+        self.assertLess(abs(wall_ns - time.time_ns()), 1_000_000_000)
+        expected = datetime.fromtimestamp(wall_ns // 1_000_000_000).strftime("%H:%M:%S")
+        self.assertEqual(clock.clock_text(wall_ns), expected)
+
+    def test_clock_text_is_consistent_across_threads(self) -> None:
+        clock = SessionClock()
+        seconds = [1_700_000_000 + offset for offset in range(4)]
+        expected = {second: time.strftime("%H:%M:%S", time.localtime(second)) for second in seconds}
+        wrong: list[tuple[int, str]] = []
+
+        def hammer(offset: int) -> None:
+            for index in range(20_000):
+                second = seconds[(index + offset) % len(seconds)]
+                text = clock.clock_text(second * 1_000_000_000)
+                if text != expected[second]:
+                    wrong.append((second, text))
+
+        threads = [threading.Thread(target=hammer, args=(offset,)) for offset in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(wrong, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,102 @@
+import gzip
+from pathlib import Path
+import tempfile
+import unittest
+
+from next_logger.application.decimator import Decimator
+from next_logger.application.log_markers import LogMarkerResult
+from next_logger.infrastructure.log_writer import FullRateArchive
+
+
+MS = 1_000_000
+INFO = LogMarkerResult("info", ())
+WARNING = LogMarkerResult("warning", ("warn",))
+ERROR = LogMarkerResult("error", ("error",))
+
+
+def _batch(lines: list[tuple[int, str, LogMarkerResult]]):
+    records = [(at_ms * MS, line, marker.severity == "error") for at_ms, line, marker in lines]
+    return records, [marker for _, _, marker in lines]
+
+
+class TestDecimator(unittest.TestCase):
+    def test_every_n_keeps_errors_and_warnings(self) -> None:
+        decimator = Decimator("every_n", every_n=4)
+        lines = [(index, f"sample {index}", INFO) for index in range(20)]
+        lines[5] = (5, "ERROR overrun", ERROR)
+        lines[6] = (6, "warning: late", WARNING)
+        records, markers = decimator.apply(*_batch(lines))
+        self.assertEqual(
+            [line for _, line, _ in records],
+            ["sample 0", "sample 4", "ERROR overrun", "warning: late", "sample 10", "sample 14", "sample 18"],
+        )
+        self.assertEqual(markers[2].severity, "error")
+        summary = decimator.summary()
+        self.assertEqual((summary["lines_in"], summary["lines_out"], summary["info_lines_out"]), (20, 7, 5))
+        self.assertEqual(summary["ratio"], round(20 / 7, 3))
+
+    def test_bucket_folds_numeric_lines_per_shape(self) -> None:
+        decimator = Decimator("bucket", bucket_ms=100)
+        lines = [(index, f"ch1 temp={20 + index % 3} volt=-1.5", INFO) for index in range(50)]
+        lines += [(60, "ch2 temp=30 volt=2", INFO), (70, "link up", INFO)]
+        records, _ = decimator.apply(*_batch(lines))
+        # Nothing numeric is written until the bucket closes; lines without numbers pass at once.
+        self.assertEqual([line for _, line, _ in records], ["link up"])
+
+        records, markers = decimator.apply(*_batch([(90, "ch1 temp=21 volt=0", INFO), (150, "ch1 temp=25 volt=0", INFO)]))
+        self.assertEqual(
+            [line for _, line, _ in records],
+            ["ch2 temp=30 volt=2", "[decimated n=51 min/mean/max] ch1 temp=20/20.9804/22 volt=-1.5/-1.47059/0"],
+        )
+        self.assertEqual(records[1][0], 90 * MS)
+        self.assertEqual(markers[1].tags, ("decimated",))
+
+        records, _ = decimator.flush()
+        self.assertEqual([line for _, line, _ in records], ["ch1 temp=25 volt=0"])
+        summary = decimator.summary()
+        self.assertEqual((summary["lines_in"], summary["lines_out"], summary["summary_lines"]), (54, 4, 1))
+
+    def test_open_bucket_is_written_before_errors_and_warnings(self) -> None:
+        decimator = Decimator("bucket", bucket_ms=100)
+        lines = [(index, f"ch1 temp={index}", INFO) for index in range(10)]
+        lines += [(20, "ERROR overheat 99", ERROR), (30, "ch1 temp=5", INFO), (40, "warning: fan", WARNING)]
+        records, _ = decimator.apply(*_batch(lines))
+        self.assertEqual(
+            [line for _, line, _ in records],
+            ["[decimated n=10 min/mean/max] ch1 temp=0/4.5/9", "ERROR overheat 99", "ch1 temp=5", "warning: fan"],
+        )
+        self.assertEqual([at for at, _, _ in records], sorted(at for at, _, _ in records))
+
+    def test_expire_closes_a_bucket_whose_time_has_passed(self) -> None:
+        decimator = Decimator("bucket", bucket_ms=100)
+        decimator.apply(*_batch([(10, "ch1 temp=1", INFO), (20, "ch1 temp=3", INFO)]))
+        self.assertEqual(decimator.expire(99 * MS), ([], []))
+        records, _ = decimator.expire(100 * MS)
+        self.assertEqual([line for _, line, _ in records], ["[decimated n=2 min/mean/max] ch1 temp=1/2/3"])
+        self.assertEqual(decimator.expire(500 * MS), ([], []))
+        self.assertEqual(decimator.summary()["lines_out"], 1)
+
+    def test_shape_limit_passes_extra_lines(self) -> None:
+        decimator = Decimator("bucket", bucket_ms=1000, max_shapes=2)
+        lines = [(index, f"sensor{index} 1", INFO) for index in range(5)]
+        records, _ = decimator.apply(*_batch(lines))
+        self.assertEqual(len(records), 3)
+        records, _ = decimator.flush()
+        self.assertEqual(len(records), 2)
+
+
+class TestFullRateArchive(unittest.TestCase):
+    def test_every_line_is_archived(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            archive = FullRateArchive(Path(tmp))
+            self.assertTrue(archive.write([(index * MS, f"sample {index}", False) for index in range(1000)]))
+            archive.close()
+            self.assertFalse(archive.write([(0, "late", False)]))
+            with gzip.open(archive.path, "rt", encoding="utf-8") as handle:
+                lines = handle.read().splitlines()
+            self.assertEqual(len(lines), 1000)
+            self.assertTrue(lines[-1].endswith("\tsample 999"))
+
+
+if __name__ == "__main__":
+    unittest.main()
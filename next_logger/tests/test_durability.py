@@ -0,0 +1,76 @@
+from datetime import datetime
+import os
+from pathlib import Path
+import tempfile
+import time
+import unittest
+
+from next_logger.domain import SessionConfig, SessionStats
+from next_logger.infrastructure.durability import (
+    CHECKSUM_BLOCK_BYTES,
+    PeriodicSyncer,
+    checksum_path,
+    trim_checksums,
+    verify_checksums,
+)
+from next_logger.infrastructure.log_writer import SessionLogWriter
+
+
+class TestDurability(unittest.TestCase):
+    def _write(self, policy: str, lines: int) -> Path:
+        config = SessionConfig(save_dir=Path(self._tmp.name), durability=policy, fsync_interval_sec=0.05)
+        writer = SessionLogWriter(config)
+        for index in range(lines):
+            self.assertTrue(writer.write_line(datetime(2026, 1, 1), f"line {index:05d} " + "x" * 40, False))
+        writer.close(status="stopped", stats=SessionStats())
+        return writer.session_dir / "raw_part01.log"
+
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_checksums_cover_whole_file_for_each_policy(self) -> None:
+        for policy in ("none", "periodic", "batch"):
+            with self.subTest(policy=policy):
+                raw_path = self._write(policy, 3000)
+                size = raw_path.stat().st_size
+                self.assertGreater(size, CHECKSUM_BLOCK_BYTES)
+                self.assertEqual(verify_checksums(raw_path), (size, 0))
+                raw_path.parent.joinpath("manifest.json").unlink()
+                for path in raw_path.parent.iterdir():
+                    path.unlink()
+
+    def test_detects_corruption_and_trims_after_truncation(self) -> None:
+        raw_path = self._write("none", 3000)
+        size = raw_path.stat().st_size
+        data = bytearray(raw_path.read_bytes())
+        data[10] ^= 0xFF
+        raw_path.write_bytes(bytes(data))
+        self.assertEqual(verify_checksums(raw_path)[1], 1)
+
+        with raw_path.open("r+b") as handle:
+            handle.truncate(size - 100)
+        with checksum_path(raw_path).open("ab") as handle:
+            handle.write(b"\x01\x02\x03")
+        trim_checksums(raw_path)
+        verified_end, _ = verify_checksums(raw_path)
+        self.assertLess(verified_end, size - 100)
+        self.assertEqual(checksum_path(raw_path).stat().st_size % 20, 0)
+
+    def test_periodic_syncer_syncs_duplicated_descriptors(self) -> None:
+        path = Path(self._tmp.name) / "data.bin"
+        with path.open("wb") as handle:
+            handle.write(b"abc")
+            syncer = PeriodicSyncer(lambda: [os.dup(handle.fileno())], interval_sec=0.05)
+            syncer.start()
+            deadline = time.monotonic() + 2.0
+            while syncer.sync_count < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+            syncer.stop()
+        self.assertGreaterEqual(syncer.sync_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
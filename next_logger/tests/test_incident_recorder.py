@@ -0,0 +1,96 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from next_logger.application.incident_recorder import IncidentRecorder
+from next_logger.infrastructure.incident_log import IncidentLog, read_incident, read_incidents
+
+
+def _feed(recorder: IncidentRecorder, count: int, errors: set[int], start: int = 0, batch: int = 7) -> None:
+    for first in range(start, start + count, batch):
+        numbers = range(first, min(first + batch, start + count))
+        records = [(number * 1000, f"line {number}", number in errors) for number in numbers]
+        severities = ["error" if is_error else "info" for _, _, is_error in records]
+        recorder.observe(records, severities, "raw_part01.log", first)
+
+
+class TestIncidentRecorder(unittest.TestCase):
+    def setUp(self) -> None:
+        self.incidents: list[dict] = []
+
+    def _recorder(self, **kwargs) -> IncidentRecorder:
+        return IncidentRecorder(self.incidents.append, **kwargs)
+
+    def test_window_around_a_single_error(self) -> None:
+        recorder = self._recorder(before=5, after=3)
+        _feed(recorder, 100, {50})
+        (incident,) = self.incidents
+        self.assertEqual([line for _, _, line in incident["lines"]], [f"line {n}" for n in range(45, 54)])
+        self.assertEqual(incident["start"], {"segment": "raw_part01.log", "line": 45})
+        self.assertEqual(incident["end"], {"segment": "raw_part01.log", "line": 53})
+        self.assertEqual((incident["errors"], incident["first_error_ns"]), (1, 50_000))
+
+    def test_overlapping_windows_are_merged(self) -> None:
+        recorder = self._recorder(before=5, after=3)
+        # The window of 50 ends at 53; the one of 57 would start at 52.
+        _feed(recorder, 200, {50, 57, 150})
+        self.assertEqual(len(self.incidents), 2)
+        merged = self.incidents[0]
+        self.assertEqual([line for _, _, line in merged["lines"]], [f"line {n}" for n in range(45, 61)])
+        self.assertEqual(merged["errors"], 2)
+        self.assertEqual(merged["last_error_ns"], 57_000)
+
+    def test_separate_windows_stay_apart(self) -> None:
+        recorder = self._recorder(before=5, after=3)
+        _feed(recorder, 200, {50, 70})
+        self.assertEqual([incident["id"] for incident in self.incidents], [1, 2])
+        self.assertEqual(self.incidents[1]["start"]["line"], 65)
+
+    def test_error_storm_is_bounded(self) -> None:
+        recorder = self._recorder(before=10, after=10, max_lines=100)
+        _feed(recorder, 50_000, set(range(100, 40_000)))
+        (incident,) = self.incidents
+        self.assertLessEqual(len(incident["lines"]), 101)
+        self.assertEqual(incident["errors"], 39_900)
+        self.assertEqual(incident["line_count"], 40_000 - 90 + 10)
+        self.assertEqual(incident["omitted"], incident["line_count"] - len(incident["lines"]))
+        self.assertEqual(incident["lines"][-1][2], "line 40009")
+        self.assertEqual(incident["end"]["line"], 40_009)
+
+    def test_flush_writes_the_open_incident(self) -> None:
+        recorder = self._recorder(before=2, after=50)
+        _feed(recorder, 10, {8})
+        self.assertEqual(self.incidents, [])
+        recorder.flush()
+        self.assertEqual(len(self.incidents), 1)
+        self.assertEqual(self.incidents[0]["line_count"], 4)
+
+    def test_incident_count_is_capped(self) -> None:
+        recorder = self._recorder(before=1, after=1, max_incidents=3)
+        _feed(recorder, 100, set(range(5, 100, 10)))
+        self.assertEqual(len(self.incidents), 3)
+        self.assertEqual(recorder.summary()["suppressed"], 7)
+
+
+class TestIncidentLog(unittest.TestCase):
+    def test_round_trip_and_torn_tail(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = Path(tmp)
+            log = IncidentLog(session_dir)
+            self.assertFalse(log.path.exists())
+            recorder = IncidentRecorder(log.append, before=2, after=2)
+            _feed(recorder, 100, {10, 11, 40})
+            log.close()
+            with log.path.open("a", encoding="utf-8") as handle:
+                handle.write('{"id": 3, "err')
+
+            self.assertEqual([record["id"] for record in read_incidents(session_dir)], [1, 2])
+            incident = read_incident(session_dir, 2)
+            self.assertEqual(incident["start"]["line"], 38)
+            self.assertIsNone(read_incident(session_dir, 3))
+            self.assertIsNone(read_incident(session_dir, 9))
+            self.assertFalse(log.append({"id": 4}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import random
+import unittest
+
+from next_logger.application.live_plot import LivePlotStore, MinMaxRing, extract_fields
+
+
+def _brute_force(values: list[float], window: int, width: int) -> tuple[float, float]:
+    recent = values[-window:]
+    return min(recent), max(recent)
+
+
+class TestExtractFields(unittest.TestCase):
+    def test_name_value_pairs(self) -> None:
+        self.assertEqual(
+            extract_fields("ch1.temp=21.5degC volt: -3.3V count=12 id=0x1F"),
+            [("ch1.temp", 21.5), ("volt", -3.3), ("count", 12.0), ("id", 0.0)],
+        )
+        self.assertEqual(extract_fields("boot complete"), [])
+        self.assertEqual(extract_fields("rate=1e3"), [("rate", 1000.0)])
+
+
+class TestMinMaxRing(unittest.TestCase):
+    def test_columns_cover_the_window_envelope(self) -> None:
+        generator = random.Random(7)
+        ring = MinMaxRing(levels=5)
+        values: list[float] = []
+        for count in (1, 3, 17, 64, 500, 1023, 1024, 1500, 5000):
+            while len(values) < count:
+                value = generator.uniform(-100, 100)
+                values.append(value)
+                ring.append(value)
+            for window in (1, 10, 200, 1024, 5000):
+                for width in (1, 7, 50):
+                    columns = ring.columns(window, width)
+                    self.assertLessEqual(len(columns), width)
+                    effective = min(window, count, ring.capacity)
+                    low = min(column[0] for column in columns)
+                    high = max(column[1] for column in columns)
+                    expected_low, expected_high = _brute_force(values, effective, width)
+                    # Columns may reach into the block holding the oldest sample, never past it.
+                    block = (count - effective) - (count - effective) % (4 ** 5)
+                    self.assertLessEqual(low, expected_low)
+                    self.assertGreaterEqual(high, expected_high)
+                    self.assertGreaterEqual(low, min(values[block:]))
+                    self.assertLessEqual(high, max(values[block:]))
+
+    def test_exact_columns_when_aligned(self) -> None:
+        ring = MinMaxRing(levels=4)
+        for value in range(256):
+            ring.append(float(value))
+        self.assertEqual(ring.columns(256, 4), [(0.0, 63.0), (64.0, 127.0), (128.0, 191.0), (192.0, 255.0)])
+        self.assertEqual(ring.columns(8, 100), [(float(value), float(value)) for value in range(248, 256)])
+
+    def test_query_cost_follows_width(self) -> None:
+        ring = MinMaxRing(levels=9)
+        for value in range(100_000):
+            ring.append(float(value % 1000))
+        columns = ring.columns(100_000, 300)
+        self.assertEqual(len(columns), 300)
+        self.assertEqual((columns[0][0], max(high for _, high in columns)), (0.0, 999.0))
+
+
+class TestLivePlotStore(unittest.TestCase):
+    def test_series_limit_and_version(self) -> None:
+        store = LivePlotStore(max_series=2, levels=3)
+        store.observe(["a=1 b=2", "boot", "c=3 a=4"])
+        self.assertEqual(store.names(), ["a", "b"])
+        self.assertEqual((store.ignored_fields, store.version), (1, 1))
+        store.observe(["nothing here"])
+        self.assertEqual(store.version, 1)
+
+        (series,) = store.snapshot(["a", "missing"], 100, 10)
+        self.assertEqual((series.name, series.last, series.count), ("a", 4.0, 2))
+        self.assertEqual(series.columns, [(1.0, 1.0), (4.0, 4.0)])
+
+
+if __name__ == "__main__":
+    unittest.main()
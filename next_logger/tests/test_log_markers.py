@@ -1,9 +1,61 @@
+import random
+import re
 import unittest
 
-from next_logger.application.log_markers import DEFAULT_CUSTOM_ERROR_KEYWORDS, classify_log_line
+from next_logger.application import log_markers
+from next_logger.application.log_markers import DEFAULT_CUSTOM_ERROR_KEYWORDS, LogMarkerResult, classify_log_line
 from next_logger.application.preflight import normalize_error_keywords
 
 
+def _words(tokens):
+    return [
+        (token.strip(), re.compile(rf"(?<![a-z0-9]){re.escape(token.strip().lower())}(?![a-z0-9])", re.IGNORECASE))
+        for token in tokens
+        if token.strip()
+    ]
+
+
+def _reference_classify(line, custom_error_keywords=()):
+    # classify_log_line as it was before the literal prefilter: every pattern is searched on every line.
+    prepared = line
+    for pattern in log_markers._NOISE_PATTERNS:
+        prepared = pattern.sub(" ", prepared)
+    regex = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in log_markers._ERROR_REGEX_PATTERNS}
+    warning_regex = {name: re.compile(pattern, re.IGNORECASE) for name, pattern in log_markers._WARNING_REGEX_PATTERNS}
+    custom = log_markers._normalize_custom_keywords(custom_error_keywords)
+
+    errors = [term for term, pattern in _words(log_markers.STANDARD_ERROR_KEYWORDS) if pattern.search(prepared)]
+    errors += [name for name, pattern in regex.items() if pattern.search(prepared)]
+    errors += [term for term, pattern in _words(custom) if pattern.search(prepared)]
+    if errors:
+        return LogMarkerResult(severity="error", matched_terms=tuple(dict.fromkeys(errors)))
+    warnings = [term for term, pattern in _words(log_markers.STANDARD_WARNING_KEYWORDS) if pattern.search(prepared)]
+    warnings += [name for name, pattern in warning_regex.items() if pattern.search(prepared)]
+    if warnings:
+        return LogMarkerResult(severity="warning", matched_terms=tuple(dict.fromkeys(warnings)))
+    return LogMarkerResult(severity="info", matched_terms=())
+
+
+def _random_line(rng):
+    fragments = [
+        *log_markers.STANDARD_ERROR_KEYWORDS,
+        *log_markers.STANDARD_WARNING_KEYWORDS,
+        "status=503", "code: 404", "http_status 500", "E1234", "err-42", "panic_007", "warn12", "notice-3",
+        "sigsegv", "SIGBUS", "stack  trace", "traceback (", "no errors", "error=0", "warnings: 0", "without error",
+        "NG", "異常", "ok", "value", "temp", "0", "5", "17",
+        "İ", "ı", "ſ", "K", "ERROR", "Tımeout", "faıled", "ſegfault", "Kill", "cRİTİCAL",
+    ]
+    separators = ["", " ", "_", "-", "=", ":", ",", "(", "\t", "/", "0"]
+    parts = []
+    for _ in range(rng.randint(1, 7)):
+        fragment = rng.choice(fragments)
+        if rng.random() < 0.3:
+            fragment = "".join(char.upper() if rng.random() < 0.5 else char for char in fragment)
+        parts.append(fragment)
+        parts.append(rng.choice(separators))
+    return "".join(parts)
+
+
 class TestLogMarkers(unittest.TestCase):
     def test_syslog_style_critical_is_error(self) -> None:
         result = classify_log_line("2026-03-01 [CRIT] sensor fault detected")
@@ -29,6 +81,21 @@ class TestLogMarkers(unittest.TestCase):
         result = classify_log_line("request failed status=500")
         self.assertEqual(result.severity, "error")
 
+    def test_prefilter_matches_unfiltered_classification(self) -> None:
+        rng = random.Random(20260301)
+        keyword_sets = [(), DEFAULT_CUSTOM_ERROR_KEYWORDS, ("NG", "異常", "over-temp", "ſtall"), ["alarm", " ALARM "]]
+        for _ in range(3000):
+            line = _random_line(rng)
+            for keywords in keyword_sets:
+                self.assertEqual(
+                    classify_log_line(line, keywords), _reference_classify(line, keywords), (line, keywords)
+                )
+
+    def test_case_folded_non_ascii_still_matches(self) -> None:
+        self.assertEqual(classify_log_line("Tımeout waiting for ack").severity, "warning")
+        self.assertEqual(classify_log_line("cRİTİCAL battery").severity, "error")
+        self.assertEqual(classify_log_line("ſegfault in handler").severity, "error")
+
     def test_default_keyword_normalization(self) -> None:
         self.assertEqual(normalize_error_keywords(""), DEFAULT_CUSTOM_ERROR_KEYWORDS)
 
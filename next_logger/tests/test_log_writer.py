@@ -1,10 +1,14 @@
+import csv
+from datetime import datetime
+import io
 import json
 from pathlib import Path
+import random
 import tempfile
 import unittest
 
 from next_logger.domain import ConnectionConfig, SessionConfig, SessionStats
-from next_logger.infrastructure.log_writer import SessionLogWriter
+from next_logger.infrastructure.log_writer import SessionLogWriter, _TimestampFormatter, _csv_record, _jsonl_record
 
 
 class TestSessionLogWriter(unittest.TestCase):
@@ -35,6 +39,94 @@ class TestSessionLogWriter(unittest.TestCase):
             self.assertEqual(payload["connection"]["port"], "COM9")
             self.assertEqual(payload["connection"]["reconnect_backoff_mode"], "exponential")
 
+    def test_csv_rows_are_written_in_binary_mode(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = SessionLogWriter(SessionConfig(save_dir=Path(tmp), log_format="csv", durability="none"))
+            writer.write_line(datetime(2026, 1, 1, 12, 0, 0), 'value "quoted", 測定', True)
+            writer.close(status="stopped", stats=SessionStats())
+
+            rows = list(csv.reader((writer.session_dir / "data_part01.csv").open(encoding="utf-8", newline="")))
+            self.assertEqual(rows[0], ["timestamp", "log", "is_error"])
+            self.assertEqual(rows[1], ["2026-01-01 12:00:00.000", 'value "quoted", 測定', "True"])
+            error_text = (writer.session_dir / "error_part01.log").read_text(encoding="utf-8")
+            self.assertEqual(error_text, '2026-01-01 12:00:00.000\tvalue "quoted", 測定\n')
+
+    def test_fast_formatters_match_stdlib_encoders(self) -> None:
+        rng = random.Random(1234)
+        alphabet = ['a', 'Z', ' ', ',', '"', "'", "\\", "\t", "\r", "\n", "測", "\x01", "{", "}"]
+        formatter = _TimestampFormatter()
+        for _ in range(500):
+            line = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+            is_error = rng.random() < 0.5
+            stamp = datetime(2026, 1, 1, 12, rng.randint(0, 59), rng.randint(0, 59), rng.randint(0, 999999))
+            ts = formatter.format(stamp)
+            self.assertEqual(ts, stamp.strftime("%Y-%m-%d %H:%M:%S.%f")[:-3])
+
+            buffer = io.StringIO()
+            csv.writer(buffer).writerow([ts, line, is_error])
+            self.assertEqual(_csv_record(ts, line, is_error), buffer.getvalue())
+            payload = {"timestamp": ts, "log": line, "is_error": is_error}
+            self.assertEqual(_jsonl_record(ts, line, is_error), json.dumps(payload, ensure_ascii=False) + "\n")
+
+    def test_write_lines_batches_all_files(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            writer = SessionLogWriter(SessionConfig(save_dir=Path(tmp), log_format="jsonl", durability="none"))
+            stamp = datetime(2026, 1, 1, 12, 0, 0, 5000)
+            self.assertTrue(writer.write_lines([(stamp, "ok", False), (stamp, "bad", True), (stamp, "ok2", False)]))
+            writer.close(status="stopped", stats=SessionStats())
+
+            raw = (writer.session_dir / "raw_part01.log").read_text(encoding="utf-8").splitlines()
+            data = (writer.session_dir / "data_part01.jsonl").read_text(encoding="utf-8").splitlines()
+            errors = (writer.session_dir / "error_part01.log").read_text(encoding="utf-8").splitlines()
+            self.assertEqual(raw, ["2026-01-01 12:00:00.005\tok", "2026-01-01 12:00:00.005\tbad", "2026-01-01 12:00:00.005\tok2"])
+            self.assertEqual([json.loads(item)["log"] for item in data], ["ok", "bad", "ok2"])
+            self.assertEqual(errors, ["2026-01-01 12:00:00.005\tbad"])
+
+    def test_nanosecond_timestamps_match_datetime_formatting(self) -> None:
+        rng = random.Random(99)
+        for resolution, digits in (("ms", 3), ("us", 6), ("ns", 9)):
+            formatter = _TimestampFormatter(resolution)
+            for _ in range(300):
+                wall_ns = rng.randint(1_700_000_000, 1_800_000_000) * 1_000_000_000 + rng.randint(0, 999_999_999)
+                second, nanosecond = divmod(wall_ns, 1_000_000_000)
+                expected = datetime.fromtimestamp(second).strftime("%Y-%m-%d %H:%M:%S.")
+                expected += f"{nanosecond:09d}"[:digits]
+                self.assertEqual(formatter.format_ns(wall_ns), expected)
+                stamp = datetime.fromtimestamp(second).replace(microsecond=nanosecond // 1000)
+                self.assertEqual(formatter.format(stamp)[:-digits], expected[:-digits])
+
+    def test_write_lines_ns_records_segment_time_range(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            config = SessionConfig(save_dir=Path(tmp), durability="none", timestamp_resolution="ns")
+            writer = SessionLogWriter(config)
+            base = 1_767_000_000_123_456_789
+            writer.write_lines_ns([(base, "a", False), (base + 7, "b", True)])
+            writer.rotate_segment()
+            writer.write_lines_ns([(base + 1_000, "c", False)])
+            manifest = json.loads(writer.close(status="stopped", stats=SessionStats()).read_text(encoding="utf-8"))
+
+            raw = (writer.session_dir / "raw_part01.log").read_text(encoding="utf-8").splitlines()
+            self.assertTrue(raw[0].endswith(".123456789\ta"))
+            self.assertTrue(raw[1].endswith(".123456796\tb"))
+            self.assertEqual(manifest["settings"]["timestamp_resolution"], "ns")
+            segments = manifest["segments"]
+            self.assertEqual((segments[0]["first_ns"], segments[0]["last_ns"]), (base, base + 7))
+            self.assertEqual((segments[1]["first_ns"], segments[1]["last_ns"]), (base + 1_000, base + 1_000))
+
+    def test_last_batch_start_counts_lines_per_segment(self) -> None:
+        for layout in ("split", "raw_only"):
+            with self.subTest(layout=layout), tempfile.TemporaryDirectory() as tmp:
+                config = SessionConfig(save_dir=Path(tmp), durability="none", storage_layout=layout)
+                writer = SessionLogWriter(config)
+                writer.write_lines_ns([(1, "a", False), (2, "b", True)])
+                self.assertEqual(writer.last_batch_start(), ("raw_part01.log", 0))
+                writer.write_lines_ns([(3, "c", False)])
+                self.assertEqual(writer.last_batch_start(), ("raw_part01.log", 2))
+                writer.rotate_segment()
+                writer.write_lines_ns([(4, "d", False)])
+                self.assertEqual(writer.last_batch_start(), ("raw_part02.log", 0))
+                writer.close(status="stopped", stats=SessionStats())
+
 
 if __name__ == "__main__":
-    unittest.main()
+    unittest.main()
@@ -58,6 +58,31 @@ class TestPreflight(unittest.TestCase):
             self.assertIn("保持セッション数は0以上で指定してください。", result.errors)
             self.assertIn("保持日数は0以上で指定してください。", result.errors)
 
+    def test_capture_validation(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = ConnectionConfig(port="COM9", baudrate=9600)
+            session = SessionConfig(
+                save_dir=Path(tmp),
+                capture_mode="triggered",
+                capture_pre_mb=0,
+                capture_trigger_regex="(unclosed",
+            )
+            result = run_preflight(conn, session, available_ports=["COM9"])
+            self.assertIn("トリガー前の保持量は1〜4096MBで指定してください。", result.errors)
+            self.assertTrue(any(error.startswith("トリガーの正規表現が不正です") for error in result.errors))
+
+    def test_decimation_validation(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            conn = ConnectionConfig(port="COM9", baudrate=9600)
+            session = SessionConfig(
+                save_dir=Path(tmp),
+                decimation_mode="sometimes",  # type: ignore[arg-type]
+                decimation_every_n=0,
+            )
+            result = run_preflight(conn, session, available_ports=["COM9"])
+            self.assertIn("間引きは off / every_n / bucket のいずれかを選択してください。", result.errors)
+            self.assertIn("間引きの間隔は1〜1000000行で指定してください。", result.errors)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,152 @@
+from datetime import datetime, timedelta
+from pathlib import Path
+import tempfile
+import time
+import unittest
+
+from next_logger.application.prompt_builder import (
+    LINE_MAX_CHARS,
+    PromptBuildWorker,
+    PromptLogBuilder,
+    estimate_tokens,
+    iter_prompt_records,
+)
+from next_logger.domain import SessionConfig, SessionStats
+from next_logger.infrastructure.log_writer import SessionLogWriter
+
+
+def _records(count: int, errors: dict[int, str] | None = None, warnings: dict[int, str] | None = None):
+    errors = errors or {}
+    warnings = warnings or {}
+    for index in range(count):
+        if index in errors:
+            yield f"t{index}", errors[index], "error"
+        elif index in warnings:
+            yield f"t{index}", warnings[index], "warning"
+        else:
+            yield f"t{index}", f"tick {index} temperature nominal", "info"
+
+
+class TestEstimateTokens(unittest.TestCase):
+    def test_wide_characters_cost_more(self) -> None:
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+        self.assertEqual(estimate_tokens("測定値異常"), 5)
+        self.assertEqual(estimate_tokens(""), 0)
+
+
+class TestPromptLogBuilder(unittest.TestCase):
+    def test_old_errors_are_kept_with_context(self) -> None:
+        builder = PromptLogBuilder(context_lines=2)
+        builder.add_records(_records(5000, errors={10: "ERROR disk 3 not ready"}))
+        text = builder.render(2000)
+        self.assertIn("t10 [ERROR] ERROR disk 3 not ready", text)
+        self.assertIn("t8 [INFO] tick 8 temperature nominal", text)
+        self.assertIn("t12 [INFO] tick 12 temperature nominal", text)
+        self.assertIn("全 5000 行（エラー 1 行 / 警告 0 行）から抜粋", text)
+
+    def test_output_stays_within_budget(self) -> None:
+        errors = {index: f"ERROR code {index} at unit {index % 7}" for index in range(0, 20000, 50)}
+        warnings = {index: f"WARN retry {index}" for index in range(25, 20000, 100)}
+        builder = PromptLogBuilder()
+        builder.add_records(_records(20000, errors, warnings))
+        for budget in (500, 2000, 8000):
+            self.assertLessEqual(estimate_tokens(builder.render(budget)), budget + 60)
+
+    def test_repeated_shapes_are_counted_once(self) -> None:
+        warnings = {index: f"WARN voltage low {index} mV" for index in range(0, 300, 3)}
+        builder = PromptLogBuilder()
+        builder.add_records(_records(300, warnings=warnings))
+        text = builder.render(4000)
+        self.assertIn("警告 100 回 (t0 〜 t297): WARN voltage low 0 mV", text)
+        self.assertEqual(text.count("[WARN]"), 1)
+
+    def test_first_and_latest_error_of_a_shape(self) -> None:
+        errors = {index: f"ERROR timeout after {index} ms" for index in (100, 200, 300, 400)}
+        builder = PromptLogBuilder(context_lines=0)
+        builder.add_records(_records(500, errors))
+        text = builder.render(300)
+        self.assertIn("ERROR timeout after 100 ms", text)
+        self.assertIn("ERROR timeout after 400 ms", text)
+        self.assertNotIn("ERROR timeout after 200 ms", text)
+        self.assertIn("エラー 4 回 (t100 〜 t400)", text)
+
+    def test_small_input_is_rendered_whole_and_collapsed(self) -> None:
+        builder = PromptLogBuilder()
+        builder.add_records(_records(8, errors={5: "ERROR fan stopped"}))
+        lines = builder.render(4000).split("\n")
+        self.assertEqual(lines[lines.index("[抜粋]") + 1 :], [
+            "t0 [INFO] tick 0 temperature nominal",
+            "  … 同じ形の行が 4 行続く",
+            "t5 [ERROR] ERROR fan stopped",
+            "t6 [INFO] tick 6 temperature nominal",
+            "t7 [INFO] tick 7 temperature nominal",
+        ])
+
+    def test_long_lines_are_clipped(self) -> None:
+        builder = PromptLogBuilder()
+        builder.add("t0", "ERROR " + "x" * 5000, "error")
+        text = builder.render(4000)
+        self.assertIn(f"…(+{5006 - LINE_MAX_CHARS}文字)", text)
+        self.assertLess(len(text), 1000)
+
+    def test_budget_too_small_for_context_keeps_error_line(self) -> None:
+        builder = PromptLogBuilder(context_lines=3)
+        builder.add_records((f"t{index}", "x" * 200, "info") for index in range(3))
+        builder.add("t3", "ERROR short", "error")
+        text = builder.render(80)
+        self.assertIn("t3 [ERROR] ERROR short", text)
+        self.assertLess(text.count("x" * 200), 3)
+        self.assertIn("上限のため省略: 通常行", text)
+
+
+class TestSessionPromptRecords(unittest.TestCase):
+    def test_reads_the_whole_session_and_restores_warnings(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            config = SessionConfig(save_dir=Path(tmp), durability="none")
+            writer = SessionLogWriter(config)
+            start = datetime(2026, 3, 1, 9, 0, 0)
+            lines = ["boot", "warning: fan slow", "ERROR sensor", "done"]
+            writer.write_lines([(start + timedelta(seconds=i), line, line.startswith("ERROR")) for i, line in enumerate(lines)])
+            writer.rotate_segment()
+            writer.write_lines([(start + timedelta(seconds=9), "ERROR sensor", True)])
+            writer.close(status="stopped", stats=SessionStats(received_lines=5))
+
+            records = list(iter_prompt_records(writer.session_dir, config.error_keywords))
+            self.assertEqual(
+                [(line, severity) for _, line, severity in records],
+                [("boot", "info"), ("warning: fan slow", "warning"), ("ERROR sensor", "error"), ("done", "info"),
+                 ("ERROR sensor", "error")],
+            )
+
+            worker = PromptBuildWorker(lambda: iter_prompt_records(writer.session_dir, config.error_keywords), 2000)
+            worker.start()
+            worker.join(10)
+            self.assertTrue(worker.finished)
+            self.assertEqual(worker.lines_read, 5)
+            self.assertIn("エラー 2 回", worker.text)
+
+    def test_worker_can_be_cancelled(self) -> None:
+        worker = PromptBuildWorker(lambda: _records(10_000_000), 2000)
+        worker.start()
+        time.sleep(0.05)
+        worker.cancel()
+        worker.join(10)
+        self.assertTrue(worker.finished)
+        self.assertTrue(worker.cancelled)
+        self.assertEqual(worker.text, "")
+
+    def test_worker_reports_unexpected_errors(self) -> None:
+        def broken_records():
+            yield "2026-03-01 09:00:00.000", "boot", "info"
+            raise RuntimeError("Corrupt frame in raw_part01.log")
+
+        worker = PromptBuildWorker(broken_records, 2000)
+        worker.start()
+        worker.join(10)
+        self.assertTrue(worker.finished)
+        self.assertEqual(worker.error, "Corrupt frame in raw_part01.log")
+        self.assertEqual(worker.text, "")
+
+
+if __name__ == "__main__":
+    unittest.main()
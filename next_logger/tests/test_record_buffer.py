@@ -0,0 +1,49 @@
+import unittest
+
+from next_logger.application.record_buffer import SEVERITY_ERROR, SEVERITY_WARNING, RecordBuffer
+
+
+def _event(index: int, severity: str = "info", terms: tuple[str, ...] = ()) -> dict[str, object]:
+    return {
+        "timestamp": "12:00:00",
+        "line": f"line {index}",
+        "is_error": severity == "error",
+        "severity": severity,
+        "marker_terms": list(terms),
+        "write_ok": True,
+    }
+
+
+class TestRecordBuffer(unittest.TestCase):
+    def test_line_limit_evicts_oldest_and_keeps_counts(self) -> None:
+        buffer = RecordBuffer(max_lines=3)
+        buffer.append_event(_event(0, "error", ("error",)))
+        buffer.append_event(_event(1, "warning", ("warn",)))
+        buffer.append_event(_event(2))
+        buffer.append_event(_event(3))
+
+        self.assertEqual([record.line for record in buffer], ["line 1", "line 2", "line 3"])
+        self.assertEqual(buffer.severity_count(SEVERITY_ERROR), 0)
+        self.assertEqual(buffer.severity_count(SEVERITY_WARNING), 1)
+
+    def test_memory_budget_is_enforced(self) -> None:
+        buffer = RecordBuffer(max_lines=1_000_000, memory_budget_bytes=10_000)
+        for index in range(1000):
+            buffer.append_event(_event(index))
+
+        self.assertLessEqual(buffer.memory_used, 10_000)
+        self.assertGreater(len(buffer), 0)
+        self.assertEqual(buffer.tail(1)[0].line, "line 999")
+
+    def test_marker_terms_are_interned(self) -> None:
+        buffer = RecordBuffer()
+        first = buffer.append_event(_event(0, "error", ("error", "fatal")))
+        second = buffer.append_event(_event(1, "error", ("error", "fatal")))
+
+        self.assertIs(first.term_ids, second.term_ids)
+        self.assertIs(first.timestamp, second.timestamp)
+        self.assertEqual(buffer.terms(second), ("error", "fatal"))
+
+
+if __name__ == "__main__":
+    unittest.main()
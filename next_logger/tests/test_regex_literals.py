@@ -0,0 +1,75 @@
+import random
+import re
+import unittest
+
+from next_logger.application.regex_literals import prefilter_literals, prefilter_text, required_literals
+
+
+class TestRequiredLiterals(unittest.TestCase):
+    def test_picks_longest_fixed_run(self) -> None:
+        self.assertEqual(required_literals(r"temp sensor \d+ overheat"), ("temp sensor ",))
+        self.assertEqual(required_literals(r"^boot (ok|done)$"), ("boot ",))
+        self.assertEqual(required_literals(r"ERR-\d{3}"), ("ERR-",))
+        self.assertEqual(required_literals(r"a\.b\(c\)"), ("a.b(c)",))
+
+    def test_quantified_characters_are_dropped(self) -> None:
+        self.assertEqual(required_literals(r"colou?r"), ("colo",))
+        self.assertEqual(required_literals(r"abcx*"), ("abc",))
+        self.assertEqual(required_literals(r"abcx+yz"), ("abcx",))
+        self.assertEqual(required_literals(r"ab{0,2}cd"), ("cd",))
+
+    def test_alternations_give_any_of_sets(self) -> None:
+        self.assertEqual(required_literals(r"warn|error"), ("warn", "error"))
+        self.assertEqual(
+            required_literals(r"\b(?:http(?:_status)?|status|code)\s*[:= ]\s*5\d\d\b"), ("http", "code", "status")
+        )
+        self.assertEqual(required_literals(r"\b(?:e|err|error|fatal)[-_]?\d{2,5}\b"), ("e", "fatal"))
+        self.assertEqual(required_literals(r"\bsig(?:abrt|segv|bus)\b"), ("sig",))
+
+    def test_unprovable_patterns_give_nothing(self) -> None:
+        self.assertEqual(required_literals(r"warn|"), ())
+        self.assertEqual(required_literals(r"\d+\s*[a-z]+"), ())
+        self.assertEqual(required_literals(r"(?x) a b c"), ())
+        self.assertEqual(required_literals(r"\x41\x42"), ())
+        self.assertEqual(required_literals(r"(?=abc)\w+"), ())
+        self.assertEqual(required_literals(r"(abc)?def"), ("def",))
+        self.assertEqual(required_literals(r"("), ())
+
+    def test_non_ascii_literals_do_not_prefilter(self) -> None:
+        self.assertEqual(prefilter_literals(["ERR", "Fault"]), ("err", "fault"))
+        self.assertEqual(prefilter_literals(["err", "異常"]), ())
+        self.assertEqual(prefilter_literals([]), ())
+
+    def test_prefilter_text_folds_like_ignorecase(self) -> None:
+        self.assertIn("critical", prefilter_text("CRİTİCAL"))
+        self.assertIn("failed", prefilter_text("faıled"))
+        self.assertIn("segfault", prefilter_text("ſegfault"))
+        self.assertIn("kill", prefilter_text("Kill"))
+
+    def test_literals_are_in_every_random_match(self) -> None:
+        patterns = [
+            r"fan speed \d+ rpm",
+            r"v(olt)?age drop",
+            r"code[:=]\s*E\d{2,4}",
+            r"[A-Z]{3}-\d+ failed",
+            r"retry #\d+ of \d+",
+            r"temp=\d+(\.\d+)?C",
+            r"(?:fan|pump) (?:stall|stop)",
+        ]
+        rng = random.Random(7)
+        alphabet = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789 .:=#-"
+        seeds = ["fan speed 1200 rpm", "voltage drop", "vage drop", "code=E123", "ABC-1 failed", "retry #2 of 3",
+                 "temp=21.5C", "pump stop", "fan stall"]
+        for pattern in patterns:
+            compiled = re.compile(pattern, re.IGNORECASE)
+            options = prefilter_literals(required_literals(pattern))
+            self.assertTrue(options, pattern)
+            for _ in range(300):
+                noise = "".join(rng.choice(alphabet) for _ in range(rng.randint(0, 12)))
+                line = noise + rng.choice(seeds).upper() + noise[::-1]
+                if compiled.search(line):
+                    self.assertTrue(any(option in prefilter_text(line) for option in options), (pattern, line))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -62,6 +62,78 @@ class TestRetentionPolicy(unittest.TestCase):
             self.assertEqual(result["removed_age"], 1)
             self.assertTrue(keep.exists())
 
+    def _create_sized_session(self, base: Path, name: str, age_sec: int, size: int, product: str, errors: int) -> Path:
+        import json
+        import os
+
+        path = base / name
+        path.mkdir(parents=True, exist_ok=True)
+        (path / "raw_part001.log").write_bytes(b"x" * (size - 1) + b"\n")
+        manifest = {"settings": {"product": product}, "stats": {"error_lines": errors}}
+        (path / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        stamp = datetime.now().timestamp() - age_sec
+        os.utime(path, (stamp, stamp))
+        return path
+
+    def test_quota_evicts_oldest_first(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            d1 = self._create_sized_session(base, "d1", 30, 4000, "A", 0)
+            d2 = self._create_sized_session(base, "d2", 20, 4000, "A", 0)
+            d3 = self._create_sized_session(base, "d3", 10, 4000, "A", 0)
+
+            result = apply_retention_policy(base, max_sessions=0, max_age_days=0, max_total_bytes=9000)
+
+            self.assertEqual(result["removed_quota"], 1)
+            self.assertFalse(d1.exists())
+            self.assertTrue(d2.exists())
+            self.assertTrue(d3.exists())
+
+    def test_quota_keep_errors_priority(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            with_errors = self._create_sized_session(base, "d1", 30, 4000, "A", 3)
+            clean = self._create_sized_session(base, "d2", 20, 4000, "A", 0)
+            newest = self._create_sized_session(base, "d3", 10, 4000, "A", 0)
+
+            apply_retention_policy(
+                base, max_sessions=0, max_age_days=0, max_total_bytes=9000, priority="keep_errors"
+            )
+
+            self.assertTrue(with_errors.exists())
+            self.assertFalse(clean.exists())
+            self.assertTrue(newest.exists())
+
+    def test_product_quota_only_affects_that_product(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            a_old = self._create_sized_session(base, "a1", 30, 4000, "A", 0)
+            a_new = self._create_sized_session(base, "a2", 20, 4000, "A", 0)
+            b_old = self._create_sized_session(base, "b1", 40, 4000, "B", 0)
+
+            result = apply_retention_policy(base, max_sessions=0, max_age_days=0, max_product_bytes=6000)
+
+            self.assertEqual(result["removed_quota"], 1)
+            self.assertFalse(a_old.exists())
+            self.assertTrue(a_new.exists())
+            self.assertTrue(b_old.exists())
+
+    def test_compress_tier_runs_before_delete(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            d1 = self._create_sized_session(base, "d1", 30, 40000, "A", 0)
+            d2 = self._create_sized_session(base, "d2", 20, 40000, "A", 0)
+
+            result = apply_retention_policy(
+                base, max_sessions=0, max_age_days=0, max_total_bytes=60000, compress_before_delete=True
+            )
+
+            self.assertEqual(result["compressed"], 1)
+            self.assertEqual(result["removed_quota"], 0)
+            self.assertTrue((d1 / "segments.nlz").exists())
+            self.assertFalse((d1 / "raw_part001.log").exists())
+            self.assertTrue((d2 / "raw_part001.log").exists())
+
 
 if __name__ == "__main__":
-    unittest.main()
+    unittest.main()
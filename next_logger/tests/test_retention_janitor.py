@@ -0,0 +1,107 @@
+import json
+import os
+from pathlib import Path
+import queue
+import tempfile
+import unittest
+
+from next_logger.infrastructure.retention_janitor import RetentionJanitor, RetentionJob
+from next_logger.infrastructure.session_catalog import SessionCatalog
+
+
+class TestRetentionJanitor(unittest.TestCase):
+    def _create_session(self, base: Path, name: str) -> Path:
+        path = base / name
+        (path / "nested").mkdir(parents=True)
+        (path / "raw_part01.log").write_text("x" * 100, encoding="utf-8")
+        (path / "nested" / "data.txt").write_text("y", encoding="utf-8")
+        (path / "manifest.json").write_text(json.dumps({}), encoding="utf-8")
+        stamp = 1_000_000_000
+        os.utime(path, (stamp, stamp))
+        return path
+
+    def test_deletes_in_background_and_respects_protected_dirs(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            old = self._create_session(base, "old")
+            active = self._create_session(base, "active")
+            kept = self._create_session(base, "kept")
+
+            events: queue.Queue[dict[str, object]] = queue.Queue()
+            janitor = RetentionJanitor(on_event=events.put, protected_dirs=lambda: {active})
+            queued = janitor.submit(
+                RetentionJob(base_dir=base, max_sessions=0, max_age_days=1, keep_dirs=frozenset({kept}))
+            )
+            self.assertTrue(queued)
+
+            while True:
+                event = events.get(timeout=5.0)
+                if event["type"] == "retention_done":
+                    break
+            janitor.stop()
+
+            self.assertEqual(event["retention"]["removed_age"], 1)
+            self.assertEqual(event["retention"]["freed_bytes"], 101 + 2)
+            self.assertFalse(old.exists())
+            self.assertTrue(active.exists())
+            self.assertTrue(kept.exists())
+
+    def test_failed_job_is_reported_and_the_janitor_keeps_running(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            old = self._create_session(base, "old")
+            calls = []
+
+            def protected_dirs() -> set[Path]:
+                calls.append(1)
+                if len(calls) == 1:
+                    raise OSError("catalog locked")
+                return set()
+
+            events: queue.Queue[dict[str, object]] = queue.Queue()
+            janitor = RetentionJanitor(on_event=events.put, protected_dirs=protected_dirs)
+            job = RetentionJob(base_dir=base, max_sessions=0, max_age_days=1)
+            done = []
+            self.assertTrue(janitor.submit(job))
+            self.assertTrue(janitor.submit(job))
+            while len(done) < 2:
+                event = events.get(timeout=5.0)
+                if event["type"] == "retention_done":
+                    done.append(event)
+            janitor.stop()
+            janitor.join(5.0)
+
+            self.assertEqual(done[0]["error"], "catalog locked")
+            self.assertNotIn("error", done[1])
+            self.assertEqual(done[1]["retention"]["removed_age"], 1)
+            self.assertFalse(old.exists())
+            self.assertFalse(janitor.submit(job))
+
+    def test_catalog_is_reconciled_once_per_folder(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp) / "logs"
+            base.mkdir()
+            old = self._create_session(base, "old")
+            # The catalog ages sessions by when their manifest was written.
+            os.utime(old / "manifest.json", (1_000_000_000, 1_000_000_000))
+            catalog = SessionCatalog(path=Path(tmp) / "catalog.sqlite3")
+            reconciled = []
+            reconcile = catalog.reconcile
+            catalog.reconcile = lambda path: reconciled.append(path) or reconcile(path)
+
+            events: queue.Queue[dict[str, object]] = queue.Queue()
+            janitor = RetentionJanitor(on_event=events.put, protected_dirs=set, catalog=catalog)
+            job = RetentionJob(base_dir=base, max_sessions=0, max_age_days=1)
+            for _ in range(2):
+                self.assertTrue(janitor.submit(job))
+                while events.get(timeout=5.0)["type"] != "retention_done":
+                    pass
+            janitor.stop()
+
+            # The session predates the catalog, so only reconciling can have found it.
+            self.assertFalse(old.exists())
+            self.assertEqual(reconciled, [base])
+
+
+if __name__ == "__main__":
+    unittest.main()
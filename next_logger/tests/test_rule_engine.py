@@ -0,0 +1,95 @@
+import json
+from pathlib import Path
+import random
+import tempfile
+import unittest
+
+from next_logger.application.log_markers import LogMarkerResult, classify_log_line
+from next_logger.application.rule_engine import RuleError, load_rules, parse_rules
+
+
+RULES = {
+    "rules": [
+        {"name": "brownout", "type": "keyword", "keywords": ["brownout", "undervoltage"], "severity": "error",
+         "tags": ["power"]},
+        {"name": "overheat", "type": "threshold", "field": "temp", "op": ">=", "value": 80, "tags": ["thermal"]},
+        {"name": "boot", "type": "regex", "pattern": r"boot (ok|done) in \d+ ms", "severity": "info",
+         "tags": ["boot"]},
+        {"name": "any_hex", "type": "regex", "pattern": r"\b[0-9a-f]{8}\b", "severity": "info"},
+        {"name": "Case", "type": "regex", "pattern": "MODE=SAFE", "ignore_case": False, "severity": "warning"},
+    ]
+}
+
+
+class TestRuleEngine(unittest.TestCase):
+    def test_rule_kinds_produce_severity_and_tags(self) -> None:
+        rules = parse_rules(RULES)
+        info = LogMarkerResult(severity="info", matched_terms=())
+
+        result = rules.apply("PSU brownout detected", info)
+        self.assertEqual(result.severity, "error")
+        self.assertEqual(result.tags, ("power",))
+
+        self.assertEqual(rules.apply("temp=85.5 fan=on", info).severity, "warning")
+        self.assertEqual(rules.apply("temp: 79 fan=on", info).severity, "info")
+        self.assertEqual(rules.apply("attempt=90", info), info)
+
+        result = rules.apply("boot done in 120 ms", info)
+        self.assertEqual((result.severity, result.matched_terms, result.tags), ("info", ("boot",), ("boot",)))
+        self.assertEqual(rules.apply("mode=safe", info), info)
+        self.assertEqual(rules.apply("MODE=SAFE", info).severity, "warning")
+
+    def test_rules_never_lower_builtin_severity(self) -> None:
+        rules = parse_rules(RULES)
+        marker = classify_log_line("ERROR boot done in 5 ms")
+        result = rules.apply("ERROR boot done in 5 ms", marker)
+        self.assertEqual(result.severity, "error")
+        self.assertEqual(result.matched_terms[-1], "boot")
+
+    def test_prefilter_matches_brute_force(self) -> None:
+        rules = parse_rules(RULES)
+        self.assertEqual(rules.summary()["prefiltered"], 4)
+        rng = random.Random(11)
+        pieces = ["brownout", "BROWNOUT", "temp=", "TEMP:", "99", "12", "boot ok in 3 ms", "0xdeadbeef", "MODE=SAFE",
+                  "mode=safe", "undervoltage", "x", " ", "=", "K", "K", "İ", "temp =90"]
+        for _ in range(3000):
+            line = "".join(rng.choice(pieces) for _ in range(rng.randint(1, 6)))
+            expected = [rule.name for rule in rules.rules if rule.confirm(line)]
+            self.assertEqual([rule.name for rule in rules.match(line)], expected, line)
+
+    def test_invalid_rules_are_reported(self) -> None:
+        cases = [
+            {"rules": [{"type": "keyword", "keywords": ["a"]}]},
+            {"rules": [{"name": "a", "type": "nope"}]},
+            {"rules": [{"name": "a", "type": "regex", "pattern": "("}]},
+            {"rules": [{"name": "a", "type": "threshold", "field": "t", "op": "~", "value": 1}]},
+            {"rules": [{"name": "a", "type": "threshold", "field": "t", "value": "hot"}]},
+            {"rules": [{"name": "a", "keywords": ["x"]}, {"name": "a", "keywords": ["y"]}]},
+            {"rules": "x"},
+        ]
+        for data in cases:
+            with self.subTest(data=data), self.assertRaises(RuleError):
+                parse_rules(data)
+
+    def test_load_and_profile(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "rules.json"
+            path.write_text(json.dumps(RULES), encoding="utf-8")
+            rules = load_rules(path)
+            with self.assertRaises(RuleError):
+                load_rules(Path(tmp) / "missing.json")
+
+        ticks = iter(range(0, 10**9, 10))
+        report = rules.profile(
+            ["brownout", "temp=90", "nothing here", "boot ok in 1 ms"] * 5, clock=lambda: next(ticks)
+        )
+        self.assertEqual(report.lines, 20)
+        by_name = {cost.name: cost for cost in report.rules}
+        self.assertEqual(by_name["brownout"].candidates, 5)
+        self.assertEqual(by_name["brownout"].matches, 5)
+        self.assertEqual(by_name["any_hex"].candidates, 20)
+        self.assertEqual(report.rules[0].name, "any_hex")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+from pathlib import Path
+import tempfile
+import unittest
+
+from next_logger.infrastructure.scrollback import SessionScrollback
+from next_logger.infrastructure.session_archive import archive_session
+
+
+def _write_raw(path: Path, start: int, count: int) -> None:
+    with path.open("a", encoding="utf-8", newline="") as handle:
+        for index in range(start, start + count):
+            handle.write(f"2026-01-01 00:00:00.{index % 1000:03d}\tline {index}\n")
+
+
+class TestSessionScrollback(unittest.TestCase):
+    def test_reads_pages_across_segments_and_growth(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            _write_raw(base / "raw_part01.log", 0, 1000)
+            _write_raw(base / "raw_part02.log", 1000, 500)
+
+            scrollback = SessionScrollback(base)
+            self.assertEqual(scrollback.refresh(), 1500)
+
+            page = scrollback.read_lines(990, 20)
+            self.assertEqual([line for _, line in page], [f"line {index}" for index in range(990, 1010)])
+            self.assertEqual(page[0][0], "2026-01-01 00:00:00.990")
+
+            _write_raw(base / "raw_part02.log", 1500, 300)
+            with (base / "raw_part02.log").open("a", encoding="utf-8") as handle:
+                handle.write("2026-01-01 00:00:00.000\tpartial")
+            self.assertEqual(scrollback.refresh(), 1800)
+            self.assertEqual(scrollback.read_lines(1799, 5), [("2026-01-01 00:00:00.799", "line 1799")])
+
+    def test_find_returns_global_line_number(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            _write_raw(base / "raw_part01.log", 0, 600)
+            _write_raw(base / "raw_part02.log", 600, 600)
+
+            scrollback = SessionScrollback(base)
+            scrollback.refresh()
+            self.assertEqual(scrollback.find("LINE 777"), 777)
+            self.assertEqual(scrollback.find("line 1", start_line=200), 1000)
+            self.assertIsNone(scrollback.find("missing"))
+
+    def test_reads_archived_session(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            _write_raw(base / "raw_part01.log", 0, 3000)
+            _write_raw(base / "raw_part02.log", 3000, 1000)
+            archive_session(base, frame_size=8192)
+
+            scrollback = SessionScrollback(base)
+            self.assertEqual(scrollback.refresh(), 4000)
+            page = scrollback.read_lines(2990, 20)
+            self.assertEqual([line for _, line in page], [f"line {index}" for index in range(2990, 3010)])
+            self.assertEqual(scrollback.find("line 3500", start_line=100), 3500)
+            self.assertEqual(scrollback.find("line 12"), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,10 @@
 import unittest
+from unittest import mock
 
-from next_logger.infrastructure.serial_worker import compute_backoff_delay
+import serial
+
+from next_logger.domain import ConnectionConfig
+from next_logger.infrastructure.serial_worker import LineSplitter, SerialWorker, compute_backoff_delay
 
 
 class TestBackoffDelay(unittest.TestCase):
@@ -14,5 +18,58 @@ class TestBackoffDelay(unittest.TestCase):
         self.assertEqual(compute_backoff_delay(1.0, attempt=5, mode="exponential", max_interval_sec=10.0), 10.0)
 
 
+class TestLineSplitter(unittest.TestCase):
+    def test_lines_carry_the_arrival_time_of_their_first_byte(self) -> None:
+        splitter = LineSplitter()
+
+        self.assertEqual(splitter.feed(b"alpha\r\nbe", 100), [(100, "alpha")])
+        self.assertEqual(splitter.feed(b"ta\n\ngamma\n", 250), [(100, "beta"), (250, "gamma")])
+        self.assertEqual(splitter.feed(b"partial", 300), [])
+        self.assertEqual(splitter.flush(), [(300, "partial")])
+        self.assertEqual(splitter.flush(), [])
+
+    def test_runaway_line_is_cut_at_the_pending_limit(self) -> None:
+        splitter = LineSplitter(max_pending=8)
+
+        self.assertEqual(splitter.feed(b"0123456789", 5), [(5, "0123456789")])
+        self.assertEqual(splitter.feed(b"ok\n", 6), [(6, "ok")])
+
+
+class _UnpluggedSerial:
+    in_waiting = 0
+
+    def __init__(self, **kwargs) -> None:
+        self._reads = [b"ok\npart"]
+
+    def __enter__(self) -> "_UnpluggedSerial":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+    def read(self, size: int) -> bytes:
+        if not self._reads:
+            raise serial.SerialException("device disconnected")
+        return self._reads.pop(0)
+
+
+class TestSerialWorker(unittest.TestCase):
+    def test_partial_line_is_delivered_before_a_read_error(self) -> None:
+        delivered: list[str] = []
+        errors: list[str] = []
+        worker = SerialWorker(
+            ConnectionConfig(port="COM1", auto_reconnect=False),
+            on_open=lambda: None,
+            on_lines=lambda batch: delivered.extend(line for _, line in batch),
+            on_error=errors.append,
+            on_reconnect=lambda *args: None,
+        )
+        with mock.patch.object(serial, "Serial", _UnpluggedSerial):
+            worker.run()
+
+        self.assertEqual(delivered, ["ok", "part"])
+        self.assertEqual(len(errors), 1)
+
+
 if __name__ == "__main__":
-    unittest.main()
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from pathlib import Path
+import tempfile
+from unittest import mock
+
+from next_logger.infrastructure.session_archive import (
+    MAX_LINE_FRAMES,
+    ArchiveError,
+    SessionArchive,
+    archive_path,
+    archive_session,
+    has_loose_segments,
+    is_archived,
+)
+
+
+class TestSessionArchive(unittest.TestCase):
+    def test_roundtrip_replaces_segments(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = Path(tmp)
+            raw = "".join(f"2024-01-01 00:00:00.000\tline {i}\n" for i in range(5000)).encode("utf-8")
+            (session_dir / "raw_part001.log").write_bytes(raw)
+            (session_dir / "error_part001.log").write_bytes(b"")
+            (session_dir / "manifest.json").write_text("{}", encoding="utf-8")
+
+            archive_session(session_dir, frame_size=4096)
+
+            self.assertTrue(is_archived(session_dir))
+            self.assertFalse((session_dir / "raw_part001.log").exists())
+            self.assertTrue((session_dir / "manifest.json").exists())
+
+            archive = SessionArchive(archive_path(session_dir))
+            self.assertEqual(archive.read_file("raw_part001.log"), raw)
+            self.assertEqual(archive.line_count("raw_part001.log"), 5000)
+            self.assertGreater(archive.frame_count("raw_part001.log"), 1)
+
+            frame = archive.read_frame("raw_part001.log", 2)
+            first = archive.frame_first_line("raw_part001.log", 2)
+            self.assertTrue(frame.startswith(f"2024-01-01 00:00:00.000\tline {first}\n".encode("utf-8")))
+            self.assertTrue(frame.endswith(b"\n"))
+
+    def test_rejects_truncated_archive(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = Path(tmp)
+            (session_dir / "raw_part001.log").write_bytes(b"a\nb\n" * 1000)
+            archive_session(session_dir)
+            path = archive_path(session_dir)
+            path.write_bytes(path.read_bytes()[:-4])
+
+            with self.assertRaises(ArchiveError):
+                SessionArchive(path)
+
+    def test_frames_only_split_overlong_lines(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = Path(tmp)
+            long_line = b"z" * 9000
+            raw = b"short\n" + long_line + b"\n" + b"x" * 50_000 + b"\nafter\n" + b"y" * 9000
+            (session_dir / "raw_part001.log").write_bytes(raw)
+            archive_session(session_dir, frame_size=1024)
+
+            archive = SessionArchive(archive_path(session_dir))
+            self.assertEqual(archive.read_file("raw_part001.log"), raw)
+            limit = 1024 * MAX_LINE_FRAMES
+            seen = b""
+            frames = []
+            for index in range(archive.frame_count("raw_part001.log")):
+                frame = archive.read_frame("raw_part001.log", index)
+                self.assertEqual(archive.frame_first_line("raw_part001.log", index), seen.count(b"\n"))
+                frames.append(frame)
+                seen += frame
+            # A line up to the limit stays whole; the 50 000 byte one is cut at the limit, and only the
+            # unterminated last line ends a frame without a newline otherwise.
+            self.assertIn(long_line + b"\n", frames)
+            self.assertEqual(
+                [len(frame) for frame in frames if not frame.endswith(b"\n")], [limit, limit, limit, 9000]
+            )
+
+    def test_open_source_is_removed_on_a_later_pass(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = Path(tmp)
+            raw = b"a\nb\n" * 1000
+            source = session_dir / "raw_part001.log"
+            source.write_bytes(raw)
+            real_unlink = Path.unlink
+
+            def locked_unlink(path: Path, missing_ok: bool = False) -> None:
+                if path.name == source.name:
+                    raise PermissionError("in use")
+                real_unlink(path, missing_ok)
+
+            with mock.patch.object(Path, "unlink", locked_unlink):
+                archive_session(session_dir)
+            self.assertTrue(is_archived(session_dir))
+            self.assertTrue(has_loose_segments(session_dir))
+
+            archive_session(session_dir)
+            self.assertFalse(source.exists())
+            self.assertFalse(has_loose_segments(session_dir))
+            self.assertEqual(SessionArchive(archive_path(session_dir)).read_file(source.name), raw)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+from pathlib import Path
+import queue
+import sqlite3
+import tempfile
+import unittest
+
+from next_logger.infrastructure.session_archive import is_archived
+from next_logger.infrastructure.session_archiver import SessionArchiver
+
+
+class TestSessionArchiver(unittest.TestCase):
+    def _create_session(self, base: Path, name: str, closed: bool = True) -> Path:
+        path = base / name
+        path.mkdir(parents=True)
+        (path / "raw_part01.log").write_text("2026-01-01 00:00:00.000\tline\n" * 500, encoding="utf-8")
+        if closed:
+            (path / "manifest.json").write_text(json.dumps({}), encoding="utf-8")
+        return path
+
+    def test_archives_closed_sessions_only(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            closed = self._create_session(base, "closed")
+            active = self._create_session(base, "active")
+            self._create_session(base, "open", closed=False)
+
+            events: queue.Queue[dict[str, object]] = queue.Queue()
+            archiver = SessionArchiver(on_event=events.put, protected_dirs=lambda: {active}, duty_cycle=1.0)
+            self.assertEqual(archiver.submit_closed(base), 1)
+
+            event = events.get(timeout=5.0)
+            archiver.stop()
+
+            self.assertEqual(event["type"], "archive_done")
+            self.assertTrue(event["ok"])
+            self.assertTrue(is_archived(closed))
+            self.assertFalse((closed / "raw_part01.log").exists())
+            self.assertFalse(is_archived(active))
+            self.assertFalse(is_archived(base / "open"))
+
+    def test_failing_catalog_is_reported_and_the_queue_keeps_moving(self) -> None:
+        class _BrokenCatalog:
+            def __init__(self) -> None:
+                self.calls = 0
+
+            def update_size(self, path: Path, size: int, archived: bool = False) -> None:
+                self.calls += 1
+                if self.calls == 1:
+                    raise sqlite3.OperationalError("database is locked")
+
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            first = self._create_session(base, "a")
+            second = self._create_session(base, "b")
+
+            events: queue.Queue[dict[str, object]] = queue.Queue()
+            archiver = SessionArchiver(
+                on_event=events.put, protected_dirs=set, catalog=_BrokenCatalog(), duty_cycle=1.0
+            )
+            self.assertTrue(archiver.submit(first))
+            self.assertTrue(archiver.submit(second))
+            failed = events.get(timeout=5.0)
+            done = events.get(timeout=5.0)
+            archiver.stop()
+
+            self.assertEqual((failed["ok"], failed["error"]), (False, "database is locked"))
+            self.assertEqual(done["session_dir"], str(second))
+            self.assertTrue(done["ok"])
+            self.assertTrue(is_archived(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
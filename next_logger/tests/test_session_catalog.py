@@ -0,0 +1,108 @@
+import json
+import os
+from pathlib import Path
+import tempfile
+import unittest
+
+from next_logger.domain import SessionConfig, SessionStats
+from next_logger.infrastructure.log_writer import SessionLogWriter
+from next_logger.infrastructure.retention import apply_retention_policy
+from next_logger.infrastructure.session_catalog import SessionCatalog
+
+
+class TestSessionCatalog(unittest.TestCase):
+    def test_writer_close_records_session(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp) / "logs"
+            catalog = SessionCatalog(path=Path(tmp) / "catalog.sqlite3")
+            writer = SessionLogWriter(SessionConfig(save_dir=base, product="P1", serial_number="SN1"), catalog=catalog)
+            writer.close(status="stopped", stats=SessionStats(received_lines=5, error_lines=2))
+
+            entries = catalog.list_sessions(base)
+            self.assertEqual(len(entries), 1)
+            self.assertEqual(entries[0].product, "P1")
+            self.assertEqual(entries[0].serial_number, "SN1")
+            self.assertEqual(entries[0].received_lines, 5)
+            self.assertEqual(entries[0].error_lines, 2)
+            self.assertEqual(catalog.list_sessions(base, product="other"), [])
+
+    def test_rebuild_and_retention_use_index(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp) / "logs"
+            for age, name in enumerate(("s3", "s2", "s1")):
+                session_dir = base / name
+                session_dir.mkdir(parents=True)
+                manifest = {"session": {"status": "stopped"}, "settings": {"product": name}}
+                manifest_path = session_dir / "manifest.json"
+                manifest_path.write_text(json.dumps(manifest), encoding="utf-8")
+                stamp = 1_700_000_000 - age * 60
+                os.utime(manifest_path, (stamp, stamp))
+            catalog = SessionCatalog(path=Path(tmp) / "catalog.sqlite3")
+
+            self.assertEqual(catalog.rebuild(base), 3)
+            oldest = catalog.list_sessions(base)[0].session_dir
+            self.assertEqual(oldest.name, "s1")
+
+            result = apply_retention_policy(base, max_sessions=2, max_age_days=0, catalog=catalog)
+
+            self.assertEqual(result["removed_count"], 1)
+            self.assertFalse(oldest.exists())
+            self.assertEqual(len(catalog.list_sessions(base)), 2)
+
+    def test_reconcile_adds_missing_sessions_and_drops_gone_ones(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp) / "logs"
+            catalog = SessionCatalog(path=Path(tmp) / "catalog.sqlite3")
+            for age, name in enumerate(("s3", "s2", "gone", "s1")):
+                session_dir = base / name
+                session_dir.mkdir(parents=True)
+                manifest_path = session_dir / "manifest.json"
+                manifest_path.write_text("{}", encoding="utf-8")
+                stamp = 1_700_000_000 - age * 60
+                os.utime(manifest_path, (stamp, stamp))
+                if name != "s1":
+                    # s1 predates the catalog (or its insert failed); "gone" was deleted by someone else.
+                    catalog.record_manifest(manifest_path)
+            (base / "gone" / "manifest.json").unlink()
+            (base / "gone").rmdir()
+
+            self.assertEqual(catalog.reconcile(base), 2)
+            self.assertEqual(catalog.reconcile(base), 0)
+            result = apply_retention_policy(base, max_sessions=2, max_age_days=0, catalog=catalog)
+
+            self.assertEqual(result["removed_count"], 1)
+            self.assertFalse((base / "s1").exists())
+            self.assertEqual([entry.session_dir.name for entry in catalog.list_sessions(base)], ["s2", "s3"])
+
+    def test_quota_uses_cached_sizes_and_records_compression(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp) / "logs"
+            for age, name in enumerate(("s2", "s1")):
+                session_dir = base / name
+                session_dir.mkdir(parents=True)
+                (session_dir / "raw_part001.log").write_bytes(b"line\n" * 10000)
+                manifest_path = session_dir / "manifest.json"
+                manifest_path.write_text("{}", encoding="utf-8")
+                stamp = 1_700_000_000 - age * 60
+                os.utime(manifest_path, (stamp, stamp))
+            catalog = SessionCatalog(path=Path(tmp) / "catalog.sqlite3")
+            catalog.rebuild(base)
+
+            result = apply_retention_policy(
+                base,
+                max_sessions=0,
+                max_age_days=0,
+                catalog=catalog,
+                max_total_bytes=80000,
+                compress_before_delete=True,
+            )
+
+            self.assertEqual(result["compressed"], 1)
+            entries = catalog.list_sessions(base)
+            self.assertTrue(entries[0].archived)
+            self.assertLess(entries[0].size_bytes, 50000)
+            self.assertFalse(entries[1].archived)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+from datetime import datetime, timedelta
+import io
+import json
+from pathlib import Path
+import tempfile
+import unittest
+
+from next_logger.cli import run_cli
+from next_logger.domain import SessionConfig, SessionStats
+from next_logger.infrastructure.log_writer import SessionLogWriter
+from next_logger.infrastructure.session_archive import archive_session
+from next_logger.infrastructure.session_export import export_session, storage_layout
+
+
+def _records() -> list[tuple[datetime, str, bool]]:
+    start = datetime(2026, 3, 1, 9, 0, 0)
+    lines = ["boot", 'value "quoted", 測定', "ERROR sensor", "tab\there", "boot", "ERROR sensor", "done"]
+    return [(start + timedelta(milliseconds=index * 7), line, line.startswith("ERROR")) for index, line in enumerate(lines)]
+
+
+def _write_session(base_dir: Path, layout: str, log_format: str = "txt") -> Path:
+    config = SessionConfig(save_dir=base_dir / layout, log_format=log_format, durability="none", storage_layout=layout)
+    writer = SessionLogWriter(config)
+    records = _records()
+    writer.write_lines(records[:4])
+    writer.rotate_segment()
+    writer.write_lines(records[4:])
+    writer.close(status="stopped", stats=SessionStats(received_lines=len(records)))
+    return writer.session_dir
+
+
+def _export(session_dir: Path, log_format: str | None = None, errors_only: bool = False) -> bytes:
+    output = io.BytesIO()
+    export_session(session_dir, output, log_format, errors_only)
+    return output.getvalue()
+
+
+class TestSessionExport(unittest.TestCase):
+    def test_split_export_matches_written_views(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            for log_format, suffix in (("txt", ".txt"), ("csv", ".csv"), ("jsonl", ".jsonl")):
+                with self.subTest(log_format=log_format):
+                    session_dir = _write_session(Path(tmp) / log_format, "split", log_format)
+                    data = b"".join((session_dir / f"data_part{i:02d}{suffix}").read_bytes() for i in (1, 2))
+                    if log_format == "csv":
+                        # Each segment carries its own header; the export writes one.
+                        data = data.replace(b"timestamp,log,is_error\r\n", b"")
+                        data = b"timestamp,log,is_error\r\n" + data
+                    self.assertEqual(_export(session_dir), data)
+
+                    errors = b"".join((session_dir / f"error_part{i:02d}.log").read_bytes() for i in (1, 2))
+                    self.assertEqual(_export(session_dir, "raw", errors_only=True), errors)
+
+    def test_raw_only_layout_exports_the_same_views(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            split_dir = _write_session(Path(tmp), "split")
+            raw_dir = _write_session(Path(tmp), "raw_only")
+
+            self.assertEqual(sorted(p.name for p in raw_dir.glob("data_*")), [])
+            self.assertEqual(sorted(p.name for p in raw_dir.glob("error_*")), ["error_part01.idx", "error_part02.idx"])
+            self.assertEqual((raw_dir / "error_part01.idx").read_text(encoding="utf-8"), "2\n")
+            self.assertEqual((raw_dir / "error_part02.idx").read_text(encoding="utf-8"), "1\n")
+            manifest = json.loads((raw_dir / "manifest.json").read_text(encoding="utf-8"))
+            self.assertEqual(manifest["settings"]["storage_layout"], "raw_only")
+            self.assertNotIn("data", manifest["segments"][0])
+            self.assertEqual(storage_layout(raw_dir), "raw_only")
+            self.assertEqual(storage_layout(split_dir), "split")
+
+            for log_format in ("raw", "txt", "csv", "jsonl"):
+                with self.subTest(log_format=log_format):
+                    self.assertEqual(_export(raw_dir, log_format), _export(split_dir, log_format))
+                    self.assertEqual(
+                        _export(raw_dir, log_format, errors_only=True),
+                        _export(split_dir, log_format, errors_only=True),
+                    )
+
+    def test_exports_archived_session(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = _write_session(Path(tmp), "raw_only")
+            before = _export(session_dir, "jsonl")
+            archive_session(session_dir, frame_size=64)
+
+            self.assertFalse((session_dir / "error_part01.idx").exists())
+            self.assertEqual(_export(session_dir, "jsonl"), before)
+
+    def test_cli_export_writes_file(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = _write_session(Path(tmp), "raw_only")
+            output = Path(tmp) / "out.csv"
+
+            code = run_cli(["export", str(session_dir), "--format", "csv", "--errors-only", "-o", str(output)])
+
+            self.assertEqual(code, 0)
+            rows = output.read_text(encoding="utf-8").splitlines()
+            self.assertEqual(rows[0], "timestamp,log,is_error")
+            self.assertEqual(rows[1:], ["2026-03-01 09:00:00.014,ERROR sensor,True", "2026-03-01 09:00:00.035,ERROR sensor,True"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,163 @@
+from datetime import datetime, timedelta
+import importlib.util
+import io
+from pathlib import Path
+import tempfile
+import threading
+import unittest
+
+from next_logger.domain import SessionConfig, SessionStats
+from next_logger.infrastructure.log_writer import SessionLogWriter
+from next_logger.infrastructure.session_archive import archive_session
+from next_logger.infrastructure.session_export import (
+    ExportCancelled,
+    SessionExporter,
+    export_session,
+    export_session_parallel,
+    plan_export,
+)
+
+
+def _write_session(base_dir: Path, layout: str) -> Path:
+    config = SessionConfig(save_dir=base_dir / layout, durability="none", storage_layout=layout)
+    writer = SessionLogWriter(config)
+    start = datetime(2026, 4, 1, 8, 0, 0)
+    for segment in range(2):
+        writer.write_lines(
+            [
+                (start + timedelta(milliseconds=index), f"s{segment} value {index % 40}, \"q\"", index % 9 == 0)
+                for index in range(3000)
+            ]
+        )
+        writer.rotate_segment()
+    writer.close(status="stopped", stats=SessionStats(received_lines=6000))
+    return writer.session_dir
+
+
+def _sequential(session_dir: Path, log_format: str, errors_only: bool = False) -> bytes:
+    output = io.BytesIO()
+    export_session(session_dir, output, log_format, errors_only)
+    return output.getvalue()
+
+
+class TestSessionExporter(unittest.TestCase):
+    def test_units_split_on_line_boundaries(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = _write_session(Path(tmp), "raw_only")
+            units = plan_export(session_dir, chunk_bytes=10_000)
+
+            self.assertGreater(len(units), 4)
+            raw = (session_dir / "raw_part01.log").read_bytes()
+            first = [unit for unit in units if unit.raw_name == "raw_part01.log"]
+            self.assertEqual(first[-1].end, len(raw))
+            for unit in first:
+                self.assertTrue(unit.start == 0 or raw[unit.start - 1 : unit.start] == b"\n")
+                self.assertEqual(raw[: unit.start].count(b"\n"), unit.first_line)
+
+    def test_parallel_output_matches_sequential_export(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            for layout in ("split", "raw_only"):
+                session_dir = _write_session(Path(tmp), layout)
+                for log_format, errors_only, workers in (("csv", False, 1), ("jsonl", True, 1), ("csv", True, 2)):
+                    with self.subTest(layout=layout, log_format=log_format, workers=workers):
+                        output = Path(tmp) / f"{layout}_{log_format}_{workers}.out"
+                        count = export_session_parallel(
+                            session_dir, output, log_format, errors_only, workers=workers, chunk_bytes=20_000
+                        )
+                        expected = _sequential(session_dir, log_format, errors_only)
+                        self.assertEqual(output.read_bytes(), expected)
+                        self.assertEqual(count, len(expected.splitlines()) - (1 if log_format == "csv" else 0))
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir() if p.name.startswith(".")), [])
+
+    def test_archived_session_is_split_by_frames(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = _write_session(Path(tmp), "raw_only")
+            expected = _sequential(session_dir, "raw")
+            archive_session(session_dir, frame_size=4096)
+
+            units = plan_export(session_dir, chunk_bytes=16_000)
+            self.assertTrue(all(unit.archived for unit in units))
+            self.assertGreater(len(units), 2)
+            output = Path(tmp) / "archived.log"
+            export_session_parallel(session_dir, output, "raw", workers=1, chunk_bytes=16_000)
+            self.assertEqual(output.read_bytes(), expected)
+
+    def test_split_layout_units_find_their_share_of_the_error_log(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            config = SessionConfig(save_dir=Path(tmp) / "dup", durability="none", storage_layout="split")
+            writer = SessionLogWriter(config)
+            stamp = datetime(2026, 4, 1, 8, 0, 0)
+            # Identical lines within one tick, only some of them errors, and one long tick that spans several
+            # units: matching by content alone would flag every copy.
+            records = [(stamp + timedelta(milliseconds=index // 7), "tick", index % 5 == 0) for index in range(3000)]
+            records += [(stamp + timedelta(seconds=5), "burst", index % 300 == 0) for index in range(2000)]
+            writer.write_lines(records)
+            writer.close(status="stopped", stats=SessionStats(received_lines=len(records)))
+            session_dir = writer.session_dir
+            expected = _sequential(session_dir, "jsonl")
+
+            self.assertGreater(len(plan_export(session_dir, chunk_bytes=8_000)), 8)
+            for name in ("loose.jsonl", "archived.jsonl"):
+                if name == "archived.jsonl":
+                    archive_session(session_dir, frame_size=4096)
+                output = Path(tmp) / name
+                export_session_parallel(session_dir, output, "jsonl", workers=1, chunk_bytes=8_000)
+                self.assertEqual(output.read_bytes(), expected)
+
+    def test_progress_and_cancel(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = _write_session(Path(tmp), "split")
+            reports = []
+            export_session_parallel(
+                session_dir, Path(tmp) / "a.txt", "txt", workers=1, chunk_bytes=20_000, progress=reports.append
+            )
+            self.assertEqual([p.units_done for p in reports], list(range(1, len(reports) + 1)))
+            self.assertEqual(reports[-1].bytes_done, reports[-1].bytes_total)
+            self.assertEqual(reports[-1].lines, 6000)
+
+            cancel = threading.Event()
+            cancel.set()
+            with self.assertRaises(ExportCancelled):
+                export_session_parallel(
+                    session_dir, Path(tmp) / "b.txt", "txt", workers=1, chunk_bytes=20_000, cancel_event=cancel
+                )
+            self.assertFalse((Path(tmp) / "b.txt").exists())
+            self.assertFalse((Path(tmp) / "b.txt.tmp").exists())
+
+    def test_exporter_thread_reports_events(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = _write_session(Path(tmp), "raw_only")
+            events = []
+            exporter = SessionExporter(session_dir, Path(tmp) / "out.jsonl", events.append, "jsonl", workers=1)
+            exporter.start()
+            exporter.join(timeout=30)
+
+            self.assertEqual(events[-1]["type"], "export_done")
+            self.assertTrue(events[-1]["ok"])
+            self.assertEqual(events[-1]["lines"], 6000)
+            self.assertTrue(any(event["type"] == "export_progress" for event in events))
+
+    @unittest.skipUnless(importlib.util.find_spec("pyarrow"), "pyarrow is not installed")
+    def test_parquet_dataset(self) -> None:
+        import pyarrow.parquet as pq
+
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = _write_session(Path(tmp), "raw_only")
+            output = Path(tmp) / "dataset"
+            export_session_parallel(session_dir, output, "parquet", workers=1, chunk_bytes=50_000)
+
+            table = pq.read_table(output)
+            self.assertEqual(table.num_rows, 6000)
+            self.assertEqual(table.column("is_error").to_pylist().count(True), 2 * len(range(0, 3000, 9)))
+
+    def test_parquet_without_pyarrow_fails_clearly(self) -> None:
+        if importlib.util.find_spec("pyarrow"):
+            self.skipTest("pyarrow is installed")
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = _write_session(Path(tmp), "split")
+            with self.assertRaisesRegex(RuntimeError, "pyarrow"):
+                export_session_parallel(session_dir, Path(tmp) / "dataset", "parquet")
+
+
+if __name__ == "__main__":
+    unittest.main()
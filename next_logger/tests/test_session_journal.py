@@ -0,0 +1,101 @@
+import json
+from datetime import datetime
+from pathlib import Path
+import tempfile
+import unittest
+
+from next_logger.domain import SessionConfig, SessionStats
+from next_logger.infrastructure.log_writer import SessionLogWriter, settings_section, stats_section
+from next_logger.infrastructure.session_journal import (
+    SessionJournal,
+    journal_path,
+    recover_session,
+    truncate_torn_tail,
+)
+
+
+class TestSessionJournal(unittest.TestCase):
+    def test_recovers_manifest_from_checkpoint_and_tail(self) -> None:
+        for layout in ("split", "raw_only"):
+            with self.subTest(layout=layout):
+                with tempfile.TemporaryDirectory() as tmp:
+                    config = SessionConfig(save_dir=Path(tmp), product="P1", storage_layout=layout)
+                    writer = SessionLogWriter(config)
+                    stats = SessionStats()
+
+                    def snapshot() -> dict:
+                        return {"stats": stats_section(stats), **writer.checkpoint_state()}
+
+                    journal = SessionJournal(writer.session_dir, snapshot=snapshot)
+                    journal.write_start(
+                        {"settings": settings_section(config), "segments": writer.checkpoint_state()["segments"]}
+                    )
+                    for index in range(10):
+                        writer.write_line(datetime.now(), f"line {index}", is_error=index == 3)
+                    stats.received_lines = 10
+                    stats.error_lines = 1
+                    stats.reconnect_attempts = 2
+                    journal._checkpoint()
+
+                    for index in range(10, 15):
+                        writer.write_line(datetime.now(), f"line {index}", is_error=index == 12)
+                    writer.rotate_segment()
+                    writer.write_line(datetime.now(), "after rotate", is_error=False)
+                    # Simulate a crash: files are left open, a torn line is on disk, and no manifest is written.
+                    with (writer.session_dir / "raw_part02.log").open("a", encoding="utf-8") as handle:
+                        handle.write("2026-01-01 00:00:00.000\ttorn")
+                    journal._file.write('{"type": "checkpoint", "stats": {')
+                    journal._file.close()
+
+                    manifest_path = recover_session(writer.session_dir)
+
+                    self.assertIsNotNone(manifest_path)
+                    manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+                    self.assertEqual(manifest["session"]["status"], "recovered")
+                    self.assertEqual(manifest["settings"]["product"], "P1")
+                    self.assertEqual(manifest["stats"]["received_lines"], 16)
+                    self.assertEqual(manifest["stats"]["error_lines"], 2)
+                    self.assertEqual(manifest["stats"]["reconnect_attempts"], 2)
+                    self.assertEqual([item["segment"] for item in manifest["segments"]], ["part01", "part02"])
+                    raw = (writer.session_dir / "raw_part02.log").read_bytes()
+                    self.assertTrue(raw.endswith(b"after rotate\n"))
+                    self.assertFalse(journal_path(writer.session_dir).exists())
+                    self.assertIsNone(recover_session(writer.session_dir))
+                    writer.close(status="stopped", stats=stats)
+
+    def test_segments_closed_before_checkpoint_are_not_recounted(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            config = SessionConfig(save_dir=Path(tmp), durability="none")
+            writer = SessionLogWriter(config)
+            stats = SessionStats()
+            journal = SessionJournal(
+                writer.session_dir, snapshot=lambda: {"stats": stats_section(stats), **writer.checkpoint_state()}
+            )
+            journal.write_start({"settings": settings_section(config)})
+            for index in range(20):
+                writer.write_line(datetime.now(), f"line {index}", is_error=False)
+            writer.rotate_segment()
+            for index in range(5):
+                writer.write_line(datetime.now(), f"next {index}", is_error=False)
+            stats.received_lines = 25
+            journal._checkpoint()
+            writer.write_line(datetime.now(), "late", is_error=False)
+            journal._file.close()
+
+            manifest_path = recover_session(writer.session_dir)
+
+            manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+            self.assertEqual(manifest["stats"]["received_lines"], 26)
+            writer.close(status="stopped", stats=stats)
+
+    def test_truncate_respects_floor(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "raw.log"
+            path.write_bytes(b"a\nb\npartial")
+            self.assertEqual(truncate_torn_tail(path), 4)
+            path.write_bytes(b"a\nb\npartial")
+            self.assertEqual(truncate_torn_tail(path, floor=6), 6)
+
+
+if __name__ == "__main__":
+    unittest.main()
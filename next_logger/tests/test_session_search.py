@@ -0,0 +1,94 @@
+import json
+from pathlib import Path
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from next_logger.infrastructure import session_search
+from next_logger.infrastructure.session_search import (
+    SessionSearchWorker,
+    compile_search_pattern,
+    list_segment_files,
+    list_session_dirs,
+    search_segment,
+)
+from next_logger.infrastructure.session_archive import archive_session
+
+
+class TestSessionSearch(unittest.TestCase):
+    def _make_session(self, base: Path, name: str, lines: list[str]) -> Path:
+        session_dir = base / name
+        session_dir.mkdir()
+        raw_path = session_dir / "raw_part01.log"
+        raw_path.write_text("".join(f"2026-01-01 00:00:{i:02d}.000\t{line}\n" for i, line in enumerate(lines)), encoding="utf-8")
+        manifest = {"segments": [{"segment": "part01", "raw": str(raw_path)}]}
+        (session_dir / "manifest.json").write_text(json.dumps(manifest), encoding="utf-8")
+        return session_dir
+
+    def test_segment_hits_keep_original_timestamps(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = self._make_session(Path(tmp), "s1", ["boot ok", "sensor ERROR 12", "idle", "error again"])
+            hits = list(search_segment(session_dir / "raw_part01.log", compile_search_pattern("error")))
+
+            self.assertEqual([hit[0] for hit in hits], [2, 4])
+            self.assertEqual(hits[0][1], "2026-01-01 00:00:01.000")
+            self.assertEqual(hits[0][2], "sensor ERROR 12")
+
+    def test_regex_and_case_sensitive_literal(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            session_dir = self._make_session(Path(tmp), "s1", ["code=E101", "code=e202", "E101 again"])
+            raw_path = session_dir / "raw_part01.log"
+            regex_hits = list(search_segment(raw_path, compile_search_pattern(r"E\d{3}$", regex=True, ignore_case=False)))
+            literal_hits = list(
+                search_segment(raw_path, compile_search_pattern("E101", ignore_case=False), literal=b"E101")
+            )
+
+            self.assertEqual([hit[2] for hit in regex_hits], ["code=E101"])
+            self.assertEqual([hit[0] for hit in literal_hits], [1, 3])
+
+    def test_line_numbers_across_long_gaps(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            lines = [f"filler {index}" for index in range(200)]
+            lines[3] = lines[150] = lines[199] = "ERROR here"
+            session_dir = self._make_session(Path(tmp), "s1", lines)
+            # A tiny slice size makes each gap span many slices.
+            with mock.patch.object(session_search, "_COUNT_CHUNK", 7):
+                hits = list(search_segment(session_dir / "raw_part01.log", compile_search_pattern("error")))
+
+            self.assertEqual([hit[0] for hit in hits], [4, 151, 200])
+
+    def test_worker_streams_hits_across_sessions(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            base = Path(tmp)
+            self._make_session(base, "s1", ["alpha", "beta"])
+            self._make_session(base, "s2", ["beta", "gamma"])
+
+            worker = SessionSearchWorker(list_session_dirs(base), "beta")
+            worker.start()
+            worker.join(timeout=5.0)
+            deadline = time.monotonic() + 5.0
+            while not worker.finished and time.monotonic() < deadline:
+                time.sleep(0.01)
+
+            hits = worker.poll_hits()
+            self.assertEqual([hit.session_dir.name for hit in hits], ["s1", "s2"])
+            self.assertEqual(worker.scanned_segments, 2)
+
+    def test_searches_archived_segments_by_frame(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            lines = [f"value {i}" + (" ERROR" if i % 500 == 0 else "") for i in range(2000)]
+            session_dir = self._make_session(Path(tmp), "s1", lines)
+            archive_session(session_dir, frame_size=4096)
+            self.assertFalse((session_dir / "raw_part01.log").exists())
+
+            segments = list_segment_files(session_dir)
+            hits = list(search_segment(segments[0][1], compile_search_pattern("error")))
+
+            self.assertEqual([segment for segment, _ in segments], ["part01"])
+            self.assertEqual([hit[0] for hit in hits], [1, 501, 1001, 1501])
+            self.assertEqual(hits[1][2], "value 500 ERROR")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,46 @@
+import threading
+import unittest
+
+from next_logger.application.stats_collector import StatsCollector
+
+
+class TestStatsCollector(unittest.TestCase):
+    def test_shards_are_summed_on_snapshot(self) -> None:
+        collector = StatsCollector()
+
+        def produce() -> None:
+            for index in range(1000):
+                collector.record_line(is_error=index % 10 == 0, write_ok=True)
+            collector.record_drop()
+
+        threads = [threading.Thread(target=produce) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        stats = collector.snapshot()
+        self.assertEqual(stats.received_lines, 4000)
+        self.assertEqual(stats.error_lines, 400)
+        self.assertEqual(stats.dropped_lines, 4)
+
+    def test_record_lines_counts_a_batch(self) -> None:
+        collector = StatsCollector()
+        collector.record_lines(5, errors=2, write_ok=True)
+        collector.record_lines(3, errors=0, write_ok=False)
+
+        stats = collector.snapshot()
+        self.assertEqual((stats.received_lines, stats.error_lines, stats.write_failures), (8, 2, 3))
+
+    def test_reconnect_events_are_bounded(self) -> None:
+        collector = StatsCollector(max_reconnect_events=3)
+        for attempt in range(1, 6):
+            collector.record_reconnect({"attempt": str(attempt)})
+
+        stats = collector.snapshot()
+        self.assertEqual(stats.reconnect_attempts, 5)
+        self.assertEqual([event["attempt"] for event in stats.reconnect_events], ["3", "4", "5"])
+
+
+if __name__ == "__main__":
+    unittest.main()
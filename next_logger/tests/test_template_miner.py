@@ -0,0 +1,95 @@
+import unittest
+
+from next_logger.application.template_miner import WILDCARD, TemplateMiner
+
+
+class TestTemplateMiner(unittest.TestCase):
+    def test_differing_tokens_become_wildcards(self) -> None:
+        miner = TemplateMiner()
+        first = miner.add("session opened for user alice from lab", 10)
+        second = miner.add("session opened for user bob from lab", 20)
+        self.assertEqual(first, second)
+        self.assertEqual(len(miner), 1)
+        self.assertEqual(miner.top()[0].template, f"session opened for user {WILDCARD} from lab")
+
+    def test_numbers_are_masked_before_mining(self) -> None:
+        miner = TemplateMiner()
+        miner.add("temp=21 fan=1200 rpm", 1)
+        miner.add("temp=35 fan=900 rpm", 2)
+        self.assertEqual([item.template for item in miner.top()], ["temp=# fan=# rpm"])
+
+    def test_different_lengths_and_prefixes_stay_apart(self) -> None:
+        miner = TemplateMiner()
+        miner.add("boot ok", 1)
+        miner.add("boot ok after retry", 2)
+        miner.add("sensor offline now", 3)
+        miner.add("link offline now", 4)
+        self.assertEqual(len(miner), 4)
+
+    def test_counts_severities_and_examples(self) -> None:
+        miner = TemplateMiner(max_examples=2)
+        batch = [(index * 100, f"read block {index} failed code {index % 3}") for index in range(6)]
+        severities = ["info", "error", "warning", "error", "info", "info"]
+        miner.add_batch(batch, severities)
+        (item,) = miner.top()
+        self.assertEqual((item.count, item.errors, item.warnings), (6, 2, 1))
+        self.assertEqual((item.first_ns, item.last_ns), (0, 500))
+        # The first example is kept whatever its severity; later slots go to warnings and errors.
+        self.assertEqual(item.examples, ("read block 0 failed code 0", "read block 1 failed code 1"))
+        self.assertEqual(miner.lines, 6)
+
+    def test_match_does_not_learn(self) -> None:
+        miner = TemplateMiner()
+        template_id = miner.add("disk sda1 mounted at /data", 1)
+        self.assertEqual(miner.match("disk sdb2 mounted at /data"), template_id)
+        self.assertIsNone(miner.match("completely different shape of line"))
+        self.assertIsNone(miner.match(""))
+        self.assertEqual(miner.lines, 1)
+
+    def test_least_recent_template_is_evicted(self) -> None:
+        miner = TemplateMiner(max_clusters=3)
+        for word in ["alpha", "bravo", "charlie"]:
+            miner.add(f"{word} step one", 1)
+        miner.add("alpha step one", 2)
+        miner.add("delta step one", 3)
+        self.assertEqual(sorted(item.template for item in miner.top()), [
+            "alpha step one", "charlie step one", "delta step one"
+        ])
+        summary = miner.summary()
+        self.assertEqual((summary["templates"], summary["evicted_templates"], summary["evicted_lines"]), (3, 1, 1))
+        self.assertIsNone(miner.match("bravo step one"))
+        # The evicted branch is pruned, so the tree only holds live templates.
+        self.assertNotIn("bravo", miner._root[3])
+
+    def test_memory_stays_bounded_for_unique_lines(self) -> None:
+        miner = TemplateMiner(max_clusters=50, max_children=8)
+        for index in range(2000):
+            word = "".join(chr(97 + (index // 26 ** power) % 26) for power in range(3))
+            miner.add(f"{word} {word}x {word}y {word}z", index)
+        self.assertEqual(len(miner), 50)
+        self.assertLessEqual(len(miner._root[4]), 8)
+        self.assertEqual(miner.lines, 2000)
+
+    def test_top_orders(self) -> None:
+        miner = TemplateMiner()
+        for _ in range(5):
+            miner.add("heartbeat ok", 1)
+        miner.add("sensor fault on bus", 2, "error")
+        miner.add("sensor fault on bus", 3, "error")
+        miner.add("config reloaded from disk now", 9)
+        self.assertEqual(miner.top(1)[0].template, "heartbeat ok")
+        self.assertEqual(miner.top(1, key="errors")[0].template, "sensor fault on bus")
+        self.assertEqual(miner.top(1, key="rare")[0].template, "config reloaded from disk now")
+        self.assertEqual(miner.top(1, key="recent")[0].template, "config reloaded from disk now")
+
+    def test_summary_converts_times(self) -> None:
+        miner = TemplateMiner()
+        miner.add("ping", 5)
+        summary = miner.summary(wall_ns=lambda value: value + 1000)
+        self.assertEqual(summary["lines"], 1)
+        self.assertEqual(summary["top"][0]["first_ns"], 1005)
+        self.assertEqual(summary["top"][0]["examples"], ["ping"])
+
+
+if __name__ == "__main__":
+    unittest.main()
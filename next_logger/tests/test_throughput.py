@@ -0,0 +1,66 @@
+import sys
+import threading
+import unittest
+
+from next_logger.application.throughput import ThroughputMeter
+
+
+class _FakeClock:
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestThroughputMeter(unittest.TestCase):
+    def test_windowed_rates_reflect_recent_seconds_only(self) -> None:
+        clock = _FakeClock()
+        meter = ThroughputMeter(clock=clock)
+        for _ in range(60):
+            meter.record(lines=100, nbytes=1000)
+            clock.now += 1.0
+        clock.now += 5.0
+
+        rates = meter.rates()
+        self.assertEqual(rates[1]["lines"], 0.0)
+        self.assertAlmostEqual(rates[10]["lines"], 50.0)
+        self.assertAlmostEqual(rates[60]["lines"], 55 * 100 / 60)
+
+    def test_series_is_downsampled_within_fixed_capacity(self) -> None:
+        clock = _FakeClock()
+        meter = ThroughputMeter(history_buckets=8, clock=clock)
+        for _ in range(20):
+            meter.record(lines=1, latency_ns=2_000_000, writes=1)
+            clock.now += 1.0
+
+        series = meter.series()
+        self.assertEqual(series["bucket_sec"], 4)
+        self.assertLessEqual(len(series["rows"]), 8)
+        self.assertEqual(sum(row[1] for row in series["rows"]), 20)
+        self.assertEqual(series["rows"][0][5], 2.0)
+
+    def test_concurrent_records_are_not_lost(self) -> None:
+        clock = _FakeClock()
+        meter = ThroughputMeter(history_buckets=16, clock=clock)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)
+        try:
+            def producer() -> None:
+                for _ in range(5000):
+                    meter.record(lines=1, nbytes=10)
+                    clock.now += 0.001
+
+            threads = [threading.Thread(target=producer) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        finally:
+            sys.setswitchinterval(interval)
+
+        self.assertEqual(sum(row[1] for row in meter.series()["rows"]), 20000)
+
+
+if __name__ == "__main__":
+    unittest.main()
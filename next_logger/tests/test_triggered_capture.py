@@ -0,0 +1,130 @@
+from pathlib import Path
+import tempfile
+import unittest
+from unittest import mock
+
+from next_logger.domain import SessionConfig, SessionStats
+from next_logger.infrastructure.log_writer import SessionLogWriter
+from next_logger.infrastructure import triggered_capture
+from next_logger.infrastructure.triggered_capture import RECORD_OVERHEAD_BYTES, TriggeredCapture
+
+
+SECOND = 1_000_000_000
+
+
+def _records(first: int, count: int) -> list[tuple[int, str, bool]]:
+    return [(number * SECOND, f"line {number:03d}", False) for number in range(first, first + count)]
+
+
+def _raw_lines(writer: SessionLogWriter, segment: str) -> list[str]:
+    text = (writer.session_dir / segment).read_text(encoding="utf-8")
+    return [line.split("\t", 1)[1] for line in text.splitlines()]
+
+
+class TestTriggeredCapture(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.writer = SessionLogWriter(SessionConfig(save_dir=Path(self._tmp.name), durability="none"))
+        self.triggered: list[dict] = []
+
+    def tearDown(self) -> None:
+        self.writer.close(status="stopped", stats=SessionStats())
+        self._tmp.cleanup()
+
+    def _capture(self, pre_lines: int, post_sec: int) -> TriggeredCapture:
+        pre_bytes = pre_lines * (len("line 000") + RECORD_OVERHEAD_BYTES)
+        return TriggeredCapture(self.writer, pre_bytes, post_sec * SECOND, on_trigger=self.triggered.append)
+
+    def test_nothing_is_written_before_a_trigger(self) -> None:
+        capture = self._capture(pre_lines=10, post_sec=5)
+        self.assertTrue(capture.write(_records(0, 100)))
+        self.assertEqual(self.writer.segment_position(), ("raw_part01.log", 0))
+        summary = capture.summary()
+        self.assertEqual((summary["buffered_lines"], summary["discarded_lines"]), (10, 90))
+        self.assertEqual(capture.last_batch_start(), ("", 0))
+
+    def test_pre_and_post_windows_go_to_separate_segments(self) -> None:
+        capture = self._capture(pre_lines=5, post_sec=3)
+        capture.write(_records(0, 20))
+        batch = _records(20, 10)
+        capture.write(batch, [(2, "error")])
+
+        self.assertEqual(_raw_lines(self.writer, "raw_part01.log"), [f"line {n:03d}" for n in range(17, 22)])
+        self.assertEqual(_raw_lines(self.writer, "raw_part02.log"), [f"line {n:03d}" for n in range(22, 26)])
+        (capture_info,) = self.triggered
+        self.assertEqual(capture_info["pre_segment"], "raw_part01.log")
+        self.assertEqual(capture_info["post_segment"], "raw_part02.log")
+        self.assertEqual((capture_info["reason"], capture_info["line"]), ("error", "line 022"))
+
+        # After the window the lines are buffered again, and the next capture starts new segments.
+        capture.write(_records(30, 10), [(5, "regex")])
+        self.assertEqual(_raw_lines(self.writer, "raw_part03.log"), [f"line {n:03d}" for n in range(30, 35)])
+        self.assertEqual(_raw_lines(self.writer, "raw_part04.log"), [f"line {n:03d}" for n in range(35, 39)])
+        summary = capture.summary()
+        self.assertEqual(summary["capture_count"], 2)
+        self.assertEqual(summary["captures"][0]["post_lines"], 4)
+
+    def test_trigger_inside_the_post_window_extends_it(self) -> None:
+        capture = self._capture(pre_lines=2, post_sec=2)
+        capture.write(_records(0, 5), [(4, "error")])
+        capture.write(_records(5, 2), [(1, "error")])
+        capture.write(_records(7, 5))
+        self.assertEqual(_raw_lines(self.writer, "raw_part02.log"), [f"line {n:03d}" for n in range(4, 9)])
+        summary = capture.summary()
+        self.assertEqual((summary["capture_count"], summary["triggers"]), (1, 2))
+        self.assertEqual(summary["captures"][0]["triggers"], 2)
+
+    def test_manual_trigger_and_batch_positions(self) -> None:
+        capture = self._capture(pre_lines=3, post_sec=10)
+        capture.write(_records(0, 5))
+        capture.trigger("manual", 5 * SECOND)
+        # The trigger is only flagged; the next write fires it.
+        self.assertTrue(capture.trigger_pending)
+        self.assertEqual(self.triggered, [])
+
+        capture.write(_records(5, 3))
+        self.assertFalse(capture.trigger_pending)
+        self.assertEqual(_raw_lines(self.writer, "raw_part01.log"), ["line 002", "line 003", "line 004"])
+        self.assertEqual(capture.last_batch_start(), ("raw_part02.log", 0))
+        capture.write(_records(8, 2))
+        self.assertEqual(capture.last_batch_start(), ("raw_part02.log", 3))
+        self.assertEqual(self.triggered[0]["reason"], "manual")
+
+
+    def test_manual_trigger_keeps_earlier_lines_of_the_batch_as_context(self) -> None:
+        capture = self._capture(pre_lines=5, post_sec=10)
+        capture.write(_records(0, 2))
+        capture.trigger("manual", 3 * SECOND)
+        capture.write(_records(2, 3))
+        self.assertEqual(_raw_lines(self.writer, "raw_part01.log"), ["line 000", "line 001", "line 002"])
+        self.assertEqual(_raw_lines(self.writer, "raw_part02.log"), ["line 003", "line 004"])
+
+        # An idle tick with no lines still fires a pending trigger; this one extends the open window.
+        capture.trigger("manual", 8 * SECOND)
+        capture.write([])
+        summary = capture.summary()
+        self.assertEqual((summary["triggers"], summary["capture_count"]), (2, 1))
+
+    def test_pre_window_is_written_in_slices(self) -> None:
+        capture = self._capture(pre_lines=50, post_sec=10)
+        capture.write(_records(0, 50))
+        calls: list[int] = []
+        write_lines_ns = self.writer.write_lines_ns
+
+        def counting_write(records):
+            calls.append(len(records))
+            return write_lines_ns(records)
+
+        with mock.patch.object(triggered_capture, "PRE_WRITE_CHUNK_BYTES", 10 * (len("line 000") + RECORD_OVERHEAD_BYTES)):
+            with mock.patch.object(self.writer, "write_lines_ns", counting_write):
+                capture.trigger("manual", 50 * SECOND)
+                capture.write([])
+
+        self.assertEqual(calls, [10] * 5)
+        self.assertEqual(len(_raw_lines(self.writer, "raw_part01.log")), 50)
+        summary = capture.summary()
+        self.assertEqual((summary["written_lines"], summary["buffered_lines"]), (50, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()